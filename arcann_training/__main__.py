@@ -6,12 +6,13 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/18
 """
 
 # Standard library modules
 import argparse
 import importlib
+import inspect
 import logging
 import logging.config
 from pathlib import Path
@@ -26,6 +27,7 @@ parser.add_argument("phase_name", type=str, help="Phase name")
 parser.add_argument("-v", "--verbose", type=int, default=0, help="verbosity, 0 (default) or 1 (debug)")
 parser.add_argument("-i", "--input", type=str, default="input.json", help="name of the input file (with ext)")
 parser.add_argument("-c", "--cluster", type=str, default=None, help="name of the fake cluster")
+parser.add_argument("-j", "--jobs", type=int, default=1, help="number of processes, 1 (default) or more (only for the phases that support it)")
 
 if __name__ == "__main__":
     args = parser.parse_args()
@@ -52,6 +54,9 @@ if __name__ == "__main__":
     else:
         fake_cluster = None
 
+    # Number of processes
+    jobs: int = args.jobs
+
     del args
 
     # Start
@@ -85,12 +90,15 @@ if __name__ == "__main__":
     else:
         try:
             submodule = importlib.import_module(submodule_name)
-            exit_code = submodule.main(step_name, phase_name, deepmd_iterative_path, fake_cluster, input_fn)
+            if "jobs" in inspect.signature(submodule.main).parameters:
+                exit_code = submodule.main(step_name, phase_name, deepmd_iterative_path, fake_cluster, input_fn, jobs=jobs)
+            else:
+                exit_code = submodule.main(step_name, phase_name, deepmd_iterative_path, fake_cluster, input_fn)
             del submodule, submodule_name
         except Exception as e:
             exit_code = 1
 
-    del deepmd_iterative_path, fake_cluster, input_fn
+    del deepmd_iterative_path, fake_cluster, input_fn, jobs
 
     # Exit
     arcann_logger.info(f"-" * 88)
@@ -0,0 +1,371 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+The amber module provides functions to read AMBER NetCDF trajectories (NetCDF3 classic or 64-bit offset, as written by
+sander) and to write AMBER ASCII restart files, as np.ndarray.
+
+The NetCDF3 header is parsed natively (no netCDF library): the record variables ('coordinates', 'cell_lengths', ...)
+are laid out one record (frame) after the other, so they are memory-mapped as strided arrays and only the selected
+frames are read.
+
+Functions
+---------
+read_netcdf_header(netcdf_file_path: Path) -> Dict[str, Any]
+    A function to read the header (dimensions, attributes and variables) of a NetCDF3 file.
+
+read_amber_netcdf_frames(netcdf_file_path: Path, frame_indexes: Sequence[int]) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]
+    A function to read the coordinates (and cell) of the selected frames of an AMBER NetCDF trajectory.
+
+check_amber_netcdf_file(netcdf_file_path: Path) -> Tuple[bool, int]
+    A function to check the integrity of an AMBER NetCDF trajectory and count its frames, without reading the coordinates.
+
+write_amber_restart_file(restart_file_path: Path, atomic_coordinates: np.ndarray, cell_lengths: Optional[np.ndarray] = None, cell_angles: Optional[np.ndarray] = None, title: str = "", time: float = 0.0) -> None
+    A function to write the coordinates (and box) of one frame as an AMBER ASCII restart (inpcrd/rst7) file.
+"""
+
+# Standard library modules
+import struct
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Sequence, Tuple
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.utils import catch_errors_decorator
+
+# NetCDF3 tags and types (big-endian on disk)
+NC_DIMENSION = 10
+NC_VARIABLE = 11
+NC_ATTRIBUTE = 12
+NC_TYPES = {1: ">i1", 2: "S1", 3: ">i2", 4: ">i4", 5: ">f4", 6: ">f8"}
+NC_STREAMING = 0xFFFFFFFF
+
+
+def _read_netcdf_int(file: BinaryIO) -> int:
+    """
+    Reads a big-endian 32-bit integer, raising a ValueError at the end of the file.
+    """
+    value_bytes = file.read(4)
+    if len(value_bytes) != 4:
+        raise ValueError("Invalid NetCDF file (unexpected end of header).")
+    return struct.unpack(">I", value_bytes)[0]
+
+
+def _read_netcdf_name(file: BinaryIO) -> str:
+    """
+    Reads a NetCDF name (length, then the characters padded to 4 bytes).
+    """
+    name_length = _read_netcdf_int(file)
+    name_bytes = file.read(name_length + (-name_length % 4))
+    if len(name_bytes) != name_length + (-name_length % 4):
+        raise ValueError("Invalid NetCDF file (unexpected end of header).")
+    return name_bytes[:name_length].decode(errors="replace")
+
+
+def _read_netcdf_attributes(file: BinaryIO) -> Dict[str, Any]:
+    """
+    Reads a NetCDF attribute list (character attributes are returned as str, the others as np.ndarray).
+    """
+    tag, attribute_count = _read_netcdf_int(file), _read_netcdf_int(file)
+    if tag == 0 and attribute_count == 0:
+        return {}
+    if tag != NC_ATTRIBUTE:
+        raise ValueError("Invalid NetCDF file (attribute list expected).")
+
+    attributes = {}
+    for _ in range(attribute_count):
+        name = _read_netcdf_name(file)
+        nc_type, value_count = _read_netcdf_int(file), _read_netcdf_int(file)
+        if nc_type not in NC_TYPES:
+            raise ValueError(f"Invalid NetCDF file (unknown type '{nc_type}').")
+        value_size = np.dtype(NC_TYPES[nc_type]).itemsize * value_count
+        value_bytes = file.read(value_size + (-value_size % 4))[:value_size]
+        if len(value_bytes) != value_size:
+            raise ValueError("Invalid NetCDF file (unexpected end of header).")
+        attributes[name] = value_bytes.decode(errors="replace").rstrip("\x00") if nc_type == 2 else np.frombuffer(value_bytes, dtype=NC_TYPES[nc_type])
+    return attributes
+
+
+# Unittested
+@catch_errors_decorator
+def read_netcdf_header(netcdf_file_path: Path) -> Dict[str, Any]:
+    """
+    Reads the header of a NetCDF3 file (classic or 64-bit offset format).
+
+    Parameters
+    ----------
+    netcdf_file_path : Path
+        The path to the NetCDF file.
+
+    Returns
+    -------
+    Dict[str, Any]
+        A dictionary with the keys:
+        - version: 1 (classic) or 2 (64-bit offset).
+        - record_count: The number of records (frames) written in the header (computed from the file size if streaming).
+        - dimensions: The dimension lengths by name (the record dimension has the length None).
+        - attributes: The global attributes.
+        - variables: By name, a dictionary with the keys 'dimensions', 'attributes', 'dtype', 'shape' (per record for
+          record variables), 'is_record', 'begin' and 'size'.
+        - record_size: The size of one record in bytes.
+        - file_size: The size of the file in bytes.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the NetCDF file does not exist.
+    ValueError
+        If the file is not a NetCDF3 file.
+    """
+    if not netcdf_file_path.is_file():
+        raise FileNotFoundError(f"File not found: {netcdf_file_path}")
+
+    return _read_netcdf_header(netcdf_file_path)
+
+
+def _read_netcdf_header(netcdf_file_path: Path) -> Dict[str, Any]:
+    """
+    Reads the header of a NetCDF3 file (see 'read_netcdf_header'), raising a ValueError if the file is not a NetCDF3 file.
+    """
+    file_size = netcdf_file_path.stat().st_size
+    with netcdf_file_path.open("rb") as file:
+        magic = file.read(4)
+        if len(magic) != 4 or magic[:3] != b"CDF" or magic[3] not in (1, 2):
+            raise ValueError(f"Invalid NetCDF3 file (missing 'CDF' signature): {netcdf_file_path}")
+        version = magic[3]
+        record_count = _read_netcdf_int(file)
+
+        # Dimensions
+        dimension_names, dimensions, record_dimension = [], {}, None
+        tag, dimension_count = _read_netcdf_int(file), _read_netcdf_int(file)
+        if not (tag == 0 and dimension_count == 0):
+            if tag != NC_DIMENSION:
+                raise ValueError(f"Invalid NetCDF3 file (dimension list expected): {netcdf_file_path}")
+            for _ in range(dimension_count):
+                name = _read_netcdf_name(file)
+                length = _read_netcdf_int(file)
+                dimension_names.append(name)
+                dimensions[name] = length if length != 0 else None
+                if length == 0:
+                    record_dimension = name
+
+        attributes = _read_netcdf_attributes(file)
+
+        # Variables
+        variables = {}
+        tag, variable_count = _read_netcdf_int(file), _read_netcdf_int(file)
+        if not (tag == 0 and variable_count == 0):
+            if tag != NC_VARIABLE:
+                raise ValueError(f"Invalid NetCDF3 file (variable list expected): {netcdf_file_path}")
+            for _ in range(variable_count):
+                name = _read_netcdf_name(file)
+                dimension_ids = [_read_netcdf_int(file) for _ in range(_read_netcdf_int(file))]
+                if any(dimension_id >= len(dimension_names) for dimension_id in dimension_ids):
+                    raise ValueError(f"Invalid NetCDF3 file (unknown dimension in variable '{name}'): {netcdf_file_path}")
+                variable_attributes = _read_netcdf_attributes(file)
+                nc_type = _read_netcdf_int(file)
+                if nc_type not in NC_TYPES:
+                    raise ValueError(f"Invalid NetCDF3 file (unknown type '{nc_type}'): {netcdf_file_path}")
+                size = _read_netcdf_int(file)
+                begin_bytes = file.read(8 if version == 2 else 4)
+                if len(begin_bytes) != (8 if version == 2 else 4):
+                    raise ValueError(f"Invalid NetCDF3 file (unexpected end of header): {netcdf_file_path}")
+                variable_dimensions = [dimension_names[dimension_id] for dimension_id in dimension_ids]
+                is_record = bool(variable_dimensions) and variable_dimensions[0] == record_dimension
+                variables[name] = {
+                    "dimensions": variable_dimensions,
+                    "attributes": variable_attributes,
+                    "dtype": np.dtype(NC_TYPES[nc_type]),
+                    "shape": tuple(dimensions[dimension] for dimension in variable_dimensions[1 if is_record else 0 :]),
+                    "is_record": is_record,
+                    "begin": struct.unpack(">Q" if version == 2 else ">I", begin_bytes)[0],
+                    "size": size,
+                }
+
+    # One record holds every record variable (without padding if there is only one)
+    record_variables = [variable for variable in variables.values() if variable["is_record"]]
+    if len(record_variables) == 1:
+        record_size = int(np.prod(record_variables[0]["shape"], dtype=np.int64)) * record_variables[0]["dtype"].itemsize
+    else:
+        record_size = sum(variable["size"] for variable in record_variables)
+
+    if record_count == NC_STREAMING:
+        records_begin = min((variable["begin"] for variable in record_variables), default=file_size)
+        record_count = (file_size - records_begin) // record_size if record_size > 0 else 0
+
+    return {
+        "version": version,
+        "record_count": record_count,
+        "dimensions": dimensions,
+        "attributes": attributes,
+        "variables": variables,
+        "record_size": record_size,
+        "file_size": file_size,
+    }
+
+
+def _map_netcdf_record_variable(netcdf_file_path: Path, netcdf_header: Dict[str, Any], variable_name: str) -> np.ndarray:
+    """
+    Memory-maps (read-only) a record variable of a NetCDF3 file as an array of shape (record_count, *shape).
+    """
+    variable = netcdf_header["variables"][variable_name]
+    file_map = np.memmap(netcdf_file_path, dtype=np.uint8, mode="r")
+    item_strides = tuple(int(np.prod(variable["shape"][idx + 1 :], dtype=np.int64)) * variable["dtype"].itemsize for idx in range(len(variable["shape"])))
+    return np.ndarray(
+        shape=(netcdf_header["record_count"],) + variable["shape"],
+        dtype=variable["dtype"],
+        buffer=file_map,
+        offset=variable["begin"],
+        strides=(netcdf_header["record_size"],) + item_strides,
+    )
+
+
+def _check_amber_netcdf_header(netcdf_file_path: Path, netcdf_header: Dict[str, Any]) -> None:
+    """
+    Checks that a NetCDF3 header describes an AMBER trajectory whose records are all present in the file.
+    """
+    if "AMBER" not in str(netcdf_header["attributes"].get("Conventions", "")):
+        raise ValueError(f"Not an AMBER NetCDF trajectory (Conventions attribute): {netcdf_file_path}")
+    coordinates = netcdf_header["variables"].get("coordinates")
+    if coordinates is None or not coordinates["is_record"] or coordinates["dimensions"][1:] != ["atom", "spatial"] or coordinates["shape"][1] != 3:
+        raise ValueError(f"Invalid AMBER NetCDF trajectory (coordinates variable): {netcdf_file_path}")
+    last_record_end = max(
+        variable["begin"] + (netcdf_header["record_count"] - 1) * netcdf_header["record_size"] + int(np.prod(variable["shape"], dtype=np.int64)) * variable["dtype"].itemsize
+        for variable in netcdf_header["variables"].values()
+        if variable["is_record"]
+    )
+    if netcdf_header["record_count"] > 0 and last_record_end > netcdf_header["file_size"]:
+        raise ValueError(f"Invalid AMBER NetCDF trajectory (truncated records): {netcdf_file_path}")
+
+
+# Unittested
+@catch_errors_decorator
+def read_amber_netcdf_frames(netcdf_file_path: Path, frame_indexes: Sequence[int]) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    Reads the coordinates (and cell, if present) of the selected frames of an AMBER NetCDF trajectory.
+    Only the selected frames are read from the (memory-mapped) file.
+
+    Parameters
+    ----------
+    netcdf_file_path : Path
+        The path to the NetCDF trajectory.
+    frame_indexes : Sequence[int]
+        The (0-based) indexes of the frames to read, in the requested order.
+
+    Returns
+    -------
+    Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]
+        - atomic_coordinates: A float64 array of shape (len(frame_indexes), atom_count, 3).
+        - cell_lengths: A float64 array of shape (len(frame_indexes), 3), or None if the trajectory has no cell.
+        - cell_angles: A float64 array of shape (len(frame_indexes), 3) (degrees), or None if the trajectory has no cell.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the NetCDF file does not exist.
+    IndexError
+        If a frame index is out of range.
+    ValueError
+        If the file is not a valid AMBER NetCDF trajectory.
+    """
+    netcdf_header = read_netcdf_header(netcdf_file_path)
+    _check_amber_netcdf_header(netcdf_file_path, netcdf_header)
+    frame_indexes = np.asarray(frame_indexes, dtype=np.int64).reshape(-1)
+    if frame_indexes.size > 0 and (frame_indexes.min() < 0 or frame_indexes.max() >= netcdf_header["record_count"]):
+        raise IndexError(f"Frame index out of range (total frames: {netcdf_header['record_count']})")
+
+    atomic_coordinates = _map_netcdf_record_variable(netcdf_file_path, netcdf_header, "coordinates")[frame_indexes].astype(np.float64)
+    if "cell_lengths" not in netcdf_header["variables"] or "cell_angles" not in netcdf_header["variables"]:
+        return atomic_coordinates, None, None
+    cell_lengths = _map_netcdf_record_variable(netcdf_file_path, netcdf_header, "cell_lengths")[frame_indexes].astype(np.float64)
+    cell_angles = _map_netcdf_record_variable(netcdf_file_path, netcdf_header, "cell_angles")[frame_indexes].astype(np.float64)
+    return atomic_coordinates, cell_lengths, cell_angles
+
+
+# Unittested
+@catch_errors_decorator
+def check_amber_netcdf_file(netcdf_file_path: Path) -> Tuple[bool, int]:
+    """
+    Checks the integrity of an AMBER NetCDF trajectory and counts its frames, without reading the coordinates.
+
+    The file must be a NetCDF3 file following the AMBER conventions, with a coordinates variable, at least one frame,
+    and all the records announced in the header must be present in the file.
+
+    Parameters
+    ----------
+    netcdf_file_path : Path
+        The path to the NetCDF trajectory.
+
+    Returns
+    -------
+    Tuple[bool, int]
+        - is_valid: True if the trajectory is valid, False otherwise.
+        - frame_count: The number of frames announced in the header (0 if the header is invalid).
+
+    Raises
+    ------
+    FileNotFoundError
+        If the NetCDF file does not exist.
+    """
+    if not netcdf_file_path.is_file():
+        raise FileNotFoundError(f"File not found: {netcdf_file_path}")
+
+    try:
+        netcdf_header = _read_netcdf_header(netcdf_file_path)
+    except ValueError:
+        return False, 0
+    try:
+        _check_amber_netcdf_header(netcdf_file_path, netcdf_header)
+    except ValueError:
+        return False, netcdf_header["record_count"]
+
+    return netcdf_header["record_count"] > 0, netcdf_header["record_count"]
+
+
+# Unittested
+@catch_errors_decorator
+def write_amber_restart_file(
+    restart_file_path: Path,
+    atomic_coordinates: np.ndarray,
+    cell_lengths: Optional[np.ndarray] = None,
+    cell_angles: Optional[np.ndarray] = None,
+    title: str = "",
+    time: float = 0.0,
+) -> None:
+    """
+    Writes the coordinates (and box) of one frame as an AMBER ASCII restart (inpcrd/rst7) file, without velocities.
+
+    Parameters
+    ----------
+    restart_file_path : Path
+        The path to the restart file.
+    atomic_coordinates : np.ndarray
+        The coordinates, of shape (atom_count, 3).
+    cell_lengths : np.ndarray, optional
+        The cell lengths (a, b, c).
+    cell_angles : np.ndarray, optional
+        The cell angles (alpha, beta, gamma) in degrees (90 degrees if the lengths are given without angles).
+    title : str, optional
+        The title line.
+    time : float, optional
+        The time (ps) of the frame.
+    """
+    atomic_coordinates = np.asarray(atomic_coordinates, dtype=np.float64).reshape(-1)
+    atom_count = atomic_coordinates.shape[0] // 3
+
+    lines = [title[:80], f"{atom_count:5d}{time:15.7e}" if atom_count < 100000 else f"{atom_count:6d}{time:15.7e}"]
+    for idx in range(0, atomic_coordinates.shape[0], 6):
+        lines.append("".join(f"{value:12.7f}" for value in atomic_coordinates[idx : idx + 6]))
+    if cell_lengths is not None:
+        cell_angles = np.full(3, 90.0) if cell_angles is None else cell_angles
+        lines.append("".join(f"{value:12.7f}" for value in np.concatenate((np.asarray(cell_lengths, dtype=np.float64), np.asarray(cell_angles, dtype=np.float64)))))
+
+    restart_file_path.write_text("\n".join(lines) + "\n")
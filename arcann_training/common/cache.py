@@ -0,0 +1,193 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+The cache module provides a binary (.npy) cache of arrays parsed from text files (trajectories), keyed on the file identity.
+
+The cache lives in a '.arcann_cache' folder inside the iteration folder ('NNN-step') containing the parsed file, one
+sub-folder per cached file. Entries are read back memory-mapped (read-only) and evicted least recently used first
+when the cache grows over its disk budget ('cache_size_mb' input, 0 disables the cache).
+
+Functions
+---------
+get_cache_path(file_path: Path, cache_size_mb: float = DEFAULT_CACHE_SIZE_MB) -> Optional[Path]
+    A function to get the cache folder used for a file (None if the file is not in an iteration folder or if the cache is disabled).
+
+get_file_key(file_path: Path) -> str
+    A function to compute the identity key of a file (path, size, modification time and partial content hash).
+
+load_cached_arrays(file_path: Path, array_names: List[str], cache_size_mb: float = DEFAULT_CACHE_SIZE_MB) -> Optional[Dict[str, np.ndarray]]
+    A function to load the cached arrays of a file (memory-mapped), if they are all present and up to date.
+
+store_cached_arrays(file_path: Path, arrays: Dict[str, np.ndarray], cache_size_mb: float = DEFAULT_CACHE_SIZE_MB) -> None
+    A function to store arrays parsed from a file in the cache and to enforce the disk budget.
+"""
+
+# Standard library modules
+import hashlib
+import logging
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.utils import catch_errors_decorator
+
+# Default disk budget of the cache of an iteration (in MB), the same as the 'cache_size_mb' default input
+DEFAULT_CACHE_SIZE_MB = 4096
+# Number of bytes hashed at the start and at the end of a file for its identity key
+PARTIAL_HASH_SIZE = 65536
+ITERATION_FOLDER_REGEX = re.compile(r"^\d{3}-")
+
+
+# Unittested
+@catch_errors_decorator
+def get_cache_path(file_path: Path, cache_size_mb: float = DEFAULT_CACHE_SIZE_MB) -> Optional[Path]:
+    """
+    Returns the cache folder used for a file: '.arcann_cache' in the nearest parent iteration folder ('NNN-step').
+
+    Parameters
+    ----------
+    file_path : Path
+        The path to the file.
+    cache_size_mb : float, optional
+        The disk budget of the cache, in MB (0 disables the cache).
+
+    Returns
+    -------
+    Optional[Path]
+        The cache folder, or None if the file is not in an iteration folder or if the cache is disabled.
+    """
+    if cache_size_mb <= 0:
+        return None
+    for parent in file_path.resolve().parents:
+        if ITERATION_FOLDER_REGEX.match(parent.name):
+            return parent / ".arcann_cache"
+    return None
+
+
+# Unittested
+@catch_errors_decorator
+def get_file_key(file_path: Path) -> str:
+    """
+    Computes the identity key of a file from its resolved path, size, modification time and a hash of its first and last bytes.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path to the file.
+
+    Returns
+    -------
+    str
+        The identity key (hexadecimal digest).
+    """
+    file_stat = file_path.stat()
+    key = hashlib.sha1(f"{file_path.resolve()}|{file_stat.st_size}|{file_stat.st_mtime_ns}".encode())
+    with file_path.open("rb") as file:
+        key.update(file.read(PARTIAL_HASH_SIZE))
+        if file_stat.st_size > 2 * PARTIAL_HASH_SIZE:
+            file.seek(-PARTIAL_HASH_SIZE, os.SEEK_END)
+            key.update(file.read(PARTIAL_HASH_SIZE))
+    return key.hexdigest()
+
+
+# Unittested
+@catch_errors_decorator
+def load_cached_arrays(file_path: Path, array_names: List[str], cache_size_mb: float = DEFAULT_CACHE_SIZE_MB) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Loads the cached arrays of a file, memory-mapped in read-only mode.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path to the (text) file the arrays were parsed from.
+    array_names : List[str]
+        The names of the arrays to load.
+    cache_size_mb : float, optional
+        The disk budget of the cache, in MB (0 disables the cache).
+
+    Returns
+    -------
+    Optional[Dict[str, np.ndarray]]
+        The arrays by name, or None if there is no cache for this file or if one of the arrays is missing.
+    """
+    cache_path = get_cache_path(file_path, cache_size_mb)
+    if cache_path is None:
+        return None
+    entry_path = cache_path / get_file_key(file_path)
+    if not all((entry_path / f"{array_name}.npy").is_file() for array_name in array_names):
+        return None
+
+    try:
+        arrays = {array_name: np.load(entry_path / f"{array_name}.npy", mmap_mode="r") for array_name in array_names}
+        # Mark the entry as recently used
+        os.utime(entry_path)
+    except (OSError, ValueError):
+        return None
+    return arrays
+
+
+# Unittested
+@catch_errors_decorator
+def store_cached_arrays(file_path: Path, arrays: Dict[str, np.ndarray], cache_size_mb: float = DEFAULT_CACHE_SIZE_MB) -> None:
+    """
+    Stores arrays parsed from a file in the cache (added to the arrays already cached for this file) and evicts the least
+    recently used entries until the cache fits in its disk budget. Any filesystem error only disables the caching.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path to the (text) file the arrays were parsed from.
+    arrays : Dict[str, np.ndarray]
+        The arrays by name (object arrays are not supported).
+    cache_size_mb : float, optional
+        The disk budget of the cache, in MB (0 disables the cache).
+    """
+    cache_path = get_cache_path(file_path, cache_size_mb)
+    if cache_path is None:
+        return
+    entry_path = cache_path / get_file_key(file_path)
+
+    try:
+        entry_path.mkdir(parents=True, exist_ok=True)
+        for array_name, array in arrays.items():
+            # Write then rename, so a reader never sees a partial file (and a memory-mapped one stays valid)
+            temporary_path = entry_path / f".{array_name}.{os.getpid()}.npy"
+            np.save(temporary_path, np.ascontiguousarray(array))
+            temporary_path.replace(entry_path / f"{array_name}.npy")
+        os.utime(entry_path)
+        _evict_cache_entries(cache_path, int(cache_size_mb * 1024**2), entry_path)
+    except OSError as e:
+        logging.getLogger("ArcaNN").debug(f"Could not cache arrays for '{file_path}': {e}")
+
+
+def _evict_cache_entries(cache_path: Path, cache_size_bytes: int, kept_entry_path: Path) -> None:
+    """
+    Removes the least recently used entries of the cache until its size is below the budget (the entry just written is kept).
+    """
+    entries = []
+    for entry_path in cache_path.iterdir():
+        if entry_path.is_dir():
+            entry_size = sum(array_path.stat().st_size for array_path in entry_path.iterdir() if array_path.is_file())
+            entries.append((entry_path.stat().st_mtime_ns, entry_size, entry_path))
+
+    total_size = sum(entry_size for _, entry_size, _ in entries)
+    for _, entry_size, entry_path in sorted(entries, key=lambda entry: entry[0]):
+        if total_size <= cache_size_bytes:
+            break
+        if entry_path == kept_entry_path:
+            continue
+        shutil.rmtree(entry_path, ignore_errors=True)
+        total_size -= entry_size
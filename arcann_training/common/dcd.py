@@ -0,0 +1,303 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+The dcd module provides functions to read DCD trajectories (CHARMM/LAMMPS/i-PI and X-PLOR flavours) as np.ndarray.
+
+A DCD file is a sequence of Fortran unformatted records (each record is framed by its length in bytes):
+a header (the 'CORD' signature and 20 control integers), the titles, the number of atoms, then for each frame
+an optional unit cell record (6 doubles) and one record per axis (float32 coordinates of all the atoms).
+Every frame has the same size, so the frames are memory-mapped and selected frames are sliced directly.
+
+Functions
+---------
+read_dcd_header(dcd_file_path: Path) -> Dict[str, Any]
+    A function to read the header of a DCD trajectory file.
+
+read_dcd_frames(dcd_file_path: Path, frame_indexes: Sequence[int]) -> Tuple[np.ndarray, Optional[np.ndarray]]
+    A function to read the coordinates (and unit cells) of the selected frames of a DCD trajectory file.
+
+dcd_unit_cell_to_lattice(unit_cells: np.ndarray) -> np.ndarray
+    A function to convert DCD unit cells (A, gamma, B, beta, alpha, C) to lattice vectors.
+
+check_dcd_file(dcd_file_path: Path) -> Tuple[bool, int]
+    A function to check the integrity of a DCD trajectory file and count its frames, without reading the coordinates.
+"""
+
+# Standard library modules
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.utils import catch_errors_decorator
+
+
+# Unittested
+@catch_errors_decorator
+def read_dcd_header(dcd_file_path: Path) -> Dict[str, Any]:
+    """
+    Reads the header of a DCD trajectory file (the byte order is detected from the first record marker).
+
+    Parameters
+    ----------
+    dcd_file_path : Path
+        The path to the DCD file.
+
+    Returns
+    -------
+    Dict[str, Any]
+        A dictionary with the keys:
+        - byte_order: '<' or '>'.
+        - atom_count: The number of atoms.
+        - header_frame_count: The number of frames written in the header (may lag behind the file contents).
+        - frame_count: The number of complete frames in the file (from the file size).
+        - first_step, save_frequency, timestep: The ISTART, NSAVC and DELTA control values.
+        - has_unit_cell: Whether each frame has a unit cell record.
+        - has_4d: Whether each frame has a fourth coordinate record.
+        - titles: The title lines.
+        - header_size: The size of the header in bytes.
+        - frame_size: The size of one frame in bytes.
+        - file_size: The size of the file in bytes.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the DCD file does not exist.
+    ValueError
+        If the file is not a DCD file or uses unsupported features (fixed atoms).
+    """
+    if not dcd_file_path.is_file():
+        raise FileNotFoundError(f"File not found: {dcd_file_path}")
+
+    return _read_dcd_header(dcd_file_path)
+
+
+def _read_dcd_header(dcd_file_path: Path) -> Dict[str, Any]:
+    """
+    Reads the header of a DCD file (see 'read_dcd_header'), raising a ValueError if the file is not a valid DCD file.
+    """
+    file_size = dcd_file_path.stat().st_size
+    with dcd_file_path.open("rb") as file:
+        first_record = file.read(92)
+        if len(first_record) < 92:
+            raise ValueError(f"Invalid DCD file (header too short): {dcd_file_path}")
+        for byte_order in ["<", ">"]:
+            if np.frombuffer(first_record[:4], dtype=f"{byte_order}i4")[0] == 84:
+                break
+        else:
+            raise ValueError(f"Invalid DCD file (unexpected header record size): {dcd_file_path}")
+        if first_record[4:8] != b"CORD" or np.frombuffer(first_record[88:92], dtype=f"{byte_order}i4")[0] != 84:
+            raise ValueError(f"Invalid DCD file (missing 'CORD' signature): {dcd_file_path}")
+
+        control = np.frombuffer(first_record[8:88], dtype=f"{byte_order}i4")
+        is_charmm = control[19] != 0
+        if control[8] != 0:
+            raise ValueError(f"DCD files with fixed atoms are not supported: {dcd_file_path}")
+        if is_charmm:
+            timestep = float(np.frombuffer(first_record[44:48], dtype=f"{byte_order}f4")[0])
+            has_unit_cell = bool(control[10] == 1)
+            has_4d = bool(control[11] == 1)
+        else:
+            timestep = float(np.frombuffer(first_record[44:52], dtype=f"{byte_order}f8")[0])
+            has_unit_cell, has_4d = False, False
+
+        title_marker = file.read(4)
+        title_record_size = np.frombuffer(title_marker, dtype=f"{byte_order}i4")[0] if len(title_marker) == 4 else -1
+        title_record = file.read(max(title_record_size, 0))
+        title_end_marker = file.read(4)
+        if title_record_size < 4 or len(title_record) != title_record_size or len(title_end_marker) != 4 or np.frombuffer(title_end_marker, dtype=f"{byte_order}i4")[0] != title_record_size:
+            raise ValueError(f"Invalid DCD file (corrupted title record): {dcd_file_path}")
+        title_count = np.frombuffer(title_record[:4], dtype=f"{byte_order}i4")[0]
+        titles = [title_record[4 + 80 * idx : 4 + 80 * (idx + 1)].decode(errors="replace").strip("\x00 ") for idx in range(title_count)]
+
+        atom_record = np.frombuffer(file.read(12), dtype=f"{byte_order}i4")
+        if atom_record.shape[0] != 3 or atom_record[0] != 4 or atom_record[2] != 4:
+            raise ValueError(f"Invalid DCD file (corrupted atom count record): {dcd_file_path}")
+        atom_count = int(atom_record[1])
+        header_size = file.tell()
+
+    frame_size = _get_dcd_frame_dtype(byte_order, atom_count, has_unit_cell, has_4d).itemsize
+
+    return {
+        "byte_order": byte_order,
+        "atom_count": atom_count,
+        "header_frame_count": int(control[0]),
+        "frame_count": max(file_size - header_size, 0) // frame_size,
+        "first_step": int(control[1]),
+        "save_frequency": int(control[2]),
+        "timestep": timestep,
+        "has_unit_cell": has_unit_cell,
+        "has_4d": has_4d,
+        "titles": titles,
+        "header_size": header_size,
+        "frame_size": frame_size,
+        "file_size": file_size,
+    }
+
+
+def _get_dcd_frame_dtype(byte_order: str, atom_count: int, has_unit_cell: bool, has_4d: bool) -> np.dtype:
+    """
+    Returns the structured dtype of one DCD frame (record markers included).
+    """
+    fields = []
+    if has_unit_cell:
+        fields += [("unit_cell_begin", f"{byte_order}i4"), ("unit_cell", f"{byte_order}f8", (6,)), ("unit_cell_end", f"{byte_order}i4")]
+    for axis in ["x", "y", "z", "w"] if has_4d else ["x", "y", "z"]:
+        fields += [(f"{axis}_begin", f"{byte_order}i4"), (axis, f"{byte_order}f4", (atom_count,)), (f"{axis}_end", f"{byte_order}i4")]
+    return np.dtype(fields)
+
+
+def _map_dcd_frames(dcd_file_path: Path, dcd_header: Dict[str, Any]) -> np.ndarray:
+    """
+    Memory-maps (read-only) the complete frames of a DCD file as a structured array.
+    """
+    frame_dtype = _get_dcd_frame_dtype(dcd_header["byte_order"], dcd_header["atom_count"], dcd_header["has_unit_cell"], dcd_header["has_4d"])
+    if dcd_header["frame_count"] == 0:
+        return np.empty(0, dtype=frame_dtype)
+    return np.memmap(dcd_file_path, dtype=frame_dtype, mode="r", offset=dcd_header["header_size"], shape=(dcd_header["frame_count"],))
+
+
+# Unittested
+@catch_errors_decorator
+def read_dcd_frames(dcd_file_path: Path, frame_indexes: Sequence[int]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Reads the coordinates (and unit cells, if present) of the selected frames of a DCD trajectory file.
+    Only the selected frames are read from the (memory-mapped) file.
+
+    Parameters
+    ----------
+    dcd_file_path : Path
+        The path to the DCD file.
+    frame_indexes : Sequence[int]
+        The (0-based) indexes of the frames to read, in the requested order.
+
+    Returns
+    -------
+    Tuple[np.ndarray, Optional[np.ndarray]]
+        - atomic_coordinates: A float64 array of shape (len(frame_indexes), atom_count, 3).
+        - unit_cells: A float64 array of shape (len(frame_indexes), 6) with the raw unit cell records (A, gamma, B, beta, alpha, C),
+          or None if the file has no unit cell.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the DCD file does not exist.
+    IndexError
+        If a frame index is out of range.
+    ValueError
+        If the file is not a DCD file or if a selected frame is corrupted.
+    """
+    dcd_header = read_dcd_header(dcd_file_path)
+    frame_indexes = np.asarray(frame_indexes, dtype=np.int64).reshape(-1)
+    if frame_indexes.size > 0 and (frame_indexes.min() < 0 or frame_indexes.max() >= dcd_header["frame_count"]):
+        raise IndexError(f"Frame index out of range (total frames: {dcd_header['frame_count']})")
+
+    frames = np.array(_map_dcd_frames(dcd_file_path, dcd_header)[frame_indexes])
+
+    coordinate_record_size = 4 * dcd_header["atom_count"]
+    for axis in ["x", "y", "z"]:
+        if np.any(frames[f"{axis}_begin"] != coordinate_record_size) or np.any(frames[f"{axis}_end"] != coordinate_record_size):
+            raise ValueError(f"Invalid DCD file (corrupted coordinate record): {dcd_file_path}")
+    atomic_coordinates = np.stack([frames["x"], frames["y"], frames["z"]], axis=-1).astype(np.float64)
+
+    if not dcd_header["has_unit_cell"]:
+        return atomic_coordinates, None
+    if np.any(frames["unit_cell_begin"] != 48) or np.any(frames["unit_cell_end"] != 48):
+        raise ValueError(f"Invalid DCD file (corrupted unit cell record): {dcd_file_path}")
+    return atomic_coordinates, frames["unit_cell"].astype(np.float64)
+
+
+# Unittested
+@catch_errors_decorator
+def dcd_unit_cell_to_lattice(unit_cells: np.ndarray) -> np.ndarray:
+    """
+    Converts DCD unit cells to lattice vectors (a along x, b in the xy plane).
+
+    The unit cell record is (A, gamma, B, beta, alpha, C). LAMMPS writes the cosines of the angles, while CHARMM/NAMD
+    write the angles in degrees: as in VMD, the angles are taken as cosines when they are all within [-1, 1].
+
+    Parameters
+    ----------
+    unit_cells : np.ndarray
+        The unit cells, of shape (6,) or (frame_count, 6).
+
+    Returns
+    -------
+    np.ndarray
+        The lattice vectors (ax ay az bx by bz cx cy cz), of shape (9,) or (frame_count, 9).
+    """
+    unit_cells = np.asarray(unit_cells, dtype=np.float64)
+    cells = np.atleast_2d(unit_cells)
+    lengths = cells[:, [0, 2, 5]]
+    angles = cells[:, [4, 3, 1]]  # alpha, beta, gamma
+    cosines = np.where(np.all(np.abs(angles) <= 1.0, axis=1, keepdims=True), angles, np.cos(np.deg2rad(angles)))
+    cosines[np.abs(cosines) < 1e-12] = 0.0
+    cos_alpha, cos_beta, cos_gamma = cosines[:, 0], cosines[:, 1], cosines[:, 2]
+    sin_gamma = np.sqrt(1.0 - cos_gamma**2)
+
+    lattice = np.zeros((cells.shape[0], 9))
+    lattice[:, 0] = lengths[:, 0]
+    lattice[:, 3] = lengths[:, 1] * cos_gamma
+    lattice[:, 4] = lengths[:, 1] * sin_gamma
+    lattice[:, 6] = lengths[:, 2] * cos_beta
+    lattice[:, 7] = lengths[:, 2] * (cos_alpha - cos_beta * cos_gamma) / sin_gamma
+    lattice[:, 8] = np.sqrt(np.maximum(lengths[:, 2] ** 2 - lattice[:, 6] ** 2 - lattice[:, 7] ** 2, 0.0))
+
+    return lattice[0] if unit_cells.ndim == 1 else lattice
+
+
+# Unittested
+@catch_errors_decorator
+def check_dcd_file(dcd_file_path: Path) -> Tuple[bool, int]:
+    """
+    Checks the integrity of a DCD trajectory file and counts its frames, without reading the coordinates.
+
+    The header records must be valid, the file size must be the header size plus a whole number of frames (a truncated
+    trailing frame makes the file invalid) and the record markers of the first and last frames must match the atom count.
+
+    Parameters
+    ----------
+    dcd_file_path : Path
+        The path to the DCD file.
+
+    Returns
+    -------
+    Tuple[bool, int]
+        - is_valid: True if the DCD file is valid, False otherwise.
+        - frame_count: The number of complete frames (0 if the header is invalid).
+
+    Raises
+    ------
+    FileNotFoundError
+        If the DCD file does not exist.
+    """
+    if not dcd_file_path.is_file():
+        raise FileNotFoundError(f"File not found: {dcd_file_path}")
+
+    try:
+        dcd_header = _read_dcd_header(dcd_file_path)
+    except ValueError:
+        return False, 0
+
+    frame_count = dcd_header["frame_count"]
+    if frame_count == 0 or (dcd_header["file_size"] - dcd_header["header_size"]) % dcd_header["frame_size"] != 0:
+        return False, frame_count
+
+    frames = _map_dcd_frames(dcd_file_path, dcd_header)[[0, frame_count - 1]]
+    record_sizes = {f"{axis}": 4 * dcd_header["atom_count"] for axis in (["x", "y", "z", "w"] if dcd_header["has_4d"] else ["x", "y", "z"])}
+    if dcd_header["has_unit_cell"]:
+        record_sizes["unit_cell"] = 48
+    for record_name, record_size in record_sizes.items():
+        if np.any(frames[f"{record_name}_begin"] != record_size) or np.any(frames[f"{record_name}_end"] != record_size):
+            return False, frame_count
+
+    return True, frame_count
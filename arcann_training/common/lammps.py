@@ -6,28 +6,133 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/18
 
 The lammps module provides functions to manipulate LAMMPS data (as list of strings).
 
+A data file is split in sections once (header keywords, then 'Masses', 'Atoms', ... blocks), each needed block is decoded
+with a single NumPy parse, and the parsing of a path is memoized per file identity (path, size, modification time) within the process.
+
 Functions
 ---------
 read_lammps_data(lines: List[str],) -> Tuple(int, int, np.ndarray, Dict[int], np.ndarray)
     Read LAMMPS data file and extract required information.
+
+read_lammps_data_atoms(data_file: Union[Path, List[str]]) -> Tuple[np.ndarray, np.ndarray]
+    Read the type and the coordinates of every atom of a LAMMPS data file, in atom ID order.
+
+read_lammps_data_atom_types(data_file: Union[Path, List[str]]) -> np.ndarray
+    Read the type of every atom of a LAMMPS data file, in atom ID order.
 """
 
 # TODO: Homogenize the docstrings for this module
 
 # Standard library modules
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Union, Tuple
+from typing import Dict, List, Optional, Union, Tuple
 
 # Third-party modules
 import numpy as np
 
 # Local imports
 from arcann_training.common.utils import catch_errors_decorator
-from arcann_training.common.list import textfile_to_string_list
+
+# Atom style: (type column, first coordinate column) of the lines of the 'Atoms' section
+LAMMPS_ATOM_STYLE_COLUMNS = {"atomic": (1, 2), "charge": (1, 3), "molecular": (2, 3), "full": (2, 4)}
+
+# Section keywords of a LAMMPS data file (a section starts at a line holding only its keyword and an optional comment)
+LAMMPS_DATA_SECTIONS = ["Atoms", "Velocities", "Masses", "Ellipsoids", "Lines", "Triangles", "Bodies", "Bonds", "Angles", "Dihedrals", "Impropers"]
+LAMMPS_DATA_SECTIONS += [f"{interaction} Coeffs" for interaction in ["Pair", "PairIJ", "Bond", "Angle", "Dihedral", "Improper", "BondBond", "BondAngle", "MiddleBondTorsion", "EndBondTorsion", "AngleTorsion", "AngleAngleTorsion", "BondBond13", "AngleAngle"]]
+LAMMPS_DATA_SECTION_REGEX = re.compile(r"^[ \t]*(" + "|".join(sorted(LAMMPS_DATA_SECTIONS, key=len, reverse=True)) + r")[ \t]*(?:#[ \t]*(\S*)[^\n]*)?$", re.MULTILINE)
+COMMENT_REGEX = re.compile(r"#[^\n]*")
+
+
+def _parse_lammps_data_sections(text: str) -> Dict:
+    """
+    Splits the content of a LAMMPS data file in its header and its sections (found in one regex pass), then decodes
+    the header keywords and the 'Masses' and 'Atoms' blocks (one NumPy parse per block).
+    The returned arrays are read-only, as the result may be shared through the per-file memoization.
+    """
+    section_matches = list(LAMMPS_DATA_SECTION_REGEX.finditer(text))
+    header = text[: section_matches[0].start()] if section_matches else text
+
+    parsed = {"num_atoms": None, "num_atom_types": None, "box": [None] * 9, "masses": None, "atom_style": None, "atoms": None}
+    # The first line is a free-form title, never a header keyword
+    for line in COMMENT_REGEX.sub("", "\n".join(header.splitlines()[1:])).splitlines():
+        fields = line.split()
+        if fields[-2:] == ["atom", "types"] and len(fields) == 3:
+            parsed["num_atom_types"] = int(fields[0])
+        elif fields[-1:] == ["atoms"] and len(fields) == 2:
+            parsed["num_atoms"] = int(fields[0])
+        elif len(fields) == 4 and fields[2:] in (["xlo", "xhi"], ["ylo", "yhi"], ["zlo", "zhi"]):
+            axis = "xyz".index(fields[2][0])
+            parsed["box"][2 * axis : 2 * axis + 2] = [float(fields[0]), float(fields[1])]
+        elif len(fields) == 6 and fields[3:] == ["xy", "xz", "yz"]:
+            parsed["box"][6:9] = [float(value) for value in fields[:3]]
+
+    for match_idx, section_match in enumerate(section_matches):
+        if section_match.group(1) not in ("Masses", "Atoms"):
+            continue
+        end = section_matches[match_idx + 1].start() if match_idx + 1 < len(section_matches) else len(text)
+        block = _parse_lammps_data_block(text[section_match.end() : end])
+        if section_match.group(1) == "Masses":
+            parsed["masses"] = block
+        else:
+            parsed["atom_style"] = section_match.group(2) or "atomic"
+            parsed["atoms"] = block
+
+    return parsed
+
+
+def _parse_lammps_data_block(block_text: str) -> Optional[np.ndarray]:
+    """
+    Decodes the numeric lines of a section in one NumPy parse. Returns None for an empty section.
+    """
+    block_text = COMMENT_REGEX.sub("", block_text)
+    lines = [line for line in block_text.splitlines() if line.strip()]
+    if not lines:
+        return None
+    column_count = len(lines[0].split())
+    values = np.array(block_text.split(), dtype=np.float64)
+    if values.size != column_count * len(lines):
+        error_msg = f"The lines of a section do not all have {column_count} columns."
+        raise ValueError(error_msg)
+    values = values.reshape(-1, column_count)
+    values.setflags(write=False)
+    return values
+
+
+@lru_cache(maxsize=128)
+def _parse_lammps_data_file(file_path: str, file_size: int, file_mtime_ns: int) -> Dict:
+    """
+    Parses a LAMMPS data file once per file identity (path, size, modification time) within the process.
+    """
+    return _parse_lammps_data_sections(Path(file_path).read_text())
+
+
+def _get_lammps_data_sections(data_file: Union[Path, List[str]]) -> Dict:
+    """
+    Returns the parsed sections of a LAMMPS data file (memoized for a path) or of a list of lines.
+    """
+    if type(data_file) == type(Path(".")):
+        if not data_file.is_file():
+            error_msg = f"File not found {data_file.name} not in {data_file.parent}"
+            raise FileNotFoundError(error_msg)
+        file_stat = data_file.stat()
+        return _parse_lammps_data_file(str(data_file.resolve()), file_stat.st_size, file_stat.st_mtime_ns)
+    return _parse_lammps_data_sections("\n".join(data_file))
+
+
+def _get_atom_style_columns(atom_style: str) -> Tuple[int, int]:
+    """
+    Returns the type column and the first coordinate column of the lines of the 'Atoms' section for an atom style.
+    """
+    if atom_style not in LAMMPS_ATOM_STYLE_COLUMNS:
+        error_msg = f"Atom style '{atom_style}' is not supported."
+        raise ValueError(error_msg)
+    return LAMMPS_ATOM_STYLE_COLUMNS[atom_style]
 
 
 # Unittested
@@ -37,6 +142,8 @@ def read_lammps_data(
 ) -> Tuple[int, int, np.ndarray, Dict[int, float], np.ndarray]:
     """
     Read LAMMPS data file and extract required information.
+    The file is split in sections once and the 'Masses' and 'Atoms' blocks are decoded with one NumPy parse each.
+    When a path is given, the parsing is memoized per file identity (path, size, modification time) within the process.
 
     Parameters
     ----------
@@ -50,82 +157,28 @@ def read_lammps_data(
         atom masses, and atom coordinates, respectively. The simulation box boundaries are stored
         as a numpy array with the following format: [xlo, xhi, ylo, yhi, zlo, zhi, xy, xz, yz].
         The atom masses are stored in a dictionary with atom type as key and mass as value.
-        The atom coordinates are stored as a numpy array with shape (num_atoms, 3).
+        The atom coordinates are stored as a numpy array with shape (num_atoms, 3), in file order.
 
     Raises
     ------
     ValueError
         If any required information is missing or inconsistent in the input data.
     """
-    if type(data_file) == type(Path(".")):
-        lines = textfile_to_string_list(data_file)
-    else:
-        lines = data_file
-
-    # Input validation
-    if not lines or not isinstance(lines, list):
+    if type(data_file) != type(Path(".")) and (not data_file or not isinstance(data_file, list)):
         raise ValueError("Input 'lines' must be a non-empty list of strings.")
 
-    # Initialize variables
-    num_atoms = None
-    num_atom_types = None
-    xlo, xhi = None, None
-    ylo, yhi = None, None
-    zlo, zhi = None, None
-    xy, xz, yz = None, None, None
-    masses = {}
-    atoms = []
-    atoms_type_list = []
-    in_atoms_section = False
-    in_masses_section = False
-
-    # Parse input file
-    for line in lines:
-        if len(line) == 0:
-            continue
-        if "Atoms" in line and "Atomsk" not in line:
-            in_atoms_section = True
-            in_masses_section = False
-            continue
-        if in_atoms_section:
-            atoms.append(line.split()[2:6])
-            atoms_type_list.append(line.split()[1:2])
-            continue
-        if "Masses" in line:
-            in_masses_section = True
-            in_atoms_section = False
-            continue
-        if in_masses_section:
-            fields = line.split()
-            masses[int(fields[0])] = float(fields[1])
-            continue
-        if "xlo" in line:
-            xlo, xhi = map(float, line.split()[0:2])
-            continue
-        if "ylo" in line:
-            ylo, yhi = map(float, line.split()[0:2])
-            continue
-        if "zlo" in line:
-            zlo, zhi = map(float, line.split()[0:2])
-            continue
-        if "xy" in line:
-            xy, xz, yz = map(float, line.split()[0:3])
-            continue
-        if "atom types" in line:
-            num_atom_types = int(line.split()[0])
-            continue
-        if "atoms" in line:
-            num_atoms = int(line.split()[0])
-            continue
-    # Convert lists to NumPy arrays
-    atoms = np.array(atoms, dtype=float)
+    parsed = _get_lammps_data_sections(data_file)
+    num_atoms = parsed["num_atoms"]
+    num_atom_types = parsed["num_atom_types"]
+    masses = {} if parsed["masses"] is None else {int(atom_type): float(mass) for atom_type, mass in parsed["masses"][:, :2]}
+
     if num_atoms == None:
         error_msg = "The number of atoms was not found."
         raise ValueError(error_msg)
     if num_atom_types == None:
         error_msg = "The number of atom types was not found."
         raise ValueError(error_msg)
-    if xlo == None or xhi == None or ylo == None or yhi == None or zlo == None or zhi == None:
+    if any(bound is None for bound in parsed["box"][:6]):
         error_msg = f"Invalid box coordinates."
         raise ValueError(error_msg)
     if len(masses) == 0:
@@ -134,17 +187,17 @@ def read_lammps_data(
     if len(masses) != num_atom_types:
         error_msg = f"Number of masses ('{len(masses)}') does not match the number of atom types ('{num_atom_types}')."
         raise ValueError(error_msg)
-    if len(atoms) == 0:
+    if parsed["atoms"] is None:
         error_msg = f"Coordinates not found."
         raise ValueError(error_msg)
-    if len(atoms) != num_atoms:
-        error_msg = f"Number of coordinates ('{len(atoms)}') does not match the number of atoms ('{num_atoms}')."
+    if parsed["atoms"].shape[0] != num_atoms:
+        error_msg = f"Number of coordinates ('{parsed['atoms'].shape[0]}') does not match the number of atoms ('{num_atoms}')."
         raise ValueError(error_msg)
 
-    atoms_type_list = np.array(atoms_type_list, dtype=int)
-    atoms_type_list = np.unique(atoms_type_list)
+    type_column, first_coordinate_column = _get_atom_style_columns(parsed["atom_style"])
+    atoms = parsed["atoms"][:, first_coordinate_column : first_coordinate_column + 3]
 
-    for atoms_type in atoms_type_list:
+    for atoms_type in np.unique(parsed["atoms"][:, type_column].astype(int)):
         if atoms_type not in masses:
             if type(data_file) == type(Path(".")):
                 error_msg = f"Atom type '{atoms_type}' present in the coordinates section but not found in masses. Problem with your LMP file: {data_file}"
@@ -156,7 +209,64 @@ def read_lammps_data(
     return (
         num_atoms,
         num_atom_types,
-        np.array([xlo, xhi, ylo, yhi, zlo, zhi, xy, xz, yz]),
+        np.array(parsed["box"]),
         masses,
         atoms,
     )
+
+
+# Unittested
+@catch_errors_decorator
+def read_lammps_data_atoms(data_file: Union[Path, List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Read the type and the coordinates of every atom of a LAMMPS data file, in atom ID order (the order of the atoms in a LAMMPS DCD trajectory).
+    The columns are found from the atom style comment of the 'Atoms' section ('atomic', 'charge', 'molecular' or 'full', 'atomic' if absent).
+
+    Parameters
+    ----------
+    data_file : Union[Path, List[str]]
+        Path to the LAMMPS data file or list of lines from a LAMMPS data file.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        An integer array with the type of each atom and an array of shape (num_atoms, 3) with the coordinates of each atom, both sorted by atom ID.
+
+    Raises
+    ------
+    ValueError
+        If the 'Atoms' section is missing or empty, or if the atom style is not supported.
+    """
+    parsed = _get_lammps_data_sections(data_file)
+    if parsed["atoms"] is None:
+        error_msg = "Coordinates not found."
+        raise ValueError(error_msg)
+
+    type_column, first_coordinate_column = _get_atom_style_columns(parsed["atom_style"])
+    order = np.argsort(parsed["atoms"][:, 0], kind="stable")
+    atoms = parsed["atoms"][order]
+    return atoms[:, type_column].astype(int), atoms[:, first_coordinate_column : first_coordinate_column + 3]
+
+
+# Unittested
+@catch_errors_decorator
+def read_lammps_data_atom_types(data_file: Union[Path, List[str]]) -> np.ndarray:
+    """
+    Read the type of every atom of a LAMMPS data file, in atom ID order (the order of the atoms in a LAMMPS DCD trajectory).
+
+    Parameters
+    ----------
+    data_file : Union[Path, List[str]]
+        Path to the LAMMPS data file or list of lines from a LAMMPS data file.
+
+    Returns
+    -------
+    np.ndarray
+        An integer array with the type of each atom, sorted by atom ID.
+
+    Raises
+    ------
+    ValueError
+        If the 'Atoms' section is missing or empty.
+    """
+    return read_lammps_data_atoms(data_file)[0]
@@ -0,0 +1,382 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+The structure module provides functions to convert atomic structures between the LAMMPS data, extended XYZ and PDB formats (in-process, as np.ndarray).
+
+The atom types and masses come from the properties ('user_files/properties.txt', stored as main_json["properties"]):
+a dictionary with the atom type as key (int, or str after a JSON round trip) and {"symbol", "mass"} as value.
+The structures are given as arrays of symbols (structure_count, atom_count), coordinates (structure_count, atom_count, 3)
+and lattices (structure_count, 9) (ax ay az bx by bz cx cy cz, as in the extended XYZ 'Lattice' key).
+
+Functions
+---------
+get_properties_maps(properties: Dict) -> Tuple[Dict[str, int], Dict[int, str], Dict[int, float]]
+    A function to get the symbol to type, type to symbol and type to mass maps from the properties.
+
+read_lammps_data_structure(data_file: Union[Path, List[str]], properties: Dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]
+    A function to read the symbols, coordinates and lattice of a LAMMPS data file.
+
+write_lammps_data_files(data_file_paths: Sequence[Path], atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, lattices: np.ndarray, properties: Dict) -> None
+    A function to write one LAMMPS data file per structure, with the types and masses of the properties.
+
+read_pdb_file(pdb_file_path: Path) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]
+    A function to read the models of a PDB file.
+
+write_pdb_file(pdb_file_path: Path, atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, lattices: Optional[np.ndarray] = None) -> None
+    A function to write several structures as the models of a PDB file.
+
+convert_xyz_to_lammps_data(xyz_file_paths: Sequence[Path], data_file_paths: Sequence[Path], properties: Dict) -> None
+    A function to convert (the first frame of) extended XYZ files to LAMMPS data files.
+
+convert_lammps_data_to_xyz(data_file_path: Path, xyz_file_path: Path, properties: Dict) -> None
+    A function to convert a LAMMPS data file to an extended XYZ file.
+"""
+
+# Standard library modules
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.dcd import dcd_unit_cell_to_lattice
+from arcann_training.common.lammps import read_lammps_data, read_lammps_data_atoms
+from arcann_training.common.list import textfile_to_string_list
+from arcann_training.common.utils import catch_errors_decorator
+from arcann_training.common.xyz import parse_xyz_trajectory_file, write_xyz_frames
+
+
+# Unittested
+@catch_errors_decorator
+def get_properties_maps(properties: Dict) -> Tuple[Dict[str, int], Dict[int, str], Dict[int, float]]:
+    """
+    Get the symbol to type, type to symbol and type to mass maps from the properties.
+
+    Parameters
+    ----------
+    properties : Dict
+        The properties, with the atom type as key (int or str) and {"symbol": str, "mass": float} as value.
+
+    Returns
+    -------
+    Tuple[Dict[str, int], Dict[int, str], Dict[int, float]]
+        The symbol to type, type to symbol and type to mass maps.
+
+    Raises
+    ------
+    ValueError
+        If the properties are empty or if a symbol is used by several types.
+    """
+    if not properties:
+        error_msg = "The properties are empty."
+        raise ValueError(error_msg)
+
+    type_symbols = {int(atom_type): atom_properties["symbol"] for atom_type, atom_properties in properties.items()}
+    type_masses = {int(atom_type): float(atom_properties["mass"]) for atom_type, atom_properties in properties.items()}
+    symbol_types = {symbol: atom_type for atom_type, symbol in type_symbols.items()}
+    if len(symbol_types) != len(type_symbols):
+        error_msg = "A symbol is used by several atom types in the properties."
+        raise ValueError(error_msg)
+
+    return symbol_types, type_symbols, type_masses
+
+
+# Unittested
+@catch_errors_decorator
+def read_lammps_data_structure(data_file: Union[Path, List[str]], properties: Dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Read the symbols, coordinates and lattice of a LAMMPS data file (atoms in atom ID order).
+
+    Parameters
+    ----------
+    data_file : Union[Path, List[str]]
+        Path to the LAMMPS data file or list of lines from a LAMMPS data file.
+    properties : Dict
+        The properties, with the atom type as key and {"symbol": str, "mass": float} as value.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray]
+        The atomic symbols (atom_count,), the atomic coordinates (atom_count, 3) and the lattice (9,).
+
+    Raises
+    ------
+    ValueError
+        If the data file is invalid or if an atom type is not in the properties.
+    """
+    if type(data_file) == type(Path(".")):
+        lines = textfile_to_string_list(data_file)
+    else:
+        lines = data_file
+
+    _, type_symbols, _ = get_properties_maps(properties)
+    _, _, box, _, _ = read_lammps_data(lines)
+    atom_types, atomic_coordinates = read_lammps_data_atoms(lines)
+
+    unknown_types = np.setdiff1d(atom_types, list(type_symbols))
+    if unknown_types.size > 0:
+        error_msg = f"Atom type(s) '{unknown_types.tolist()}' not found in the properties."
+        raise ValueError(error_msg)
+    atomic_symbols = np.array([type_symbols[atom_type] for atom_type in atom_types.tolist()])
+
+    xy, xz, yz = [0.0 if tilt is None else tilt for tilt in box[6:9]]
+    lattice = np.array([box[1] - box[0], 0.0, 0.0, xy, box[3] - box[2], 0.0, xz, yz, box[5] - box[4]], dtype=np.float64)
+
+    return atomic_symbols, atomic_coordinates, lattice
+
+
+def _get_atom_types(atomic_symbols: np.ndarray, symbol_types: Dict[str, int]) -> np.ndarray:
+    """
+    Maps the atomic symbols to the atom types (one dictionary lookup per distinct symbol).
+    """
+    unique_symbols, inverse = np.unique(atomic_symbols, return_inverse=True)
+    unknown_symbols = [str(symbol) for symbol in unique_symbols if symbol not in symbol_types]
+    if unknown_symbols:
+        error_msg = f"Symbol(s) '{unknown_symbols}' not found in the properties."
+        raise ValueError(error_msg)
+    return np.array([symbol_types[symbol] for symbol in unique_symbols], dtype=int)[inverse].reshape(np.shape(atomic_symbols))
+
+
+def _get_lammps_box(lattice: np.ndarray) -> Tuple[float, float, float, float, float, float]:
+    """
+    Converts a lattice (ax ay az bx by bz cx cy cz) to the LAMMPS box (lx, ly, lz, xy, xz, yz).
+    """
+    lattice = np.asarray(lattice, dtype=np.float64).reshape(3, 3)
+    tolerance = 1e-8 * np.abs(lattice).max()
+    if abs(lattice[0, 1]) > tolerance or abs(lattice[0, 2]) > tolerance or abs(lattice[1, 2]) > tolerance:
+        error_msg = f"The lattice '{lattice.ravel().tolist()}' is not a LAMMPS lattice (a along x, b in the xy plane)."
+        raise ValueError(error_msg)
+    return lattice[0, 0], lattice[1, 1], lattice[2, 2], lattice[1, 0], lattice[2, 0], lattice[2, 1]
+
+
+# Unittested
+@catch_errors_decorator
+def write_lammps_data_files(data_file_paths: Sequence[Path], atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, lattices: np.ndarray, properties: Dict) -> None:
+    """
+    Writes one LAMMPS data file ('atomic' style) per structure. Every atom type of the properties is declared with its mass,
+    so the files can be read with the same 'pair_coeff' whatever the symbols present in a structure.
+
+    Parameters
+    ----------
+    data_file_paths : Sequence[Path]
+        One file path per structure.
+    atomic_symbols : np.ndarray
+        The atomic symbols, of shape (structure_count, atom_count).
+    atomic_coordinates : np.ndarray
+        The atomic coordinates, of shape (structure_count, atom_count, 3).
+    lattices : np.ndarray
+        The lattices (ax ay az bx by bz cx cy cz), of shape (structure_count, 9).
+    properties : Dict
+        The properties, with the atom type as key and {"symbol": str, "mass": float} as value.
+
+    Raises
+    ------
+    ValueError
+        If the number of file paths does not match the number of structures, if a symbol is not in the properties
+        or if a lattice is not a LAMMPS lattice (a along x, b in the xy plane).
+    """
+    data_file_paths = list(data_file_paths)
+    atomic_coordinates = np.asarray(atomic_coordinates, dtype=np.float64)
+    lattices = np.asarray(lattices, dtype=np.float64).reshape(-1, 9)
+    if not len(data_file_paths) == atomic_coordinates.shape[0] == lattices.shape[0] == np.shape(atomic_symbols)[0]:
+        error_msg = f"Number of file paths ('{len(data_file_paths)}') does not match the number of structures ('{atomic_coordinates.shape[0]}')."
+        raise ValueError(error_msg)
+
+    symbol_types, type_symbols, type_masses = get_properties_maps(properties)
+    atom_types = _get_atom_types(atomic_symbols, symbol_types)
+    atom_count = atomic_coordinates.shape[1]
+
+    # The masses section and the atom line format are the same for every structure
+    masses_section = "".join(f"{atom_type:10d} {type_masses[atom_type]:16.8f}  # {type_symbols[atom_type]}\n" for atom_type in sorted(type_masses))
+    atoms_format = "%10d %4d %20.12f %20.12f %20.12f\n" * atom_count
+    atom_lines_buffer = np.empty((atom_count, 5), dtype=object)
+    atom_lines_buffer[:, 0] = np.arange(1, atom_count + 1)
+
+    for data_file_path, structure_types, structure_coordinates, lattice in zip(data_file_paths, atom_types, atomic_coordinates, lattices):
+        lx, ly, lz, xy, xz, yz = _get_lammps_box(lattice)
+        header = f"# Generated by ArcaNN\n\n{atom_count:10d}  atoms\n{len(type_masses):10d}  atom types\n\n"
+        header += f"{0.0:20.12f} {lx:20.12f}  xlo xhi\n{0.0:20.12f} {ly:20.12f}  ylo yhi\n{0.0:20.12f} {lz:20.12f}  zlo zhi\n"
+        if xy != 0.0 or xz != 0.0 or yz != 0.0:
+            header += f"{xy:20.12f} {xz:20.12f} {yz:20.12f}  xy xz yz\n"
+        atom_lines_buffer[:, 1] = structure_types
+        atom_lines_buffer[:, 2:] = structure_coordinates
+        data_file_path.write_text(f"{header}\nMasses\n\n{masses_section}\nAtoms # atomic\n\n" + atoms_format % tuple(atom_lines_buffer.ravel()))
+
+
+# Unittested
+@catch_errors_decorator
+def read_pdb_file(pdb_file_path: Path) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Reads the models of a PDB file (ATOM/HETATM records). The symbol is the element column, or the atom name without digits if absent.
+
+    Parameters
+    ----------
+    pdb_file_path : Path
+        The path to the PDB file.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]
+        The atomic symbols (model_count, atom_count), the atomic coordinates (model_count, atom_count, 3)
+        and the lattices (model_count, 9) from the CRYST1 records, or None if there is no CRYST1 record.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist.
+    ValueError
+        If there is no atom or if the models do not have the same number of atoms.
+    """
+    if not pdb_file_path.is_file():
+        error_msg = f"File not found {pdb_file_path.name} not in {pdb_file_path.parent}"
+        raise FileNotFoundError(error_msg)
+
+    models_symbols, models_coordinates, unit_cells = [], [], []
+    symbols, coordinates = [], []
+    for line in pdb_file_path.read_text().splitlines():
+        record = line[:6].strip()
+        if record in ("ATOM", "HETATM"):
+            element = line[76:78].strip()
+            symbols.append(element.capitalize() if element else "".join(character for character in line[12:16] if character.isalpha()).capitalize())
+            coordinates.append((line[30:38], line[38:46], line[46:54]))
+        elif record == "CRYST1":
+            a, b, c, alpha, beta, gamma = (float(value) for value in (line[6:15], line[15:24], line[24:33], line[33:40], line[40:47], line[47:54]))
+            unit_cells.append([a, gamma, b, beta, alpha, c])
+        elif record in ("ENDMDL", "END") and symbols:
+            models_symbols.append(symbols)
+            models_coordinates.append(coordinates)
+            symbols, coordinates = [], []
+    if symbols:
+        models_symbols.append(symbols)
+        models_coordinates.append(coordinates)
+
+    if not models_symbols:
+        error_msg = f"No atom found in {pdb_file_path}."
+        raise ValueError(error_msg)
+    if len({len(symbols) for symbols in models_symbols}) != 1:
+        error_msg = f"The models of {pdb_file_path} do not have the same number of atoms."
+        raise ValueError(error_msg)
+
+    lattices = None
+    if unit_cells:
+        # One CRYST1 record for the whole file, or one per model
+        unit_cells = np.array(unit_cells, dtype=np.float64)
+        lattices = dcd_unit_cell_to_lattice(np.broadcast_to(unit_cells, (len(models_symbols), 6)) if unit_cells.shape[0] == 1 else unit_cells[: len(models_symbols)])
+
+    return np.array(models_symbols), np.array(models_coordinates, dtype=np.float64), lattices
+
+
+# Unittested
+@catch_errors_decorator
+def write_pdb_file(pdb_file_path: Path, atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, lattices: Optional[np.ndarray] = None) -> None:
+    """
+    Writes several structures as the models of a PDB file (one CRYST1 record per model if the lattices are given).
+
+    Parameters
+    ----------
+    pdb_file_path : Path
+        The path to the PDB file.
+    atomic_symbols : np.ndarray
+        The atomic symbols, of shape (structure_count, atom_count).
+    atomic_coordinates : np.ndarray
+        The atomic coordinates, of shape (structure_count, atom_count, 3).
+    lattices : Optional[np.ndarray], optional
+        The lattices (ax ay az bx by bz cx cy cz), of shape (structure_count, 9).
+    """
+    atomic_symbols = np.asarray(atomic_symbols)
+    atomic_coordinates = np.asarray(atomic_coordinates, dtype=np.float64)
+    atom_count = atomic_coordinates.shape[1]
+
+    if lattices is not None:
+        cell_vectors = np.asarray(lattices, dtype=np.float64).reshape(-1, 3, 3)
+        lengths = np.linalg.norm(cell_vectors, axis=2)
+        alphas = np.degrees(np.arccos(np.einsum("ij,ij->i", cell_vectors[:, 1], cell_vectors[:, 2]) / (lengths[:, 1] * lengths[:, 2])))
+        betas = np.degrees(np.arccos(np.einsum("ij,ij->i", cell_vectors[:, 0], cell_vectors[:, 2]) / (lengths[:, 0] * lengths[:, 2])))
+        gammas = np.degrees(np.arccos(np.einsum("ij,ij->i", cell_vectors[:, 0], cell_vectors[:, 1]) / (lengths[:, 0] * lengths[:, 1])))
+
+    # Serial (modulo 100000), name, element and coordinates: one format string and one buffer for every model
+    atoms_format = "HETATM%5d %-4s MOL A   1    %8.3f%8.3f%8.3f  1.00  0.00          %2s\n" * atom_count
+    atom_lines_buffer = np.empty((atom_count, 6), dtype=object)
+    atom_lines_buffer[:, 0] = np.arange(1, atom_count + 1) % 100000
+
+    with pdb_file_path.open("w") as file:
+        for structure_idx in range(atomic_coordinates.shape[0]):
+            file.write(f"MODEL     {structure_idx + 1:4d}\n")
+            if lattices is not None:
+                file.write(f"CRYST1{lengths[structure_idx, 0]:9.3f}{lengths[structure_idx, 1]:9.3f}{lengths[structure_idx, 2]:9.3f}{alphas[structure_idx]:7.2f}{betas[structure_idx]:7.2f}{gammas[structure_idx]:7.2f} P 1           1\n")
+            atom_lines_buffer[:, 1] = atomic_symbols[structure_idx]
+            atom_lines_buffer[:, 2:5] = atomic_coordinates[structure_idx]
+            atom_lines_buffer[:, 5] = atomic_symbols[structure_idx]
+            file.write(atoms_format % tuple(atom_lines_buffer.ravel()))
+            file.write("ENDMDL\n")
+        file.write("END\n")
+
+
+# Unittested
+@catch_errors_decorator
+def convert_xyz_to_lammps_data(xyz_file_paths: Sequence[Path], data_file_paths: Sequence[Path], properties: Dict) -> None:
+    """
+    Converts (the first frame of) extended XYZ files to LAMMPS data files, with the types and masses of the properties.
+
+    Parameters
+    ----------
+    xyz_file_paths : Sequence[Path]
+        The paths to the extended XYZ files (with a 'Lattice' key).
+    data_file_paths : Sequence[Path]
+        The paths to the LAMMPS data files, one per XYZ file.
+    properties : Dict
+        The properties, with the atom type as key and {"symbol": str, "mass": float} as value.
+
+    Raises
+    ------
+    ValueError
+        If the number of file paths does not match, if an XYZ file has no lattice or if the structures do not have the same number of atoms.
+    """
+    xyz_file_paths = list(xyz_file_paths)
+    data_file_paths = list(data_file_paths)
+    if len(xyz_file_paths) != len(data_file_paths):
+        error_msg = f"Number of XYZ files ('{len(xyz_file_paths)}') does not match the number of LAMMPS data files ('{len(data_file_paths)}')."
+        raise ValueError(error_msg)
+
+    atomic_symbols, atomic_coordinates, lattices = [], [], []
+    for xyz_file_path in xyz_file_paths:
+        atom_counts, structure_symbols, structure_coordinates, _, structure_lattices, _, _, _ = parse_xyz_trajectory_file(xyz_file_path)
+        if structure_lattices[0] is None:
+            error_msg = f"No lattice found in {xyz_file_path}."
+            raise ValueError(error_msg)
+        atomic_symbols.append(structure_symbols[0, : atom_counts[0]])
+        atomic_coordinates.append(structure_coordinates[0, : atom_counts[0]])
+        lattices.append(structure_lattices[0])
+
+    if len({symbols.shape[0] for symbols in atomic_symbols}) > 1:
+        error_msg = "The structures do not have the same number of atoms."
+        raise ValueError(error_msg)
+
+    write_lammps_data_files(data_file_paths, np.array(atomic_symbols), np.array(atomic_coordinates), np.array(lattices), properties)
+
+
+# Unittested
+@catch_errors_decorator
+def convert_lammps_data_to_xyz(data_file_path: Path, xyz_file_path: Path, properties: Dict) -> None:
+    """
+    Converts a LAMMPS data file to an extended XYZ file (with the 'Lattice' key), with the symbols of the properties.
+
+    Parameters
+    ----------
+    data_file_path : Path
+        The path to the LAMMPS data file.
+    xyz_file_path : Path
+        The path to the extended XYZ file.
+    properties : Dict
+        The properties, with the atom type as key and {"symbol": str, "mass": float} as value.
+    """
+    atomic_symbols, atomic_coordinates, lattice = read_lammps_data_structure(data_file_path, properties)
+    write_xyz_frames(xyz_file_path, [0], np.array([atomic_symbols.shape[0]]), atomic_symbols[np.newaxis], atomic_coordinates[np.newaxis], lattice[np.newaxis], [""])
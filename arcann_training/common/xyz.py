@@ -6,47 +6,203 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/18
 
 The xyz module provides functions to manipulate XYZ data (as np.ndarray).
 
+The frames read by 'parse_xyz_trajectory_file' and 'read_xyz_frames' and the values read by 'read_xyz_max_f_std' are kept
+in the binary cache of the iteration ('common.cache'), so the next reads of the same frames (e.g. the candidates read by
+the deviate and then the extract phase) are served from memory-mapped arrays.
+
 Functions
 ---------
-parse_xyz_trajectory_file(trajectory_file_path: Path, is_extended: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List]
+iter_xyz_frames(trajectory_file_path: Path) -> Iterator[Tuple[np.ndarray, np.ndarray, str, Optional[List[float]], bool, Optional[List[bool]], Optional[float]]]
+    A function to iterate (in constant memory) over the frames of an extended XYZ format trajectory file.
+
+parse_xyz_trajectory_file(trajectory_file_path: Path, cache_size_mb: float = DEFAULT_CACHE_SIZE_MB) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], Optional[np.ndarray], Optional[List[bool]], Optional[bool], Optional[float]]
     A function to parse an extended XYZ format trajectory file, returning information about the atomic structure throughout the trajectory.
 
+get_xyz_frame_offsets(trajectory_file_path: Path) -> np.ndarray
+    A function to get the byte offset of every frame of an XYZ trajectory file (persisted in a '<file>.xyzidx' sidecar).
+
+read_xyz_max_f_std(trajectory_file_path: Path, cache_size_mb: float = DEFAULT_CACHE_SIZE_MB) -> np.ndarray
+    A function to read only the 'max_f_std' value of every frame of an extended XYZ trajectory file.
+
+read_xyz_frames(trajectory_file_path: Path, frame_indexes: Sequence[int], cache_size_mb: float = DEFAULT_CACHE_SIZE_MB) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], List[Optional[np.ndarray]], List[Optional[List[bool]]], List[Optional[bool]], List[Optional[float]]]
+    A function to read only the requested frames of an XYZ trajectory file.
+
 parse_extended_format(comment_line: str) -> Tuple[List[float], bool]
     A function to parse the comment line of an extended XYZ file for lattice and properties information.
 
+parse_extended_xyz_info(comment_line: str) -> Dict[str, str]
+    A function to parse every key=value pair of the comment line of an extended XYZ file.
+
+parse_extended_xyz_properties(properties: str) -> List[Tuple[str, str, int, int]]
+    A function to parse the 'Properties' specification of an extended XYZ file into its columns.
+
 write_xyz_frame(trajectory_file_path: Path, frame_idx: int, atom_counts: np.ndarray, atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, cell_info: np.ndarray, comments: List[str]) -> None
     A function to write the XYZ coordinates of a specific frame from a trajectory to a file, including extended format lattice information if provided.
+
+write_xyz_frames(trajectory_file_paths: Union[Path, Sequence[Path]], frame_indexes: Sequence[int], atom_counts: np.ndarray, atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, cell_info: np.ndarray, comments: List[str]) -> None
+    A function to write several frames of a trajectory, in one XYZ file or in one XYZ file per frame.
 """
 
 # TODO: Homogenize the docstrings for this module
 
 # Standard library modules
 import re
+from collections import deque
+from itertools import islice
 from pathlib import Path
-from typing import Tuple, List, Optional
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 # Third-party modules
 import numpy as np
 
 # Local imports
+from arcann_training.common.cache import DEFAULT_CACHE_SIZE_MB, load_cached_arrays, store_cached_arrays
 from arcann_training.common.utils import catch_errors_decorator
 
+# Extended XYZ comment line patterns (compiled once, used for every frame)
+LATTICE_REGEX = re.compile(r"Lattice=\"((?:[-\d\.]+\s+){8}[-\d\.]+)\"")
+PROPERTIES_REGEX = re.compile(r"Properties=species:S:1:pos:R:3")
+PBC_REGEX = re.compile(r'pbc="([^"]*)"')
+MAX_F_STD_REGEX = re.compile(r"max_f_std=([\d.]+)")
+MAX_F_STD_BYTES_REGEX = re.compile(rb"max_f_std=([\d.]+)")
+# Any key=value pair of an extended XYZ comment line (double quoted, single quoted, braced or bare value)
+EXTENDED_XYZ_KEY_VALUE_REGEX = re.compile(r"""([A-Za-z_][\w\-]*)=(?:"([^"]*)"|'([^']*)'|\{([^}]*)\}|(\S+))""")
 
-# TODO: Add tests for this function
+# One atom line of an XYZ frame
+XYZ_ATOM_DTYPE = np.dtype([("symbol", "<U3"), ("position", np.float64, (3,))])
+
+# Names of the arrays of the cached frames of a trajectory (sorted by frame index, 'frame_count' is the total of the file)
+XYZ_CACHE_ARRAYS = ["frame_count", "frame_indexes", "atom_counts", "atomic_symbols", "atomic_coordinates", "comments", "lattice", "lattice_mask", "pbc", "pbc_mask", "properties", "frame_max_f_std"]
+
+
+# Unittested
 @catch_errors_decorator
-def parse_xyz_trajectory_file(trajectory_file_path: Path) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], Optional[np.ndarray], Optional[List[bool]], Optional[bool], Optional[float]]:
+def iter_xyz_frames(trajectory_file_path: Path) -> Iterator[Tuple[np.ndarray, np.ndarray, str, Optional[List[float]], bool, Optional[List[bool]], Optional[float]]]:
+    """
+    Iterates over the frames of an XYZ format trajectory file, one frame at a time, without loading the whole file in memory.
+
+    Parameters
+    ----------
+    trajectory_file_path : Path
+        The path to the trajectory file.
+
+    Returns
+    -------
+    Iterator[Tuple[np.ndarray, np.ndarray, str, Optional[List[float]], bool, Optional[List[bool]], Optional[float]]]
+        An iterator yielding, for each frame:
+        - atomic_symbols: An array of atomic symbols, each symbol up to 3 characters.
+        - atomic_coordinates: An array of atomic coordinates with shape (atom_count, 3).
+        - comment: The (stripped) comment line.
+        - lattice: Optional list of lattice parameters if provided.
+        - properties: Boolean indicating if 'Properties=species:S:1:pos:R:3' is present.
+        - pbc: Optional list of booleans indicating periodic boundary conditions if provided.
+        - max_f_std: Optional float representing maximum force standard deviation if provided.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the trajectory file does not exist.
+    TypeError
+        If the number of atoms is not an integer.
+    ValueError
+        If the number of atoms changes throughout the file or if the file format is incorrect.
+    """
+    if not trajectory_file_path.is_file():
+        raise FileNotFoundError(f"File not found: {trajectory_file_path}")
+
+    return _iter_xyz_frames(trajectory_file_path)
+
+
+def _iter_xyz_frames(trajectory_file_path: Path) -> Iterator[Tuple[np.ndarray, np.ndarray, str, Optional[List[float]], bool, Optional[List[bool]], Optional[float]]]:
+    """
+    Generator behind 'iter_xyz_frames' (the file existence is checked eagerly by the public function).
+    """
+    first_atom_count = None
+
+    with trajectory_file_path.open("rb") as file:
+        while True:
+            frame = _read_xyz_frame(file)
+            if frame is None:
+                break
+            if first_atom_count is None:
+                first_atom_count = frame[0].shape[0]
+            elif frame[0].shape[0] != first_atom_count:
+                raise ValueError("Number of atoms is not constant throughout the trajectory file.")
+            yield frame
+
+
+def _read_xyz_frame(file: BinaryIO) -> Optional[Tuple[np.ndarray, np.ndarray, str, Optional[List[float]], bool, Optional[List[bool]], Optional[float]]]:
+    """
+    Reads the XYZ frame starting at the current position of a file opened in binary mode.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        The trajectory file, positioned at the start of a frame (its atom count line).
+
+    Returns
+    -------
+    Optional[Tuple[np.ndarray, np.ndarray, str, Optional[List[float]], bool, Optional[List[bool]], Optional[float]]]
+        The frame, as yielded by 'iter_xyz_frames', or None at the end of the file.
+
+    Raises
+    ------
+    TypeError
+        If the number of atoms is not an integer.
+    ValueError
+        If the frame format is incorrect.
+    """
+    atom_count_line = file.readline()
+    if not atom_count_line:
+        return None
+    atom_count_str = atom_count_line.decode().strip()
+    if not atom_count_str.isdigit():
+        raise TypeError("Incorrect file format: number of atoms must be an integer.")
+    atom_count = int(atom_count_str)
+
+    comment_line = file.readline()
+    if not comment_line:
+        raise ValueError("Incorrect file format: unexpected end of file.")
+    comment = comment_line.decode().strip()
+
+    lattice, properties, pbc, max_f_std = parse_extended_format(comment)
+    if pbc and len(pbc) != 3:
+        raise ValueError("PBC data must consist of three boolean values (True or False for each axis).")
+
+    symbols_frame = np.zeros(atom_count, dtype="<U3")
+    coordinates_frame = np.zeros((atom_count, 3))
+
+    for j in range(atom_count):
+        line_elements = file.readline().decode().split()
+        if len(line_elements) != 4:
+            raise ValueError("Incorrect file format: expected an atomic symbol followed by three coordinates.")
+        symbol, x, y, z = line_elements
+        symbols_frame[j] = symbol
+        coordinates_frame[j] = [float(x), float(y), float(z)]
+
+    return symbols_frame, coordinates_frame, comment, lattice, properties, pbc, max_f_std
+
+
+# Unittested
+@catch_errors_decorator
+def parse_xyz_trajectory_file(trajectory_file_path: Path, cache_size_mb: float = DEFAULT_CACHE_SIZE_MB) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], Optional[np.ndarray], Optional[List[bool]], Optional[bool], Optional[float]]:
     """
     Parses an XYZ format trajectory file, extracting atomic structure and optional extended properties such as lattice information,
     periodic boundary conditions (PBC), and additional properties if they are provided in the comments.
+    This is a thin wrapper around 'iter_xyz_frames' that stacks all the frames in memory.
+    The frames are kept in the binary cache of the iteration ('common.cache'): on a cache hit the atomic symbols and
+    coordinates are returned as read-only memory-mapped arrays.
 
     Parameters
     ----------
     trajectory_file_path : Path
         The path to the trajectory file.
+    cache_size_mb : float, optional
+        The disk budget of the cache of the iteration, in MB (0 disables the cache).
 
     Returns
     -------
@@ -72,56 +228,437 @@ def parse_xyz_trajectory_file(trajectory_file_path: Path) -> Tuple[np.ndarray, n
     if not trajectory_file_path.is_file():
         raise FileNotFoundError(f"File not found: {trajectory_file_path}")
 
+    cached_arrays = _load_cached_xyz_frames(trajectory_file_path, cache_size_mb)
+    if cached_arrays is not None and cached_arrays["frame_indexes"].shape[0] == cached_arrays["frame_count"][0]:
+        return _decode_xyz_frames(cached_arrays, slice(None))
+
+    # Fast path: constant atom count, every frame decoded at once
+    parsed = _parse_xyz_trajectory_block(trajectory_file_path)
+    if parsed is not None:
+        _store_xyz_frames(trajectory_file_path, parsed[0].shape[0], np.arange(parsed[0].shape[0]), parsed, None, cache_size_mb)
+        return parsed
+
+    # Slow path: frame by frame (also gives the detailed error messages)
     atom_counts, atomic_symbols, atomic_coordinates, comments, lattice_info, pbc_info, properties_info, max_f_std_info = [], [], [], [], [], [], [], []
 
+    for symbols_frame, coordinates_frame, comment, lattice, properties, pbc, max_f_std in iter_xyz_frames(trajectory_file_path):
+        atom_counts.append(symbols_frame.shape[0])
+        atomic_symbols.append(symbols_frame)
+        atomic_coordinates.append(coordinates_frame)
+        comments.append(comment)
+        lattice_info.append(np.array([float(x) for x in lattice]) if lattice else None)
+        pbc_info.append(pbc if pbc else None)
+        properties_info.append(properties if properties else None)
+        max_f_std_info.append(max_f_std if max_f_std else None)
+
+    parsed = np.array(atom_counts), np.array(atomic_symbols), np.array(atomic_coordinates), comments, lattice_info, pbc_info, properties_info, max_f_std_info
+    _store_xyz_frames(trajectory_file_path, len(atom_counts), np.arange(len(atom_counts)), parsed, None, cache_size_mb)
+    return parsed
+
+
+def _load_cached_xyz_frames(trajectory_file_path: Path, cache_size_mb: float) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Loads the cached frames of a trajectory, or returns None if there are none (or if two stores were mixed).
+    """
+    cached_arrays = load_cached_arrays(trajectory_file_path, XYZ_CACHE_ARRAYS, cache_size_mb)
+    if cached_arrays is None:
+        return None
+    if any(cached_arrays[array_name].shape[0] != cached_arrays["frame_indexes"].shape[0] for array_name in XYZ_CACHE_ARRAYS[2:]):
+        return None
+    return cached_arrays
+
+
+def _store_xyz_frames(
+    trajectory_file_path: Path,
+    frame_count: int,
+    frame_indexes: np.ndarray,
+    parsed: Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], List[Optional[np.ndarray]], List[Optional[List[bool]]], List[Optional[bool]], List[Optional[float]]],
+    cached_arrays: Optional[Dict[str, np.ndarray]],
+    cache_size_mb: float,
+) -> None:
+    """
+    Stores frames read from a trajectory in the binary cache, merged with the frames already cached for this file
+    (the frames must all have the same number of atoms).
+    """
+    atom_counts, atomic_symbols, atomic_coordinates, comments, lattice_info, pbc_info, properties_info, max_f_std_info = parsed
+    if atom_counts.shape[0] == 0 or atomic_symbols.dtype == object or atomic_coordinates.dtype == object:
+        return
+
+    frame_indexes, positions = np.unique(np.asarray(frame_indexes, dtype=np.int64), return_index=True)
+    lattice_mask = np.array([lattice_info[idx] is not None for idx in positions])
+    lattice = np.full((positions.shape[0], 9), np.nan)
+    if lattice_mask.any():
+        lattice[lattice_mask] = np.array([lattice_info[idx] for idx in positions if lattice_info[idx] is not None], dtype=np.float64)
+    pbc_mask = np.array([pbc_info[idx] is not None for idx in positions])
+    pbc = np.zeros((positions.shape[0], 3), dtype=bool)
+    if pbc_mask.any():
+        pbc[pbc_mask] = np.array([pbc_info[idx] for idx in positions if pbc_info[idx] is not None], dtype=bool)
+
+    arrays = {
+        "frame_indexes": frame_indexes,
+        "atom_counts": atom_counts[positions],
+        "atomic_symbols": atomic_symbols[positions],
+        "atomic_coordinates": atomic_coordinates[positions],
+        "comments": np.array([comments[idx] for idx in positions], dtype=str),
+        "lattice": lattice,
+        "lattice_mask": lattice_mask,
+        "pbc": pbc,
+        "pbc_mask": pbc_mask,
+        "properties": np.array([bool(properties_info[idx]) for idx in positions]),
+        "frame_max_f_std": np.array([np.nan if max_f_std_info[idx] is None else max_f_std_info[idx] for idx in positions], dtype=np.float64),
+    }
+    # The frames already cached (same atom count) are kept, the ones read again are replaced
+    if cached_arrays is not None and cached_arrays["atomic_symbols"].shape[1:] == arrays["atomic_symbols"].shape[1:]:
+        kept = ~np.isin(cached_arrays["frame_indexes"], frame_indexes)
+        arrays = {array_name: np.concatenate((cached_arrays[array_name][kept], array)) for array_name, array in arrays.items()}
+        order = np.argsort(arrays["frame_indexes"], kind="stable")
+        arrays = {array_name: array[order] for array_name, array in arrays.items()}
+    arrays["frame_count"] = np.array([frame_count], dtype=np.int64)
+
+    store_cached_arrays(trajectory_file_path, arrays, cache_size_mb)
+
+
+def _decode_xyz_frames(cached_arrays: Dict[str, np.ndarray], positions: Union[slice, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], List[Optional[np.ndarray]], List[Optional[List[bool]]], List[Optional[bool]], List[Optional[float]]]:
+    """
+    Rebuilds the 'parse_xyz_trajectory_file' tuple from the cached arrays, for the frames at the given positions of the entry.
+    """
+    lattice, lattice_mask = cached_arrays["lattice"][positions], cached_arrays["lattice_mask"][positions]
+    pbc, pbc_mask = cached_arrays["pbc"][positions], cached_arrays["pbc_mask"][positions]
+
+    lattice_info = [np.array(lattice[idx]) if has_lattice else None for idx, has_lattice in enumerate(lattice_mask)]
+    pbc_info = [pbc[idx].tolist() if has_pbc else None for idx, has_pbc in enumerate(pbc_mask)]
+    properties_info = [True if properties else None for properties in cached_arrays["properties"][positions]]
+    max_f_std_info = [None if np.isnan(max_f_std) or max_f_std == 0.0 else float(max_f_std) for max_f_std in cached_arrays["frame_max_f_std"][positions]]
+
+    return (
+        np.array(cached_arrays["atom_counts"][positions]),
+        cached_arrays["atomic_symbols"][positions],
+        cached_arrays["atomic_coordinates"][positions],
+        cached_arrays["comments"][positions].tolist(),
+        lattice_info,
+        pbc_info,
+        properties_info,
+        max_f_std_info,
+    )
+
+
+def _parse_xyz_trajectory_block(trajectory_file_path: Path) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], List[Optional[np.ndarray]], List[Optional[List[bool]]], List[Optional[bool]], List[Optional[float]]]]:
+    """
+    Vectorized parser for XYZ trajectories with a constant number of atoms per frame.
+
+    The frame layout is fixed (atom_count + 2 lines per frame), so the comment lines are pulled out in one pass
+    and the bodies of all the frames are decoded in a single NumPy conversion. Comment lines that only differ by
+    their 'max_f_std' value share the same parsed header.
+
+    Parameters
+    ----------
+    trajectory_file_path : Path
+        The path to the trajectory file.
+
+    Returns
+    -------
+    Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], List[Optional[np.ndarray]], List[Optional[List[bool]]], List[Optional[bool]], List[Optional[float]]]]
+        The same tuple as 'parse_xyz_trajectory_file', or None if the file does not fit the fixed layout
+        (in which case the caller falls back to the frame by frame parser).
+    """
     with trajectory_file_path.open("r") as file:
-        lines = file.readlines()
+        lines = file.read().splitlines()
+
+    if not lines:
+        return None
+    atom_count_str = lines[0].strip()
+    if not atom_count_str.isdigit():
+        return None
+    atom_count = int(atom_count_str)
+    frame_length = atom_count + 2
+    if len(lines) % frame_length != 0:
+        return None
+    nb_frames = len(lines) // frame_length
+    if set(line.strip() for line in lines[0::frame_length]) != {atom_count_str}:
+        return None
+
+    comments = [line.strip() for line in lines[1::frame_length]]
+    # Drop the comment lines, then the atom count lines: only the frame bodies are left
+    del lines[1::frame_length]
+    del lines[0 :: frame_length - 1]
+    if not lines:
+        return None
+    try:
+        atoms = np.loadtxt(lines, dtype=XYZ_ATOM_DTYPE, comments=None, ndmin=1)
+    except ValueError:
+        return None
+    del lines
+    atomic_symbols = np.ascontiguousarray(atoms["symbol"]).reshape(nb_frames, atom_count)
+    atomic_coordinates = np.ascontiguousarray(atoms["position"]).reshape(nb_frames, atom_count, 3)
+    del atoms
+
+    # Parse each distinct header (once the max_f_std value is removed) only once
+    header_keys = [MAX_F_STD_REGEX.sub("", comment) for comment in comments]
+    parsed_headers = {}
+    for header_key in set(header_keys):
+        lattice, properties, pbc, _ = parse_extended_format(header_key)
+        if pbc and len(pbc) != 3:
+            return None
+        parsed_headers[header_key] = (lattice, properties, pbc)
+
+    if all(parsed_headers[header_key][0] for header_key in parsed_headers):
+        # Every frame has a lattice: one row per frame of a single array
+        header_index = {header_key: idx for idx, header_key in enumerate(parsed_headers)}
+        lattice_table = np.array([parsed_headers[header_key][0] for header_key in parsed_headers], dtype=np.float64)
+        lattice_info = list(lattice_table[[header_index[header_key] for header_key in header_keys]])
+    else:
+        lattice_info = [np.array(parsed_headers[header_key][0], dtype=np.float64) if parsed_headers[header_key][0] else None for header_key in header_keys]
+    pbc_info = [list(parsed_headers[header_key][2]) if parsed_headers[header_key][2] else None for header_key in header_keys]
+    properties_info = [parsed_headers[header_key][1] if parsed_headers[header_key][1] else None for header_key in header_keys]
+    del header_keys, parsed_headers
+
+    max_f_std_info = [float(match.group(1)) if match else None for match in map(MAX_F_STD_REGEX.search, comments)]
+    max_f_std_info = [max_f_std if max_f_std else None for max_f_std in max_f_std_info]
+
+    return np.full(nb_frames, atom_count), atomic_symbols, atomic_coordinates, comments, lattice_info, pbc_info, properties_info, max_f_std_info
+
+
+def _scan_xyz_frame_headers(file: BinaryIO) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Walks over the frames of an XYZ file opened in binary mode, reading only the atom count and comment lines.
+    The bodies of the frames are skipped without being decoded.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        The trajectory file, positioned at the start of a frame.
+
+    Returns
+    -------
+    Iterator[Tuple[int, int, bytes]]
+        An iterator yielding, for each frame, its byte offset, its number of atoms and its (raw) comment line.
 
-    i = 0
-    while i < len(lines):
-        atom_count_str = lines[i].strip()
+    Raises
+    ------
+    TypeError
+        If the number of atoms is not an integer.
+    ValueError
+        If the file ends in the middle of a frame.
+    """
+    while True:
+        offset = file.tell()
+        atom_count_line = file.readline()
+        if not atom_count_line:
+            break
+        atom_count_str = atom_count_line.strip()
         if not atom_count_str.isdigit():
             raise TypeError("Incorrect file format: number of atoms must be an integer.")
         atom_count = int(atom_count_str)
-        atom_counts.append(atom_count)
+        comment_line = file.readline()
+        if not comment_line:
+            raise ValueError("Incorrect file format: unexpected end of file.")
+        if atom_count > 0:
+            # Skip the body (C-level iteration over the lines), the last line tells if the frame is complete
+            deque(islice(file, atom_count - 1), maxlen=0)
+            if not file.readline():
+                raise ValueError("Incorrect file format: unexpected end of file.")
+        yield offset, atom_count, comment_line
+
+
+# Unittested
+@catch_errors_decorator
+def get_xyz_frame_offsets(trajectory_file_path: Path) -> np.ndarray:
+    """
+    Returns the byte offset of every frame of an XYZ trajectory file.
 
-        comment = lines[i + 1].strip()
-        comments.append(comment)
+    The offsets are persisted in a '<file>.xyzidx' sidecar (np.save format) together with the size and the modification
+    time of the trajectory, so the index is only rebuilt when the trajectory changes.
 
-        lattice, properties, pbc, max_f_std = parse_extended_format(comment)
+    Parameters
+    ----------
+    trajectory_file_path : Path
+        The path to the trajectory file.
 
-        lattice_info.append(np.array([float(x) for x in lattice]) if lattice else None)
-        if pbc:
-            if len(pbc) == 3:
-                pbc_info.append(pbc)
-            else:
-                raise ValueError("PBC data must consist of three boolean values (True or False for each axis).")
+    Returns
+    -------
+    np.ndarray
+        An int64 array with the byte offset of each frame.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the trajectory file does not exist.
+    """
+    if not trajectory_file_path.is_file():
+        raise FileNotFoundError(f"File not found: {trajectory_file_path}")
+
+    offsets = _load_xyz_frame_index(trajectory_file_path)
+    if offsets is not None:
+        return offsets
+
+    with trajectory_file_path.open("rb") as file:
+        offsets = np.fromiter((offset for offset, _, _ in _scan_xyz_frame_headers(file)), dtype=np.int64)
+    _save_xyz_frame_index(trajectory_file_path, offsets)
+
+    return offsets
+
+
+def _load_xyz_frame_index(trajectory_file_path: Path) -> Optional[np.ndarray]:
+    """
+    Loads the frame offsets from the '<file>.xyzidx' sidecar, or returns None if it is missing or out of date.
+    The first two values of the sidecar are the size and the modification time (ns) of the trajectory.
+    """
+    index_file_path = trajectory_file_path.with_name(f"{trajectory_file_path.name}.xyzidx")
+    if not index_file_path.is_file():
+        return None
+    trajectory_stat = trajectory_file_path.stat()
+    try:
+        index = np.load(index_file_path)
+    except (OSError, ValueError):
+        return None
+    if index.shape[0] >= 2 and index[0] == trajectory_stat.st_size and index[1] == trajectory_stat.st_mtime_ns:
+        return index[2:]
+    return None
+
+
+def _save_xyz_frame_index(trajectory_file_path: Path, offsets: np.ndarray) -> None:
+    """
+    Saves the frame offsets in the '<file>.xyzidx' sidecar (a read-only folder only costs a rebuild next time).
+    """
+    index_file_path = trajectory_file_path.with_name(f"{trajectory_file_path.name}.xyzidx")
+    trajectory_stat = trajectory_file_path.stat()
+    try:
+        with index_file_path.open("wb") as index_file:
+            np.save(index_file, np.concatenate((np.array([trajectory_stat.st_size, trajectory_stat.st_mtime_ns], dtype=np.int64), offsets.astype(np.int64))))
+    except OSError:
+        pass
+
+
+# Unittested
+@catch_errors_decorator
+def read_xyz_max_f_std(trajectory_file_path: Path, cache_size_mb: float = DEFAULT_CACHE_SIZE_MB) -> np.ndarray:
+    """
+    Reads the 'max_f_std' value of every frame of an extended XYZ trajectory file, without decoding the atomic coordinates.
+
+    Only the atom count and comment lines are read: with an up-to-date '<file>.xyzidx' sidecar the reader seeks straight
+    to each frame header, otherwise the bodies are skipped line-wise and the sidecar is written on the way.
+    The values are kept in the binary cache of the iteration ('common.cache').
+
+    Parameters
+    ----------
+    trajectory_file_path : Path
+        The path to the trajectory file.
+    cache_size_mb : float, optional
+        The disk budget of the cache of the iteration, in MB (0 disables the cache).
+
+    Returns
+    -------
+    np.ndarray
+        A float64 array with the 'max_f_std' value of each frame (NaN if the frame has none).
+
+    Raises
+    ------
+    FileNotFoundError
+        If the trajectory file does not exist.
+    TypeError
+        If the number of atoms is not an integer.
+    ValueError
+        If the file ends in the middle of a frame.
+    """
+    if not trajectory_file_path.is_file():
+        raise FileNotFoundError(f"File not found: {trajectory_file_path}")
+
+    def comment_max_f_std(comment_line: bytes) -> float:
+        max_f_std_match = MAX_F_STD_BYTES_REGEX.search(comment_line)
+        return float(max_f_std_match.group(1)) if max_f_std_match else np.nan
+
+    cached_arrays = load_cached_arrays(trajectory_file_path, ["max_f_std"], cache_size_mb)
+    if cached_arrays is not None:
+        return np.array(cached_arrays["max_f_std"])
+
+    offsets = _load_xyz_frame_index(trajectory_file_path)
+    with trajectory_file_path.open("rb") as file:
+        if offsets is not None:
+            max_f_std = np.empty(offsets.shape[0], dtype=np.float64)
+            for frame_idx, offset in enumerate(offsets):
+                file.seek(offset)
+                file.readline()
+                max_f_std[frame_idx] = comment_max_f_std(file.readline())
         else:
-            pbc_info.append(None)
+            offsets, max_f_std = [], []
+            for offset, _, comment_line in _scan_xyz_frame_headers(file):
+                offsets.append(offset)
+                max_f_std.append(comment_max_f_std(comment_line))
+            _save_xyz_frame_index(trajectory_file_path, np.array(offsets, dtype=np.int64))
+            max_f_std = np.array(max_f_std, dtype=np.float64)
 
-        properties_info.append(properties if properties else None)
-        max_f_std_info.append(max_f_std if max_f_std else None)
+    store_cached_arrays(trajectory_file_path, {"max_f_std": max_f_std}, cache_size_mb)
+    return max_f_std
 
-        symbols_frame = np.zeros(atom_count, dtype='<U3')
-        coordinates_frame = np.zeros((atom_count, 3))
 
-        for j in range(atom_count):
-            line_elements = lines[i + 2 + j].split()
-            if len(line_elements) != 4:
-                raise ValueError("Incorrect file format: expected an atomic symbol followed by three coordinates.")
-            symbol, x, y, z = line_elements
-            symbols_frame[j] = symbol
-            coordinates_frame[j] = [float(x), float(y), float(z)]
+# Unittested
+@catch_errors_decorator
+def read_xyz_frames(trajectory_file_path: Path, frame_indexes: Sequence[int], cache_size_mb: float = DEFAULT_CACHE_SIZE_MB) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], List[Optional[np.ndarray]], List[Optional[List[bool]]], List[Optional[bool]], List[Optional[float]]]:
+    """
+    Reads only the requested frames of an XYZ trajectory file, seeking straight to them with the frame index.
+    The frames read are added to the binary cache of the iteration ('common.cache'), and the requested frames are sliced
+    from it when they were all read before (by this function or by 'parse_xyz_trajectory_file').
 
-        atomic_symbols.append(symbols_frame)
-        atomic_coordinates.append(coordinates_frame)
+    Parameters
+    ----------
+    trajectory_file_path : Path
+        The path to the trajectory file.
+    frame_indexes : Sequence[int]
+        The indexes of the frames to read (in the requested order).
+    cache_size_mb : float, optional
+        The disk budget of the cache of the iteration, in MB (0 disables the cache).
 
-        i += atom_count + 2
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], List[Optional[np.ndarray]], List[Optional[List[bool]]], List[Optional[bool]], List[Optional[float]]]
+        The same tuple as 'parse_xyz_trajectory_file', restricted to the requested frames.
 
-    if len(set(atom_counts)) > 1:
-        raise ValueError("Number of atoms is not constant throughout the trajectory file.")
+    Raises
+    ------
+    FileNotFoundError
+        If the trajectory file does not exist.
+    IndexError
+        If a frame index is out of range.
+    ValueError
+        If the number of atoms is not constant over the requested frames or if the file format is incorrect.
+    """
+    if not trajectory_file_path.is_file():
+        raise FileNotFoundError(f"File not found: {trajectory_file_path}")
+    frame_indexes = np.asarray(frame_indexes, dtype=np.int64).reshape(-1)
 
-    return np.array(atom_counts), np.array(atomic_symbols), np.array(atomic_coordinates), comments, lattice_info, pbc_info, properties_info, max_f_std_info
+    cached_arrays = _load_cached_xyz_frames(trajectory_file_path, cache_size_mb)
+    if cached_arrays is not None and frame_indexes.size > 0:
+        frame_count = int(cached_arrays["frame_count"][0])
+        if frame_indexes.min() < 0 or frame_indexes.max() >= frame_count:
+            raise IndexError(f"Frame index out of range (total frames: {frame_count})")
+        positions = np.minimum(np.searchsorted(cached_arrays["frame_indexes"], frame_indexes), cached_arrays["frame_indexes"].shape[0] - 1)
+        if np.array_equal(cached_arrays["frame_indexes"][positions], frame_indexes):
+            return _decode_xyz_frames(cached_arrays, positions)
+
+    offsets = get_xyz_frame_offsets(trajectory_file_path)
+    if frame_indexes.size > 0 and (frame_indexes.min() < 0 or frame_indexes.max() >= offsets.shape[0]):
+        raise IndexError(f"Frame index out of range (total frames: {offsets.shape[0]})")
+
+    atom_counts, atomic_symbols, atomic_coordinates, comments, lattice_info, pbc_info, properties_info, max_f_std_info = [], [], [], [], [], [], [], []
+
+    with trajectory_file_path.open("rb") as file:
+        for frame_idx in frame_indexes:
+            file.seek(offsets[frame_idx])
+            symbols_frame, coordinates_frame, comment, lattice, properties, pbc, max_f_std = _read_xyz_frame(file)
+            if atom_counts and symbols_frame.shape[0] != atom_counts[0]:
+                raise ValueError("Number of atoms is not constant throughout the requested frames.")
+            atom_counts.append(symbols_frame.shape[0])
+            atomic_symbols.append(symbols_frame)
+            atomic_coordinates.append(coordinates_frame)
+            comments.append(comment)
+            lattice_info.append(np.array([float(x) for x in lattice]) if lattice else None)
+            pbc_info.append(pbc if pbc else None)
+            properties_info.append(properties if properties else None)
+            max_f_std_info.append(max_f_std if max_f_std else None)
+
+    parsed = np.array(atom_counts), np.array(atomic_symbols), np.array(atomic_coordinates), comments, lattice_info, pbc_info, properties_info, max_f_std_info
+    _store_xyz_frames(trajectory_file_path, offsets.shape[0], frame_indexes, parsed, cached_arrays, cache_size_mb)
+    return parsed
 
 
 # TODO: Add tests for this function
@@ -144,15 +681,10 @@ def parse_extended_format(comment_line: str) -> Tuple[Optional[List[float]], boo
         - PBC as an optional list of booleans.
         - Max force standard deviation as an optional float.
     """
-    lattice_regex = r"Lattice=\"((?:[-\d\.]+\s+){8}[-\d\.]+)\""
-    properties_regex = r"Properties=species:S:1:pos:R:3"
-    pbc_regex = r'pbc="([^"]*)"'
-    max_f_std_regex = r"max_f_std=([\d.]+)"
-
-    lattice_match = re.search(lattice_regex, comment_line)
-    properties_match = re.search(properties_regex, comment_line)
-    pbc_match = re.search(pbc_regex, comment_line)
-    max_f_std_match = re.search(max_f_std_regex, comment_line)
+    lattice_match = LATTICE_REGEX.search(comment_line)
+    properties_match = PROPERTIES_REGEX.search(comment_line)
+    pbc_match = PBC_REGEX.search(comment_line)
+    max_f_std_match = MAX_F_STD_REGEX.search(comment_line)
 
     lattice_values = [float(value) for value in lattice_match.group(1).split()] if lattice_match else None
     properties_present = bool(properties_match)
@@ -161,7 +693,67 @@ def parse_extended_format(comment_line: str) -> Tuple[Optional[List[float]], boo
 
     return lattice_values, properties_present, pbc_values, max_f_std_value
 
-# TODO: Add tests for this function
+
+# Unittested
+@catch_errors_decorator
+def parse_extended_xyz_info(comment_line: str) -> Dict[str, str]:
+    """
+    Parses every key=value pair of the comment line of an extended XYZ file (quotes and braces are removed from the values).
+
+    Parameters
+    ----------
+    comment_line : str
+        The comment line of the frame.
+
+    Returns
+    -------
+    Dict[str, str]
+        The values (as strings) by key, keys are case sensitive.
+    """
+    info = {}
+    for match in EXTENDED_XYZ_KEY_VALUE_REGEX.finditer(comment_line):
+        key, *values = match.groups()
+        info[key] = next(value for value in values if value is not None)
+
+    return info
+
+
+# Unittested
+@catch_errors_decorator
+def parse_extended_xyz_properties(properties: str) -> List[Tuple[str, str, int, int]]:
+    """
+    Parses the 'Properties' specification of an extended XYZ file (e.g. 'species:S:1:pos:R:3:forces:R:3').
+
+    Parameters
+    ----------
+    properties : str
+        The value of the 'Properties' key.
+
+    Returns
+    -------
+    List[Tuple[str, str, int, int]]
+        For each property: its name, its type ('S', 'R', 'I' or 'L'), its number of columns and its first column in the atom lines.
+
+    Raises
+    ------
+    ValueError
+        If the specification is not made of name:type:count triplets, or if a type or a count is invalid.
+    """
+    fields = properties.split(":")
+    if len(fields) % 3 != 0:
+        raise ValueError(f"Invalid extended XYZ properties: '{properties}'.")
+
+    columns = []
+    first_column = 0
+    for name, property_type, count in zip(fields[0::3], fields[1::3], fields[2::3]):
+        if property_type not in ("S", "R", "I", "L") or not count.isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid extended XYZ property '{name}:{property_type}:{count}' in '{properties}'.")
+        columns.append((name, property_type, int(count), first_column))
+        first_column += int(count)
+
+    return columns
+
+# Unittested
 @catch_errors_decorator
 def write_xyz_frame(trajectory_file_path: Path, frame_idx: int, atom_counts: np.ndarray, atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, cell_info: np.ndarray, comments: List[str]) -> None:
     """
@@ -189,15 +781,62 @@ def write_xyz_frame(trajectory_file_path: Path, frame_idx: int, atom_counts: np.
     IndexError
         If the specified frame index is out of range.
     """
+    write_xyz_frames(trajectory_file_path, [frame_idx], atom_counts, atomic_symbols, atomic_coordinates, cell_info, comments)
 
-    # Validate frame index
-    if frame_idx >= atom_counts.shape[0]:
-        raise IndexError(f"Frame index out of range: {frame_idx} (total frames: {atom_counts.shape[0]})")
 
-    # Start writing to the file
-    with trajectory_file_path.open("w") as file:
-        # Write the atom count for the frame
-        file.write(f"{atom_counts[frame_idx]}\n")
+# Unittested
+@catch_errors_decorator
+def write_xyz_frames(trajectory_file_paths: Union[Path, Sequence[Path]], frame_indexes: Sequence[int], atom_counts: np.ndarray, atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, cell_info: np.ndarray, comments: List[str]) -> None:
+    """
+    Writes several frames of a trajectory, either all in one XYZ file or each in its own XYZ file, including extended format lattice information if provided.
+    Each frame is formatted as a single block (one formatting call per frame, the formatting buffer is reused between frames).
+
+    Parameters
+    ----------
+    trajectory_file_paths : Union[Path, Sequence[Path]]
+        A single file path (all the frames are written in it, in order) or one file path per frame.
+    frame_indexes : Sequence[int]
+        The indexes of the frames to write.
+    atom_counts : np.ndarray
+        An array containing the number of atoms in each frame of the trajectory.
+    atomic_symbols : np.ndarray
+        An array containing the atomic symbols for each atom in each frame of the trajectory.
+    atomic_coordinates : np.ndarray
+        An array containing the coordinates of each atom in each frame of the trajectory.
+    cell_info : np.ndarray
+        An array containing the cell lattice information for each frame.
+    comments : List[str]
+        A list of comments for each frame.
+
+    Raises
+    ------
+    IndexError
+        If a frame index is out of range.
+    ValueError
+        If the number of file paths does not match the number of frames.
+    """
+    frame_indexes = np.asarray(frame_indexes, dtype=np.int64).reshape(-1)
+
+    # Validate frame indexes
+    for frame_idx in frame_indexes:
+        if frame_idx >= atom_counts.shape[0]:
+            raise IndexError(f"Frame index out of range: {frame_idx} (total frames: {atom_counts.shape[0]})")
+
+    if isinstance(trajectory_file_paths, Path):
+        file_paths = None
+    else:
+        file_paths = list(trajectory_file_paths)
+        if len(file_paths) != frame_indexes.shape[0]:
+            raise ValueError(f"Number of file paths ('{len(file_paths)}') does not match the number of frames ('{frame_indexes.shape[0]}').")
+
+    # One format string per atom count and one (symbol, x, y, z) buffer, reused for every frame
+    frame_formats = {}
+    atom_lines_buffer = np.empty((atomic_symbols.shape[-1], 4), dtype=object)
+
+    def format_frame(frame_idx: int) -> str:
+        atom_count = int(atom_counts[frame_idx])
+        if atom_count not in frame_formats:
+            frame_formats[atom_count] = "%s %.6f %.6f %.6f\n" * atom_count
 
         # Write the comment line with cell information if available
         if len(cell_info) > 0:
@@ -205,11 +844,14 @@ def write_xyz_frame(trajectory_file_path: Path, frame_idx: int, atom_counts: np.
             comment_line = f'Lattice="{cell_line}" Properties=species:S:1:pos:R:3'
         else:
             comment_line = comments[frame_idx] if frame_idx < len(comments) else ""
-        file.write(f"{comment_line}\n")
-
-        # Write atomic symbols and coordinates for the frame
-        for atom_index in range(atom_counts[frame_idx]):
-            symbol = atomic_symbols[frame_idx, atom_index]
-            coords = atomic_coordinates[frame_idx, atom_index]
-            coords_line = " ".join(f"{coord:.6f}" for coord in coords)
-            file.write(f"{symbol} {coords_line}\n")
+
+        atom_lines_buffer[:atom_count, 0] = atomic_symbols[frame_idx, :atom_count]
+        atom_lines_buffer[:atom_count, 1:] = atomic_coordinates[frame_idx, :atom_count]
+        return f"{atom_count}\n{comment_line}\n" + frame_formats[atom_count] % tuple(atom_lines_buffer[:atom_count].ravel())
+
+    if file_paths is None:
+        with trajectory_file_paths.open("w") as file:
+            file.writelines(format_frame(frame_idx) for frame_idx in frame_indexes)
+    else:
+        for file_path, frame_idx in zip(file_paths, frame_indexes):
+            file_path.write_text(format_frame(frame_idx))
@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/26
+Last modified: 2026/10/18
 """
 
 # Standard library modules
@@ -19,9 +19,9 @@ import re
 import numpy as np
 
 # Local imports
-from arcann_training.common.json import load_json_file, write_json_file, get_key_in_dict, load_default_json_file, backup_and_overwrite_json_file
+from arcann_training.common.json import load_json_file, write_json_file, load_default_json_file, backup_and_overwrite_json_file
 from arcann_training.common.list import textfile_to_string_list, string_list_to_textfile
-from arcann_training.common.check import validate_step_folder, check_vmd, check_dcd_is_valid, check_nc_is_valid
+from arcann_training.common.check import validate_step_folder, check_dcd_is_valid, check_nc_is_valid
 
 
 def main(
@@ -100,12 +100,6 @@ def main(
         arcann_logger.error(f"Aborting...")
         return 1
 
-    # Check if the vmd package is installed
-    vmd_bin = check_vmd(get_key_in_dict("vmd_path", user_input_json, previous_exploration_json, default_input_json))
-    current_input_json["vmd_path"] = vmd_bin
-
-    exploration_json["vmd_path"] = vmd_bin
-
     # Check the normal termination of the exploration phase
     # Counters
     completed_count = 0
@@ -151,7 +145,7 @@ def main(
                         continue
 
                     # Check if DCD is unreadable
-                    if not check_dcd_is_valid(traj_file, vmd_bin):
+                    if not check_dcd_is_valid(traj_file):
                         (local_path / "skip").touch(exist_ok=True)
                         skipped_count += 1
                         exploration_json["systems_auto"][system_auto]["skipped_count"] += 1
@@ -190,7 +184,7 @@ def main(
                         continue
 
                     # Check if NC is unreadable
-                    if not check_nc_is_valid(traj_file, vmd_bin):
+                    if not check_nc_is_valid(traj_file):
                         (local_path / "skip").touch(exist_ok=True)
                         skipped_count += 1
                         exploration_json["systems_auto"][system_auto]["skipped_count"] += 1
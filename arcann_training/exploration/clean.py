@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/18
 """
 
 # Standard library modules
@@ -17,7 +17,7 @@ import subprocess
 
 # Local imports
 from arcann_training.common.check import validate_step_folder
-from arcann_training.common.filesystem import change_directory, remove_file, remove_files_matching_glob, remove_all_symlink
+from arcann_training.common.filesystem import change_directory, remove_file, remove_files_matching_glob, remove_all_symlink, remove_tree
 from arcann_training.common.list import string_list_to_textfile
 from arcann_training.common.json import load_json_file
 
@@ -103,13 +103,21 @@ def main(
     remove_files_matching_glob(current_path, "**/emle_port.txt")
     remove_files_matching_glob(current_path, "**/mdinfo")
     remove_files_matching_glob(current_path, "**/old.*")
+    arcann_logger.info("Deleting trajectory index files...")
+    remove_files_matching_glob(current_path, "**/*.xyzidx")
+    arcann_logger.info("Deleting online deviation state files...")
+    remove_files_matching_glob(current_path, "**/model_devi_*.out.state.json")
+    remove_files_matching_glob(current_path, "**/model_devi_*.out.rows")
+    if (current_path / ".arcann_cache").is_dir():
+        remove_tree(current_path / ".arcann_cache")
 
     if prev_iter > 0:
         arcann_logger.info(f"Compressing into a bzip2 tar archive...")
         change_directory(training_path / "starting_structures")
         starting_structures_xyz = list(Path(".").glob(f"{padded_prev_iter}_*.xyz"))
         starting_structures_lmp = list(Path(".").glob(f"{padded_prev_iter}_*.lmp"))
-        starting_structures = starting_structures_xyz + starting_structures_lmp
+        starting_structures_rst7 = list(Path(".").glob(f"{padded_prev_iter}_*.rst7"))
+        starting_structures = starting_structures_xyz + starting_structures_lmp + starting_structures_rst7
         if starting_structures:
             starting_structures = [str(_) for _ in starting_structures]
             archive_name = f"starting_structures_{padded_prev_iter}.tar.bz2"
@@ -135,7 +143,7 @@ def main(
                 subprocess.run(cmd)
                 remove_file(training_path / "starting_structures" / archive_name.replace(".tar.bz2", ".lst"))
 
-                del starting_structures, starting_structures_xyz, starting_structures_lmp
+                del starting_structures, starting_structures_xyz, starting_structures_lmp, starting_structures_rst7
                 arcann_logger.info(f"If the tar.bz2 is good, you can remove all files starting with {padded_prev_iter}_ in {training_path / 'starting_structures'}")
             change_directory(current_path)
 
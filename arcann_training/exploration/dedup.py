@@ -0,0 +1,239 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+Removes the near-duplicate candidates before the labeling, to run after exploration extract (and before labeling prepare).
+A candidate is dropped if it is a duplicate of a frame of the datasets of the data folder (set.000), or of a previous
+candidate of its system (e.g. from a sibling trajectory started from the same point). Exact duplicates are found with
+hashes invariant to the order of the atoms of a same species and to the periodic images, near-duplicates with the
+distance between pair distance histograms (within 'dedup_tolerance'). The descriptors of the datasets are indexed in
+'control/dedup_index', only the new datasets are read. The dropped candidates are reported in the exploration JSON.
+"""
+
+# Standard library modules
+import logging
+import sys
+from pathlib import Path
+
+# Non-standard library imports
+import numpy as np
+
+# Local imports
+from arcann_training.common.check import validate_step_folder
+from arcann_training.common.json import backup_and_overwrite_json_file, load_default_json_file, load_json_file, write_json_file
+from arcann_training.common.structure import get_properties_maps
+from arcann_training.common.xyz import get_xyz_frame_offsets, read_xyz_frames
+from arcann_training.exploration.utils import compute_structure_descriptors, get_duplicate_leaders, get_nearest_descriptors, get_structure_hashes, update_dataset_dedup_index
+
+
+def _keep_xyz_frames(xyz_file_path: Path, frame_indexes: np.ndarray) -> None:
+    """
+    Rewrites an XYZ file with only the given frames (copied byte for byte, in order).
+    """
+    offsets = np.append(get_xyz_frame_offsets(xyz_file_path), xyz_file_path.stat().st_size)
+    temporary_path = xyz_file_path.with_name(f".{xyz_file_path.name}.tmp")
+    with xyz_file_path.open("rb") as xyz_file, temporary_path.open("wb") as kept_file:
+        for frame_index in frame_indexes:
+            xyz_file.seek(offsets[frame_index])
+            kept_file.write(xyz_file.read(offsets[frame_index + 1] - offsets[frame_index]))
+    temporary_path.replace(xyz_file_path)
+
+
+def main(
+    current_step: str,
+    current_phase: str,
+    deepmd_iterative_path: Path,
+    fake_machine=None,
+    user_input_json_filename: str = "input.json",
+):
+    # Get the logger
+    arcann_logger = logging.getLogger("ArcaNN")
+
+    # Get the current path and set the training path as the parent of the current path
+    current_path = Path(".").resolve()
+    training_path = current_path.parent
+
+    # Log the step and phase of the program
+    arcann_logger.info(f"Step: {current_step.capitalize()} - Phase: {current_phase.capitalize()}.")
+    arcann_logger.debug(f"Current path :{current_path}")
+    arcann_logger.debug(f"Training path: {training_path}")
+    arcann_logger.debug(f"Program path: {deepmd_iterative_path}")
+    arcann_logger.info(f"-" * 88)
+
+    # Check if the current folder is correct for the current step
+    validate_step_folder(current_step)
+
+    # Get the current iteration number
+    padded_curr_iter = Path().resolve().parts[-1].split("-")[0]
+
+    # Load the default input JSON (its own section, so the dedup keys do not end up in the exploration input)
+    default_input_json = load_default_json_file(deepmd_iterative_path / "assets" / "default_config.json")[f"{current_step}_{current_phase}"]
+    arcann_logger.debug(f"default_input_json: {default_input_json}")
+
+    # Load the user input JSON
+    if (current_path / user_input_json_filename).is_file():
+        user_input_json = load_json_file((current_path / user_input_json_filename))
+    else:
+        user_input_json = {}
+    arcann_logger.debug(f"user_input_json: {user_input_json}")
+
+    # Merge them (only the dedup keys), the types must match the default ones (an int is accepted for a float)
+    dedup_json = {}
+    for key, default_value in default_input_json.items():
+        dedup_json[key] = user_input_json.get(key, default_value)
+        expected_types = (int, float) if isinstance(default_value, float) else type(default_value)
+        if isinstance(dedup_json[key], bool) != isinstance(default_value, bool) or not isinstance(dedup_json[key], expected_types):
+            arcann_logger.error(f"Type mismatch for '{key}': expected {type(default_value).__name__}, got {type(dedup_json[key]).__name__}")
+            arcann_logger.error(f"Aborting...")
+            return 1
+    arcann_logger.debug(f"dedup_json: {dedup_json}")
+
+    # Get control path, load the main JSON and the exploration JSON
+    control_path = training_path / "control"
+    main_json = load_json_file((control_path / "config.json"))
+    exploration_json = load_json_file((control_path / f"exploration_{padded_curr_iter}.json"))
+
+    # Check if we can continue
+    if not exploration_json["is_extracted"]:
+        arcann_logger.error(f"Lock found. Execute first: exploration extract.")
+        arcann_logger.error(f"Aborting...")
+        return 1
+
+    # The types of the candidates as in the type.raw of the datasets (the properties types start from 1)
+    symbol_types, _, _ = get_properties_maps(main_json["properties"])
+
+    # The frames of the datasets, grouped by composition (only frames of the same composition are compared)
+    references = {}
+    if dedup_json["dedup_against_datasets"]:
+        dataset_index = update_dataset_dedup_index(
+            control_path / "dedup_index",
+            training_path / "data",
+            dedup_json["dedup_hash_resolution_A"],
+            dedup_json["dedup_bin_count"],
+            dedup_json["dedup_cutoff_A"],
+        )
+        for dataset_name, dataset_entry in dataset_index.items():
+            reference = references.setdefault(np.sort(dataset_entry["types"]).tobytes(), {"hashes": [], "descriptors": [], "frames": []})
+            reference["hashes"].append(dataset_entry["hashes"])
+            reference["descriptors"].append(dataset_entry["descriptors"])
+            reference["frames"].extend(f"{dataset_name}/{frame_index}" for frame_index in range(dataset_entry["hashes"].shape[0]))
+        for reference in references.values():
+            reference["hashes"] = np.concatenate(reference["hashes"])
+            reference["descriptors"] = np.concatenate(reference["descriptors"])
+        arcann_logger.info(f"Indexed {sum(len(reference['frames']) for reference in references.values())} frames of {len(dataset_index)} datasets.")
+        del dataset_index
+
+    total_dropped_count = 0
+    arcann_logger.info(f"{'System':<24}{'Candidates':>12}{'Datasets':>10}{'Siblings':>10}{'Kept':>8}")
+    for system_auto in main_json["systems_auto"]:
+        system_json = exploration_json["systems_auto"][system_auto]
+        candidates_xyz_file = current_path / system_auto / f"candidates_{padded_curr_iter}_{system_auto}.xyz"
+        candidates_disturbed_xyz_file = current_path / system_auto / f"candidates_{padded_curr_iter}_{system_auto}_disturbed.xyz"
+        if "dedup_dropped_count" in system_json:
+            arcann_logger.info(f"{system_auto}: already deduplicated (execute exploration extract again to start over), skipping.")
+            continue
+        if system_json["selected_count"] == 0 or not candidates_xyz_file.is_file():
+            system_json["dedup_dropped_count"] = 0
+            system_json["dedup_dropped"] = []
+            continue
+
+        nb_candidates = get_xyz_frame_offsets(candidates_xyz_file).shape[0]
+        if nb_candidates != system_json["selected_count"]:
+            arcann_logger.error(f"{system_auto}: {nb_candidates} structures in {candidates_xyz_file.name} but {system_json['selected_count']} selected candidates.")
+            arcann_logger.error(f"Aborting...")
+            return 1
+        # Not cached (0): the file is rewritten without its duplicates, and labeling prepare streams it
+        _, atomic_symbols, atomic_coordinates, _, lattice_info, _, _, _ = read_xyz_frames(candidates_xyz_file, np.arange(nb_candidates), 0)
+        atom_types = np.array([symbol_types[symbol] - 1 for symbol in atomic_symbols[0]], dtype=np.int64)
+        cell_lengths = np.array([lattice[[0, 4, 8]] for lattice in lattice_info]) if all(lattice is not None for lattice in lattice_info) else None
+        hashes = get_structure_hashes(atom_types, atomic_coordinates, cell_lengths, dedup_json["dedup_hash_resolution_A"])
+        descriptors = compute_structure_descriptors(atom_types, atomic_coordinates, cell_lengths, dedup_json["dedup_bin_count"], dedup_json["dedup_cutoff_A"])
+        del atomic_symbols, atomic_coordinates, lattice_info, cell_lengths
+
+        dropped = {}
+        # Against the datasets
+        reference = references.get(np.sort(atom_types).tobytes())
+        if reference is not None:
+            nearest_indexes, nearest_distances = get_nearest_descriptors(descriptors, reference["descriptors"])
+            for candidate_index in np.flatnonzero(nearest_distances <= dedup_json["dedup_tolerance"]):
+                is_exact = bool(np.any(reference["hashes"] == hashes[candidate_index]))
+                dropped[int(candidate_index)] = {
+                    "candidate_index": int(candidate_index),
+                    "reason": "exact" if is_exact else "near",
+                    "duplicate_of": reference["frames"][int(np.flatnonzero(reference["hashes"] == hashes[candidate_index])[0])] if is_exact else reference["frames"][int(nearest_indexes[candidate_index])],
+                    "distance": 0.0 if is_exact else float(nearest_distances[candidate_index]),
+                }
+                del is_exact
+            del nearest_indexes, nearest_distances
+        datasets_dropped_count = len(dropped)
+
+        # Against the previous candidates of the system (the ones not already dropped)
+        remaining_indexes = np.array([candidate_index for candidate_index in range(nb_candidates) if candidate_index not in dropped], dtype=np.int64)
+        leaders = remaining_indexes[get_duplicate_leaders(descriptors[remaining_indexes], dedup_json["dedup_tolerance"])]
+        for candidate_index, leader_index in zip(remaining_indexes, leaders):
+            if candidate_index != leader_index:
+                is_exact = bool(hashes[candidate_index] == hashes[leader_index])
+                dropped[int(candidate_index)] = {
+                    "candidate_index": int(candidate_index),
+                    "reason": "exact" if is_exact else "near",
+                    "duplicate_of": f"candidate/{int(leader_index)}",
+                    "distance": 0.0 if is_exact else float(np.abs(descriptors[candidate_index] - descriptors[leader_index]).max()),
+                }
+                del is_exact
+        del remaining_indexes, leaders
+
+        # Keep the other candidates (and their disturbed copies, in the same order)
+        if dropped:
+            kept_indexes = np.array([candidate_index for candidate_index in range(nb_candidates) if candidate_index not in dropped], dtype=np.int64)
+            _keep_xyz_frames(candidates_xyz_file, kept_indexes)
+            if candidates_disturbed_xyz_file.is_file():
+                _keep_xyz_frames(candidates_disturbed_xyz_file, kept_indexes)
+            del kept_indexes
+
+        system_json["selected_count"] = nb_candidates - len(dropped)
+        system_json["dedup_dropped_count"] = len(dropped)
+        system_json["dedup_dropped"] = [dropped[candidate_index] for candidate_index in sorted(dropped)]
+        total_dropped_count = total_dropped_count + len(dropped)
+        arcann_logger.info(f"{system_auto:<24}{nb_candidates:>12}{datasets_dropped_count:>10}{len(dropped) - datasets_dropped_count:>10}{system_json['selected_count']:>8}")
+        del nb_candidates, atom_types, hashes, descriptors, reference, dropped, datasets_dropped_count
+    del system_auto, system_json, candidates_xyz_file, candidates_disturbed_xyz_file
+
+    arcann_logger.info(f"{total_dropped_count} duplicate candidates removed, as many labeling calculations saved.")
+
+    # Dump the JSON files (exploration and used input)
+    arcann_logger.info(f"-" * 88)
+    write_json_file(exploration_json, (control_path / f"exploration_{padded_curr_iter}.json"))
+    backup_and_overwrite_json_file(dedup_json, (current_path / f"used_input_{current_phase}.json"), read_only=True)
+
+    # End
+    arcann_logger.info(f"-" * 88)
+    arcann_logger.info(f"Step: {current_step.capitalize()} - Phase: {current_phase.capitalize()} is a success!")
+
+    # Cleaning
+    del current_path, control_path, training_path
+    del default_input_json, user_input_json, user_input_json_filename, dedup_json
+    del main_json, exploration_json, padded_curr_iter
+    del symbol_types, references, total_dropped_count
+
+    arcann_logger.debug(f"LOCAL")
+    arcann_logger.debug(f"{locals()}")
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4:
+        main(
+            "exploration",
+            "dedup",
+            Path(sys.argv[1]),
+            fake_machine=sys.argv[2],
+            user_input_json_filename=sys.argv[3],
+        )
+    else:
+        pass
@@ -6,12 +6,13 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/18
 """
 
 # Standard library modules
 import logging
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Non-standard library imports
@@ -20,8 +21,214 @@ import numpy as np
 # Local imports
 from arcann_training.common.json import load_json_file, write_json_file, load_default_json_file, backup_and_overwrite_json_file
 from arcann_training.common.check import validate_step_folder
-from arcann_training.exploration.utils import get_last_frame_number, generate_input_exploration_deviation_json, get_system_deviation
-from arcann_training.common.xyz import parse_xyz_trajectory_file
+from arcann_training.common.dcd import read_dcd_frames
+from arcann_training.exploration.utils import (
+    QBC_STORE_FILENAME,
+    allocate_candidate_budget,
+    compute_pair_distance_histograms,
+    get_autocorrelation_time,
+    get_candidate_labeling_costs,
+    get_last_frame_number,
+    generate_input_exploration_deviation_json,
+    get_system_deviation,
+    get_minimum_deviation_index,
+    get_selected_counts,
+    read_model_deviation,
+    select_candidates,
+    write_qbc_store,
+)
+from arcann_training.common.xyz import read_xyz_frames, read_xyz_max_f_std
+
+
+def _deviate_trajectory(
+    local_path: Path,
+    deviation_file_path: Path,
+    exploration_type: str,
+    print_every_x_steps: int,
+    disturbed_start: bool,
+    sigmas: tuple,
+    start_row_number: int,
+    nb_steps_expected: int,
+    autocorrelation: bool = False,
+    cache_size_mb: float = 0,
+):
+    """
+    Deviation stats of one trajectory (module level and without the error decorator, so it can run in a process pool).
+    The messages are returned as (level, message) and logged by the main process, in the order of the trajectories.
+    With autocorrelation, the autocorrelation time (in rows) of max_devi_f over the analyzed rows is added to the stats.
+    The 'max_f_std' values of the sander_emle trajectories go through the binary cache of the iteration (cache_size_mb).
+    """
+    sigma_low, sigma_high, sigma_high_limit = sigmas
+    trajectory_logs = []
+
+    # Create the JSON data for Query-by-Committee (written once, after the selection)
+    QbC_stats = {
+        "sigma_low": sigma_low,
+        "sigma_high": sigma_high,
+        "sigma_high_limit": sigma_high_limit,
+    }
+    QbC_indexes = {}
+    # The candidates (step, max_devi_f) are kept in memory for the selection
+    candidates = np.empty((0, 2))
+
+    ### If the trajectory was used skiped, count everything as a failure
+    if (local_path / "skip").is_file():
+        # Fill JSON files
+        QbC_indexes = {
+            **QbC_indexes,
+            "good_indexes": [],
+            "rejected_indexes": [],
+            "candidate_indexes": [],
+        }
+        QbC_stats = {
+            **QbC_stats,
+            "total_count": nb_steps_expected,
+            "mean_deviation_max_f": 999.0,
+            "median_deviation_max_f": 999.0,
+            "stdeviation_deviation_max_f": 999.0,
+            "good_count": 0,
+            "rejected_count": nb_steps_expected,
+            "candidates_count": 0,
+        }
+        return QbC_stats, QbC_indexes, candidates, "skipped_user", False, trajectory_logs
+
+    if exploration_type == "sander_emle":
+        max_f_std_info = read_xyz_max_f_std(deviation_file_path, cache_size_mb)
+        model_deviation = np.vstack(([_ for _ in range(0, len(max_f_std_info), print_every_x_steps)], max_f_std_info)).T
+        total_row_number = len(max_f_std_info)
+    elif exploration_type == "lammps" or exploration_type == "i-PI":
+        model_deviation = read_model_deviation(deviation_file_path)
+        if exploration_type == "lammps":
+            total_row_number = model_deviation.shape[0]
+        elif exploration_type == "i-PI":
+            total_row_number = model_deviation.shape[0] + 1
+    else:
+        raise ValueError("Unknown exploration type. Please BUG REPORT!")
+
+    if nb_steps_expected > (total_row_number - start_row_number):
+        QbC_stats["total_count"] = nb_steps_expected
+        trajectory_logs.append((logging.CRITICAL, f"Exploration '{local_path.parts[-3]}' / '{local_path.parts[-2]}' / '{int(local_path.parts[-1])}'."))
+        trajectory_logs.append((logging.CRITICAL, f"Mismatch between expected ('{nb_steps_expected}') number of steps."))
+        trajectory_logs.append((logging.CRITICAL, f"and actual ('{total_row_number - start_row_number}') number of steps in the deviation file."))
+        if (local_path / "force").is_file():
+            trajectory_logs.append((logging.WARNING, "but it has been forced, so it should be ok."))
+    elif nb_steps_expected == (total_row_number - start_row_number):
+        QbC_stats["total_count"] = total_row_number - start_row_number
+    else:
+        raise ValueError("Unknown error. Please BUG REPORT!")
+
+    end_row_number = get_last_frame_number(
+        model_deviation,
+        sigma_high_limit,
+        disturbed_start,
+    )
+    trajectory_logs.append((logging.DEBUG, f"end_row_number: {end_row_number}, start_row_number: {start_row_number}"))
+    if (local_path / "force").is_file():
+        end_row_number = end_row_number - 1
+
+    # Both the model deviation files and the QM XYZ give (step, max_devi_f) columns
+    # This part is when sigma_high_limit was never crossed
+    if end_row_number < 0:
+        mean_deviation_max_f = np.mean(model_deviation[start_row_number:, 1])
+        median_deviation_max_f = np.median(model_deviation[start_row_number:, 1])
+        stdeviation_deviation_max_f = np.std(model_deviation[start_row_number:, 1])
+        good = model_deviation[start_row_number:, :][model_deviation[start_row_number:, 1] <= sigma_low]
+        rejected = model_deviation[start_row_number:, :][model_deviation[start_row_number:, 1] >= sigma_high]
+        candidates = model_deviation[start_row_number:, :][(model_deviation[start_row_number:, 1] > sigma_low) & (model_deviation[start_row_number:, 1] < sigma_high)]
+        trajectory_status = "ok"
+
+    # This part is when sigma_high_limit was crossed during ignore_first_x_ps (SKIP everything for stats)
+    elif end_row_number <= start_row_number:
+        mean_deviation_max_f = 999.0
+        median_deviation_max_f = 999.0
+        stdeviation_deviation_max_f = 999.0
+        good = np.empty((0, 2))
+        rejected = model_deviation[start_row_number:, :]
+        candidates = np.empty((0, 2))
+        # In this case, it is skipped
+        trajectory_status = "skipped_stats"
+
+    # This part is when sigma_high_limit was crossed (Gets stats before)
+    else:
+        mean_deviation_max_f = np.mean(model_deviation[start_row_number:end_row_number, 1])
+        median_deviation_max_f = np.median(model_deviation[start_row_number:end_row_number, 1])
+        stdeviation_deviation_max_f = np.std(model_deviation[start_row_number:end_row_number, 1])
+        good = model_deviation[start_row_number:end_row_number, :][model_deviation[start_row_number:end_row_number, 1] <= sigma_low]
+        rejected = model_deviation[start_row_number:end_row_number, :][model_deviation[start_row_number:end_row_number, 1] >= sigma_high]
+        candidates = model_deviation[start_row_number:end_row_number, :][(model_deviation[start_row_number:end_row_number, 1] > sigma_low) & (model_deviation[start_row_number:end_row_number, 1] < sigma_high)]
+        # Add the rest to rejected
+        rejected = np.vstack((rejected, model_deviation[end_row_number:, :]))
+        trajectory_status = "ok"
+
+    if autocorrelation:
+        if trajectory_status == "ok":
+            QbC_stats["autocorrelation_time_rows"] = get_autocorrelation_time(model_deviation[start_row_number : end_row_number if end_row_number >= 0 else None, 1])
+        else:
+            QbC_stats["autocorrelation_time_rows"] = 1.0
+    del model_deviation
+
+    # Fill JSON files
+    QbC_indexes = {
+        **QbC_indexes,
+        "good_indexes": good[:, 0].astype(int).tolist() if good.size > 0 else [],
+        "rejected_indexes": rejected[:, 0].astype(int).tolist() if rejected.size > 0 else [],
+        "candidate_indexes": candidates[:, 0].astype(int).tolist() if candidates.size > 0 else [],
+    }
+    QbC_stats = {
+        **QbC_stats,
+        "mean_deviation_max_f": mean_deviation_max_f,
+        "median_deviation_max_f": median_deviation_max_f,
+        "stdeviation_deviation_max_f": stdeviation_deviation_max_f,
+        "good_count": good.shape[0],
+        "rejected_count": rejected.shape[0],
+        "candidates_count": candidates.shape[0],
+    }
+    # If the traj is smaller than expected (forced case) add the missing as rejected
+    if (QbC_stats["good_count"] + QbC_stats["rejected_count"] + QbC_stats["candidates_count"]) < nb_steps_expected:
+        QbC_stats["rejected_count"] = QbC_stats["rejected_count"] + nb_steps_expected - (QbC_stats["good_count"] + QbC_stats["rejected_count"] + QbC_stats["candidates_count"])
+    # Only if we have corect stats, they are added to the system ones
+    stats_valid = (end_row_number > start_row_number) or (end_row_number == -1)
+
+    return QbC_stats, QbC_indexes, candidates, trajectory_status, stats_valid, trajectory_logs
+
+
+def _get_candidate_descriptors(
+    local_path: Path,
+    trajectory_file_stem: str,
+    exploration_type: str,
+    print_every_x_steps: int,
+    candidate_indexes: np.ndarray,
+    system_cell,
+    cache_size_mb: float = 0,
+) -> np.ndarray:
+    """
+    Structural descriptors (pair distance histograms) of the candidates of one trajectory, for the farthest point selector.
+    The frames are read as in the extract phase, and so is the cell (cell.txt if it exists, else the cell of the system).
+    The XYZ frames go through the binary cache of the iteration (cache_size_mb), where the extract phase finds them again.
+    """
+    # The same step to frame mapping as the extract phase (only the LAMMPS steps are divided)
+    if exploration_type == "lammps":
+        frame_indexes = candidate_indexes.astype(int) // print_every_x_steps
+    else:
+        frame_indexes = candidate_indexes.astype(int)
+
+    cell_lengths = None
+    if exploration_type == "sander_emle":
+        _, _, atomic_coordinates, _, lattice_info, _, _, _ = read_xyz_frames(local_path / f"{trajectory_file_stem}_QM.xyz", frame_indexes, cache_size_mb)
+        if all(lattice is not None for lattice in lattice_info):
+            cell_lengths = np.array([lattice[[0, 4, 8]] for lattice in lattice_info])
+    else:
+        atomic_coordinates, _ = read_dcd_frames(local_path / f"{trajectory_file_stem}.dcd", frame_indexes)
+        if (local_path / "cell.txt").is_file():
+            with (local_path / "cell.txt").open("r") as cell_file:
+                cell_array = np.loadtxt(cell_file, ndmin=2)
+            cell_lengths = np.stack((cell_array[:, 1] - cell_array[:, 0], cell_array[:, 3] - cell_array[:, 2], cell_array[:, 5] - cell_array[:, 4]), axis=1)[frame_indexes]
+            del cell_array
+        elif system_cell is not None:
+            cell_lengths = np.asarray(system_cell, dtype=np.float64)[:3]
+
+    return compute_pair_distance_histograms(atomic_coordinates, cell_lengths)
+
 
 def main(
     current_step: str,
@@ -29,6 +236,7 @@ def main(
     deepmd_iterative_path: Path,
     fake_machine=None,
     user_input_json_filename: str = "input.json",
+    jobs: int = 1,
 ):
     # Get the logger
     arcann_logger = logging.getLogger("ArcaNN")
@@ -113,7 +321,45 @@ def main(
         main_json,
     )
     arcann_logger.debug(f"current_input_json: {current_input_json}")
+    exploration_json["cache_size_mb"] = current_input_json["cache_size_mb"]
+
+    # The global labeling budget, in core-hours (-1 to only use max_candidates)
+    # Priority: user > previous > default
+    if "labeling_budget_core_h" in user_input_json and user_input_json["labeling_budget_core_h"] != "default":
+        labeling_budget_core_h = user_input_json["labeling_budget_core_h"]
+    elif "labeling_budget_core_h" in previous_exploration_json:
+        labeling_budget_core_h = previous_exploration_json["labeling_budget_core_h"]
+    else:
+        labeling_budget_core_h = default_input_json["labeling_budget_core_h"]
+    if isinstance(labeling_budget_core_h, bool) or not isinstance(labeling_budget_core_h, (int, float)):
+        arcann_logger.error(f"'labeling_budget_core_h' must be a number, not '{labeling_budget_core_h}'.")
+        arcann_logger.error(f"Aborting...")
+        return 1
+    current_input_json["labeling_budget_core_h"] = labeling_budget_core_h
+    exploration_json["labeling_budget_core_h"] = labeling_budget_core_h
+    arcann_logger.debug(f"labeling_budget_core_h: {labeling_budget_core_h}")
 
+    # The per trajectory JSON files (QbC_stats.json, QbC_indexes.json) are only written for compatibility
+    # Priority: user > previous > default
+    if "write_qbc_json" in user_input_json and user_input_json["write_qbc_json"] != "default":
+        write_qbc_json = user_input_json["write_qbc_json"]
+    elif "write_qbc_json" in previous_exploration_json:
+        write_qbc_json = previous_exploration_json["write_qbc_json"]
+    else:
+        write_qbc_json = default_input_json["write_qbc_json"]
+    if not isinstance(write_qbc_json, bool):
+        arcann_logger.error(f"'write_qbc_json' must be a boolean, not '{write_qbc_json}'.")
+        arcann_logger.error(f"Aborting...")
+        return 1
+    current_input_json["write_qbc_json"] = write_qbc_json
+    exploration_json["write_qbc_json"] = write_qbc_json
+    arcann_logger.debug(f"write_qbc_json: {write_qbc_json}")
+
+    # Per trajectory (QbC_stats, QbC_indexes, candidates), reused by the selection instead of reading the files again
+    trajectories_deviation = {}
+
+    # Per system settings and the per trajectory work, in a fixed order (system, nnp, trajectory)
+    trajectories_tasks = []
     for system_auto_index, system_auto in enumerate(main_json["systems_auto"]):
         # Set the system params for deviation selection
         (
@@ -132,6 +378,7 @@ def main(
             "sigma_high": sigma_high,
             "sigma_high_limit": sigma_high_limit,
             "ignore_first_x_ps": ignore_first_x_ps,
+            "candidate_selector": current_input_json["candidate_selector"][system_auto_index],
             "mean_deviation_max_f": 0,
             "median_deviation_max_f": 0,
             "stdeviation_deviation_max_f": 0,
@@ -140,8 +387,6 @@ def main(
             "rejected_count": 0,
         }
 
-        skipped_traj_user = 0
-        skipped_traj_stats = 0
         start_row_number = 0
 
         arcann_logger.debug(f"{exploration_json['systems_auto'][system_auto]['print_every_x_steps']},{exploration_json['systems_auto'][system_auto]['timestep_ps']}")
@@ -157,230 +402,85 @@ def main(
             arcann_logger.warning(f"Please reduce it to a value lower than {start_row_number * exploration_json['systems_auto'][system_auto]['print_every_x_steps'] * exploration_json['systems_auto'][system_auto]['timestep_ps']}.")
             arcann_logger.warning(f"Temporarily setting it to 0.")
 
+        # Get the number of exptected steps
+        nb_steps_expected = (exploration_json["systems_auto"][system_auto]["nb_steps"] // exploration_json["systems_auto"][system_auto]["print_every_x_steps"]) + 1 - start_row_number
+        arcann_logger.debug(f"nb_steps_expected: {nb_steps_expected}")
+
         for it_nnp in range(1, main_json["nnp_count"] + 1):
             for it_number in range(1, exploration_json["systems_auto"][system_auto]["traj_count"] + 1):
-                arcann_logger.debug(f"{system_auto} / {it_nnp} / {it_number}")
-
-                # Get the local path and the name of model_deviation file
+                # Get the local path and the name of the deviation file
                 local_path = Path(".").resolve() / str(system_auto) / str(it_nnp) / str(it_number).zfill(5)
-                model_deviation_filename = f"model_devi_{system_auto}_{it_nnp}_{padded_curr_iter}.out"
-                xyz_qm_filename = f"{system_auto}_{it_nnp}_{padded_curr_iter}_QM.xyz"
-
-                # Create the JSON data for Query-by-Committee
-                QbC_stats = load_json_file(local_path / "QbC_stats.json", False, False)
-                QbC_indexes = load_json_file(local_path / "QbC_indexes.json", False, False)
-                QbC_stats = {
-                    **QbC_stats,
-                    "sigma_low": sigma_low,
-                    "sigma_high": sigma_high,
-                    "sigma_high_limit": sigma_high_limit,
-                }
-
-                # Get the number of exptected steps
-                nb_steps_expected = (exploration_json["systems_auto"][system_auto]["nb_steps"] // exploration_json["systems_auto"][system_auto]["print_every_x_steps"]) + 1 - start_row_number
-                arcann_logger.debug(f"nb_steps_expected: {nb_steps_expected}")
-
-                # If it was not skipped
-                if not (local_path / "skip").is_file():
-                    if exploration_json["systems_auto"][system_auto]["exploration_type"] == "sander_emle":
-                        num_atoms, atom_symbols, atom_coords, comments, cell_info, pbc_info, properties_info, max_f_std_info = parse_xyz_trajectory_file(local_path / xyz_qm_filename)
-                        model_deviation = np.vstack(([_ for _ in range(0, len(max_f_std_info), exploration_json["systems_auto"][system_auto]["print_every_x_steps"])], max_f_std_info)).T
-                        total_row_number = len(max_f_std_info)
-                    elif exploration_json["systems_auto"][system_auto]["exploration_type"] == "lammps" or exploration_json["systems_auto"][system_auto]["exploration_type"] == "i-PI":
-                        model_deviation = np.genfromtxt(str(local_path / model_deviation_filename))
-                        if exploration_json["systems_auto"][system_auto]["exploration_type"] == "lammps":
-                            total_row_number = model_deviation.shape[0]
-                        elif exploration_json["systems_auto"][system_auto]["exploration_type"] == "i-PI":
-                            total_row_number = model_deviation.shape[0] + 1
-                    else:
-                        arcann_logger.error("Unknown exploration type. Please BUG REPORT!")
-                        arcann_logger.error("Aborting...")
-                        return 1
-
-                    if nb_steps_expected > (total_row_number - start_row_number):
-                        QbC_stats["total_count"] = nb_steps_expected
-                        arcann_logger.critical(f"Exploration '{system_auto}' / '{it_nnp}' / '{it_number}'.")
-                        arcann_logger.critical(f"Mismatch between expected ('{nb_steps_expected}') number of steps.")
-                        arcann_logger.critical(f"and actual ('{total_row_number - start_row_number}') number of steps in the deviation file.")
-                        if (local_path / "force").is_file():
-                            arcann_logger.warning("but it has been forced, so it should be ok.")
-                    elif nb_steps_expected == (total_row_number - start_row_number):
-                        QbC_stats["total_count"] = total_row_number - start_row_number
-                    else:
-                        arcann_logger.error("Unknown error. Please BUG REPORT!")
-                        arcann_logger.error("Aborting...")
-                        return 1
-
-                    end_row_number = get_last_frame_number(
-                        model_deviation,
-                        sigma_high_limit,
-                        exploration_json["systems_auto"][system_auto]["disturbed_start"],
+                if exploration_json["systems_auto"][system_auto]["exploration_type"] == "sander_emle":
+                    deviation_file_path = local_path / f"{system_auto}_{it_nnp}_{padded_curr_iter}_QM.xyz"
+                else:
+                    deviation_file_path = local_path / f"model_devi_{system_auto}_{it_nnp}_{padded_curr_iter}.out"
+                trajectories_tasks.append(
+                    (
+                        (system_auto, it_nnp, it_number),
+                        (
+                            local_path,
+                            deviation_file_path,
+                            exploration_json["systems_auto"][system_auto]["exploration_type"],
+                            exploration_json["systems_auto"][system_auto]["print_every_x_steps"],
+                            exploration_json["systems_auto"][system_auto]["disturbed_start"],
+                            (sigma_low, sigma_high, sigma_high_limit),
+                            start_row_number,
+                            nb_steps_expected,
+                            exploration_json["systems_auto"][system_auto]["candidate_selector"] == "decorrelated",
+                            current_input_json["cache_size_mb"],
+                        ),
                     )
-                    arcann_logger.debug(f"end_row_number: {end_row_number}, start_row_number: {start_row_number}")
-                    if (local_path / "force").is_file():
-                        end_row_number = end_row_number - 1
-
-                    if exploration_json["systems_auto"][system_auto]["exploration_type"] == "lammps" or exploration_json["systems_auto"][system_auto]["exploration_type"] == "i-PI":
-
-                        # This part is when sigma_high_limit was never crossed
-                        if end_row_number < 0:
-                            mean_deviation_max_f = np.mean(model_deviation[start_row_number:, 4])
-                            median_deviation_max_f = np.median(model_deviation[start_row_number:, 4])
-                            stdeviation_deviation_max_f = np.std(model_deviation[start_row_number:, 4])
-                            good = model_deviation[start_row_number:, :][model_deviation[start_row_number:, 4] <= sigma_low]
-                            rejected = model_deviation[start_row_number:, :][model_deviation[start_row_number:, 4] >= sigma_high]
-                            candidates = model_deviation[start_row_number:, :][(model_deviation[start_row_number:, 4] > sigma_low) & (model_deviation[start_row_number:, 4] < sigma_high)]
-
-                        # This part is when sigma_high_limit was crossed during ignore_first_x_ps (SKIP everything for stats)
-                        elif end_row_number <= start_row_number:
-                            mean_deviation_max_f = 999.0
-                            median_deviation_max_f = 999.0
-                            stdeviation_deviation_max_f = 999.0
-                            good = np.array([])
-                            rejected = model_deviation[start_row_number:, :]
-                            candidates = np.array([])
-                            # In this case, it is skipped
-                            skipped_traj_stats += 1
-
-                        # This part is when sigma_high_limit was crossed (Gets stats before)
-                        else:
-                            mean_deviation_max_f = np.mean(model_deviation[start_row_number:end_row_number, 4])
-                            median_deviation_max_f = np.median(model_deviation[start_row_number:end_row_number, 4])
-                            stdeviation_deviation_max_f = np.std(model_deviation[start_row_number:end_row_number, 4])
-                            good = model_deviation[start_row_number:end_row_number, :][model_deviation[start_row_number:end_row_number, 4] <= sigma_low]
-                            rejected = model_deviation[start_row_number:end_row_number, :][model_deviation[start_row_number:end_row_number, 4] >= sigma_high]
-                            candidates = model_deviation[start_row_number:end_row_number, :][(model_deviation[start_row_number:end_row_number, 4] > sigma_low) & (model_deviation[start_row_number:end_row_number, 4] < sigma_high)]
-                            # Add the rest to rejected
-                            rejected = np.vstack((rejected, model_deviation[end_row_number:, :]))
-
-                    elif exploration_json["systems_auto"][system_auto]["exploration_type"] == "sander_emle":
-
-                        # This part is when sigma_high_limit was never crossed
-                        if end_row_number < 0:
-                            mean_deviation_max_f = np.mean(model_deviation[start_row_number:])
-                            median_deviation_max_f = np.median(model_deviation[start_row_number:])
-                            stdeviation_deviation_max_f = np.std(model_deviation[start_row_number:])
-                            good = model_deviation[start_row_number:, :][model_deviation[start_row_number:, 1] <= sigma_low]
-                            rejected = model_deviation[start_row_number:, :][model_deviation[start_row_number:, 1] >= sigma_high]
-                            candidates = model_deviation[start_row_number:, :][(model_deviation[start_row_number:, 1] > sigma_low) & (model_deviation[start_row_number:, 1] < sigma_high)]
-
-                        # This part is when sigma_high_limit was crossed during ignore_first_x_ps (SKIP everything for stats)
-                        elif end_row_number <= start_row_number:
-                            mean_deviation_max_f = 999.0
-                            median_deviation_max_f = 999.0
-                            stdeviation_deviation_max_f = 999.0
-                            good = np.array([])
-                            rejected = model_deviation[start_row_number:, :]
-                            candidates = np.array([])
-                            # In this case, it is skipped
-                            skipped_traj_stats += 1
-
-                        # This part is when sigma_high_limit was crossed (Gets stats before)
-                        else:
-                            mean_deviation_max_f = np.mean(model_deviation[start_row_number:end_row_number])
-                            median_deviation_max_f = np.median(model_deviation[start_row_number:end_row_number])
-                            stdeviation_deviation_max_f = np.std(model_deviation[start_row_number:end_row_number])
-                            good = model_deviation[start_row_number:end_row_number][model_deviation[start_row_number:end_row_number] <= sigma_low]
-                            rejected = model_deviation[start_row_number:end_row_number][model_deviation[start_row_number:end_row_number] >= sigma_high]
-                            candidates = model_deviation[start_row_number:end_row_number][(model_deviation[start_row_number:end_row_number] > sigma_low) & (model_deviation[start_row_number:end_row_number] < sigma_high)]
-                            # Add the rest to rejected
-                            rejected = np.vstack((rejected, model_deviation[end_row_number:, :]))
-                    else:
-                        arcann_logger.error("Unknown exploration type. Please BUG REPORT!")
-                        arcann_logger.error("Aborting...")
-                        return 1
-
-                    # Fill JSON files
-                    if exploration_json["systems_auto"][system_auto]["exploration_type"] == "sander_emle":
-                        QbC_indexes = {
-                            **QbC_indexes,
-                            "good_indexes": good[:, 0].astype(int).tolist() if good.size > 0 else [],
-                            "rejected_indexes": rejected[:, 0].astype(int).tolist() if rejected.size > 0 else [],
-                            "candidate_indexes": candidates[:, 0].astype(int).tolist() if candidates.size > 0 else [],
-                        }
-                    elif exploration_json["systems_auto"][system_auto]["exploration_type"] == "lammps" or exploration_json["systems_auto"][system_auto]["exploration_type"] == "i-PI":
-                        QbC_indexes = {
-                            **QbC_indexes,
-                            "good_indexes": good[:, 0].astype(int).tolist() if good.size > 0 else [],
-                            "rejected_indexes": rejected[:, 0].astype(int).tolist() if rejected.size > 0 else [],
-                            "candidate_indexes": candidates[:, 0].astype(int).tolist() if candidates.size > 0 else [],
-                        }
-                    else:
-                        arcann_logger.error("Unknown exploration type. Please BUG REPORT!")
-                        arcann_logger.error("Aborting...")
-                        return 1
-
-                    if exploration_json["systems_auto"][system_auto]["exploration_type"] == "sander_emle":
-                        QbC_stats = {
-                            **QbC_stats,
-                            "mean_deviation_max_f": mean_deviation_max_f,
-                            "median_deviation_max_f": median_deviation_max_f,
-                            "stdeviation_deviation_max_f": stdeviation_deviation_max_f,
-                            "good_count": len(good.astype(int).tolist()) if good.size > 0 else 0,
-                            "rejected_count": len(rejected.astype(int).tolist()) if rejected.size > 0 else 0,
-                            "candidates_count": len(candidates.astype(int).tolist()) if candidates.size > 0 else 0,
-                        }
-                    elif exploration_json["systems_auto"][system_auto]["exploration_type"] == "lammps" or exploration_json["systems_auto"][system_auto]["exploration_type"] == "i-PI":
-                        QbC_stats = {
-                            **QbC_stats,
-                            "mean_deviation_max_f": mean_deviation_max_f,
-                            "median_deviation_max_f": median_deviation_max_f,
-                            "stdeviation_deviation_max_f": stdeviation_deviation_max_f,
-                            "good_count": len(good[:, 0].astype(int).tolist()) if good.size > 0 else 0,
-                            "rejected_count": len(rejected[:, 0].astype(int).tolist()) if rejected.size > 0 else 0,
-                            "candidates_count": len(candidates[:, 0].astype(int).tolist()) if candidates.size > 0 else 0,
-                        }
-                    else:
-                        arcann_logger.error("Unknown exploration type. Please BUG REPORT!")
-                        arcann_logger.error("Aborting...")
-                        return 1
+                )
+                del local_path, deviation_file_path
+            del it_number
+        del it_nnp, nb_steps_expected, start_row_number
+        del max_candidates, sigma_low, sigma_high, sigma_high_limit, ignore_first_x_ps
+    del system_auto_index, system_auto
 
-                    # If the traj is smaller than expected (forced case) add the missing as rejected
-                    if (QbC_stats["good_count"] + QbC_stats["rejected_count"] + QbC_stats["candidates_count"]) < nb_steps_expected:
-                        QbC_stats["rejected_count"] = QbC_stats["rejected_count"] + nb_steps_expected - (QbC_stats["good_count"] + QbC_stats["rejected_count"] + QbC_stats["candidates_count"])
+    # Run the per trajectory work (in worker processes if requested), the results keep the order of the tasks
+    jobs = min(max(jobs, 1), len(trajectories_tasks))
+    arcann_logger.debug(f"jobs: {jobs}")
+    try:
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                trajectories_results = list(executor.map(_deviate_trajectory, *zip(*[task for _, task in trajectories_tasks]), chunksize=max(1, len(trajectories_tasks) // (4 * jobs))))
+        else:
+            trajectories_results = [_deviate_trajectory(*task) for _, task in trajectories_tasks]
+    except (ValueError, FileNotFoundError) as e:
+        arcann_logger.error(f"{e}")
+        arcann_logger.error("Aborting...")
+        return 1
+    trajectories_results = dict(zip([key for key, _ in trajectories_tasks], trajectories_results))
+    del trajectories_tasks, jobs
 
-                    # Only if we have corect stats, add it
-                    if (end_row_number > start_row_number) or (end_row_number == -1):
-                        exploration_json["systems_auto"][system_auto]["mean_deviation_max_f"] = exploration_json["systems_auto"][system_auto]["mean_deviation_max_f"] + QbC_stats["mean_deviation_max_f"]
-                        exploration_json["systems_auto"][system_auto]["median_deviation_max_f"] = exploration_json["systems_auto"][system_auto]["median_deviation_max_f"] + QbC_stats["median_deviation_max_f"]
-                        exploration_json["systems_auto"][system_auto]["stdeviation_deviation_max_f"] = exploration_json["systems_auto"][system_auto]["stdeviation_deviation_max_f"] + QbC_stats["stdeviation_deviation_max_f"]
-                    del end_row_number
+    # Reduce in the same fixed order (system, nnp, trajectory), so the sums do not depend on the number of jobs
+    for system_auto_index, system_auto in enumerate(main_json["systems_auto"]):
+        skipped_traj_user = 0
+        skipped_traj_stats = 0
 
-                else:
-                    ### If the trajectory was used skiped, count everything as a failure
-                    skipped_traj_user = skipped_traj_user + 1
-                    # Fill JSON files
-                    QbC_indexes = {
-                        **QbC_indexes,
-                        "good_indexes": [],
-                        "rejected_indexes": [],
-                        "candidate_indexes": [],
-                    }
+        for it_nnp in range(1, main_json["nnp_count"] + 1):
+            for it_number in range(1, exploration_json["systems_auto"][system_auto]["traj_count"] + 1):
+                arcann_logger.debug(f"{system_auto} / {it_nnp} / {it_number}")
+                QbC_stats, QbC_indexes, candidates, trajectory_status, stats_valid, trajectory_logs = trajectories_results.pop((system_auto, it_nnp, it_number))
+                for log_level, log_message in trajectory_logs:
+                    arcann_logger.log(log_level, log_message)
 
-                    QbC_stats = {
-                        **QbC_stats,
-                        "total_count": nb_steps_expected,
-                        "mean_deviation_max_f": 999.0,
-                        "median_deviation_max_f": 999.0,
-                        "stdeviation_deviation_max_f": 999.0,
-                        "good_count": 0,
-                        "rejected_count": nb_steps_expected,
-                        "candidates_count": 0,
-                    }
+                if trajectory_status == "skipped_user":
+                    skipped_traj_user = skipped_traj_user + 1
+                elif trajectory_status == "skipped_stats":
+                    skipped_traj_stats = skipped_traj_stats + 1
+                # Only if we have corect stats, add it
+                if stats_valid:
+                    exploration_json["systems_auto"][system_auto]["mean_deviation_max_f"] = exploration_json["systems_auto"][system_auto]["mean_deviation_max_f"] + QbC_stats["mean_deviation_max_f"]
+                    exploration_json["systems_auto"][system_auto]["median_deviation_max_f"] = exploration_json["systems_auto"][system_auto]["median_deviation_max_f"] + QbC_stats["median_deviation_max_f"]
+                    exploration_json["systems_auto"][system_auto]["stdeviation_deviation_max_f"] = exploration_json["systems_auto"][system_auto]["stdeviation_deviation_max_f"] + QbC_stats["stdeviation_deviation_max_f"]
 
                 exploration_json["systems_auto"][system_auto]["total_count"] = exploration_json["systems_auto"][system_auto]["total_count"] + QbC_stats["total_count"]
                 exploration_json["systems_auto"][system_auto]["candidates_count"] = exploration_json["systems_auto"][system_auto]["candidates_count"] + QbC_stats["candidates_count"]
                 exploration_json["systems_auto"][system_auto]["rejected_count"] = exploration_json["systems_auto"][system_auto]["rejected_count"] + QbC_stats["rejected_count"]
 
-                write_json_file(QbC_stats, local_path / "QbC_stats.json", False)
-                write_json_file(QbC_indexes, local_path / "QbC_indexes.json", False)
-                del (
-                    local_path,
-                    model_deviation_filename,
-                    QbC_stats,
-                    QbC_indexes,
-                    nb_steps_expected,
-                )
+                trajectories_deviation[(system_auto, it_nnp, it_number)] = (QbC_stats, QbC_indexes, candidates)
+                del QbC_stats, QbC_indexes, candidates, trajectory_status, stats_valid, trajectory_logs
 
             del it_number
 
@@ -399,21 +499,53 @@ def main(
             exploration_json["systems_auto"][system_auto]["median_deviation_max_f"] = exploration_json["systems_auto"][system_auto]["median_deviation_max_f"] / exploitable_traj
             exploration_json["systems_auto"][system_auto]["stdeviation_deviation_max_f"] = exploration_json["systems_auto"][system_auto]["stdeviation_deviation_max_f"] / exploitable_traj
 
-        del it_nnp
-        del (
-            max_candidates,
-            sigma_low,
-            sigma_high,
-            sigma_high_limit,
-            ignore_first_x_ps,
-            skipped_traj_user,
-            start_row_number,
-        )
+        del it_nnp, skipped_traj_user, skipped_traj_stats, exploitable_traj
 
     del system_auto_index, system_auto
 
-    total_candidates_selected = 0
+    # Split the labeling budget between the systems, with the cost of one candidate measured by the previous labeling
+    for system_auto in exploration_json["systems_auto"]:
+        exploration_json["systems_auto"][system_auto].pop("candidate_cost_core_h", None)
+        exploration_json["systems_auto"][system_auto].pop("budget_max_candidates", None)
+    if labeling_budget_core_h > 0:
+        previous_labeling_json = load_json_file((control_path / f"labeling_{padded_prev_iter}.json"), abort_on_error=False, enable_logging=False) if curr_iter > 1 else {}
+        candidate_costs = get_candidate_labeling_costs(previous_labeling_json, list(exploration_json["systems_auto"]))
+        if candidate_costs is None:
+            arcann_logger.warning(f"No labeling timings from a previous iteration, 'labeling_budget_core_h' is ignored (only max_candidates is used).")
+        else:
+            if np.any(np.isnan(candidate_costs)):
+                arcann_logger.warning(f"Systems without labeling timings use the highest cost of the others: {[system_auto for system_auto, candidate_cost in zip(exploration_json['systems_auto'], candidate_costs) if np.isnan(candidate_cost)]}")
+                candidate_costs = np.where(np.isnan(candidate_costs), np.nanmax(candidate_costs), candidate_costs)
+            systems_candidates_counts = [
+                np.array([trajectories_deviation[(system_auto, it_nnp, it_number)][0]["candidates_count"] for it_nnp in range(1, main_json["nnp_count"] + 1) for it_number in range(1, exploration_json["systems_auto"][system_auto]["traj_count"] + 1)])
+                for system_auto in exploration_json["systems_auto"]
+            ]
+            # What max_candidates alone would select
+            systems_max_candidates = [get_system_deviation(current_input_json, system_auto_index)[0] for system_auto_index in range(len(systems_candidates_counts))]
+            candidate_caps = [int(get_selected_counts(system_candidates_counts, system_max_candidates).sum()) for system_candidates_counts, system_max_candidates in zip(systems_candidates_counts, systems_max_candidates)]
+            budget_candidates_counts = allocate_candidate_budget(candidate_costs, candidate_caps, labeling_budget_core_h)
+
+            arcann_logger.info(f"Labeling budget: {labeling_budget_core_h} core-hours")
+            arcann_logger.info(f"{'System':<24}{'Core-h/cand.':>14}{'Candidates':>12}{'Cap':>8}{'Core-h':>10}")
+            for system_auto, candidate_cost, system_candidates_counts, system_max_candidates, budget_candidates_count in zip(exploration_json["systems_auto"], candidate_costs, systems_candidates_counts, systems_max_candidates, budget_candidates_counts):
+                # The largest max_candidates whose selection (rounded up per trajectory) stays within the allocation
+                budget_max_candidates = min(int(budget_candidates_count), system_max_candidates)
+                while budget_max_candidates > 0 and get_selected_counts(system_candidates_counts, budget_max_candidates).sum() > budget_candidates_count:
+                    budget_max_candidates = budget_max_candidates - 1
+                if get_selected_counts(system_candidates_counts, system_max_candidates).sum() <= budget_candidates_count:
+                    budget_max_candidates = system_max_candidates
+                exploration_json["systems_auto"][system_auto]["candidate_cost_core_h"] = float(candidate_cost)
+                exploration_json["systems_auto"][system_auto]["budget_max_candidates"] = budget_max_candidates
+                arcann_logger.info(f"{system_auto:<24}{candidate_cost:>14.3f}{int(system_candidates_counts.sum()):>12}{budget_max_candidates:>8}{budget_candidates_count * candidate_cost:>10.1f}")
+                del budget_max_candidates
+            arcann_logger.info(f"Predicted labeling cost: {float(np.sum(candidate_costs * budget_candidates_counts)):.1f} core-hours")
+            del system_auto, candidate_cost, system_candidates_counts, system_max_candidates, budget_candidates_count
+            del systems_candidates_counts, systems_max_candidates, candidate_caps, budget_candidates_counts
+        del previous_labeling_json, candidate_costs
 
+    total_candidates_selected = 0
+    # The (QbC_stats, QbC_indexes) of all the trajectories, written in a single store
+    trajectories_qbc = {}
     for system_auto_index, system_auto in enumerate(exploration_json["systems_auto"]):
         # Set the system params for deviation selection
         (
@@ -423,6 +555,8 @@ def main(
             sigma_high_limit,
             ignore_first_x_ps,
         ) = get_system_deviation(current_input_json, system_auto_index)
+        # The cap given by the labeling budget, if any
+        max_candidates = min(max_candidates, exploration_json["systems_auto"][system_auto].get("budget_max_candidates", max_candidates))
 
         # Initialize
         exploration_json["systems_auto"][system_auto] = {
@@ -433,15 +567,9 @@ def main(
 
         for it_nnp in range(1, main_json["nnp_count"] + 1):
             for it_number in range(1, exploration_json["systems_auto"][system_auto]["traj_count"] + 1):
-                # Get the local path and the name of model_deviation file
+                # Get the local path and the data for Query-by-Committee of the first pass
                 local_path = Path(".").resolve() / str(system_auto) / str(it_nnp) / str(it_number).zfill(5)
-
-                model_deviation_filename = f"model_devi_{system_auto}_{it_nnp}_{padded_curr_iter}.out"
-                xyz_qm_filename = f"{system_auto}_{it_nnp}_{padded_curr_iter}_QM.xyz"
-
-                # Create the JSON data for Query-by-Committee
-                QbC_stats = load_json_file(local_path / "QbC_stats.json", True, False)
-                QbC_indexes = load_json_file(local_path / "QbC_indexes.json", True, False)
+                QbC_stats, QbC_indexes, candidates = trajectories_deviation.pop((system_auto, it_nnp, it_number))
 
                 # If it was not skipped
                 if not (local_path / "skip").is_file():
@@ -462,11 +590,28 @@ def main(
 
                     candidate_indexes = np.array(QbC_indexes["candidate_indexes"])
 
-                    # Selection of candidates (as linearly as possible, keeping the first and the last ones)
-                    if len(candidate_indexes) > max_candidates_local:
-                        selected_indexes = candidate_indexes[np.round(np.linspace(0, len(candidate_indexes) - 1, max_candidates_local)).astype(int)]
-                    else:
-                        selected_indexes = candidate_indexes
+                    # Selection of candidates (linspace: as linearly as possible, keeping the first and the last ones)
+                    candidate_selector = exploration_json["systems_auto"][system_auto]["candidate_selector"]
+                    selector_inputs = {}
+                    if candidate_selector == "decorrelated":
+                        # Minimum gap from the autocorrelation time (rows of print_every_x_steps steps, the i-PI steps are the rows)
+                        autocorrelation_time_rows = QbC_stats.pop("autocorrelation_time_rows")
+                        QbC_stats["autocorrelation_time_ps"] = autocorrelation_time_rows * exploration_json["systems_auto"][system_auto]["print_every_x_steps"] * exploration_json["systems_auto"][system_auto]["timestep_ps"]
+                        QbC_stats["minimum_gap_steps"] = int(np.ceil(autocorrelation_time_rows)) * (1 if exploration_json["systems_auto"][system_auto]["exploration_type"] == "i-PI" else exploration_json["systems_auto"][system_auto]["print_every_x_steps"])
+                        selector_inputs["minimum_gap"] = QbC_stats["minimum_gap_steps"]
+                        del autocorrelation_time_rows
+                    if candidate_selector == "farthest_point" and len(candidate_indexes) > max_candidates_local:
+                        selector_inputs["descriptors"] = _get_candidate_descriptors(
+                            local_path,
+                            f"{system_auto}_{it_nnp}_{padded_curr_iter}",
+                            exploration_json["systems_auto"][system_auto]["exploration_type"],
+                            exploration_json["systems_auto"][system_auto]["print_every_x_steps"],
+                            candidate_indexes,
+                            main_json["systems_auto"][system_auto].get("cell"),
+                            current_input_json["cache_size_mb"],
+                        )
+                    selected_indexes = select_candidates(candidate_indexes, max_candidates_local, candidate_selector, **selector_inputs)
+                    del candidate_selector, selector_inputs
                     discarded_indexes = np.setdiff1d(candidate_indexes, selected_indexes)
 
                     QbC_indexes = {
@@ -485,21 +630,7 @@ def main(
                     # Now we get the starting point (the min of selected, or the last good)
                     # Min of selected
                     if selected_indexes.shape[0] > 0:
-                        if exploration_json["systems_auto"][system_auto]["exploration_type"] == "sander_emle":
-                            num_atoms, atom_symbols, atom_coords, comments, cell_info, pbc_info, properties_info, max_f_std_info = parse_xyz_trajectory_file(local_path / xyz_qm_filename)
-                            model_deviation = np.array(max_f_std_info)
-                        elif exploration_json["systems_auto"][system_auto]["exploration_type"] == "lammps" or exploration_json["systems_auto"][system_auto]["exploration_type"] == "i-PI":
-                            model_deviation = np.genfromtxt(str(local_path / model_deviation_filename))
-                        min_val = 1e30
-                        for selected_idx in selected_indexes:
-                            if exploration_json["systems_auto"][system_auto]["exploration_type"] == "sander_emle":
-                                temp_min = model_deviation[selected_idx]
-                            else:
-                                temp_min = model_deviation[:, 4][np.where(model_deviation[:, 0] == selected_idx)]
-                            if temp_min < min_val:
-                                min_val = temp_min
-                                min_index = selected_idx
-                        QbC_stats["minimum_index"] = int(min_index)
+                        QbC_stats["minimum_index"] = get_minimum_deviation_index(candidates, selected_indexes)
                     # Last of good
                     elif len(QbC_indexes["good_indexes"]) > 0:
                         QbC_stats["minimum_index"] = int(QbC_indexes["good_indexes"][-1])
@@ -525,14 +656,19 @@ def main(
                 exploration_json["systems_auto"][system_auto]["selected_count"] = exploration_json["systems_auto"][system_auto]["selected_count"] + QbC_stats["selected_count"]
                 exploration_json["systems_auto"][system_auto]["discarded_count"] = exploration_json["systems_auto"][system_auto]["discarded_count"] + QbC_stats["discarded_count"]
 
-                write_json_file(QbC_stats, local_path / "QbC_stats.json", False)
-                write_json_file(QbC_indexes, local_path / "QbC_indexes.json", False)
-                del local_path, model_deviation_filename, QbC_stats, QbC_indexes
+                trajectories_qbc[(system_auto, it_nnp, it_number)] = (QbC_stats, QbC_indexes)
+                if write_qbc_json:
+                    write_json_file(QbC_stats, local_path / "QbC_stats.json", False)
+                    write_json_file(QbC_indexes, local_path / "QbC_indexes.json", False)
+                del local_path, QbC_stats, QbC_indexes, candidates
             del it_number
         del it_nnp
 
         del max_candidates, sigma_low, sigma_high, sigma_high_limit, ignore_first_x_ps
-    del system_auto_index, system_auto
+    del system_auto_index, system_auto, trajectories_deviation
+
+    write_qbc_store(current_path / QBC_STORE_FILENAME, trajectories_qbc)
+    del trajectories_qbc, write_qbc_json
 
     arcann_logger.info(f"A total of {total_candidates_selected} structures have been selected for labeling...")
     del total_candidates_selected
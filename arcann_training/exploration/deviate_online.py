@@ -0,0 +1,217 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+Online deviation of the LAMMPS explorations, while the jobs are still running (it can be run as often as needed).
+Each run reads only the rows written since the previous one and updates a state file per trajectory, then reports the live
+candidate yields per system. Once the exploration is checked, a last run finalizes the states and writes the parsed model
+deviations, so the deviate phase does not parse them again (its results are the ones of a normal deviate).
+"""
+
+# Standard library modules
+import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Non-standard library imports
+import numpy as np
+
+# Local imports
+from arcann_training.common.check import validate_step_folder
+from arcann_training.common.json import load_default_json_file, load_json_file
+from arcann_training.exploration.utils import generate_input_exploration_deviation_json, get_deviation_state_stats, get_system_deviation, update_model_deviation_state_file
+
+
+def _update_trajectory(model_deviation_file_path: Path, sigmas: tuple, start_row_number: int, disturbed_start: bool, is_final: bool):
+    """
+    Worker of the process pool (module level, so it can be pickled).
+    """
+    if not model_deviation_file_path.is_file():
+        return None
+    return update_model_deviation_state_file(model_deviation_file_path, *sigmas, start_row_number, disturbed_start, is_final=is_final)
+
+
+def main(
+    current_step: str,
+    current_phase: str,
+    deepmd_iterative_path: Path,
+    fake_machine=None,
+    user_input_json_filename: str = "input.json",
+    jobs: int = 1,
+):
+    # Get the logger
+    arcann_logger = logging.getLogger("ArcaNN")
+
+    # Get the current path and set the training path as the parent of the current path
+    current_path = Path(".").resolve()
+    training_path = current_path.parent
+
+    # Log the step and phase of the program
+    arcann_logger.info(f"Step: {current_step.capitalize()} - Phase: {current_phase.capitalize()}.")
+    arcann_logger.debug(f"Current path :{current_path}")
+    arcann_logger.debug(f"Training path: {training_path}")
+    arcann_logger.debug(f"Program path: {deepmd_iterative_path}")
+    arcann_logger.info(f"-" * 88)
+
+    # Check if the current folder is correct for the current step
+    validate_step_folder(current_step)
+
+    # Get the current iteration number
+    padded_curr_iter = Path().resolve().parts[-1].split("-")[0]
+    curr_iter = int(padded_curr_iter)
+
+    # Load the default input JSON
+    default_input_json = load_default_json_file(deepmd_iterative_path / "assets" / "default_config.json")[current_step]
+    arcann_logger.debug(f"default_input_json: {default_input_json}")
+
+    # Load the user input JSON
+    if (current_path / user_input_json_filename).is_file():
+        user_input_json = load_json_file((current_path / user_input_json_filename))
+    else:
+        user_input_json = {}
+    arcann_logger.debug(f"user_input_json: {user_input_json}")
+
+    # Load the used input JSON (it is only read, the deviate phase updates it)
+    current_input_json = load_json_file((current_path / "used_input.json"), abort_on_error=False, enable_logging=False)
+    arcann_logger.debug(f"current_input_json: {current_input_json}")
+
+    # Get control path, load the main JSON and the exploration JSON
+    control_path = training_path / "control"
+    main_json = load_json_file((control_path / "config.json"))
+    exploration_json = load_json_file((control_path / f"exploration_{padded_curr_iter}.json"))
+
+    # Load the previous exploration JSON
+    if curr_iter > 1:
+        previous_exploration_json = load_json_file((control_path / f"exploration_{str(curr_iter - 1).zfill(3)}.json"))
+    else:
+        previous_exploration_json = {}
+
+    # Check if we can continue
+    if not exploration_json["is_launched"]:
+        arcann_logger.error(f"Lock found. Execute first: exploration launch.")
+        arcann_logger.error(f"Aborting...")
+        return 1
+    # Once checked, the trajectories are complete and the states are finalized
+    is_final = exploration_json["is_checked"]
+
+    # Same deviation parameters as the deviate phase
+    # Priority: user > previous > default
+    current_input_json = generate_input_exploration_deviation_json(
+        user_input_json,
+        previous_exploration_json,
+        default_input_json,
+        current_input_json,
+        main_json,
+    )
+    arcann_logger.debug(f"current_input_json: {current_input_json}")
+
+    # The trajectories, in a fixed order (system, nnp, trajectory)
+    trajectories_tasks = []
+    for system_auto_index, system_auto in enumerate(main_json["systems_auto"]):
+        system_json = exploration_json["systems_auto"][system_auto]
+        if system_json["exploration_type"] != "lammps":
+            arcann_logger.warning(f"'{system_auto}': the online deviation is only available for LAMMPS explorations, skipping.")
+            continue
+
+        _, sigma_low, sigma_high, sigma_high_limit, ignore_first_x_ps = get_system_deviation(current_input_json, system_auto_index)
+        start_row_number = 0
+        while start_row_number * system_json["print_every_x_steps"] * system_json["timestep_ps"] < ignore_first_x_ps:
+            start_row_number = start_row_number + 1
+        if start_row_number > system_json["nb_steps"] // system_json["print_every_x_steps"]:
+            start_row_number = 0
+
+        for it_nnp in range(1, main_json["nnp_count"] + 1):
+            for it_number in range(1, system_json["traj_count"] + 1):
+                local_path = current_path / str(system_auto) / str(it_nnp) / str(it_number).zfill(5)
+                if (local_path / "skip").is_file():
+                    continue
+                trajectories_tasks.append(
+                    (
+                        system_auto,
+                        (
+                            local_path / f"model_devi_{system_auto}_{it_nnp}_{padded_curr_iter}.out",
+                            (sigma_low, sigma_high, sigma_high_limit),
+                            start_row_number,
+                            system_json["disturbed_start"],
+                            is_final,
+                        ),
+                    )
+                )
+        del system_json, sigma_low, sigma_high, sigma_high_limit, ignore_first_x_ps, start_row_number
+    del system_auto_index, system_auto
+
+    # Update the states (in worker processes if requested)
+    jobs = min(max(jobs, 1), max(len(trajectories_tasks), 1))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            deviation_states = list(executor.map(_update_trajectory, *zip(*[task for _, task in trajectories_tasks]), chunksize=max(1, len(trajectories_tasks) // (4 * jobs))))
+    else:
+        deviation_states = [_update_trajectory(*task) for _, task in trajectories_tasks]
+
+    # Live yields per system
+    systems_states = {}
+    for (system_auto, _), deviation_state in zip(trajectories_tasks, deviation_states):
+        systems_states.setdefault(system_auto, []).append(deviation_state)
+    arcann_logger.info(f"{'System':<24}{'Started':>9}{'Crossed':>9}{'Rows':>11}{'Candidates':>12}{'Yield':>8}{'Mean':>9}{'Median':>9}{'Std':>9}")
+    for system_auto, system_states in systems_states.items():
+        started_states = [deviation_state for deviation_state in system_states if deviation_state is not None]
+        crossed_count = sum(deviation_state["end_row_number"] >= 0 for deviation_state in started_states)
+        classified_count = sum(deviation_state["good_count"] + deviation_state["rejected_count"] + deviation_state["candidates_count"] for deviation_state in started_states)
+        candidates_count = sum(deviation_state["candidates_count"] for deviation_state in started_states)
+        system_stats = [get_deviation_state_stats(deviation_state) for deviation_state in started_states if deviation_state["count"] > 0]
+        mean_deviation_max_f, median_deviation_max_f, stdeviation_deviation_max_f = np.mean(system_stats, axis=0) if system_stats else (np.nan, np.nan, np.nan)
+        candidates_yield = candidates_count / classified_count if classified_count else 0.0
+        arcann_logger.info(
+            f"{system_auto:<24}{len(started_states):>4}/{len(system_states):<4}{crossed_count:>9}{sum(deviation_state['row_count'] for deviation_state in started_states):>11}"
+            f"{candidates_count:>12}{candidates_yield:>8.1%}{mean_deviation_max_f:>9.4f}{median_deviation_max_f:>9.4f}{stdeviation_deviation_max_f:>9.4f}"
+        )
+        if started_states and crossed_count == len(system_states):
+            arcann_logger.warning(f"'{system_auto}': every trajectory crossed sigma_high_limit, the remaining steps are rejected (the jobs can be stopped).")
+        elif classified_count and candidates_count == 0:
+            arcann_logger.warning(f"'{system_auto}': no candidate so far.")
+        del started_states, crossed_count, classified_count, candidates_count, system_stats, candidates_yield
+        del mean_deviation_max_f, median_deviation_max_f, stdeviation_deviation_max_f
+
+    if is_final:
+        not_final_count = sum(deviation_state is not None and not deviation_state["is_final"] for deviation_state in deviation_states)
+        if not_final_count:
+            arcann_logger.warning(f"{not_final_count} model deviation file(s) could not be finalized (incomplete last line), deviate will read them.")
+        arcann_logger.info(f"The online deviation is finalized, execute: exploration deviate.")
+        del not_final_count
+    else:
+        arcann_logger.info(f"The exploration is not checked yet, the states will be finalized by the first run after: exploration check.")
+
+    # End
+    arcann_logger.info(f"-" * 88)
+    arcann_logger.info(f"Step: {current_step.capitalize()} - Phase: {current_phase.capitalize()} is a success!")
+
+    # Cleaning
+    del current_path, control_path, training_path
+    del default_input_json, user_input_json, user_input_json_filename, current_input_json
+    del main_json, exploration_json, previous_exploration_json
+    del curr_iter, padded_curr_iter, is_final, jobs
+    del trajectories_tasks, deviation_states, systems_states
+
+    arcann_logger.debug(f"LOCAL")
+    arcann_logger.debug(f"{locals()}")
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4:
+        main(
+            "exploration",
+            "deviate_online",
+            Path(sys.argv[1]),
+            fake_machine=sys.argv[2],
+            user_input_json_filename=sys.argv[3],
+        )
+    else:
+        pass
@@ -6,26 +6,27 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/18
 """
 
 # Standard library modules
 import logging
 import sys
 from pathlib import Path
-from copy import deepcopy
-import subprocess
 
 # Non-standard library imports
 import numpy as np
 
 # Local imports
-from arcann_training.common.json import load_json_file, write_json_file, get_key_in_dict, load_default_json_file, backup_and_overwrite_json_file
-from arcann_training.common.filesystem import check_file_existence, remove_file, remove_files_matching_glob
-from arcann_training.common.list import replace_substring_in_string_list, string_list_to_textfile, textfile_to_string_list
-from arcann_training.common.check import validate_step_folder, check_atomsk, check_vmd
-from arcann_training.exploration.utils import generate_input_exploration_disturbed_json, get_system_disturb
-from arcann_training.common.xyz import parse_xyz_trajectory_file, write_xyz_frame
+from arcann_training.common.json import load_json_file, write_json_file, load_default_json_file, backup_and_overwrite_json_file
+from arcann_training.common.filesystem import check_file_existence, remove_file
+from arcann_training.common.amber import check_amber_netcdf_file, read_amber_netcdf_frames, write_amber_restart_file
+from arcann_training.common.check import validate_step_folder
+from arcann_training.common.dcd import read_dcd_frames
+from arcann_training.common.lammps import read_lammps_data_atom_types
+from arcann_training.common.structure import get_properties_maps, write_lammps_data_files
+from arcann_training.exploration.utils import QBC_STORE_FILENAME, disturb_atomic_coordinates, generate_input_exploration_disturbed_json, get_disturb_seed, get_qbc_indexes, get_qbc_stats, get_system_disturb, load_qbc_store
+from arcann_training.common.xyz import read_xyz_frames, write_xyz_frames
 
 def main(
     current_step: str,
@@ -70,6 +71,11 @@ def main(
     arcann_logger.debug(f"user_input_json: {user_input_json}")
     arcann_logger.debug(f"user_input_json_present: {user_input_json_present}")
 
+    # The VMD and Atomsk binaries are no longer used (the structures are read and written natively)
+    for deprecated_key in ["atomsk_path", "vmd_path"]:
+        if deprecated_key in user_input_json:
+            arcann_logger.warning(f"'{deprecated_key}' is deprecated and ignored, it can be removed from {user_input_json_filename}.")
+
     # If the used input JSON is present, load it
     if (current_path / "used_input.json").is_file():
         current_input_json = load_json_file((current_path / "used_input.json"))
@@ -97,36 +103,12 @@ def main(
         previous_training_json = {}
         previous_exploration_json = {}
 
-    # Check if the atomsk and vmd package are installed
-    if "atomsk_path" not in user_input_json:
-        atomsk_bin = check_atomsk(get_key_in_dict("atomsk_path", current_input_json, previous_exploration_json, default_input_json))
-    else:
-        atomsk_bin = check_atomsk(get_key_in_dict("atomsk_path", user_input_json, previous_exploration_json, default_input_json))
-        current_input_json["atomsk_path"] = atomsk_bin
-    if "vmd_path" not in user_input_json:
-        vmd_bin = check_vmd(get_key_in_dict("vmd_path", current_input_json, previous_exploration_json, default_input_json))
-    else:
-        vmd_bin = check_vmd(get_key_in_dict("vmd_path", user_input_json, previous_exploration_json, default_input_json))
-        current_input_json["vmd_path"] = vmd_bin
-    arcann_logger.debug(f"atomsk_bin: {atomsk_bin}")
-    arcann_logger.debug(f"vmd_bin: {vmd_bin}")
-
     # Check if we can continue
     if not exploration_json["is_deviated"]:
         arcann_logger.error(f"Lock found. Execute first: exploration deviation.")
         arcann_logger.error(f"Aborting...")
         return 1
 
-    # Update the current input JSON
-    current_input_json["atomsk_path"] = atomsk_bin
-    current_input_json["vmd_path"] = vmd_bin
-    arcann_logger.debug(f"current_input_json: {current_input_json}")
-
-    # Update the current exploration JSON
-    exploration_json["atomsk_path"] = atomsk_bin
-    exploration_json["vmd_path"] = vmd_bin
-    arcann_logger.debug(f"exploration_json: {exploration_json}")
-
     # Generate/update the merged input JSON
     # Priority: user > previous > default
     current_input_json = generate_input_exploration_disturbed_json(
@@ -137,39 +119,61 @@ def main(
         main_json,
     )
     arcann_logger.debug(f"current_input_json: {current_input_json}")
-
-    check_file_existence(deepmd_iterative_path / "assets" / "others" / "vmd_dcd_selection_index.tcl")
-    master_vmd_tcl = textfile_to_string_list(deepmd_iterative_path / "assets" / "others" / "vmd_dcd_selection_index.tcl")
-    arcann_logger.debug(f"{master_vmd_tcl}")
+    exploration_json["cache_size_mb"] = current_input_json["cache_size_mb"]
 
     starting_structures_path = training_path / "starting_structures"
     starting_structures_path.mkdir(exist_ok=True)
 
+    # The Query-by-Committee store of the deviate phase (per trajectory JSON files for iterations deviated before it)
+    if (current_path / QBC_STORE_FILENAME).is_file():
+        qbc_store = load_qbc_store(current_path / QBC_STORE_FILENAME)
+    else:
+        qbc_store = None
+
+    # One seed for the disturbed structures of this extraction (recorded in the exploration JSON, the 'disturbed_seed' input replays it)
+    disturb_seed = get_disturb_seed(current_input_json["disturbed_seed"])
+    exploration_json["disturbed_seed"] = current_input_json["disturbed_seed"]
+    arcann_logger.debug(f"disturb_seed: {disturb_seed}")
+
     for system_auto_index, system_auto in enumerate(main_json["systems_auto"]):
         arcann_logger.info(f"Processing system: {system_auto} ({system_auto_index + 1}/{len(main_json['systems_auto'])})")
-        candidates_files = []
-        candidates_disturbed_files = []
+        # The selected frames of the system, gathered in memory (one entry per trajectory) and written once at the end
+        candidates_atom_counts = []
+        candidates_atomic_symbols = []
+        candidates_atomic_coordinates = []
+        candidates_comments = []
+        candidates_disturbed_atomic_coordinates = []
+
+        # A new extraction writes all the selected candidates again (it undoes the dedup phase)
+        if "dedup_dropped_count" in exploration_json["systems_auto"][system_auto]:
+            exploration_json["systems_auto"][system_auto]["selected_count"] = exploration_json["systems_auto"][system_auto]["selected_count"] + exploration_json["systems_auto"][system_auto].pop("dedup_dropped_count")
+            exploration_json["systems_auto"][system_auto].pop("dedup_dropped", None)
 
         print_every_x_steps = exploration_json["systems_auto"][system_auto]["print_every_x_steps"]
         # Set the system params for disburbed selection
         disturbed_start_value, disturbed_start_indexes, disturbed_candidate_value, disturbed_candidate_indexes = get_system_disturb(current_input_json, system_auto_index)
 
-        if exploration_json["systems_auto"][system_auto]["exploration_type"] == "lammps":
-            check_file_existence(training_path / "user_files" / f"{system_auto}.lmp")
-            subprocess.run([atomsk_bin, str(training_path / "user_files" / f"{system_auto}.lmp"), "pdb", str(training_path / "user_files" / system_auto), "-ow"], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-            topo_file = training_path / "user_files" / f"{system_auto}.pdb"
-        elif exploration_json["systems_auto"][system_auto]["exploration_type"] == "i-PI":
+        if exploration_json["systems_auto"][system_auto]["exploration_type"] == "lammps" or exploration_json["systems_auto"][system_auto]["exploration_type"] == "i-PI":
+            # The DCD frames are in atom ID order: the symbols come from the LMP atom types and the properties
             check_file_existence(training_path / "user_files" / f"{system_auto}.lmp")
-            subprocess.run([atomsk_bin, str(training_path / "user_files" / f"{system_auto}.lmp"), "pdb", str(training_path / "user_files" / system_auto), "-ow"], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-            topo_file = training_path / "user_files" / f"{system_auto}.pdb"
+            if "properties" not in main_json:
+                arcann_logger.error(f"No 'properties' found in the config.json file. Please run the 'initialization' step again.")
+                arcann_logger.error(f"Aborting...")
+                return 1
+            _, type_symbols, _ = get_properties_maps(main_json["properties"])
+            system_atom_types = read_lammps_data_atom_types(training_path / "user_files" / f"{system_auto}.lmp")
+            system_atomic_symbols = np.array([type_symbols[atom_type] for atom_type in system_atom_types])
+            del type_symbols, system_atom_types
 
         for it_nnp in range(1, main_json["nnp_count"] + 1):
             for it_number in range(1, exploration_json["systems_auto"][system_auto]["traj_count"] + 1):
                 arcann_logger.debug(f"{system_auto} / {it_nnp} / {it_number}")
                 # Get the local path
                 local_path = Path(".").resolve() / str(system_auto) / str(it_nnp) / str(it_number).zfill(5)
-                QbC_stats = load_json_file(local_path / "QbC_stats.json", True, False)
-                QbC_indexes = load_json_file(local_path / "QbC_indexes.json", True, False)
+                if qbc_store is not None:
+                    QbC_stats = get_qbc_stats(qbc_store, system_auto, it_nnp, it_number)
+                else:
+                    QbC_stats = load_json_file(local_path / "QbC_stats.json", True, False)
                 arcann_logger.debug(QbC_stats)
 
                 if (local_path / "cell.txt").is_file():
@@ -198,80 +202,70 @@ def main(
                         traj_file = local_path / f"{system_auto}_{it_nnp}_{padded_curr_iter}_QM.xyz"
                         min_index = int(QbC_stats["minimum_index"])
 
-                    (local_path / "min.vmd").write_text(f"{min_index}")
                     padded_min_index = str(min_index).zfill(5)
 
                     if exploration_json["systems_auto"][system_auto]["exploration_type"] == "lammps" or exploration_json["systems_auto"][system_auto]["exploration_type"] == "i-PI":
 
-
                         min_file_name = f"{padded_curr_iter}_{system_auto}_{it_nnp}_{str(it_number).zfill(5)}"
-                        vmd_tcl = deepcopy(master_vmd_tcl)
-                        vmd_tcl = replace_substring_in_string_list(vmd_tcl, "_R_PDB_FILE_", str(topo_file))
-                        vmd_tcl = replace_substring_in_string_list(vmd_tcl, "_R_DCD_FILE_", str(traj_file))
-                        vmd_tcl = replace_substring_in_string_list(vmd_tcl, "_R_FRAME_INDEX_FILE_", str(local_path / "min.vmd"))
-                        vmd_tcl = replace_substring_in_string_list(vmd_tcl, "_R_XYZ_OUT_", str(starting_structures_path / f"{min_file_name}"))
-                        string_list_to_textfile(local_path / "vmd.tcl", vmd_tcl)
-                        del vmd_tcl, traj_file
-
-                        # VMD DCD -> XYZ
+
+                        # DCD -> XYZ (the selected frame is sliced from the memory-mapped trajectory)
                         remove_file(starting_structures_path / f"{min_file_name}_{padded_min_index}.xyz")
-                        subprocess.run([vmd_bin, "-e", str(local_path / "vmd.tcl"), "-dispdev", "text"], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-                        xyz_string = textfile_to_string_list(starting_structures_path / f"{min_file_name}_{padded_min_index}.xyz")
+                        atomic_coordinates, _ = read_dcd_frames(traj_file, [min_index])
                         if not is_cell_constant:
                             extended_xyz_header = f'Lattice="{cella[min_index]} 0.0000 0.0000 0.0000 {cellb[min_index]} 0.0000 0.0000 0.0000 {cellc[min_index]}" Properties=species:S:1:pos:R:3 Frame={min_index}'
+                            lattice = [cella[min_index], 0.0, 0.0, 0.0, cellb[min_index], 0.0, 0.0, 0.0, cellc[min_index]]
                         else:
                             extended_xyz_header = f'Lattice="{cella} 0.0000 0.0000 0.0000 {cellb} 0.0000 0.0000 0.0000 {cellc}" Properties=species:S:1:pos:R:3 Frame={min_index}'
-                        xyz_string = [xyz_string[0]] + [extended_xyz_header] + xyz_string[2:]
-                        string_list_to_textfile(starting_structures_path / f"{min_file_name}_{padded_min_index}.xyz", xyz_string)
-                        del xyz_string, extended_xyz_header
+                            lattice = [cella, 0.0, 0.0, 0.0, cellb, 0.0, 0.0, 0.0, cellc]
+                        write_xyz_frames(starting_structures_path / f"{min_file_name}_{padded_min_index}.xyz", [0], np.array([system_atomic_symbols.shape[0]]), system_atomic_symbols[np.newaxis], atomic_coordinates, np.array([]), [extended_xyz_header])
+                        del traj_file
 
-                        remove_file((local_path / "vmd.tcl"))
-                        remove_file((local_path / "min.vmd"))
-
-                        # Atomsk XYZ -> LMP
+                        # XYZ -> LMP (types and masses from the properties)
                         remove_file(starting_structures_path / f"{min_file_name}_{padded_min_index}.lmp")
-                        subprocess.run([atomsk_bin, "-ow", "-properties", str(Path("..") / "user_files" / "properties.txt"), str(Path("..") / "starting_structures" / f"{min_file_name}_{padded_min_index}.xyz"), str(Path("..") / "starting_structures" / f"{min_file_name}_{padded_min_index}.lmp")], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-                        # Add a mass to any 0.0000 mass in the LMP file
-                        lmp_file = textfile_to_string_list(starting_structures_path / f"{min_file_name}_{padded_min_index}.lmp")
-                        lmp_file = replace_substring_in_string_list(lmp_file, "0.00000000              # XX", "1.00000000              # XX")
-                        string_list_to_textfile(starting_structures_path / f"{min_file_name}_{padded_min_index}.lmp", lmp_file)
-                        del lmp_file
+                        write_lammps_data_files([starting_structures_path / f"{min_file_name}_{padded_min_index}.lmp"], system_atomic_symbols[np.newaxis], atomic_coordinates, [lattice], main_json["properties"])
 
                         # If the a minium value was set by the user or previous, enable disturbed min structures
                         if disturbed_start_value != 0:
                             # or (curr_iter > 1 and previous_exploration_json["systems_auto"][system_auto]["disturbed_start"]):
 
-                            # Atomsk XYZ ==> XYZ_disturbed
+                            # XYZ ==> XYZ_disturbed (seeded per trajectory, so that the extraction can be reproduced)
+                            disturbed_coordinates = disturb_atomic_coordinates(atomic_coordinates, disturbed_start_value, disturbed_start_indexes, np.random.default_rng([disturb_seed, system_auto_index, it_nnp, it_number, 0]))
                             remove_file((starting_structures_path / f"{min_file_name}_{padded_min_index}_disturbed.xyz"))
-                            (starting_structures_path / f"{min_file_name}_{padded_min_index}_disturbed.xyz").write_text((starting_structures_path / f"{min_file_name}_{padded_min_index}.xyz").read_text())
+                            write_xyz_frames(starting_structures_path / f"{min_file_name}_{padded_min_index}_disturbed.xyz", [0], np.array([system_atomic_symbols.shape[0]]), system_atomic_symbols[np.newaxis], disturbed_coordinates, np.array([]), [extended_xyz_header])
 
-                            if not disturbed_start_indexes:
-                                subprocess.run([atomsk_bin, "-ow", str(Path("..") / "starting_structures" / f"{min_file_name}_{padded_min_index}_disturbed.xyz"), "-disturb", str(disturbed_start_value), "exyz"], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-                            else:
-                                subprocess.run([atomsk_bin, "-ow", str(Path("..") / "starting_structures" / f"{min_file_name}_{padded_min_index}_disturbed.xyz"), "-select", ",".join([str(idx) for idx in disturbed_start_indexes]), "-disturb", str(disturbed_start_value), "exyz"], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-
-                            # Atomsk XYZ -> LMP
+                            # XYZ_disturbed -> LMP (types and masses from the properties)
                             remove_file(starting_structures_path / f"{min_file_name}_{padded_min_index}_disturbed.lmp")
-                            subprocess.run([atomsk_bin, "-ow", "-properties", str(Path("..") / "user_files" / "properties.txt"), str(Path("..") / "starting_structures" / f"{min_file_name}_{padded_min_index}_disturbed.xyz"), str(Path("..") / "starting_structures" / f"{min_file_name}_{padded_min_index}_disturbed.lmp")], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-                            # Add a mass to any 0.0000 mass in the LMP file
-                            lmp_file = textfile_to_string_list(starting_structures_path / f"{min_file_name}_{padded_min_index}_disturbed.lmp")
-                            lmp_file = replace_substring_in_string_list(lmp_file, "0.00000000              # XX", "1.00000000              # XX")
-                            string_list_to_textfile(starting_structures_path / f"{min_file_name}_{padded_min_index}_disturbed.lmp", lmp_file)
-                            del lmp_file
+                            write_lammps_data_files([starting_structures_path / f"{min_file_name}_{padded_min_index}_disturbed.lmp"], system_atomic_symbols[np.newaxis], disturbed_coordinates, [lattice], main_json["properties"])
+                            del disturbed_coordinates
 
                             exploration_json["systems_auto"][system_auto]["disturbed_start_value"] = disturbed_start_value
                             exploration_json["systems_auto"][system_auto]["disturbed_start_indexes"] = disturbed_start_indexes
+                            exploration_json["systems_auto"][system_auto]["disturbed_seed"] = disturb_seed
                         else:
                             exploration_json["systems_auto"][system_auto]["disturbed_start_value"] = 0
                             exploration_json["systems_auto"][system_auto]["disturbed_start_indexes"] = []
 
-                        del min_index, padded_min_index, min_file_name
+                        del atomic_coordinates, extended_xyz_header, lattice, min_index, padded_min_index, min_file_name
 
                     elif exploration_json["systems_auto"][system_auto]["exploration_type"] == "sander_emle":
 
-                        remove_file((local_path / "min.vmd"))
-                        # This part should read the nc file and convert it
-                        # But for now, it is deactivated
+                        # NC -> RST7 (the NetCDF frames are written at the same frequency as the QM XYZ frames)
+                        min_file_name = f"{padded_curr_iter}_{system_auto}_{it_nnp}_{str(it_number).zfill(5)}"
+                        nc_file = local_path / f"{system_auto}_{it_nnp}_{padded_curr_iter}.nc"
+                        remove_file(starting_structures_path / f"{min_file_name}_{padded_min_index}.rst7")
+                        if nc_file.is_file() and min_index < check_amber_netcdf_file(nc_file)[1]:
+                            atomic_coordinates, cell_lengths, cell_angles = read_amber_netcdf_frames(nc_file, [min_index])
+                            write_amber_restart_file(
+                                starting_structures_path / f"{min_file_name}_{padded_min_index}.rst7",
+                                atomic_coordinates[0],
+                                cell_lengths[0] if cell_lengths is not None else None,
+                                cell_angles[0] if cell_angles is not None else None,
+                                title=f"{system_auto} Frame={min_index}",
+                            )
+                            del atomic_coordinates, cell_lengths, cell_angles
+                        else:
+                            arcann_logger.warning(f"'{nc_file}' missing or without frame {min_index}: no starting structure extracted.")
+                        del nc_file, min_file_name, traj_file
 
                         if disturbed_start_value != 0:
                             arcann_logger.warning("Disturbed start value is not supported for sander_emle")
@@ -280,7 +274,10 @@ def main(
 
                 # Selection of labeling XYZ
                 if QbC_stats["selected_count"] > 0:
-                    candidate_indexes = np.array(QbC_indexes["selected_indexes"])
+                    if qbc_store is not None:
+                        candidate_indexes = get_qbc_indexes(qbc_store, system_auto, it_nnp, it_number, "selected")
+                    else:
+                        candidate_indexes = np.array(load_json_file(local_path / "QbC_indexes.json", True, False)["selected_indexes"])
 
                     if exploration_json["systems_auto"][system_auto]["exploration_type"] == "lammps":
                         traj_file = local_path / f"{system_auto}_{it_nnp}_{padded_curr_iter}.dcd"
@@ -294,67 +291,50 @@ def main(
                     candidate_indexes = candidate_indexes.astype(int).astype(str).tolist()
 
                     if exploration_json["systems_auto"][system_auto]["exploration_type"] == "lammps" or exploration_json["systems_auto"][system_auto]["exploration_type"] == "i-PI":
-                        string_list_to_textfile((local_path / "label.vmd"), candidate_indexes)
-
-                        vmd_tcl = deepcopy(master_vmd_tcl)
-                        vmd_tcl = replace_substring_in_string_list(vmd_tcl, "_R_PDB_FILE_", str(topo_file))
-                        vmd_tcl = replace_substring_in_string_list(vmd_tcl, "_R_DCD_FILE_", str(traj_file))
-                        vmd_tcl = replace_substring_in_string_list(vmd_tcl, "_R_FRAME_INDEX_FILE_", str(local_path / "label.vmd"))
-                        vmd_tcl = replace_substring_in_string_list(vmd_tcl, "_R_XYZ_OUT_", str(local_path / ("candidates")))
-                        string_list_to_textfile((local_path / "vmd.tcl"), vmd_tcl)
-                        del vmd_tcl, traj_file
-
-                        # VMD DCD ->  A lot of XYZ
-                        subprocess.run([vmd_bin, "-e", str(local_path / "vmd.tcl"), "-dispdev", "text"], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-                        for xyz_files in local_path.glob("candidates_*.xyz"):
-                            if "disturbed" in xyz_files.stem:
-                                continue
-                            index_xyz = int(xyz_files.stem.split("_")[-1])
-                            xyz_string = textfile_to_string_list(xyz_files)
+                        candidate_indexes_padded = [_.zfill(5) for _ in candidate_indexes]
+
+                        # DCD -> XYZ (the selected frames are sliced from the memory-mapped trajectory)
+                        atomic_coordinates, _ = read_dcd_frames(traj_file, [int(_) for _ in candidate_indexes])
+                        extended_xyz_headers = []
+                        for index_xyz in [int(_) for _ in candidate_indexes]:
                             if not is_cell_constant:
-                                extended_xyz_header = f'Lattice="{cella[index_xyz]} 0.0000 0.0000 0.0000 {cellb[index_xyz]} 0.0000 0.0000 0.0000 {cellc[index_xyz]}" Properties=species:S:1:pos:R:3 Frame={index_xyz}'
+                                extended_xyz_headers.append(f'Lattice="{cella[index_xyz]} 0.0000 0.0000 0.0000 {cellb[index_xyz]} 0.0000 0.0000 0.0000 {cellc[index_xyz]}" Properties=species:S:1:pos:R:3 Frame={index_xyz}')
                             else:
-                                extended_xyz_header = f'Lattice="{cella} 0.0000 0.0000 0.0000 {cellb} 0.0000 0.0000 0.0000 {cellc}" Properties=species:S:1:pos:R:3 Frame={index_xyz}'
-                            xyz_string = [xyz_string[0]] + [extended_xyz_header] + xyz_string[2:]
-                            string_list_to_textfile(xyz_files, xyz_string)
-                            del xyz_string, extended_xyz_header, index_xyz
-                        del xyz_files
-
-                        remove_file((local_path / "label.vmd"))
-                        remove_file((local_path / "vmd.tcl"))
-
-                        candidate_indexes_padded = [_.zfill(5) for _ in candidate_indexes]
-                        candidates_files.extend([str(Path(".") / str(system_auto) / str(it_nnp) / str(it_number).zfill(5) / ("candidates_" + _ + ".xyz")) for _ in candidate_indexes_padded])
+                                extended_xyz_headers.append(f'Lattice="{cella} 0.0000 0.0000 0.0000 {cellb} 0.0000 0.0000 0.0000 {cellc}" Properties=species:S:1:pos:R:3 Frame={index_xyz}')
+                        candidates_atom_counts.append(np.full(len(candidate_indexes_padded), system_atomic_symbols.shape[0]))
+                        candidates_atomic_symbols.append(np.broadcast_to(system_atomic_symbols, (len(candidate_indexes_padded), system_atomic_symbols.shape[0])))
+                        candidates_atomic_coordinates.append(atomic_coordinates)
+                        candidates_comments.extend(extended_xyz_headers)
+                        del traj_file
 
                         # If the a minium value was set by the user or previous, enable disturbed min structures
                         if disturbed_candidate_value != 0:
-                            remove_files_matching_glob(local_path, "_disturbed.xyz")
-                            for candidate_index_padded in candidate_indexes_padded:
-                                (local_path / f"candidates_{candidate_index_padded}_disturbed.xyz").write_text((local_path / f"candidates_{candidate_index_padded}.xyz").read_text())
-                                if not disturbed_candidate_indexes:
-                                    subprocess.run([atomsk_bin, "-ow", str(Path(".") / str(system_auto) / str(it_nnp) / str(it_number).zfill(5) / (f"candidates_{candidate_index_padded}_disturbed.xyz")), "-disturb", str(disturbed_candidate_value), "exyz"], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-                                else:
-                                    subprocess.run([atomsk_bin, "-ow", str(Path(".") / str(system_auto) / str(it_nnp) / str(it_number).zfill(5) / (f"candidates_{candidate_index_padded}_disturbed.xyz")), "-select", ",".join([str(idx) for idx in disturbed_candidate_indexes]), "-disturb", str(disturbed_candidate_value), "exyz"], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-
-                            candidates_disturbed_files.extend([str(Path(".") / str(system_auto) / str(it_nnp) / str(it_number).zfill(5) / ("candidates_" + _ + "_disturbed.xyz")) for _ in candidate_indexes_padded])
+                            # The displacements of all the candidates of the trajectory are drawn at once (seeded per trajectory)
+                            disturbed_coordinates = disturb_atomic_coordinates(atomic_coordinates, disturbed_candidate_value, disturbed_candidate_indexes, np.random.default_rng([disturb_seed, system_auto_index, it_nnp, it_number, 1]))
+                            candidates_disturbed_atomic_coordinates.append(disturbed_coordinates)
+                            del disturbed_coordinates
+
                             exploration_json["systems_auto"][system_auto]["disturbed_candidate_value"] = disturbed_candidate_value
                             exploration_json["systems_auto"][system_auto]["disturbed_candidate_indexes"] = disturbed_candidate_indexes
-                            del candidate_index_padded
+                            exploration_json["systems_auto"][system_auto]["disturbed_seed"] = disturb_seed
 
                         else:
                             exploration_json["systems_auto"][system_auto]["disturbed_candidate_value"] = 0
                             exploration_json["systems_auto"][system_auto]["disturbed_candidate_indexes"] = []
-                        del candidate_indexes, candidate_indexes_padded
+                        del atomic_coordinates, extended_xyz_headers, index_xyz, candidate_indexes, candidate_indexes_padded
 
                     elif exploration_json["systems_auto"][system_auto]["exploration_type"] == "sander_emle":
 
                         candidate_indexes_padded = [_.zfill(5) for _ in candidate_indexes]
-                        atom_counts, atomic_symbols, atomic_coordinates, comments, lattice_info, pbc_info, properties_info, max_f_std_info = parse_xyz_trajectory_file(local_path / traj_file)
+                        # Seek straight to the selected frames (byte-offset index of the trajectory)
+                        atom_counts, atomic_symbols, atomic_coordinates, comments, lattice_info, pbc_info, properties_info, max_f_std_info = read_xyz_frames(traj_file, [int(_) for _ in candidate_indexes], current_input_json["cache_size_mb"])
 
-                        for _ in candidate_indexes_padded:
-                            print(f"Processing candidate: {system_auto} / {it_nnp} / {it_number} / {_}")
-                            write_xyz_frame(local_path / f"candidates_{_}.xyz", int(_), atom_counts, atomic_symbols, atomic_coordinates, np.array([]), comments)
-                            candidates_files.append(str(Path(".") / str(system_auto) / str(it_nnp) / str(it_number).zfill(5) / ("candidates_" + _ + ".xyz")))
+                        arcann_logger.debug(f"Processing candidates: {system_auto} / {it_nnp} / {it_number} / {candidate_indexes_padded}")
+                        candidates_atom_counts.append(atom_counts)
+                        candidates_atomic_symbols.append(atomic_symbols)
+                        candidates_atomic_coordinates.append(atomic_coordinates)
+                        candidates_comments.extend(comments)
+                        del atom_counts, atomic_symbols, atomic_coordinates, comments, lattice_info, pbc_info, properties_info, max_f_std_info
 
                         if disturbed_candidate_value != 0:
                             arcann_logger.warning("Disturbed start value is not supported for sander_emle")
@@ -367,35 +347,29 @@ def main(
                     exploration_json["systems_auto"][system_auto]["disturbed_candidate_value"] = 0
                     exploration_json["systems_auto"][system_auto]["disturbed_candidate_indexes"] = []
 
-            del cella, cellb, cellc, is_cell_constant, local_path, QbC_stats, QbC_indexes
+            del cella, cellb, cellc, is_cell_constant, local_path, QbC_stats
 
         del it_nnp, it_number
 
-        if candidates_files:
+        # All the candidates of the system in one file (and their disturbed copies, in the same order, with the same headers)
+        if candidates_atomic_coordinates:
+            candidates_atom_counts = np.concatenate(candidates_atom_counts)
+            candidates_atomic_symbols = np.concatenate(candidates_atomic_symbols)
             candidates_xyz_file = current_path / system_auto / f"candidates_{padded_curr_iter}_{system_auto}.xyz"
             remove_file(candidates_xyz_file)
-            with open(candidates_xyz_file, "w") as f:
-                for candidate_xyz_file in candidates_files:
-                    f.write((current_path / candidate_xyz_file).read_text())
-                    remove_file((current_path / candidate_xyz_file))
-                del candidate_xyz_file
-            del candidates_xyz_file, f
-        del candidates_files
-
-        if candidates_disturbed_files:
-            candidates_disturbed_xyz_file = current_path / system_auto / f"candidates_{padded_curr_iter}_{system_auto}_disturbed.xyz"
-            remove_file(candidates_disturbed_xyz_file)
-            with open(candidates_disturbed_xyz_file, "w") as f:
-                for candidate_disturbed_file in candidates_disturbed_files:
-                    f.write((current_path / candidate_disturbed_file).read_text())
-                    remove_file((current_path / candidate_disturbed_file))
-                del candidate_disturbed_file
-            del candidates_disturbed_xyz_file, f
-        del candidates_disturbed_files
+            write_xyz_frames(candidates_xyz_file, np.arange(candidates_atom_counts.shape[0]), candidates_atom_counts, candidates_atomic_symbols, np.concatenate(candidates_atomic_coordinates), np.array([]), candidates_comments)
+            del candidates_xyz_file
+
+            if candidates_disturbed_atomic_coordinates:
+                candidates_disturbed_xyz_file = current_path / system_auto / f"candidates_{padded_curr_iter}_{system_auto}_disturbed.xyz"
+                remove_file(candidates_disturbed_xyz_file)
+                write_xyz_frames(candidates_disturbed_xyz_file, np.arange(candidates_atom_counts.shape[0]), candidates_atom_counts, candidates_atomic_symbols, np.concatenate(candidates_disturbed_atomic_coordinates), np.array([]), candidates_comments)
+                del candidates_disturbed_xyz_file
+        del candidates_atom_counts, candidates_atomic_symbols, candidates_atomic_coordinates, candidates_comments, candidates_disturbed_atomic_coordinates
         arcann_logger.info(f"Processed system: {system_auto} ({system_auto_index + 1}/{len(main_json['systems_auto'])})")
 
     del disturbed_start_value, disturbed_start_indexes, disturbed_candidate_value, disturbed_candidate_indexes, print_every_x_steps
-    del system_auto_index, system_auto, master_vmd_tcl
+    del system_auto_index, system_auto
     del starting_structures_path
 
     arcann_logger.info(f"-" * 88)
@@ -415,7 +389,7 @@ def main(
     del default_input_json, default_input_json_present, user_input_json, user_input_json_present, user_input_json_filename
     del main_json, current_input_json, exploration_json, previous_training_json, previous_exploration_json
     del curr_iter, padded_curr_iter, prev_iter, padded_prev_iter
-    del atomsk_bin, vmd_bin
+    del disturb_seed, qbc_store
 
     arcann_logger.debug(f"LOCAL")
     arcann_logger.debug(f"{locals()}")
@@ -23,7 +23,7 @@ import numpy as np
 import yaml
 
 # Local imports
-from arcann_training.common.check import validate_step_folder, check_atomsk
+from arcann_training.common.check import validate_step_folder
 from arcann_training.exploration.utils import generate_starting_points, create_models_list, update_system_nb_steps_factor, get_system_exploration, generate_input_exploration_json
 from arcann_training.common.ipi import get_temperature_from_ipi_xml
 from arcann_training.common.json import backup_and_overwrite_json_file, get_key_in_dict, load_default_json_file, load_json_file, write_json_file
@@ -32,6 +32,7 @@ from arcann_training.common.lammps import read_lammps_data
 from arcann_training.common.machine import get_machine_keyword, get_machine_spec_for_step
 from arcann_training.common.plumed import analyze_plumed_file_for_movres
 from arcann_training.common.slurm import replace_in_slurm_file_general
+from arcann_training.common.structure import convert_lammps_data_to_xyz
 from arcann_training.common.xml import string_list_to_xml, xml_to_string_list, read_xml_file, write_xml_file
 
 
@@ -81,6 +82,11 @@ def main(
     logging.debug(f"user_input_json: {user_input_json}")
     logging.debug(f"user_input_json_present: {user_input_json_present}")
 
+    # The VMD and Atomsk binaries are no longer used (the structures are read and written natively)
+    for deprecated_key in ["atomsk_path", "vmd_path"]:
+        if deprecated_key in user_input_json:
+            arcann_logger.warning(f"'{deprecated_key}' is deprecated and ignored, it can be removed from {user_input_json_filename}.")
+
     # Create a empty (None/Null) current input JSON
     current_input_json = {}
     for key in default_input_json:
@@ -107,12 +113,6 @@ def main(
     logging.debug(f"previous_training_json: {previous_training_json}")
     logging.debug(f"previous_exploration_json: {previous_exploration_json}")
 
-    # Check if the atomsk package is installed
-    atomsk_bin = check_atomsk(get_key_in_dict("atomsk_path", user_input_json, previous_exploration_json, default_input_json))
-    # Update the merged input JSON
-    current_input_json["atomsk_path"] = atomsk_bin
-    logging.debug(f"current_input_json: {current_input_json}")
-
     # Get the machine keyword (Priority: user > previous > default)
     # And update the merged input JSON
     user_machine_keyword = get_machine_keyword(user_input_json, previous_exploration_json, default_input_json, "exp")
@@ -167,7 +167,6 @@ def main(
     exploration_json = {}
     exploration_json = {
         **exploration_json,
-        "atomsk_path": atomsk_bin,
         "user_machine_keyword_exp": user_machine_keyword,
         "deepmd_model_version": previous_training_json["deepmd_model_version"],
         "nnp_count": main_json["nnp_count"],
@@ -514,8 +513,8 @@ def main(
                 system_ipi_xyz_fn = system_auto + ".xyz"
                 input_replace_dict["_R_DATA_FILE_"] = system_ipi_xyz_fn
                 master_system_ipi_json["coord_file"] = system_ipi_xyz_fn
-                # Get the XYZ file from LMP
-                subprocess.run([atomsk_bin, str(Path("../") / "user_files" / system_lammps_data_fn), "xyz", str(Path("../") / "user_files" / system_auto), "-ow"], stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+                # Get the XYZ file from LMP (symbols from the properties)
+                convert_lammps_data_to_xyz(training_path / "user_files" / system_lammps_data_fn, training_path / "user_files" / system_ipi_xyz_fn, main_json["properties"])
                 system_ipi_xyz = textfile_to_string_list(training_path / "user_files" / system_ipi_xyz_fn)
 
                 if "job_walltime_h" in user_input_json and system_job_walltime_h != -1:
@@ -615,12 +614,14 @@ def main(
                         system_lammps_data_fn = starting_point_list[random.randrange(0, len(starting_point_list))]
                         starting_point_list.remove(system_lammps_data_fn)
                         if system_previous_start:
-                            system_lammps_data = textfile_to_string_list(training_path / "starting_structures" / system_lammps_data_fn)
+                            system_lammps_data_path = training_path / "starting_structures" / system_lammps_data_fn
                         else:
-                            system_lammps_data = textfile_to_string_list(training_path / "user_files" / system_lammps_data_fn)
+                            system_lammps_data_path = training_path / "user_files" / system_lammps_data_fn
+                        system_lammps_data = textfile_to_string_list(system_lammps_data_path)
                         input_replace_dict["_R_DATA_FILE_"] = system_lammps_data_fn
-                        # Get again the system_cell and nb_atom
-                        system_nb_atm, num_atom_types, box, masses, coords = read_lammps_data(system_lammps_data)
+                        # Get again the system_cell and nb_atom (parsed once per starting structure, memoized by path)
+                        system_nb_atm, num_atom_types, box, masses, coords = read_lammps_data(system_lammps_data_path)
+                        del system_lammps_data_path
                         system_cell = [box[1] - box[0], box[3] - box[2], box[5] - box[4]]
 
                     # Plumed files
@@ -826,9 +827,8 @@ def main(
                         system_ipi_json["coord_file"] = system_ipi_xyz_fn
                         for it_zzz, zzz in enumerate(main_json["type_map"]):
                             system_ipi_json["atom_type"][str(zzz)] = it_zzz
-                        system_lammps_data = textfile_to_string_list(training_path / "starting_structures" / system_ipi_xyz_fn.replace(".xyz", ".lmp"))
-                        # Get again the system_cell and nb_atom
-                        (system_nb_atm, num_atom_types, box, masses, coords) = read_lammps_data(system_lammps_data)
+                        # Get again the system_cell and nb_atom (parsed once per starting structure, memoized by path)
+                        (system_nb_atm, num_atom_types, box, masses, coords) = read_lammps_data(training_path / "starting_structures" / system_ipi_xyz_fn.replace(".xyz", ".lmp"))
                         system_cell = [box[1] - box[0], box[3] - box[2], box[5] - box[4]]
                         input_replace_dict["_R_CELL_"] = f"{system_cell}"
 
@@ -0,0 +1,230 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+What-if of the deviation thresholds, to run after exploration check (and before or after deviate, it changes nothing).
+The deviation of every trajectory is read once, and the good/candidates/rejected counts, the selection factor and the number
+of selected candidates of each system are computed for a whole grid of (sigma_low, sigma_high, sigma_high_limit) values.
+The results are logged and written to 'sweep.json'.
+"""
+
+# Standard library modules
+import logging
+import sys
+from pathlib import Path
+
+# Non-standard library imports
+import numpy as np
+
+# Local imports
+from arcann_training.common.check import validate_step_folder
+from arcann_training.common.json import load_default_json_file, load_json_file, write_json_file
+from arcann_training.common.xyz import read_xyz_max_f_std
+from arcann_training.exploration.utils import generate_input_exploration_deviation_json, get_selected_counts, get_system_deviation, read_model_deviation, sweep_deviation_thresholds
+
+
+def main(
+    current_step: str,
+    current_phase: str,
+    deepmd_iterative_path: Path,
+    fake_machine=None,
+    user_input_json_filename: str = "input.json",
+):
+    # Get the logger
+    arcann_logger = logging.getLogger("ArcaNN")
+
+    # Get the current path and set the training path as the parent of the current path
+    current_path = Path(".").resolve()
+    training_path = current_path.parent
+
+    # Log the step and phase of the program
+    arcann_logger.info(f"Step: {current_step.capitalize()} - Phase: {current_phase.capitalize()}.")
+    arcann_logger.debug(f"Current path :{current_path}")
+    arcann_logger.debug(f"Training path: {training_path}")
+    arcann_logger.debug(f"Program path: {deepmd_iterative_path}")
+    arcann_logger.info(f"-" * 88)
+
+    # Check if the current folder is correct for the current step
+    validate_step_folder(current_step)
+
+    # Get the current iteration number
+    padded_curr_iter = Path().resolve().parts[-1].split("-")[0]
+    curr_iter = int(padded_curr_iter)
+
+    # Load the default input JSONs (the deviation one, and the grid one in its own section)
+    default_input_json = load_default_json_file(deepmd_iterative_path / "assets" / "default_config.json")
+    default_sweep_json = default_input_json[f"{current_step}_{current_phase}"]
+    default_input_json = default_input_json[current_step]
+    arcann_logger.debug(f"default_input_json: {default_input_json}")
+    arcann_logger.debug(f"default_sweep_json: {default_sweep_json}")
+
+    # Load the user input JSON
+    if (current_path / user_input_json_filename).is_file():
+        user_input_json = load_json_file((current_path / user_input_json_filename))
+    else:
+        user_input_json = {}
+    arcann_logger.debug(f"user_input_json: {user_input_json}")
+
+    # Load the used input JSON (it is only read, the deviate phase updates it)
+    current_input_json = load_json_file((current_path / "used_input.json"), abort_on_error=False, enable_logging=False)
+    arcann_logger.debug(f"current_input_json: {current_input_json}")
+
+    # The grid of thresholds, the types must match the default ones
+    sweep_json = {}
+    for key, default_value in default_sweep_json.items():
+        sweep_json[key] = user_input_json.get(key, default_value)
+        if not isinstance(sweep_json[key], list) or not sweep_json[key] or not all(isinstance(value, (int, float)) for value in sweep_json[key]):
+            arcann_logger.error(f"'{key}' must be a non-empty list of numbers, not '{sweep_json[key]}'.")
+            arcann_logger.error(f"Aborting...")
+            return 1
+    arcann_logger.debug(f"sweep_json: {sweep_json}")
+
+    # Get control path, load the main JSON and the exploration JSON
+    control_path = training_path / "control"
+    main_json = load_json_file((control_path / "config.json"))
+    exploration_json = load_json_file((control_path / f"exploration_{padded_curr_iter}.json"))
+
+    # Load the previous exploration JSON
+    if curr_iter > 1:
+        previous_exploration_json = load_json_file((control_path / f"exploration_{str(curr_iter - 1).zfill(3)}.json"))
+    else:
+        previous_exploration_json = {}
+
+    # Check if we can continue
+    if not exploration_json["is_checked"]:
+        arcann_logger.error(f"Lock found. Execute first: exploration check.")
+        arcann_logger.error(f"Aborting...")
+        return 1
+
+    # Same deviation parameters as the deviate phase (max_candidates and ignore_first_x_ps are not swept)
+    # Priority: user > previous > default
+    current_input_json = generate_input_exploration_deviation_json(
+        user_input_json,
+        previous_exploration_json,
+        default_input_json,
+        current_input_json,
+        main_json,
+    )
+    arcann_logger.debug(f"current_input_json: {current_input_json}")
+
+    sigma_low_values = np.asarray(sweep_json["sigma_low_values"], dtype=np.float64)
+    sigma_high_values = np.asarray(sweep_json["sigma_high_values"], dtype=np.float64)
+    sigma_high_limit_values = np.asarray(sweep_json["sigma_high_limit_values"], dtype=np.float64)
+    # Only the meaningful triples are reported, as (sigma_high_limit, sigma_low, sigma_high) indexes
+    valid_triples = np.argwhere((sigma_low_values[np.newaxis, :, np.newaxis] < sigma_high_values[np.newaxis, np.newaxis, :]) & (sigma_high_values[np.newaxis, np.newaxis, :] <= sigma_high_limit_values[:, np.newaxis, np.newaxis]))
+    if valid_triples.shape[0] == 0:
+        arcann_logger.error(f"No (sigma_low, sigma_high, sigma_high_limit) triple with sigma_low < sigma_high <= sigma_high_limit in the grid.")
+        arcann_logger.error(f"Aborting...")
+        return 1
+
+    sweep_json["systems_auto"] = {}
+    for system_auto_index, system_auto in enumerate(main_json["systems_auto"]):
+        system_json = exploration_json["systems_auto"][system_auto]
+        max_candidates, sigma_low, sigma_high, sigma_high_limit, ignore_first_x_ps = get_system_deviation(current_input_json, system_auto_index)
+
+        start_row_number = 0
+        while start_row_number * system_json["print_every_x_steps"] * system_json["timestep_ps"] < ignore_first_x_ps:
+            start_row_number = start_row_number + 1
+        if start_row_number > system_json["nb_steps"] // system_json["print_every_x_steps"]:
+            start_row_number = 0
+        nb_steps_expected = (system_json["nb_steps"] // system_json["print_every_x_steps"]) + 1 - start_row_number
+
+        # The counts of every trajectory for the whole grid, read once
+        trajectories_counts = []
+        for it_nnp in range(1, main_json["nnp_count"] + 1):
+            for it_number in range(1, system_json["traj_count"] + 1):
+                local_path = current_path / str(system_auto) / str(it_nnp) / str(it_number).zfill(5)
+                if (local_path / "skip").is_file():
+                    trajectory_counts = np.zeros((sigma_high_limit_values.shape[0], sigma_low_values.shape[0], sigma_high_values.shape[0], 3), dtype=np.int64)
+                    trajectory_counts[..., 2] = nb_steps_expected
+                else:
+                    if system_json["exploration_type"] == "sander_emle":
+                        max_devi_f = np.asarray(read_xyz_max_f_std(local_path / f"{system_auto}_{it_nnp}_{padded_curr_iter}_QM.xyz", current_input_json["cache_size_mb"]), dtype=np.float64)
+                    else:
+                        max_devi_f = read_model_deviation(local_path / f"model_devi_{system_auto}_{it_nnp}_{padded_curr_iter}.out")[:, 1]
+                    trajectory_counts = sweep_deviation_thresholds(
+                        max_devi_f,
+                        start_row_number,
+                        system_json["disturbed_start"],
+                        (local_path / "force").is_file(),
+                        nb_steps_expected,
+                        sigma_low_values,
+                        sigma_high_values,
+                        sigma_high_limit_values,
+                    )
+                    del max_devi_f
+                trajectories_counts.append(trajectory_counts)
+                del local_path, trajectory_counts
+            del it_number
+        del it_nnp
+        trajectories_counts = np.stack(trajectories_counts)
+
+        system_counts = trajectories_counts.sum(axis=0)
+        selected_counts = get_selected_counts(trajectories_counts[..., 1], max_candidates).sum(axis=0)
+
+        sweep_json["systems_auto"][system_auto] = []
+        arcann_logger.info(f"{system_auto} (max_candidates: {max_candidates}, * current thresholds)")
+        arcann_logger.info(f"  {'sigma_low':>10}{'sigma_high':>11}{'limit':>8}{'Good':>10}{'Candidates':>12}{'Rejected':>10}{'Factor':>8}{'Selected':>10}")
+        for limit_index, low_index, high_index in valid_triples:
+            good_count, candidates_count, rejected_count = (int(count) for count in system_counts[limit_index, low_index, high_index])
+            selection_factor = 1.0 if candidates_count <= max_candidates else max_candidates / candidates_count
+            sweep_json["systems_auto"][system_auto].append(
+                {
+                    "sigma_low": float(sigma_low_values[low_index]),
+                    "sigma_high": float(sigma_high_values[high_index]),
+                    "sigma_high_limit": float(sigma_high_limit_values[limit_index]),
+                    "good_count": good_count,
+                    "candidates_count": candidates_count,
+                    "rejected_count": rejected_count,
+                    "selection_factor": selection_factor,
+                    "selected_count": int(selected_counts[limit_index, low_index, high_index]),
+                }
+            )
+            is_current = (sigma_low_values[low_index], sigma_high_values[high_index], sigma_high_limit_values[limit_index]) == (sigma_low, sigma_high, sigma_high_limit)
+            arcann_logger.info(
+                f"{'*' if is_current else ' '} {sigma_low_values[low_index]:>10.3f}{sigma_high_values[high_index]:>11.3f}{sigma_high_limit_values[limit_index]:>8.3f}"
+                f"{good_count:>10}{candidates_count:>12}{rejected_count:>10}{selection_factor:>8.3f}{selected_counts[limit_index, low_index, high_index]:>10}"
+            )
+            del good_count, candidates_count, rejected_count, selection_factor, is_current
+        del limit_index, low_index, high_index
+        del system_json, max_candidates, sigma_low, sigma_high, sigma_high_limit, ignore_first_x_ps, start_row_number, nb_steps_expected
+        del trajectories_counts, system_counts, selected_counts
+    del system_auto_index, system_auto
+
+    # Dump the results
+    arcann_logger.info(f"-" * 88)
+    write_json_file(sweep_json, (current_path / "sweep.json"))
+
+    # End
+    arcann_logger.info(f"-" * 88)
+    arcann_logger.info(f"Step: {current_step.capitalize()} - Phase: {current_phase.capitalize()} is a success!")
+
+    # Cleaning
+    del current_path, control_path, training_path
+    del default_input_json, default_sweep_json, user_input_json, user_input_json_filename, current_input_json, sweep_json
+    del main_json, exploration_json, previous_exploration_json
+    del curr_iter, padded_curr_iter
+    del sigma_low_values, sigma_high_values, sigma_high_limit_values, valid_triples
+
+    arcann_logger.debug(f"LOCAL")
+    arcann_logger.debug(f"{locals()}")
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4:
+        main(
+            "exploration",
+            "sweep",
+            Path(sys.argv[1]),
+            fake_machine=sys.argv[2],
+            user_input_json_filename=sys.argv[3],
+        )
+    else:
+        pass
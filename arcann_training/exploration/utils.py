@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/17
+Last modified: 2026/10/18
 
 Functions
 ---------
@@ -28,6 +28,12 @@ generate_input_exploration_disturbed_json(user_input_json: Dict, previous_json:
 get_system_disturb(merged_input_json: Dict, system_auto_index: int) -> Tuple[Union[float, int], Union[float, int], List[int]]
     Return a tuple of system exploration parameters based on the input JSON and system index.
 
+get_disturb_seed(disturbed_seed: int = -1) -> int
+    Returns the seed of the disturbed structures (the 'disturbed_seed' input if set, or drawn from the OS entropy).
+
+disturb_atomic_coordinates(atomic_coordinates: np.ndarray, disturb_value: float, atom_indexes: List[int], rng: np.random.Generator) -> np.ndarray
+    Returns a disturbed copy of the coordinates of several structures (random displacements drawn in one call).
+
 generate_starting_points(exploration_type: int, system_auto: int, training_path: str, padded_prev_iter: str, previous_json: Dict, input_present: bool, disturbed_start: bool) -> Tuple[List[str], List[str], bool]
     Generates a list of starting point file names.
 
@@ -37,6 +43,87 @@ create_models_list(main_json: Dict, previous_json: Dict, it_nnp: int, padded_pre
 get_last_frame_number(model_deviation: np.ndarray, sigma_high_limit: float, disturbed_start: bool) -> int
     Returns the index of the last frame to be processed based on the given parameters.
 
+read_model_deviation(model_deviation_file_path: Path) -> np.ndarray
+    Reads the step and max_devi_f columns of a model deviation file (cached in a '<file>.npy' sidecar).
+
+get_minimum_deviation_index(model_deviation: np.ndarray, selected_indexes: np.ndarray) -> int
+    Returns the step of the selected frame with the lowest max_devi_f.
+
+tail_model_deviation(model_deviation_file_path: Path, offset: int) -> Tuple[np.ndarray, int]
+    Reads the step and max_devi_f columns of the complete rows written in a (growing) model deviation file after a byte offset.
+
+update_deviation_state(deviation_state: Dict, model_deviation: np.ndarray, is_final: bool = False) -> Dict
+    Updates the running deviation statistics of a trajectory with its next rows.
+
+get_deviation_state_stats(deviation_state: Dict) -> Tuple[float, float, float]
+    Returns the mean, the (streaming) median and the standard deviation of max_devi_f from a deviation state.
+
+update_model_deviation_state_file(model_deviation_file_path: Path, sigma_low: float, sigma_high: float, sigma_high_limit: float, start_row_number: int, disturbed_start: bool, is_final: bool = False) -> Dict
+    Updates the deviation state file of a (growing) model deviation file with its new rows.
+
+encode_index_intervals(indexes: np.ndarray, stride: int) -> np.ndarray
+    Encodes a sequence of steps as (first, last) intervals of consecutive steps.
+
+decode_index_intervals(intervals: np.ndarray, stride: int) -> np.ndarray
+    Decodes (first, last) intervals of consecutive steps back to the sequence of steps.
+
+write_qbc_store(qbc_store_path: Path, trajectories_qbc: Dict[Tuple[str, int, int], Tuple[Dict, Dict]]) -> None
+    Writes the Query-by-Committee stats and index sets of all the trajectories of an iteration in a single NPZ store.
+
+load_qbc_store(qbc_store_path: Path) -> Dict
+    Loads a Query-by-Committee store written by 'write_qbc_store'.
+
+get_qbc_stats(qbc_store: Dict, system_auto: str, it_nnp: int, it_number: int) -> Dict
+    Returns the Query-by-Committee stats of a trajectory from a store.
+
+get_qbc_indexes(qbc_store: Dict, system_auto: str, it_nnp: int, it_number: int, index_set: str) -> np.ndarray
+    Returns one index set (steps) of a trajectory from a store.
+
+sweep_deviation_thresholds(max_devi_f: np.ndarray, start_row_number: int, disturbed_start: bool, is_forced: bool, nb_steps_expected: int, sigma_low_values: List[float], sigma_high_values: List[float], sigma_high_limit_values: List[float]) -> np.ndarray
+    Returns the good/candidates/rejected counts of a trajectory for every (sigma_high_limit, sigma_low, sigma_high) of a grid.
+
+get_selected_counts(candidates_counts: np.ndarray, max_candidates: int) -> np.ndarray
+    Returns the number of candidates selected per trajectory of a system, as in the deviate phase.
+
+get_candidate_labeling_costs(labeling_json: Dict, systems_auto: List[str]) -> Optional[np.ndarray]
+    Returns the measured labeling cost of one candidate of each system, in core-hours.
+
+allocate_candidate_budget(candidate_costs: np.ndarray, candidate_caps: np.ndarray, budget: float) -> np.ndarray
+    Splits a labeling budget between the systems, as numbers of candidates.
+
+get_autocorrelation_time(values: np.ndarray, window_factor: float = 5.0) -> float
+    Returns the integrated autocorrelation time of a series, in rows.
+
+compute_pair_distance_histograms(atomic_coordinates: np.ndarray, cell_lengths: Optional[np.ndarray] = None, bin_count: int = 64, cutoff: Optional[float] = None) -> np.ndarray
+    Returns a structural descriptor per frame: the normalized cumulative histogram of its pair distances.
+
+select_candidates_linspace(candidate_indexes: np.ndarray, max_candidates_local: int) -> np.ndarray
+    Selects the candidates as linearly as possible along the trajectory, keeping the first and the last ones.
+
+select_candidates_farthest_point(candidate_indexes: np.ndarray, max_candidates_local: int, descriptors: np.ndarray) -> np.ndarray
+    Selects the candidates by farthest point sampling of their descriptors.
+
+select_candidates_decorrelated(candidate_indexes: np.ndarray, max_candidates_local: int, minimum_gap: int = 1) -> np.ndarray
+    Selects candidates at least minimum_gap steps apart, thinned with the linspace selector if there are still too many.
+
+select_candidates(candidate_indexes: np.ndarray, max_candidates_local: int, candidate_selector: str = "linspace", **selector_inputs) -> np.ndarray
+    Selects at most max_candidates_local candidates with one of the CANDIDATE_SELECTORS.
+
+get_structure_hashes(atom_types: np.ndarray, atomic_coordinates: np.ndarray, cell_lengths: Optional[np.ndarray] = None, resolution: float = 0.01) -> np.ndarray
+    Returns a hash per frame that does not depend on the order of the atoms of a same species nor on their periodic images.
+
+compute_structure_descriptors(atom_types: np.ndarray, atomic_coordinates: np.ndarray, cell_lengths: Optional[np.ndarray] = None, bin_count: int = 128, cutoff: float = 6.0) -> np.ndarray
+    Returns the descriptors used to find near-duplicates (pair distance histograms of all the atoms and of each species).
+
+get_nearest_descriptors(descriptors: np.ndarray, reference_descriptors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]
+    Returns, for each descriptor, the nearest reference descriptor and the distance to it.
+
+get_duplicate_leaders(descriptors: np.ndarray, tolerance: float) -> np.ndarray
+    Groups the near-duplicates of a set of frames, returning for each frame the index of the kept frame it duplicates.
+
+update_dataset_dedup_index(index_path: Path, data_path: Path, hash_resolution: float = 0.01, bin_count: int = 128, cutoff: float = 6.0) -> Dict[str, Dict[str, np.ndarray]]
+    Returns the hashes and the descriptors of the frames of every dataset of the data folder, updating the index incrementally.
+
 update_system_nb_steps_factor(previous_json: Dict, system_auto_index: int) -> int
     Calculates a ratio based on information from a dictionary and returns a multiplying factor for system_nb_steps.
 """
@@ -44,9 +131,12 @@ update_system_nb_steps_factor(previous_json: Dict, system_auto_index: int) -> in
 # TODO: Homogenize the docstrings for this module
 
 # Standard library modules
+import hashlib
+import json
+import os
 from pathlib import Path
 from copy import deepcopy
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 import subprocess
 
 # Third-party modules
@@ -54,7 +144,15 @@ import numpy as np
 
 # Local imports
 from arcann_training.common.utils import catch_errors_decorator
-from arcann_training.common.json import convert_control_to_input
+from arcann_training.common.json import convert_control_to_input, load_json_file, write_json_file
+
+# Number of bins of the max_devi_f histogram (from 0 to sigma_high_limit) giving the streaming median of the online deviation
+DEVIATION_STATE_HISTOGRAM_BINS = 1000
+# Name of the Query-by-Committee store of an exploration iteration, and its index sets ('<name>_indexes' in the QbC_indexes)
+QBC_STORE_FILENAME = "QbC_store.npz"
+QBC_INDEX_SETS = ("good", "rejected", "candidate", "selected", "discarded")
+# Number of pair distances computed at once for the pair distance histograms (bounds the memory used)
+PAIR_DISTANCE_CHUNK_SIZE = 2**20
 
 
 # TODO: Add tests for this function
@@ -307,9 +405,9 @@ def generate_input_exploration_deviation_json(
     KeyError
         If a key is not found in any of the JSON dictionaries.
     TypeError
-        If the value type is not int/float or bool (for disturbed_start).
+        If the value type is not int/float (str for candidate_selector).
     ValueError
-        If the length of the value list is not equal to the system count.
+        If the length of the value list is not equal to the system count, or if a candidate selector is unknown.
     """
 
     system_count = len(main_json.get("systems_auto", []))
@@ -322,7 +420,11 @@ def generate_input_exploration_deviation_json(
         "sigma_high",
         "sigma_high_limit",
         "ignore_first_x_ps",
+        "candidate_selector",
     ]:
+        # The selector is a name, the others are numbers
+        value_types = (str,) if key == "candidate_selector" else (int, float)
+
         # Get the value
         default_used = False
         if key in user_input_json:
@@ -351,21 +453,39 @@ def generate_input_exploration_deviation_json(
             if isinstance(value, List):
                 if len(value) == system_count:
                     for it_value in value:
-                        if isinstance(it_value, (int, float)):
+                        if isinstance(it_value, value_types):
                             merged_input_json[key].append(it_value)
                         else:
-                            error_msg = f"Type mismatch: the type is '{type(it_value)}', but it should be '{type(1)}' or '{type(1.0)}'"
+                            error_msg = f"Type mismatch: the type is '{type(it_value)}', but it should be one of '{value_types}'"
                             raise TypeError(error_msg)
                 else:
                     error_msg = f"Size mismatch: The length of the list should be '{system_count}' corresponding to the number of systems."
                     raise ValueError(error_msg)
 
             # If it is not a List
-            elif isinstance(value, (int, float)):
+            elif isinstance(value, value_types):
                 merged_input_json[key] = [value] * system_count
             else:
                 error_msg = f"Type mismatch: the type is '{type(it_value)}', but it should be '{type(1)}' or '{type(1.0)}'"
                 raise TypeError(error_msg)
+        if key == "candidate_selector" and any(candidate_selector not in CANDIDATE_SELECTORS for candidate_selector in merged_input_json[key]):
+            error_msg = f"Unknown candidate selector in '{merged_input_json[key]}', expected one of: {list(CANDIDATE_SELECTORS)}"
+            raise ValueError(error_msg)
+
+    # The disk budget of the binary cache of the iteration, not system dependent (0 disables the cache)
+    if "cache_size_mb" in user_input_json and user_input_json["cache_size_mb"] != "default":
+        value = user_input_json["cache_size_mb"]
+    elif "cache_size_mb" in previous_json:
+        value = previous_json["cache_size_mb"]
+    elif "cache_size_mb" in default_input_json:
+        value = default_input_json["cache_size_mb"]
+    else:
+        error_msg = f"'cache_size_mb' not found in any of the JSON dictionaries"
+        raise KeyError(error_msg)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        error_msg = f"Type mismatch: the type is '{type(value)}', but it should be '{type(1)}' or '{type(1.0)}'."
+        raise TypeError(error_msg)
+    merged_input_json["cache_size_mb"] = value
     return merged_input_json
 
 
@@ -539,6 +659,36 @@ def generate_input_exploration_disturbed_json(
             else:
                 error_msg = f"Type mismatch: the type is '{type(it_value)}', but it should be '{type(1)}' or '{type(1.0)}'"
                 raise TypeError(error_msg)
+
+    # One seed for all the systems, not system dependent (-1 draws a new seed at each extraction)
+    if "disturbed_seed" in user_input_json and user_input_json["disturbed_seed"] != "default":
+        value = user_input_json["disturbed_seed"]
+    elif "disturbed_seed" in previous_json:
+        value = previous_json["disturbed_seed"]
+    elif "disturbed_seed" in default_input_json:
+        value = default_input_json["disturbed_seed"]
+    else:
+        error_msg = f"'disturbed_seed' not found in any of the JSON dictionaries"
+        raise KeyError(error_msg)
+    if isinstance(value, bool) or not isinstance(value, int):
+        error_msg = f"Type mismatch: the type is '{type(value)}', but it should be '{type(1)}'."
+        raise TypeError(error_msg)
+    merged_input_json["disturbed_seed"] = value
+
+    # The disk budget of the binary cache of the iteration, not system dependent (0 disables the cache)
+    if "cache_size_mb" in user_input_json and user_input_json["cache_size_mb"] != "default":
+        value = user_input_json["cache_size_mb"]
+    elif "cache_size_mb" in previous_json:
+        value = previous_json["cache_size_mb"]
+    elif "cache_size_mb" in default_input_json:
+        value = default_input_json["cache_size_mb"]
+    else:
+        error_msg = f"'cache_size_mb' not found in any of the JSON dictionaries"
+        raise KeyError(error_msg)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        error_msg = f"Type mismatch: the type is '{type(value)}', but it should be '{type(1)}' or '{type(1.0)}'."
+        raise TypeError(error_msg)
+    merged_input_json["cache_size_mb"] = value
     return merged_input_json
 
 
@@ -578,6 +728,78 @@ def get_system_disturb(merged_input_json: Dict, system_auto_index: int) -> Tuple
     return tuple(system_values)
 
 
+# Unittested
+@catch_errors_decorator
+def get_disturb_seed(disturbed_seed: int = -1) -> int:
+    """
+    Returns the seed of the disturbed structures: the 'disturbed_seed' input if set (to reproduce a previous extraction
+    with the seed recorded in its exploration JSON), otherwise a seed drawn from the OS entropy.
+
+    Parameters
+    ----------
+    disturbed_seed : int, optional
+        The 'disturbed_seed' input, -1 (default) to draw a new seed.
+
+    Returns
+    -------
+    int
+        The seed (a non-negative integer).
+
+    Raises
+    ------
+    ValueError
+        If 'disturbed_seed' is neither -1 nor a non-negative integer.
+    """
+    if disturbed_seed < -1:
+        error_msg = f"'disturbed_seed' must be -1 or a non-negative integer, not '{disturbed_seed}'."
+        raise ValueError(error_msg)
+    if disturbed_seed >= 0:
+        return int(disturbed_seed)
+    return int(np.random.SeedSequence().generate_state(1)[0])
+
+
+# Unittested
+@catch_errors_decorator
+def disturb_atomic_coordinates(atomic_coordinates: np.ndarray, disturb_value: float, atom_indexes: List[int], rng: np.random.Generator) -> np.ndarray:
+    """
+    Returns a disturbed copy of the coordinates of several structures: each selected atom of each structure is translated
+    by its own random vector, with components drawn uniformly in [-disturb_value, disturb_value] (Å).
+    The displacements of all the structures are drawn in one call.
+
+    Parameters
+    ----------
+    atomic_coordinates : np.ndarray
+        The atomic coordinates, of shape (structure_count, atom_count, 3).
+    disturb_value : float
+        The maximal amplitude of each component of the displacements.
+    atom_indexes : List[int]
+        The (zero-based) indexes of the atoms to disturb. All the atoms are disturbed if empty.
+    rng : np.random.Generator
+        The random generator (seeded by the caller).
+
+    Returns
+    -------
+    np.ndarray
+        The disturbed atomic coordinates, of shape (structure_count, atom_count, 3).
+
+    Raises
+    ------
+    IndexError
+        If an atom index is out of range.
+    """
+    disturbed_coordinates = np.array(atomic_coordinates, dtype=np.float64)
+    if not atom_indexes:
+        disturbed_coordinates += rng.uniform(-disturb_value, disturb_value, size=disturbed_coordinates.shape)
+        return disturbed_coordinates
+
+    atom_indexes = np.unique(np.asarray(atom_indexes, dtype=np.int64))
+    if atom_indexes[0] < 0 or atom_indexes[-1] >= disturbed_coordinates.shape[1]:
+        error_msg = f"Atom indexes out of range: {atom_indexes.tolist()} (atom count: {disturbed_coordinates.shape[1]})."
+        raise IndexError(error_msg)
+    disturbed_coordinates[:, atom_indexes] += rng.uniform(-disturb_value, disturb_value, size=(disturbed_coordinates.shape[0], atom_indexes.shape[0], 3))
+    return disturbed_coordinates
+
+
 # TODO: Add tests for this function
 @catch_errors_decorator
 def generate_starting_points(
@@ -748,7 +970,7 @@ def get_last_frame_number(model_deviation: np.ndarray, sigma_high_limit: float,
     else:
         start_frame = 0
     if model_deviation.shape[1] == 2:
-        if np.any(model_deviation[start_frame: 1] >= sigma_high_limit):
+        if np.any(model_deviation[start_frame:, 1] >= sigma_high_limit):
             last_frame = np.argmax(model_deviation[start_frame:, 1] >= sigma_high_limit)
         else:
             last_frame = -1
@@ -761,6 +983,1312 @@ def get_last_frame_number(model_deviation: np.ndarray, sigma_high_limit: float,
     return last_frame
 
 
+# Unittested
+@catch_errors_decorator
+def read_model_deviation(model_deviation_file_path: Path) -> np.ndarray:
+    """
+    Reads the step (column 0) and max_devi_f (column 4) columns of a DeePMD model deviation file ('model_devi_*.out').
+
+    Only these two columns are parsed (C parser of np.loadtxt). The result is saved in a '<file>.npy' sidecar, after the
+    size and the modification time (ns) of the file, so the next reads of an unchanged file skip the parsing.
+
+    Parameters
+    ----------
+    model_deviation_file_path : Path
+        The path to the model deviation file.
+
+    Returns
+    -------
+    np.ndarray
+        A (nb_rows, 2) float64 array: the step and the max_devi_f of each row.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the model deviation file does not exist.
+    """
+    if not model_deviation_file_path.is_file():
+        error_msg = f"File not found: {model_deviation_file_path}"
+        raise FileNotFoundError(error_msg)
+
+    model_deviation = _load_model_deviation_sidecar(model_deviation_file_path)
+    if model_deviation is not None:
+        return model_deviation
+
+    with model_deviation_file_path.open("r") as model_deviation_file:
+        model_deviation = np.loadtxt(model_deviation_file, usecols=(0, 4), comments="#", ndmin=2, dtype=np.float64)
+    _save_model_deviation_sidecar(model_deviation_file_path, model_deviation)
+
+    return model_deviation
+
+
+# Unittested
+@catch_errors_decorator
+def get_minimum_deviation_index(model_deviation: np.ndarray, selected_indexes: np.ndarray) -> int:
+    """
+    Returns the step of the selected frame with the lowest max_devi_f (the first one in the selection order for ties).
+
+    The steps are looked up at once with np.searchsorted on the step column (sorted first if needed), then the
+    deviations of the selected frames are gathered for a single np.argmin.
+
+    Parameters
+    ----------
+    model_deviation : np.ndarray
+        A (nb_rows, 2) array of (step, max_devi_f) rows, with unique steps.
+    selected_indexes : np.ndarray
+        The steps of the selected frames (not empty).
+
+    Returns
+    -------
+    int
+        The step of the selected frame with the lowest max_devi_f.
+
+    Raises
+    ------
+    ValueError
+        If there is no selected frame or if a selected step is not in the model deviation.
+    """
+    selected_indexes = np.asarray(selected_indexes)
+    if selected_indexes.size == 0:
+        error_msg = "No selected frame to get the minimum deviation from."
+        raise ValueError(error_msg)
+
+    steps = model_deviation[:, 0]
+    deviations = model_deviation[:, 1]
+    if np.any(steps[1:] < steps[:-1]):
+        order = np.argsort(steps, kind="stable")
+        steps = steps[order]
+        deviations = deviations[order]
+
+    positions = np.searchsorted(steps, selected_indexes)
+    positions_in_range = np.minimum(positions, steps.shape[0] - 1)
+    if steps.shape[0] == 0 or np.any(steps[positions_in_range] != selected_indexes):
+        error_msg = "Some selected steps are not in the model deviation."
+        raise ValueError(error_msg)
+
+    return int(selected_indexes[np.argmin(deviations[positions])])
+
+
+# Unittested
+@catch_errors_decorator
+def tail_model_deviation(model_deviation_file_path: Path, offset: int) -> Tuple[np.ndarray, int]:
+    """
+    Reads the step (column 0) and max_devi_f (column 4) columns of the rows written in a (growing) DeePMD model deviation
+    file after a byte offset.
+
+    Only the complete lines are read (a line still being written is left for the next call) and the comment lines are
+    skipped, so successive calls give the same rows as 'read_model_deviation' on the whole file.
+
+    Parameters
+    ----------
+    model_deviation_file_path : Path
+        The path to the model deviation file.
+    offset : int
+        The byte offset to start from (0 for the first call, then the offset returned by the previous call).
+
+    Returns
+    -------
+    Tuple[np.ndarray, int]
+        A (nb_new_rows, 2) float64 array of (step, max_devi_f) rows, and the byte offset after the last complete line.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the model deviation file does not exist.
+    ValueError
+        If the offset is after the end of the file (the file was rewritten).
+    """
+    if not model_deviation_file_path.is_file():
+        error_msg = f"File not found: {model_deviation_file_path}"
+        raise FileNotFoundError(error_msg)
+
+    with model_deviation_file_path.open("rb") as model_deviation_file:
+        model_deviation_file.seek(0, os.SEEK_END)
+        file_size = model_deviation_file.tell()
+        if offset > file_size:
+            error_msg = f"The offset ({offset}) is after the end of the file ({file_size}): {model_deviation_file_path}"
+            raise ValueError(error_msg)
+        model_deviation_file.seek(offset)
+        chunk = model_deviation_file.read(file_size - offset)
+
+    last_newline = chunk.rfind(b"\n")
+    if last_newline < 0:
+        return np.empty((0, 2), dtype=np.float64), offset
+
+    lines = [line for line in chunk[: last_newline + 1].decode().splitlines() if line.strip() and not line.lstrip().startswith("#")]
+    if not lines:
+        return np.empty((0, 2), dtype=np.float64), offset + last_newline + 1
+
+    return np.loadtxt(lines, usecols=(0, 4), ndmin=2, dtype=np.float64), offset + last_newline + 1
+
+
+# Unittested
+@catch_errors_decorator
+def update_deviation_state(deviation_state: Dict, model_deviation: np.ndarray, is_final: bool = False) -> Dict:
+    """
+    Updates the running deviation statistics of a trajectory with its next rows, with the split of the deviate phase.
+
+    The rows from 'start_row_number' to the first crossing of 'sigma_high_limit' are counted as good, candidates or
+    rejected, and their max_devi_f are added to the Welford mean/variance (merged per chunk) and to a histogram from 0
+    to sigma_high_limit (streaming median). The rows after the crossing are rejected. As in 'get_last_frame_number', a
+    disturbed start ends the statistics one row before the crossing, so the last row is kept pending until the next
+    rows (or the final update) tell whether it is part of them.
+
+    Parameters
+    ----------
+    deviation_state : Dict
+        The deviation state of the trajectory (from 'update_model_deviation_state_file'), updated in place.
+    model_deviation : np.ndarray
+        The next (nb_new_rows, 2) rows of (step, max_devi_f).
+    is_final : bool, optional
+        If True, the trajectory is complete and the pending rows are added to the statistics. Default is False.
+
+    Returns
+    -------
+    Dict
+        The updated deviation state.
+    """
+    start_frame = 1 if deviation_state["disturbed_start"] else 0
+    start_row_number = deviation_state["start_row_number"]
+    sigma_high_limit = deviation_state["sigma_high_limit"]
+
+    pending = np.asarray(deviation_state["pending"], dtype=np.float64).reshape(-1, 2)
+    first_row_number = deviation_state["row_count"] - pending.shape[0]
+    rows = np.vstack((pending, model_deviation))
+    row_numbers = np.arange(first_row_number, first_row_number + rows.shape[0])
+    deviation_state["row_count"] = deviation_state["row_count"] + model_deviation.shape[0]
+
+    # The rows kept for the statistics are the ones before commit_row_number
+    if deviation_state["end_row_number"] < 0:
+        new_row_numbers = row_numbers[pending.shape[0] :]
+        crossing = (new_row_numbers >= start_frame) & (model_deviation[:, 1] >= sigma_high_limit)
+        if np.any(crossing):
+            deviation_state["end_row_number"] = int(new_row_numbers[np.argmax(crossing)]) - start_frame
+            commit_row_number = deviation_state["end_row_number"]
+        elif is_final:
+            commit_row_number = deviation_state["row_count"]
+        else:
+            commit_row_number = deviation_state["row_count"] - start_frame
+    else:
+        commit_row_number = first_row_number
+
+    committed = row_numbers < commit_row_number
+    values = rows[committed & (row_numbers >= start_row_number), 1]
+    deviation_state["good_count"] = deviation_state["good_count"] + int(np.count_nonzero(values <= deviation_state["sigma_low"]))
+    deviation_state["rejected_count"] = deviation_state["rejected_count"] + int(np.count_nonzero(values >= deviation_state["sigma_high"]))
+    deviation_state["candidates_count"] = deviation_state["candidates_count"] + int(np.count_nonzero((values > deviation_state["sigma_low"]) & (values < deviation_state["sigma_high"])))
+
+    if values.size > 0:
+        # Welford, with the chunk merged at once (Chan et al.)
+        chunk_mean = float(np.mean(values))
+        chunk_m2 = float(np.sum((values - chunk_mean) ** 2))
+        count = deviation_state["count"] + values.size
+        delta = chunk_mean - deviation_state["mean"]
+        deviation_state["mean"] = deviation_state["mean"] + delta * values.size / count
+        deviation_state["m2"] = deviation_state["m2"] + chunk_m2 + delta**2 * deviation_state["count"] * values.size / count
+        deviation_state["count"] = count
+        bins = np.clip((values / sigma_high_limit * DEVIATION_STATE_HISTOGRAM_BINS).astype(np.int64), 0, DEVIATION_STATE_HISTOGRAM_BINS - 1)
+        deviation_state["histogram"] = (np.asarray(deviation_state["histogram"], dtype=np.int64) + np.bincount(bins, minlength=DEVIATION_STATE_HISTOGRAM_BINS)).tolist()
+
+    if deviation_state["end_row_number"] >= 0:
+        # Everything after the crossing is rejected
+        deviation_state["rejected_count"] = deviation_state["rejected_count"] + int(np.count_nonzero(~committed & (row_numbers >= start_row_number)))
+        deviation_state["pending"] = []
+    else:
+        deviation_state["pending"] = rows[~committed].tolist()
+
+    return deviation_state
+
+
+# Unittested
+@catch_errors_decorator
+def get_deviation_state_stats(deviation_state: Dict) -> Tuple[float, float, float]:
+    """
+    Returns the mean, the median and the standard deviation of max_devi_f from a deviation state.
+
+    The median is the mean of the centers of the histogram bins holding the two middle rows, so it is within half a bin
+    (sigma_high_limit / (2 * DEVIATION_STATE_HISTOGRAM_BINS)) of the exact one.
+
+    Parameters
+    ----------
+    deviation_state : Dict
+        The deviation state of the trajectory.
+
+    Returns
+    -------
+    Tuple[float, float, float]
+        The mean, the median and the standard deviation (999.0 each, as in the deviate phase, if there are no rows).
+    """
+    if deviation_state["count"] == 0:
+        return 999.0, 999.0, 999.0
+
+    cumulative_histogram = np.cumsum(np.asarray(deviation_state["histogram"], dtype=np.int64))
+    middle_ranks = np.array([(deviation_state["count"] - 1) // 2, deviation_state["count"] // 2])
+    middle_bins = np.searchsorted(cumulative_histogram, middle_ranks, side="right")
+    median = (np.mean(middle_bins) + 0.5) * deviation_state["sigma_high_limit"] / DEVIATION_STATE_HISTOGRAM_BINS
+
+    return deviation_state["mean"], float(median), float(np.sqrt(deviation_state["m2"] / deviation_state["count"]))
+
+
+# Unittested
+@catch_errors_decorator
+def update_model_deviation_state_file(
+    model_deviation_file_path: Path,
+    sigma_low: float,
+    sigma_high: float,
+    sigma_high_limit: float,
+    start_row_number: int,
+    disturbed_start: bool,
+    is_final: bool = False,
+) -> Dict:
+    """
+    Updates the deviation state of a (growing) model deviation file with the rows written since the last update.
+
+    The state is kept in a '<file>.state.json' file (byte offset, running statistics and counts), and the rows read so
+    far are appended to a '<file>.rows' binary file. The state starts over if the deviation parameters changed or if the
+    file was rewritten. The final update (once the trajectory is complete) writes the '<file>.npy' sidecar of
+    'read_model_deviation' from the rows, so the deviate phase does not parse the file again.
+
+    Parameters
+    ----------
+    model_deviation_file_path : Path
+        The path to the model deviation file.
+    sigma_low : float
+        The lower deviation threshold.
+    sigma_high : float
+        The upper deviation threshold.
+    sigma_high_limit : float
+        The deviation limit ending the statistics of the trajectory.
+    start_row_number : int
+        The number of rows ignored at the start of the trajectory.
+    disturbed_start : bool
+        If the trajectory starts from a disturbed structure.
+    is_final : bool, optional
+        If True, the trajectory is complete (the exploration was checked). Default is False.
+
+    Returns
+    -------
+    Dict
+        The deviation state.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the model deviation file does not exist.
+    """
+    if not model_deviation_file_path.is_file():
+        error_msg = f"File not found: {model_deviation_file_path}"
+        raise FileNotFoundError(error_msg)
+
+    state_path = model_deviation_file_path.with_name(f"{model_deviation_file_path.name}.state.json")
+    rows_path = model_deviation_file_path.with_name(f"{model_deviation_file_path.name}.rows")
+    file_size = model_deviation_file_path.stat().st_size
+    deviation_parameters = {
+        "sigma_low": sigma_low,
+        "sigma_high": sigma_high,
+        "sigma_high_limit": sigma_high_limit,
+        "start_row_number": start_row_number,
+        "disturbed_start": disturbed_start,
+    }
+
+    deviation_state = load_json_file(state_path, abort_on_error=False, enable_logging=False)
+    if deviation_state and all(deviation_state.get(key) == value for key, value in deviation_parameters.items()):
+        if deviation_state["is_final"] and deviation_state["offset"] == file_size:
+            return deviation_state
+        is_valid = not deviation_state["is_final"] and deviation_state["offset"] <= file_size and rows_path.is_file() and rows_path.stat().st_size == deviation_state["row_count"] * 16
+    else:
+        is_valid = False
+    if not is_valid:
+        deviation_state = {
+            **deviation_parameters,
+            "offset": 0,
+            "row_count": 0,
+            "pending": [],
+            "end_row_number": -1,
+            "count": 0,
+            "mean": 0.0,
+            "m2": 0.0,
+            "histogram": [0] * DEVIATION_STATE_HISTOGRAM_BINS,
+            "good_count": 0,
+            "rejected_count": 0,
+            "candidates_count": 0,
+            "is_final": False,
+        }
+        rows_path.write_bytes(b"")
+
+    model_deviation, deviation_state["offset"] = tail_model_deviation(model_deviation_file_path, deviation_state["offset"])
+    with rows_path.open("ab") as rows_file:
+        model_deviation.astype(np.float64).tofile(rows_file)
+
+    # Only a complete file can be finalized (the last line is written)
+    is_final = is_final and deviation_state["offset"] == file_size
+    update_deviation_state(deviation_state, model_deviation, is_final=is_final)
+    if is_final:
+        with rows_path.open("rb") as rows_file:
+            _save_model_deviation_sidecar(model_deviation_file_path, np.fromfile(rows_file, dtype=np.float64).reshape(-1, 2))
+        rows_path.unlink()
+        deviation_state["is_final"] = True
+    write_json_file(deviation_state, state_path, enable_logging=False)
+
+    return deviation_state
+
+
+# Unittested
+@catch_errors_decorator
+def encode_index_intervals(indexes: np.ndarray, stride: int) -> np.ndarray:
+    """
+    Encodes a sequence of steps as (first, last) intervals, each one holding consecutive steps (spaced by the stride).
+
+    The order of the sequence is kept, so any sequence is decoded back exactly (unsorted or sparse ones just give more
+    intervals).
+
+    Parameters
+    ----------
+    indexes : np.ndarray
+        The sequence of steps (integers).
+    stride : int
+        The spacing of consecutive steps (the print frequency of the trajectory).
+
+    Returns
+    -------
+    np.ndarray
+        A (nb_intervals, 2) int64 array of inclusive (first, last) steps.
+    """
+    indexes = np.asarray(indexes, dtype=np.int64).reshape(-1)
+    if indexes.size == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    breaks = np.flatnonzero(np.diff(indexes) != stride)
+    return np.column_stack((indexes[np.concatenate(([0], breaks + 1))], indexes[np.concatenate((breaks, [indexes.size - 1]))]))
+
+
+# Unittested
+@catch_errors_decorator
+def decode_index_intervals(intervals: np.ndarray, stride: int) -> np.ndarray:
+    """
+    Decodes (first, last) intervals of consecutive steps (spaced by the stride) back to the sequence of steps.
+
+    Parameters
+    ----------
+    intervals : np.ndarray
+        A (nb_intervals, 2) array of inclusive (first, last) steps, from 'encode_index_intervals'.
+    stride : int
+        The spacing of consecutive steps used for the encoding.
+
+    Returns
+    -------
+    np.ndarray
+        The int64 sequence of steps.
+    """
+    intervals = np.asarray(intervals, dtype=np.int64).reshape(-1, 2)
+    counts = (intervals[:, 1] - intervals[:, 0]) // stride + 1
+    positions = np.arange(np.sum(counts)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(intervals[:, 0], counts) + stride * positions
+
+
+# Unittested
+@catch_errors_decorator
+def write_qbc_store(qbc_store_path: Path, trajectories_qbc: Dict[Tuple[str, int, int], Tuple[Dict, Dict]]) -> None:
+    """
+    Writes the Query-by-Committee stats and index sets of all the trajectories of an iteration in a single NPZ store.
+
+    The stats are stored as one JSON string. Each index set is stored as the (first, last) intervals of all the
+    trajectories one after the other, with the offsets of each trajectory, and the stride of each trajectory is the
+    smallest spacing of its steps. The store is written to a temporary file first, then renamed.
+
+    Parameters
+    ----------
+    qbc_store_path : Path
+        The path to the store (usually 'NNN-exploration/QbC_store.npz').
+    trajectories_qbc : Dict[Tuple[str, int, int], Tuple[Dict, Dict]]
+        The (QbC_stats, QbC_indexes) of each (system_auto, it_nnp, it_number) trajectory, the QbC_indexes with the
+        '<index_set>_indexes' lists of QBC_INDEX_SETS (a missing one is stored empty).
+
+    Returns
+    -------
+    None
+    """
+    trajectory_keys = list(trajectories_qbc)
+    strides = np.ones(len(trajectory_keys), dtype=np.int64)
+    intervals = {index_set: [] for index_set in QBC_INDEX_SETS}
+    for trajectory_index, trajectory_key in enumerate(trajectory_keys):
+        QbC_indexes = trajectories_qbc[trajectory_key][1]
+        indexes = {index_set: np.asarray(QbC_indexes.get(f"{index_set}_indexes", []), dtype=np.int64) for index_set in QBC_INDEX_SETS}
+        steps = np.unique(np.concatenate(list(indexes.values())))
+        if steps.size > 1:
+            strides[trajectory_index] = max(int(np.min(np.diff(steps))), 1)
+        for index_set in QBC_INDEX_SETS:
+            intervals[index_set].append(encode_index_intervals(indexes[index_set], strides[trajectory_index]))
+
+    qbc_store = {
+        "trajectory_keys": np.array([f"{system_auto}/{it_nnp}/{it_number}" for system_auto, it_nnp, it_number in trajectory_keys], dtype=str),
+        "stats": np.array(json.dumps([trajectories_qbc[trajectory_key][0] for trajectory_key in trajectory_keys])),
+        "strides": strides,
+    }
+    for index_set in QBC_INDEX_SETS:
+        qbc_store[f"{index_set}_intervals"] = np.concatenate(intervals[index_set]) if intervals[index_set] else np.empty((0, 2), dtype=np.int64)
+        qbc_store[f"{index_set}_offsets"] = np.concatenate(([0], np.cumsum([trajectory_intervals.shape[0] for trajectory_intervals in intervals[index_set]], dtype=np.int64)))
+
+    temporary_path = qbc_store_path.with_name(f".{qbc_store_path.name}.tmp")
+    with temporary_path.open("wb") as qbc_store_file:
+        np.savez_compressed(qbc_store_file, **qbc_store)
+    temporary_path.replace(qbc_store_path)
+
+
+# Unittested
+@catch_errors_decorator
+def load_qbc_store(qbc_store_path: Path) -> Dict:
+    """
+    Loads a Query-by-Committee store written by 'write_qbc_store' (to use with 'get_qbc_stats' and 'get_qbc_indexes').
+
+    Parameters
+    ----------
+    qbc_store_path : Path
+        The path to the store.
+
+    Returns
+    -------
+    Dict
+        The arrays of the store, with the stats decoded and the index of each (system_auto, it_nnp, it_number) key.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the store does not exist.
+    """
+    if not qbc_store_path.is_file():
+        error_msg = f"File not found: {qbc_store_path}"
+        raise FileNotFoundError(error_msg)
+
+    with qbc_store_path.open("rb") as qbc_store_file, np.load(qbc_store_file) as qbc_store_npz:
+        qbc_store = {key: qbc_store_npz[key] for key in qbc_store_npz.files}
+    qbc_store["stats"] = json.loads(str(qbc_store["stats"]))
+    qbc_store["trajectory_indexes"] = {}
+    for trajectory_index, trajectory_key in enumerate(qbc_store["trajectory_keys"]):
+        system_auto, it_nnp, it_number = str(trajectory_key).rsplit("/", 2)
+        qbc_store["trajectory_indexes"][(system_auto, int(it_nnp), int(it_number))] = trajectory_index
+
+    return qbc_store
+
+
+# Unittested
+@catch_errors_decorator
+def get_qbc_stats(qbc_store: Dict, system_auto: str, it_nnp: int, it_number: int) -> Dict:
+    """
+    Returns the Query-by-Committee stats of a trajectory (the content of its former 'QbC_stats.json').
+
+    Parameters
+    ----------
+    qbc_store : Dict
+        The store, from 'load_qbc_store'.
+    system_auto : str
+        The name of the system.
+    it_nnp : int
+        The NNP number of the trajectory.
+    it_number : int
+        The number of the trajectory.
+
+    Returns
+    -------
+    Dict
+        The stats of the trajectory.
+
+    Raises
+    ------
+    KeyError
+        If the trajectory is not in the store.
+    """
+    return qbc_store["stats"][qbc_store["trajectory_indexes"][(system_auto, it_nnp, it_number)]]
+
+
+# Unittested
+@catch_errors_decorator
+def get_qbc_indexes(qbc_store: Dict, system_auto: str, it_nnp: int, it_number: int, index_set: str) -> np.ndarray:
+    """
+    Returns one index set of a trajectory (the '<index_set>_indexes' list of its former 'QbC_indexes.json').
+
+    Parameters
+    ----------
+    qbc_store : Dict
+        The store, from 'load_qbc_store'.
+    system_auto : str
+        The name of the system.
+    it_nnp : int
+        The NNP number of the trajectory.
+    it_number : int
+        The number of the trajectory.
+    index_set : str
+        One of QBC_INDEX_SETS ('good', 'rejected', 'candidate', 'selected' or 'discarded').
+
+    Returns
+    -------
+    np.ndarray
+        The int64 steps of the index set, in their original order.
+
+    Raises
+    ------
+    KeyError
+        If the trajectory is not in the store.
+    ValueError
+        If the index set is unknown.
+    """
+    if index_set not in QBC_INDEX_SETS:
+        error_msg = f"Unknown index set '{index_set}', expected one of: {QBC_INDEX_SETS}"
+        raise ValueError(error_msg)
+    trajectory_index = qbc_store["trajectory_indexes"][(system_auto, it_nnp, it_number)]
+    offsets = qbc_store[f"{index_set}_offsets"]
+    intervals = qbc_store[f"{index_set}_intervals"][offsets[trajectory_index] : offsets[trajectory_index + 1]]
+    return decode_index_intervals(intervals, int(qbc_store["strides"][trajectory_index]))
+
+
+# Unittested
+@catch_errors_decorator
+def sweep_deviation_thresholds(
+    max_devi_f: np.ndarray,
+    start_row_number: int,
+    disturbed_start: bool,
+    is_forced: bool,
+    nb_steps_expected: int,
+    sigma_low_values: List[float],
+    sigma_high_values: List[float],
+    sigma_high_limit_values: List[float],
+) -> np.ndarray:
+    """
+    Returns the good/candidates/rejected counts of a trajectory for every (sigma_high_limit, sigma_low, sigma_high) of a
+    grid, with the split of the deviate phase.
+
+    The first crossing of every sigma_high_limit is found at once with np.searchsorted in the running maximum of
+    max_devi_f. For each of them, the statistics window is sorted once and the counts of every sigma_low and sigma_high
+    are given by np.searchsorted. The grid should only hold sigma_low < sigma_high (other triples are meaningless).
+
+    Parameters
+    ----------
+    max_devi_f : np.ndarray
+        The max_devi_f of each row of the trajectory.
+    start_row_number : int
+        The number of rows ignored at the start of the trajectory.
+    disturbed_start : bool
+        If the trajectory starts from a disturbed structure (its first row does not end the statistics).
+    is_forced : bool
+        If the trajectory was forced (the statistics end one row earlier).
+    nb_steps_expected : int
+        The expected number of rows after start_row_number (the missing ones are rejected).
+    sigma_low_values : List[float]
+        The sigma_low values of the grid.
+    sigma_high_values : List[float]
+        The sigma_high values of the grid.
+    sigma_high_limit_values : List[float]
+        The sigma_high_limit values of the grid.
+
+    Returns
+    -------
+    np.ndarray
+        A (nb_sigma_high_limit, nb_sigma_low, nb_sigma_high, 3) int64 array of (good, candidates, rejected) counts.
+    """
+    start_frame = 1 if disturbed_start else 0
+    row_count = max_devi_f.shape[0]
+    sigma_low_values = np.asarray(sigma_low_values, dtype=np.float64)
+    sigma_high_values = np.asarray(sigma_high_values, dtype=np.float64)
+
+    # First crossing of each limit (as in get_last_frame_number, relative to start_frame)
+    running_maximum = np.maximum.accumulate(max_devi_f[start_frame:]) if row_count > start_frame else np.empty(0)
+    first_crossings = np.searchsorted(running_maximum, np.asarray(sigma_high_limit_values, dtype=np.float64), side="left")
+    end_row_numbers = np.where(first_crossings < running_maximum.shape[0], first_crossings, -1)
+    if is_forced:
+        end_row_numbers = end_row_numbers - 1
+
+    counts = np.zeros((end_row_numbers.shape[0], sigma_low_values.shape[0], sigma_high_values.shape[0], 3), dtype=np.int64)
+    for limit_index, end_row_number in enumerate(end_row_numbers):
+        # Never crossed, crossed during the ignored rows (all rejected), or crossed after them
+        if end_row_number < 0:
+            window = max_devi_f[start_row_number:]
+            rejected_after_count = 0
+        elif end_row_number <= start_row_number:
+            window = max_devi_f[:0]
+            rejected_after_count = max(row_count - start_row_number, 0)
+        else:
+            window = max_devi_f[start_row_number:end_row_number]
+            rejected_after_count = row_count - end_row_number
+        sorted_window = np.sort(window)
+        good_counts = np.searchsorted(sorted_window, sigma_low_values, side="right")
+        below_high_counts = np.searchsorted(sorted_window, sigma_high_values, side="left")
+        counts[limit_index, :, :, 0] = good_counts[:, np.newaxis]
+        counts[limit_index, :, :, 1] = np.maximum(below_high_counts[np.newaxis, :] - good_counts[:, np.newaxis], 0)
+        counts[limit_index, :, :, 2] = (sorted_window.shape[0] - below_high_counts)[np.newaxis, :] + rejected_after_count
+
+    # If the trajectory is smaller than expected (forced case) the missing rows are rejected
+    counts[..., 2] = counts[..., 2] + np.maximum(nb_steps_expected - counts.sum(axis=-1), 0)
+
+    return counts
+
+
+# Unittested
+@catch_errors_decorator
+def get_selected_counts(candidates_counts: np.ndarray, max_candidates: int) -> np.ndarray:
+    """
+    Returns the number of candidates selected per trajectory of a system, as in the deviate phase: every candidate if
+    the system has at most max_candidates of them, otherwise ceil(max_candidates * selection_factor) per trajectory,
+    with selection_factor the share of the candidates of the system in the trajectory.
+
+    Parameters
+    ----------
+    candidates_counts : np.ndarray
+        The candidates counts, trajectories along the first axis (any other axes, e.g. a grid of thresholds).
+    max_candidates : int
+        The maximum number of candidates of the system.
+
+    Returns
+    -------
+    np.ndarray
+        The int64 selected counts, with the shape of candidates_counts.
+    """
+    candidates_counts = np.asarray(candidates_counts, dtype=np.int64)
+    system_candidates_counts = candidates_counts.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        selection_factors = np.where(system_candidates_counts <= max_candidates, 1.0, candidates_counts / system_candidates_counts)
+    max_candidates_local = np.ceil(max_candidates * selection_factors).astype(np.int64)
+    return np.where(candidates_counts > max_candidates_local, max_candidates_local, candidates_counts)
+
+
+# Unittested
+@catch_errors_decorator
+def get_candidate_labeling_costs(labeling_json: Dict, systems_auto: List[str]) -> Optional[np.ndarray]:
+    """
+    Returns the measured labeling cost of one candidate of each system, in core-hours: the mean time of the two labeling
+    jobs (timings_s) times the cores used (nb_nodes * nb_mpi_per_node * nb_threads_per_mpi), times the number of
+    labeled structures per candidate (the disturbed candidates double it). The placeholder timings written by the labeling
+    check are not used: the systems without candidates or with all of them skipped have no cost, and only the steps with
+    converged candidates (candidates_converged_count) are summed.
+
+    Parameters
+    ----------
+    labeling_json : Dict
+        The labeling JSON of an iteration (e.g. the previous one).
+    systems_auto : List[str]
+        The systems.
+
+    Returns
+    -------
+    Optional[np.ndarray]
+        The costs (NaN for the systems without timings), or None if no system has timings.
+    """
+    candidate_costs = np.full(len(systems_auto), np.nan)
+    for system_auto_index, system_auto in enumerate(systems_auto):
+        system_json = labeling_json.get("systems_auto", {}).get(system_auto, {})
+        if "timings_s" not in system_json or "nb_nodes" not in system_json or "nb_mpi_per_node" not in system_json:
+            continue
+        labeled_count = system_json.get("candidates_count", 0) + system_json.get("disturbed_candidates_count", 0)
+        skipped_count = system_json.get("candidates_skipped_count", 0) + system_json.get("disturbed_candidates_skipped_count", 0)
+        if labeled_count == 0 or skipped_count >= labeled_count:
+            continue
+        timings_s = system_json["timings_s"]
+        if "candidates_converged_count" in system_json:
+            timings_s = [timing for timing, converged_count in zip(timings_s, system_json["candidates_converged_count"]) if converged_count > 0]
+            if not timings_s:
+                continue
+        cores_count = system_json["nb_nodes"] * system_json["nb_mpi_per_node"] * system_json.get("nb_threads_per_mpi", 1)
+        structures_per_candidate = 1.0
+        if system_json.get("candidates_count", 0) > 0:
+            structures_per_candidate = 1.0 + system_json.get("disturbed_candidates_count", 0) / system_json["candidates_count"]
+        candidate_cost = sum(timings_s) / 3600.0 * cores_count * structures_per_candidate
+        if candidate_cost > 0:
+            candidate_costs[system_auto_index] = candidate_cost
+    if np.all(np.isnan(candidate_costs)):
+        return None
+    return candidate_costs
+
+
+# Unittested
+@catch_errors_decorator
+def allocate_candidate_budget(candidate_costs: np.ndarray, candidate_caps: np.ndarray, budget: float) -> np.ndarray:
+    """
+    Splits a labeling budget between the systems: the number of candidates n of each system maximizes the sum of
+    log(1 + n) (each new candidate of a system is a bit less useful than the previous one), with sum(cost * n) <= budget
+    and 0 <= n <= cap. The optimum is n = clip(1 / (mu * cost) - 1, 0, cap), with mu found by bisection, rounded down,
+    and what is left of the budget goes to the systems with the largest gain per cost.
+
+    Parameters
+    ----------
+    candidate_costs : np.ndarray
+        The labeling cost of one candidate of each system (e.g. core-hours), strictly positive.
+    candidate_caps : np.ndarray
+        The maximum number of candidates of each system (e.g. min(max_candidates, candidates_count)).
+    budget : float
+        The total budget, in the unit of the costs.
+
+    Returns
+    -------
+    np.ndarray
+        The int64 number of candidates of each system.
+
+    Raises
+    ------
+    ValueError
+        If a cost is not strictly positive, or if the shapes do not match.
+    """
+    candidate_costs = np.asarray(candidate_costs, dtype=np.float64).reshape(-1)
+    candidate_caps = np.maximum(np.asarray(candidate_caps, dtype=np.int64).reshape(-1), 0)
+    if candidate_costs.shape != candidate_caps.shape:
+        error_msg = f"One cost per cap is expected: {candidate_costs.shape[0]} costs for {candidate_caps.shape[0]} caps."
+        raise ValueError(error_msg)
+    if not np.all(candidate_costs > 0):
+        error_msg = f"The costs must be strictly positive: {candidate_costs}."
+        raise ValueError(error_msg)
+    if np.sum(candidate_costs * candidate_caps) <= budget:
+        return candidate_caps
+    if budget <= 0:
+        return np.zeros_like(candidate_caps)
+
+    def allocation(mu: float) -> np.ndarray:
+        return np.clip(1.0 / (mu * candidate_costs) - 1.0, 0.0, candidate_caps)
+
+    # The cost of the allocation decreases with mu: nothing above 1 / min(cost), everything below 1 / (max(cost) * (max(cap) + 1))
+    mu_low, mu_high = 1.0 / (candidate_costs.max() * (candidate_caps.max() + 1.0)), 1.0 / candidate_costs.min()
+    for _ in range(200):
+        mu = np.sqrt(mu_low * mu_high)
+        if np.sum(candidate_costs * allocation(mu)) > budget:
+            mu_low = mu
+        else:
+            mu_high = mu
+        if mu_high / mu_low < 1.0 + 1e-12:
+            break
+    candidate_counts = np.floor(allocation(mu_high)).astype(np.int64)
+
+    # Rounding down leaves less than one candidate per system: spend it on the best gain per cost that still fits
+    remaining_budget = budget - np.sum(candidate_costs * candidate_counts)
+    while True:
+        is_possible = (candidate_counts < candidate_caps) & (candidate_costs <= remaining_budget)
+        if not np.any(is_possible):
+            break
+        best_system = int(np.argmax(np.where(is_possible, np.log1p(1.0 / (candidate_counts + 1.0)) / candidate_costs, -np.inf)))
+        candidate_counts[best_system] = candidate_counts[best_system] + 1
+        remaining_budget = remaining_budget - candidate_costs[best_system]
+    return candidate_counts
+
+
+# Unittested
+@catch_errors_decorator
+def get_autocorrelation_time(values: np.ndarray, window_factor: float = 5.0) -> float:
+    """
+    Returns the integrated autocorrelation time of a series, in rows: 1 + 2 * sum of the normalized autocorrelation, summed
+    up to the automatic window of Sokal (the first lag M with M >= window_factor * time). Rows further apart than this time
+    are close to independent; it is 1 for an uncorrelated series.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The series (e.g. the max_devi_f column of a trajectory).
+    window_factor : float, optional
+        The factor of the automatic window. Default is 5.0.
+
+    Returns
+    -------
+    float
+        The integrated autocorrelation time (at least 1.0, and 1.0 for a constant or too short series).
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(-1)
+    nb_values = values.shape[0]
+    if nb_values < 2 or np.ptp(values) == 0:
+        return 1.0
+    centered_values = values - values.mean()
+    # Autocorrelation by FFT (zero padded, so it is not circular)
+    fft_size = 1 << int(2 * nb_values - 1).bit_length()
+    spectrum = np.fft.rfft(centered_values, n=fft_size)
+    autocorrelation = np.fft.irfft(spectrum * np.conjugate(spectrum), n=fft_size)[:nb_values]
+    autocorrelation = autocorrelation / autocorrelation[0]
+    autocorrelation_times = 1.0 + 2.0 * np.cumsum(autocorrelation[1:])
+    window_reached = np.arange(1, nb_values) >= window_factor * autocorrelation_times
+    window = int(np.argmax(window_reached)) if np.any(window_reached) else nb_values - 2
+    return max(float(autocorrelation_times[window]), 1.0)
+
+
+# Unittested
+@catch_errors_decorator
+def compute_pair_distance_histograms(
+    atomic_coordinates: np.ndarray,
+    cell_lengths: Optional[np.ndarray] = None,
+    bin_count: int = 64,
+    cutoff: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Returns a structural descriptor per frame: the cumulative histogram of its pair distances, normalized by the number of
+    pairs. It does not depend on the order of the atoms, and with the cell lengths the minimum image convention is used
+    (orthorhombic cells), so it does not depend on the periodic images either.
+
+    Parameters
+    ----------
+    atomic_coordinates : np.ndarray
+        The coordinates, shape (nb_frames, nb_atoms, 3).
+    cell_lengths : Optional[np.ndarray], optional
+        The cell lengths, shape (3,) or (nb_frames, 3). None (default) if the system is not periodic.
+    bin_count : int, optional
+        The number of bins of the histograms. Default is 64.
+    cutoff : Optional[float], optional
+        The largest distance of the histograms. Default is half the smallest cell length, or the largest distance of the
+        first frame if the system is not periodic.
+
+    Returns
+    -------
+    np.ndarray
+        The descriptors, shape (nb_frames, bin_count).
+
+    Raises
+    ------
+    ValueError
+        If the coordinates are not of shape (nb_frames, nb_atoms, 3) with at least two atoms.
+    """
+    atomic_coordinates = np.asarray(atomic_coordinates, dtype=np.float64)
+    if atomic_coordinates.ndim != 3 or atomic_coordinates.shape[2] != 3 or atomic_coordinates.shape[1] < 2:
+        error_msg = f"The coordinates must be of shape (nb_frames, nb_atoms >= 2, 3), not {atomic_coordinates.shape}."
+        raise ValueError(error_msg)
+    nb_frames, nb_atoms, _ = atomic_coordinates.shape
+    if cell_lengths is not None:
+        cell_lengths = np.broadcast_to(np.asarray(cell_lengths, dtype=np.float64), (nb_frames, 3))
+    if cutoff is None:
+        if cell_lengths is not None:
+            cutoff = 0.5 * float(cell_lengths.min())
+        else:
+            cutoff = float(np.linalg.norm(np.ptp(atomic_coordinates[0], axis=0)))
+    cutoff = max(cutoff, np.finfo(np.float64).eps)
+
+    first_atoms, second_atoms = np.triu_indices(nb_atoms, k=1)
+    nb_pairs = first_atoms.shape[0]
+    descriptors = np.empty((nb_frames, bin_count), dtype=np.float64)
+    # A few frames at a time, so the pair vectors stay within PAIR_DISTANCE_CHUNK_SIZE
+    frames_per_chunk = max(1, PAIR_DISTANCE_CHUNK_SIZE // nb_pairs)
+    for chunk_start in range(0, nb_frames, frames_per_chunk):
+        chunk = slice(chunk_start, min(chunk_start + frames_per_chunk, nb_frames))
+        pair_vectors = atomic_coordinates[chunk, second_atoms] - atomic_coordinates[chunk, first_atoms]
+        if cell_lengths is not None:
+            chunk_cell_lengths = cell_lengths[chunk, np.newaxis, :]
+            pair_vectors = pair_vectors - chunk_cell_lengths * np.round(pair_vectors / chunk_cell_lengths)
+        pair_bins = np.floor(np.linalg.norm(pair_vectors, axis=-1) * (bin_count / cutoff)).astype(np.int64)
+        # Pairs beyond the cutoff fall in an extra bin, dropped; one bincount for all the frames of the chunk
+        pair_bins = np.minimum(pair_bins, bin_count) + (bin_count + 1) * np.arange(pair_bins.shape[0])[:, np.newaxis]
+        histograms = np.bincount(pair_bins.ravel(), minlength=(bin_count + 1) * pair_bins.shape[0]).reshape(-1, bin_count + 1)
+        descriptors[chunk] = np.cumsum(histograms[:, :bin_count], axis=1) / nb_pairs
+        del pair_vectors, pair_bins, histograms
+    return descriptors
+
+
+# Unittested
+@catch_errors_decorator
+def select_candidates_linspace(candidate_indexes: np.ndarray, max_candidates_local: int, **_) -> np.ndarray:
+    """
+    Selects the candidates as linearly as possible along the trajectory, keeping the first and the last ones.
+
+    Parameters
+    ----------
+    candidate_indexes : np.ndarray
+        The steps of the candidates, in order.
+    max_candidates_local : int
+        The maximum number of candidates to select.
+
+    Returns
+    -------
+    np.ndarray
+        The selected steps.
+    """
+    candidate_indexes = np.asarray(candidate_indexes)
+    if candidate_indexes.shape[0] <= max_candidates_local:
+        return candidate_indexes
+    return candidate_indexes[np.round(np.linspace(0, candidate_indexes.shape[0] - 1, max_candidates_local)).astype(int)]
+
+
+# Unittested
+@catch_errors_decorator
+def select_candidates_farthest_point(candidate_indexes: np.ndarray, max_candidates_local: int, descriptors: Optional[np.ndarray] = None, **_) -> np.ndarray:
+    """
+    Selects the candidates by farthest point sampling of their descriptors: starting from the first candidate, the next
+    one is always the farthest from the ones already selected, so similar structures are not selected twice.
+
+    Parameters
+    ----------
+    candidate_indexes : np.ndarray
+        The steps of the candidates, in order.
+    max_candidates_local : int
+        The maximum number of candidates to select.
+    descriptors : Optional[np.ndarray], optional
+        The descriptors of the candidates, one row per candidate (e.g. compute_pair_distance_histograms).
+        Only needed if there are more than max_candidates_local candidates.
+
+    Returns
+    -------
+    np.ndarray
+        The selected steps, in order.
+
+    Raises
+    ------
+    ValueError
+        If there is not one descriptor per candidate.
+    """
+    candidate_indexes = np.asarray(candidate_indexes)
+    if candidate_indexes.shape[0] <= max_candidates_local:
+        return candidate_indexes
+    if max_candidates_local <= 0:
+        return candidate_indexes[:0]
+    descriptors = np.asarray(descriptors if descriptors is not None else [], dtype=np.float64)
+    if descriptors.ndim == 1:
+        descriptors = descriptors[:, np.newaxis]
+    if descriptors.shape[0] != candidate_indexes.shape[0]:
+        error_msg = f"One descriptor per candidate is expected: {descriptors.shape[0]} descriptors for {candidate_indexes.shape[0]} candidates."
+        raise ValueError(error_msg)
+
+    selected = np.empty(max_candidates_local, dtype=np.int64)
+    selected[0] = 0
+    min_distances = np.sum((descriptors - descriptors[0]) ** 2, axis=1)
+    min_distances[0] = -1.0
+    for it_selected in range(1, max_candidates_local):
+        selected[it_selected] = np.argmax(min_distances)
+        min_distances = np.minimum(min_distances, np.sum((descriptors - descriptors[selected[it_selected]]) ** 2, axis=1))
+        # Already selected candidates are never selected again (identical descriptors included)
+        min_distances[selected[: it_selected + 1]] = -1.0
+    return candidate_indexes[np.sort(selected)]
+
+
+# Unittested
+@catch_errors_decorator
+def select_candidates_decorrelated(candidate_indexes: np.ndarray, max_candidates_local: int, minimum_gap: int = 1, **_) -> np.ndarray:
+    """
+    Selects candidates at least minimum_gap steps apart (e.g. the autocorrelation time of the trajectory): starting from
+    the first candidate, the next one is always the first candidate at least minimum_gap steps after it. If there are
+    still more than max_candidates_local of them, they are thinned with the linspace selector.
+    The chain of candidates is followed by pointer doubling (no loop over the candidates).
+
+    Parameters
+    ----------
+    candidate_indexes : np.ndarray
+        The steps of the candidates, in order.
+    max_candidates_local : int
+        The maximum number of candidates to select.
+    minimum_gap : int, optional
+        The minimum gap between two selected candidates, in steps. Default is 1 (no thinning).
+
+    Returns
+    -------
+    np.ndarray
+        The selected steps, in order.
+    """
+    candidate_indexes = np.asarray(candidate_indexes)
+    nb_candidates = candidate_indexes.shape[0]
+    if nb_candidates == 0 or max_candidates_local <= 0:
+        return candidate_indexes[:0]
+    # The next candidate of each one (nb_candidates if none, which points to itself)
+    jumps = np.append(np.searchsorted(candidate_indexes, candidate_indexes + max(int(minimum_gap), 1), side="left"), nb_candidates)
+    is_on_chain = np.zeros(nb_candidates + 1, dtype=bool)
+    is_on_chain[0] = True
+    # After k rounds, the first 2**k candidates of the chain are marked
+    for _ in range(max(nb_candidates, 1).bit_length()):
+        is_on_chain[jumps[is_on_chain]] = True
+        jumps = jumps[jumps]
+    return select_candidates_linspace(candidate_indexes[is_on_chain[:nb_candidates]], max_candidates_local)
+
+
+# The candidate selectors, by name (the "candidate_selector" input key), with the signature of select_candidates
+CANDIDATE_SELECTORS = {
+    "linspace": select_candidates_linspace,
+    "farthest_point": select_candidates_farthest_point,
+    "decorrelated": select_candidates_decorrelated,
+}
+
+
+# Unittested
+@catch_errors_decorator
+def select_candidates(candidate_indexes: np.ndarray, max_candidates_local: int, candidate_selector: str = "linspace", **selector_inputs) -> np.ndarray:
+    """
+    Selects at most max_candidates_local candidates with one of the CANDIDATE_SELECTORS.
+
+    Parameters
+    ----------
+    candidate_indexes : np.ndarray
+        The steps of the candidates, in order.
+    max_candidates_local : int
+        The maximum number of candidates to select.
+    candidate_selector : str, optional
+        The name of the selector. Default is "linspace".
+    **selector_inputs
+        The inputs needed by the selector (descriptors for "farthest_point", minimum_gap for "decorrelated"), the others are ignored.
+
+    Returns
+    -------
+    np.ndarray
+        The selected steps, in order.
+
+    Raises
+    ------
+    ValueError
+        If the selector is unknown.
+    """
+    if candidate_selector not in CANDIDATE_SELECTORS:
+        error_msg = f"Unknown candidate selector '{candidate_selector}', expected one of: {list(CANDIDATE_SELECTORS)}"
+        raise ValueError(error_msg)
+    return CANDIDATE_SELECTORS[candidate_selector](candidate_indexes, max_candidates_local, **selector_inputs)
+
+
+# Unittested
+@catch_errors_decorator
+def get_structure_hashes(atom_types: np.ndarray, atomic_coordinates: np.ndarray, cell_lengths: Optional[np.ndarray] = None, resolution: float = 0.01) -> np.ndarray:
+    """
+    Returns a hash per frame that does not depend on the order of the atoms of a same species nor on their periodic images:
+    the coordinates are wrapped in the cell (orthorhombic), rounded to the resolution, and sorted by (type, x, y, z).
+
+    Parameters
+    ----------
+    atom_types : np.ndarray
+        The type of each atom, shape (nb_atoms,).
+    atomic_coordinates : np.ndarray
+        The coordinates, shape (nb_frames, nb_atoms, 3).
+    cell_lengths : Optional[np.ndarray], optional
+        The cell lengths, shape (3,) or (nb_frames, 3). None (default) if the system is not periodic.
+    resolution : float, optional
+        The rounding of the coordinates, in the unit of the coordinates. Default is 0.01.
+
+    Returns
+    -------
+    np.ndarray
+        The hashes (32 hexadecimal characters), shape (nb_frames,).
+    """
+    atom_types = np.asarray(atom_types, dtype=np.int64).reshape(-1)
+    atomic_coordinates = np.asarray(atomic_coordinates, dtype=np.float64)
+    nb_frames = atomic_coordinates.shape[0]
+    grid_coordinates = np.round(atomic_coordinates / resolution).astype(np.int64)
+    if cell_lengths is not None:
+        grid_cell_lengths = np.maximum(np.round(np.broadcast_to(np.asarray(cell_lengths, dtype=np.float64), (nb_frames, 3)) / resolution).astype(np.int64), 1)
+        grid_coordinates = np.mod(grid_coordinates, grid_cell_lengths[:, np.newaxis, :])
+    frame_types = np.broadcast_to(atom_types, grid_coordinates.shape[:2])
+    # Canonical order of the atoms of each frame (lexsort: the last key is the primary one)
+    atom_order = np.lexsort((grid_coordinates[..., 2], grid_coordinates[..., 1], grid_coordinates[..., 0], frame_types), axis=-1)
+    canonical_frames = np.concatenate((np.take_along_axis(frame_types, atom_order, axis=1)[..., np.newaxis], np.take_along_axis(grid_coordinates, atom_order[..., np.newaxis], axis=1)), axis=2)
+    if cell_lengths is not None:
+        canonical_frames = np.concatenate((canonical_frames.reshape(nb_frames, -1), grid_cell_lengths), axis=1)
+    canonical_frames = np.ascontiguousarray(canonical_frames.reshape(nb_frames, -1), dtype="<i8")
+    return np.array([hashlib.blake2b(canonical_frame.tobytes(), digest_size=16).hexdigest() for canonical_frame in canonical_frames], dtype="<U32")
+
+
+# Unittested
+@catch_errors_decorator
+def compute_structure_descriptors(
+    atom_types: np.ndarray,
+    atomic_coordinates: np.ndarray,
+    cell_lengths: Optional[np.ndarray] = None,
+    bin_count: int = 128,
+    cutoff: float = 6.0,
+) -> np.ndarray:
+    """
+    Returns the descriptors used to find near-duplicates: the pair distance histograms (compute_pair_distance_histograms)
+    of all the atoms, then of the atoms of each species (sorted by type), with a common cutoff so that any two frames of
+    the same composition can be compared with get_nearest_descriptors.
+
+    Parameters
+    ----------
+    atom_types : np.ndarray
+        The type of each atom, shape (nb_atoms,).
+    atomic_coordinates : np.ndarray
+        The coordinates, shape (nb_frames, nb_atoms, 3).
+    cell_lengths : Optional[np.ndarray], optional
+        The cell lengths, shape (3,) or (nb_frames, 3). None (default) if the system is not periodic.
+    bin_count : int, optional
+        The number of bins of each histogram. Default is 128.
+    cutoff : float, optional
+        The largest distance of the histograms. Default is 6.0.
+
+    Returns
+    -------
+    np.ndarray
+        The float32 descriptors, shape (nb_frames, bin_count * (1 + number of species with at least two atoms)).
+    """
+    atom_types = np.asarray(atom_types, dtype=np.int64).reshape(-1)
+    atom_groups = [np.arange(atom_types.shape[0])] + [np.flatnonzero(atom_types == atom_type) for atom_type in np.unique(atom_types)]
+    return np.concatenate(
+        [compute_pair_distance_histograms(np.asarray(atomic_coordinates)[:, atom_group], cell_lengths, bin_count, cutoff).astype(np.float32) for atom_group in atom_groups if atom_group.shape[0] > 1],
+        axis=1,
+    )
+
+
+# Unittested
+@catch_errors_decorator
+def get_nearest_descriptors(descriptors: np.ndarray, reference_descriptors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns, for each descriptor, the nearest reference descriptor. The distance is the largest difference between the
+    cumulative histograms (the Kolmogorov-Smirnov distance between the pair distance distributions), between 0 and 1.
+    The distances are computed by chunks (PAIR_DISTANCE_CHUNK_SIZE values at a time).
+
+    Parameters
+    ----------
+    descriptors : np.ndarray
+        The descriptors, shape (nb_frames, nb_features).
+    reference_descriptors : np.ndarray
+        The reference descriptors, shape (nb_references, nb_features).
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        - The index of the nearest reference of each frame (-1 if there is no reference).
+        - The distance to it (inf if there is no reference).
+    """
+    descriptors = np.asarray(descriptors, dtype=np.float32)
+    reference_descriptors = np.asarray(reference_descriptors, dtype=np.float32)
+    nearest_indexes = np.full(descriptors.shape[0], -1, dtype=np.int64)
+    nearest_distances = np.full(descriptors.shape[0], np.inf)
+    if descriptors.shape[0] == 0 or reference_descriptors.shape[0] == 0:
+        return nearest_indexes, nearest_distances
+    nb_features = max(descriptors.shape[1], 1)
+    references_per_chunk = max(1, PAIR_DISTANCE_CHUNK_SIZE // nb_features)
+    frames_per_chunk = max(1, PAIR_DISTANCE_CHUNK_SIZE // (nb_features * min(references_per_chunk, reference_descriptors.shape[0])))
+    for frame_start in range(0, descriptors.shape[0], frames_per_chunk):
+        frames = slice(frame_start, frame_start + frames_per_chunk)
+        for reference_start in range(0, reference_descriptors.shape[0], references_per_chunk):
+            distances = np.abs(descriptors[frames, np.newaxis, :] - reference_descriptors[np.newaxis, reference_start : reference_start + references_per_chunk, :]).max(axis=2)
+            chunk_indexes = np.argmin(distances, axis=1)
+            chunk_distances = distances[np.arange(distances.shape[0]), chunk_indexes]
+            is_nearer = chunk_distances < nearest_distances[frames]
+            nearest_indexes[frames] = np.where(is_nearer, chunk_indexes + reference_start, nearest_indexes[frames])
+            nearest_distances[frames] = np.where(is_nearer, chunk_distances, nearest_distances[frames])
+            del distances, chunk_indexes, chunk_distances, is_nearer
+    return nearest_indexes, nearest_distances
+
+
+# Unittested
+@catch_errors_decorator
+def get_duplicate_leaders(descriptors: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Groups the near-duplicates of a set of frames: in order, a frame is kept if it is farther than the tolerance from
+    every kept frame, otherwise it is a duplicate of the first kept frame within the tolerance.
+
+    Parameters
+    ----------
+    descriptors : np.ndarray
+        The descriptors, shape (nb_frames, nb_features).
+    tolerance : float
+        The largest distance (as in get_nearest_descriptors) between duplicates.
+
+    Returns
+    -------
+    np.ndarray
+        For each frame, the index of the kept frame it duplicates (itself if it is kept).
+    """
+    descriptors = np.asarray(descriptors, dtype=np.float32)
+    nb_frames = descriptors.shape[0]
+    leaders = np.arange(nb_frames)
+    if nb_frames < 2:
+        return leaders
+    # The neighbours of each frame among the previous ones
+    is_neighbour = np.zeros((nb_frames, nb_frames), dtype=bool)
+    frames_per_chunk = max(1, PAIR_DISTANCE_CHUNK_SIZE // (nb_frames * max(descriptors.shape[1], 1)))
+    for frame_start in range(0, nb_frames, frames_per_chunk):
+        frames = slice(frame_start, frame_start + frames_per_chunk)
+        is_neighbour[frames] = np.abs(descriptors[frames, np.newaxis, :] - descriptors[np.newaxis, :, :]).max(axis=2) <= tolerance
+    is_neighbour = np.tril(is_neighbour, k=-1)
+    # Only the frames with neighbours need a decision, in order
+    is_kept = np.ones(nb_frames, dtype=bool)
+    for frame_index in np.flatnonzero(is_neighbour.any(axis=1)):
+        kept_neighbours = np.flatnonzero(is_neighbour[frame_index] & is_kept)
+        if kept_neighbours.shape[0] > 0:
+            is_kept[frame_index] = False
+            leaders[frame_index] = kept_neighbours[0]
+    return leaders
+
+
+# Unittested
+@catch_errors_decorator
+def update_dataset_dedup_index(index_path: Path, data_path: Path, hash_resolution: float = 0.01, bin_count: int = 128, cutoff: float = 6.0) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Returns the hashes and the descriptors of the frames of every DeePMD dataset of the data folder (set.000), for the
+    near-duplicate search. They are stored in the index folder, one '<dataset>.npz' per dataset, keyed on the size and the
+    modification time of its coord.npy and on the parameters: only the new or modified datasets are read, and the
+    entries of the datasets that no longer exist are removed.
+
+    Parameters
+    ----------
+    index_path : Path
+        The index folder (created if needed).
+    data_path : Path
+        The data folder, with one dataset (type.raw and set.000/coord.npy, set.000/box.npy) per folder.
+    hash_resolution : float, optional
+        The resolution of get_structure_hashes. Default is 0.01.
+    bin_count : int, optional
+        The bin count of compute_structure_descriptors. Default is 128.
+    cutoff : float, optional
+        The cutoff of compute_structure_descriptors. Default is 6.0.
+
+    Returns
+    -------
+    Dict[str, Dict[str, np.ndarray]]
+        By dataset name: the atom types ("types", as in type.raw), the frame hashes ("hashes") and descriptors ("descriptors").
+    """
+    index_path.mkdir(parents=True, exist_ok=True)
+    dataset_paths = sorted(dataset_path for dataset_path in data_path.iterdir() if (dataset_path / "type.raw").is_file() and (dataset_path / "set.000" / "coord.npy").is_file())
+    dataset_names = {dataset_path.name for dataset_path in dataset_paths}
+    for entry_path in index_path.glob("*.npz"):
+        if entry_path.stem not in dataset_names:
+            entry_path.unlink()
+
+    dataset_index = {}
+    for dataset_path in dataset_paths:
+        coord_stat = (dataset_path / "set.000" / "coord.npy").stat()
+        entry_key = f"{coord_stat.st_size}:{coord_stat.st_mtime_ns}:{hash_resolution}:{bin_count}:{cutoff}"
+        entry_path = index_path / f"{dataset_path.name}.npz"
+        if entry_path.is_file():
+            with entry_path.open("rb") as entry_file:
+                with np.load(entry_file) as entry:
+                    if str(entry["key"]) == entry_key:
+                        dataset_index[dataset_path.name] = {name: entry[name] for name in ["types", "hashes", "descriptors"]}
+                        continue
+
+        with (dataset_path / "type.raw").open("r") as type_file:
+            atom_types = np.loadtxt(type_file, dtype=np.int64, ndmin=1)
+        with (dataset_path / "set.000" / "coord.npy").open("rb") as coord_file:
+            atomic_coordinates = np.load(coord_file).reshape(-1, atom_types.shape[0], 3)
+        cell_lengths = None
+        if (dataset_path / "set.000" / "box.npy").is_file():
+            with (dataset_path / "set.000" / "box.npy").open("rb") as box_file:
+                cell_lengths = np.load(box_file).reshape(-1, 9)[:, [0, 4, 8]]
+        dataset_index[dataset_path.name] = {
+            "types": atom_types,
+            "hashes": get_structure_hashes(atom_types, atomic_coordinates, cell_lengths, hash_resolution),
+            "descriptors": compute_structure_descriptors(atom_types, atomic_coordinates, cell_lengths, bin_count, cutoff),
+        }
+        del atomic_coordinates, cell_lengths, atom_types
+        # Written next to the entry then renamed, so an interrupted update never leaves a truncated entry
+        temporary_entry_path = entry_path.with_name(f".{entry_path.name}.tmp")
+        with temporary_entry_path.open("wb") as entry_file:
+            np.savez(entry_file, key=np.array(entry_key), **dataset_index[dataset_path.name])
+        temporary_entry_path.replace(entry_path)
+    return dataset_index
+
+
+def _load_model_deviation_sidecar(model_deviation_file_path: Path) -> Optional[np.ndarray]:
+    """
+    Loads the columns from the '<file>.npy' sidecar, or returns None if it is missing or out of date.
+    The sidecar holds two arrays saved one after the other: the size and the modification time (ns) of the file, then the columns.
+    """
+    sidecar_path = model_deviation_file_path.with_name(f"{model_deviation_file_path.name}.npy")
+    if not sidecar_path.is_file():
+        return None
+    file_stat = model_deviation_file_path.stat()
+    try:
+        with sidecar_path.open("rb") as sidecar_file:
+            file_key = np.load(sidecar_file)
+            if file_key.shape != (2,) or file_key[0] != file_stat.st_size or file_key[1] != file_stat.st_mtime_ns:
+                return None
+            return np.load(sidecar_file)
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+def _save_model_deviation_sidecar(model_deviation_file_path: Path, model_deviation: np.ndarray) -> None:
+    """
+    Saves the columns in the '<file>.npy' sidecar (a read-only folder only costs a new parsing next time).
+    """
+    sidecar_path = model_deviation_file_path.with_name(f"{model_deviation_file_path.name}.npy")
+    file_stat = model_deviation_file_path.stat()
+    try:
+        with sidecar_path.open("wb") as sidecar_file:
+            np.save(sidecar_file, np.array([file_stat.st_size, file_stat.st_mtime_ns], dtype=np.int64))
+            np.save(sidecar_file, model_deviation)
+    except OSError:
+        pass
+
+
 # TODO: Sould be renamed because it is not returning a factor or a number of steps but a time of simulation
 # Unittested
 @catch_errors_decorator
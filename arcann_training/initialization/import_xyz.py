@@ -0,0 +1,183 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+Imports labeled extended XYZ files (reference sets) as DeePMD datasets in the data folder, one init_/extra_ dataset per file.
+The files are converted in parallel (one process per file) and each conversion streams its file in chunks of frames.
+"""
+
+# Standard library modules
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+# Local imports
+from arcann_training.common.filesystem import check_directory
+from arcann_training.common.json import backup_and_overwrite_json_file, load_default_json_file, load_json_file
+from arcann_training.common.utils import natural_sort_key
+from arcann_training.initialization.utils import check_properties_file, import_extended_xyz_dataset
+
+
+def _import_dataset(xyz_file_path: Path, dataset_path: Path, properties: Dict, import_json: Dict, memory_budget_mb: float) -> int:
+    """
+    Worker of the process pool (module level, so it can be pickled).
+    """
+    return import_extended_xyz_dataset(
+        xyz_file_path,
+        dataset_path,
+        properties,
+        energy_key=import_json["energy_key"],
+        forces_key=import_json["forces_key"],
+        virial_key=import_json["virial_key"],
+        stress_key=import_json["stress_key"],
+        memory_budget_mb=memory_budget_mb,
+    )
+
+
+# Main function
+def main(
+    current_step: str,
+    current_phase: str,
+    deepmd_iterative_path,
+    fake_machine=None,
+    user_input_json_filename: str = "input.json",
+):
+    # Get the logger
+    arcann_logger = logging.getLogger("ArcaNN")
+
+    # Get the current path and set the training path as the current path
+    current_path = Path(".").resolve()
+    training_path = current_path
+    user_files_path = current_path / "user_files"
+
+    # Log the step and phase of the program
+    arcann_logger.info(f"Step: {current_step.capitalize()} - Phase: {current_phase.capitalize()}.")
+    arcann_logger.debug(f"Current path: {current_path}")
+    arcann_logger.debug(f"Training path: {training_path}")
+    arcann_logger.debug(f"Program path: {deepmd_iterative_path}")
+    arcann_logger.info(f"-" * 88)
+
+    # Load the default input JSON (its own section, so the import keys do not end up in the config JSON)
+    default_input_json = load_default_json_file(deepmd_iterative_path / "assets" / "default_config.json")[f"{current_step}_{current_phase}"]
+    arcann_logger.debug(f"default_input_json: {default_input_json}")
+
+    # Load the user input JSON
+    user_input_json = load_json_file((current_path / user_input_json_filename), abort_on_error=False)
+    arcann_logger.debug(f"user_input_json: {user_input_json}")
+
+    # Merge them (only the import keys), the types must match the default ones
+    import_json = {}
+    for key, default_value in default_input_json.items():
+        import_json[key] = user_input_json.get(key, default_value)
+        if not isinstance(import_json[key], type(default_value)):
+            arcann_logger.error(f"Type mismatch for '{key}': expected {type(default_value).__name__}, got {type(import_json[key]).__name__}")
+            arcann_logger.error(f"Aborting...")
+            return 1
+    arcann_logger.debug(f"import_json: {import_json}")
+
+    if import_json["dataset_prefix"] not in ["init", "extra"]:
+        arcann_logger.error(f"'dataset_prefix' must be 'init' or 'extra', not '{import_json['dataset_prefix']}'.")
+        arcann_logger.error(f"Aborting...")
+        return 1
+
+    # Check if a data folder is present in the training path
+    check_directory((training_path / "data"), error_msg=f"No data folder found in: {training_path}")
+
+    # The properties of the training if it is initialized, else the properties file
+    main_json = load_json_file((training_path / "control" / "config.json"), abort_on_error=False)
+    properties = main_json["properties"] if "properties" in main_json else check_properties_file(user_files_path / "properties.txt")
+    arcann_logger.debug(f"properties: {properties}")
+
+    # Auto-populate the files with the extended XYZ files of user_files/import
+    if import_json["xyz_files"] == [""]:
+        xyz_file_paths = [file for file in (user_files_path / "import").glob("*") if file.suffix in [".xyz", ".extxyz"]]
+        xyz_file_paths.sort(key=lambda file: natural_sort_key(file.name))
+    else:
+        xyz_file_paths = [training_path / xyz_file for xyz_file in import_json["xyz_files"]]
+    if not xyz_file_paths:
+        arcann_logger.error(f"No extended XYZ file found in {user_files_path / 'import'}")
+        arcann_logger.error(f"Aborting...")
+        return 1
+    for xyz_file_path in xyz_file_paths:
+        if not xyz_file_path.is_file():
+            arcann_logger.error(f"File not found: {xyz_file_path}")
+            arcann_logger.error(f"Aborting...")
+            return 1
+
+    dataset_paths = [training_path / "data" / f"{import_json['dataset_prefix']}_{xyz_file_path.stem}" for xyz_file_path in xyz_file_paths]
+    if len(set(dataset_paths)) != len(dataset_paths):
+        arcann_logger.error(f"Several files would be imported in the same dataset (same name): {[xyz_file_path.name for xyz_file_path in xyz_file_paths]}")
+        arcann_logger.error(f"Aborting...")
+        return 1
+    for dataset_path in dataset_paths:
+        if dataset_path.exists():
+            arcann_logger.error(f"The dataset already exists: {dataset_path}")
+            arcann_logger.error(f"Aborting...")
+            return 1
+
+    # One process per file, the memory budget is shared between them
+    jobs = import_json["jobs"] if import_json["jobs"] > 0 else (os.cpu_count() or 1)
+    jobs = min(jobs, len(xyz_file_paths))
+    memory_budget_mb = import_json["memory_budget_mb"] / jobs
+    arcann_logger.info(f"Importing {len(xyz_file_paths)} file(s) with {jobs} process(es) and {memory_budget_mb:.0f} MB each.")
+
+    datasets_json = {}
+    if jobs == 1:
+        for xyz_file_path, dataset_path in zip(xyz_file_paths, dataset_paths):
+            datasets_json[dataset_path.name] = _import_dataset(xyz_file_path, dataset_path, properties, import_json, memory_budget_mb)
+            arcann_logger.info(f"{xyz_file_path.name}: {datasets_json[dataset_path.name]} frames imported in {dataset_path.name}.")
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(_import_dataset, xyz_file_path, dataset_path, properties, import_json, memory_budget_mb) for xyz_file_path, dataset_path in zip(xyz_file_paths, dataset_paths)]
+            for xyz_file_path, dataset_path, future in zip(xyz_file_paths, dataset_paths, futures):
+                try:
+                    datasets_json[dataset_path.name] = future.result()
+                except Exception as e:
+                    arcann_logger.error(f"{xyz_file_path.name}: {e}")
+                    continue
+                arcann_logger.info(f"{xyz_file_path.name}: {datasets_json[dataset_path.name]} frames imported in {dataset_path.name}.")
+        if len(datasets_json) != len(dataset_paths):
+            arcann_logger.error(f"{len(dataset_paths) - len(datasets_json)} file(s) could not be imported.")
+            arcann_logger.error(f"Aborting...")
+            return 1
+    arcann_logger.debug(f"datasets_json: {datasets_json}")
+
+    # Dump the used input JSON
+    arcann_logger.info(f"-" * 88)
+    backup_and_overwrite_json_file(import_json, (current_path / f"used_input_{current_phase}.json"), read_only=True)
+
+    # End
+    arcann_logger.info(f"-" * 88)
+    arcann_logger.info(f"Step: {current_step.capitalize()} - Phase: {current_phase.capitalize()} is a success!")
+
+    # Cleaning
+    del current_path, training_path, user_files_path
+    del default_input_json, user_input_json, user_input_json_filename, import_json, main_json, properties
+    del xyz_file_paths, dataset_paths, jobs, memory_budget_mb, datasets_json
+
+    arcann_logger.debug(f"LOCAL")
+    arcann_logger.debug(f"{locals()}")
+    return 0
+
+
+# Standalone part
+if __name__ == "__main__":
+    if len(sys.argv) == 4:
+        main(
+            "initialization",
+            "import_xyz",
+            Path(sys.argv[1]),
+            fake_machine=sys.argv[2],
+            user_input_json_filename=sys.argv[3],
+        )
+    else:
+        pass
@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/18
 
 Functions
 ---------
@@ -20,14 +20,17 @@ check_dptrain_properties(user_files_path: Path, properties_dict: Dict)
     A function to check the properties in dptrain files.
 check_typeraw_properties(type_raw_path, properties_dict)
     A function to check the properties in type.raw files.
+import_extended_xyz_dataset(xyz_file_path: Path, dataset_path: Path, properties: Dict, energy_key: str = "energy", forces_key: str = "forces", virial_key: str = "virial", stress_key: str = "stress", memory_budget_mb: float = 1024.0) -> int
+    A function to convert a labeled extended XYZ file into a DeePMD dataset, in chunks of frames.
 """
 
 # TODO: Homogenize the docstrings for this module
 
 # Standard library modules
+import shutil
 from pathlib import Path
 from copy import deepcopy
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 
 # Third-party modules
 import numpy as np
@@ -36,6 +39,11 @@ import numpy as np
 from arcann_training.common.utils import catch_errors_decorator
 from arcann_training.common.lammps import read_lammps_data
 from arcann_training.common.json import load_json_file
+from arcann_training.common.structure import get_properties_maps
+from arcann_training.common.xyz import get_xyz_frame_offsets, parse_extended_xyz_info, parse_extended_xyz_properties
+
+# Peak memory of a chunk (text, tokens and parsed values) relative to its size in the extended XYZ file
+XYZ_IMPORT_MEMORY_FACTOR = 8
 
 
 # Unittested
@@ -257,3 +265,216 @@ def check_typeraw_properties(type_raw_path, properties_dict):
         if type_val not in properties_dict:
             error_msg = f"Type {type_val} is not in properties file but is present in {type_raw_path}"
             raise ValueError(error_msg)
+
+
+# Unittested
+@catch_errors_decorator
+def import_extended_xyz_dataset(
+    xyz_file_path: Path,
+    dataset_path: Path,
+    properties: Dict,
+    energy_key: str = "energy",
+    forces_key: str = "forces",
+    virial_key: str = "virial",
+    stress_key: str = "stress",
+    memory_budget_mb: float = 1024.0,
+) -> int:
+    """
+    Converts a labeled extended XYZ file into a DeePMD dataset (type.raw and set.000/{box,coord,energy,force[,virial]}.npy).
+
+    The frames are located with the '<file>.xyzidx' offset index and streamed in chunks sized from the memory budget:
+    the atom lines of a chunk are decoded in one NumPy conversion and appended to the .npy files (their headers are
+    written first, from the number of frames), so the memory used does not depend on the number of frames.
+    The dataset is written in a hidden folder next to 'dataset_path' and only moved to 'dataset_path' once complete.
+
+    Parameters
+    ----------
+    xyz_file_path : Path
+        The extended XYZ file, with a 'Lattice', the energy and the virial (or stress, in eV/A^3) in the comment lines,
+        and the species, positions and forces in the atom lines.
+    dataset_path : Path
+        The DeePMD dataset to create (it must not exist).
+    properties : Dict
+        The properties of the training (main_json["properties"]), to map the species to the types.
+    energy_key : str, optional
+        The key of the energy in the comment lines. Default is "energy".
+    forces_key : str, optional
+        The name of the forces in the 'Properties' specification. Default is "forces".
+    virial_key : str, optional
+        The key of the virial in the comment lines. Default is "virial".
+    stress_key : str, optional
+        The key of the stress in the comment lines, used if there is no virial (virial = - stress * volume). Default is "stress".
+    memory_budget_mb : float, optional
+        The memory budget (MB) of the conversion. Default is 1024.0.
+
+    Returns
+    -------
+    int
+        The number of frames of the dataset.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the extended XYZ file does not exist.
+    FileExistsError
+        If the dataset already exists.
+    ValueError
+        If the file is empty, if the number or the order of the atoms changes, if a species is not in the properties,
+        or if a frame lacks the lattice, the energy or the forces.
+    """
+    if dataset_path.exists():
+        error_msg = f"The dataset already exists: {dataset_path}"
+        raise FileExistsError(error_msg)
+
+    offsets = get_xyz_frame_offsets(xyz_file_path)
+    nb_frames = offsets.shape[0]
+    if nb_frames == 0:
+        error_msg = f"No frame found in: {xyz_file_path}"
+        raise ValueError(error_msg)
+    file_size = xyz_file_path.stat().st_size
+    chunk_frames = max(1, int(memory_budget_mb * 1024**2 // (XYZ_IMPORT_MEMORY_FACTOR * file_size / nb_frames)))
+
+    with xyz_file_path.open("rb") as xyz_file:
+        atom_count = int(xyz_file.readline())
+        first_info = parse_extended_xyz_info(xyz_file.readline().decode())
+        first_atom_lines = [xyz_file.readline().decode() for _ in range(atom_count)]
+    properties_spec = first_info.get("Properties", "species:S:1:pos:R:3")
+    columns = {name: (property_type, count) for name, property_type, count, _ in parse_extended_xyz_properties(properties_spec)}
+    for name, expected in [("species", ("S", 1)), ("pos", ("R", 3)), (forces_key, ("R", 3))]:
+        if columns.get(name) != expected:
+            error_msg = f"'{name}:{expected[0]}:{expected[1]}' is missing from the properties '{properties_spec}' of {xyz_file_path}"
+            raise ValueError(error_msg)
+    # One field per property: strings for S and L (T/F), floats for R and I
+    atom_dtype = np.dtype([(name, "<U16" if property_type in ("S", "L") else np.float64, (count,) if count > 1 else ()) for name, (property_type, count) in columns.items()])
+    if virial_key in first_info:
+        virial_source = virial_key
+    elif stress_key in first_info:
+        virial_source = stress_key
+    else:
+        virial_source = None
+
+    # The atoms (thus type.raw) must be in the same order in every frame
+    atomic_species = np.loadtxt(first_atom_lines, dtype=atom_dtype, comments=None, ndmin=1)["species"]
+    symbol_types, _, _ = get_properties_maps(properties)
+    unknown_species = sorted(set(atomic_species) - set(symbol_types))
+    if unknown_species:
+        error_msg = f"Species {unknown_species} of {xyz_file_path} are not in the properties."
+        raise ValueError(error_msg)
+    atom_types = np.array([symbol_types[symbol] for symbol in atomic_species], dtype=np.int64)
+
+    set_shapes = {"box": (nb_frames, 9), "coord": (nb_frames, 3 * atom_count), "energy": (nb_frames,), "force": (nb_frames, 3 * atom_count)}
+    if virial_source:
+        set_shapes["virial"] = (nb_frames, 9)
+
+    temporary_path = dataset_path.parent / f".importing_{dataset_path.name}"
+    if temporary_path.exists():
+        shutil.rmtree(temporary_path)
+    (temporary_path / "set.000").mkdir(parents=True)
+    set_files = {}
+    try:
+        # Add minus one because type.raw starts from 0
+        (temporary_path / "type.raw").write_text("".join(f"{atom_type - 1} " for atom_type in atom_types))
+        for set_name, set_shape in set_shapes.items():
+            set_files[set_name] = (temporary_path / "set.000" / f"{set_name}.npy").open("wb")
+            np.lib.format.write_array_header_1_0(set_files[set_name], {"descr": np.lib.format.dtype_to_descr(np.dtype(np.float64)), "fortran_order": False, "shape": set_shape})
+
+        with xyz_file_path.open("rb") as xyz_file:
+            for chunk_start in range(0, nb_frames, chunk_frames):
+                chunk_end = min(chunk_start + chunk_frames, nb_frames)
+                xyz_file.seek(offsets[chunk_start])
+                chunk_bytes = (offsets[chunk_end] if chunk_end < nb_frames else file_size) - offsets[chunk_start]
+                lines = xyz_file.read(chunk_bytes).decode().splitlines()
+                chunk_arrays = _decode_extended_xyz_chunk(lines, chunk_start, chunk_end, atom_count, atomic_species, atom_dtype, properties_spec, (energy_key, forces_key, virial_source, virial_source == stress_key), xyz_file_path)
+                del lines
+                for set_name, set_file in set_files.items():
+                    set_file.write(np.ascontiguousarray(chunk_arrays[set_name], dtype=np.float64).tobytes())
+                del chunk_arrays
+
+        for set_file in set_files.values():
+            set_file.close()
+        temporary_path.rename(dataset_path)
+    except BaseException:
+        for set_file in set_files.values():
+            set_file.close()
+        shutil.rmtree(temporary_path, ignore_errors=True)
+        raise
+
+    return nb_frames
+
+
+def _decode_extended_xyz_chunk(
+    lines: List[str],
+    chunk_start: int,
+    chunk_end: int,
+    atom_count: int,
+    atomic_species: np.ndarray,
+    atom_dtype: np.dtype,
+    properties_spec: str,
+    keys: Tuple[str, str, Optional[str], bool],
+    xyz_file_path: Path,
+) -> Dict[str, np.ndarray]:
+    """
+    Decodes the lines of the frames [chunk_start, chunk_end) of an extended XYZ file into DeePMD set arrays (by set name).
+    The comment lines are parsed one by one, the atom lines of the whole chunk go through a single NumPy conversion.
+    """
+    chunk_frames = chunk_end - chunk_start
+    frame_length = atom_count + 2
+    chunk_label = f"the frames {chunk_start} to {chunk_end - 1} of {xyz_file_path}"
+    if len(lines) != chunk_frames * frame_length or set(line.strip() for line in lines[0::frame_length]) != {str(atom_count)}:
+        error_msg = f"The number of atoms is not constant in {chunk_label}"
+        raise ValueError(error_msg)
+    energy_key, forces_key, virial_source, is_stress = keys
+
+    lattices, energies, virials = [], [], []
+    for frame_idx, comment in enumerate(lines[1::frame_length], start=chunk_start):
+        info = parse_extended_xyz_info(comment)
+        if info.get("Properties", "species:S:1:pos:R:3") != properties_spec:
+            error_msg = f"The properties of the frame {frame_idx} of {xyz_file_path} differ from the ones of the first frame."
+            raise ValueError(error_msg)
+        if "Lattice" not in info or energy_key not in info or (virial_source and virial_source not in info):
+            error_msg = f"The frame {frame_idx} of {xyz_file_path} lacks the 'Lattice', '{energy_key}' or '{virial_source}' key."
+            raise ValueError(error_msg)
+        lattices.append(info["Lattice"])
+        energies.append(info[energy_key])
+        if virial_source:
+            virials.append(info[virial_source])
+
+    chunk_arrays = {}
+    chunk_arrays["box"] = np.array(" ".join(lattices).split(), dtype=np.float64)
+    if chunk_arrays["box"].shape[0] != 9 * chunk_frames:
+        error_msg = f"Invalid 'Lattice' (nine values expected) in {chunk_label}"
+        raise ValueError(error_msg)
+    chunk_arrays["box"] = chunk_arrays["box"].reshape(chunk_frames, 9)
+    chunk_arrays["energy"] = np.array(energies, dtype=np.float64)
+    if virial_source:
+        virials = np.array(" ".join(virials).split(), dtype=np.float64)
+        if virials.shape[0] == 6 * chunk_frames:
+            # Voigt order (xx, yy, zz, yz, xz, xy)
+            virials = virials.reshape(chunk_frames, 6)[:, [0, 5, 4, 5, 1, 3, 4, 3, 2]]
+        elif virials.shape[0] == 9 * chunk_frames:
+            virials = virials.reshape(chunk_frames, 9)
+        else:
+            error_msg = f"Invalid '{virial_source}' (six or nine values expected) in {chunk_label}"
+            raise ValueError(error_msg)
+        if is_stress:
+            # Stress (eV/A^3) to virial (eV)
+            virials = -virials * np.abs(np.linalg.det(chunk_arrays["box"].reshape(chunk_frames, 3, 3)))[:, np.newaxis]
+        chunk_arrays["virial"] = virials
+    del lattices, energies, virials
+
+    # Keep only the atom lines, then decode them at once
+    del lines[1::frame_length]
+    del lines[0 :: frame_length - 1]
+    try:
+        atoms = np.loadtxt(lines, dtype=atom_dtype, comments=None, ndmin=1)
+    except ValueError as e:
+        error_msg = f"Invalid atom lines in {chunk_label}: {e}"
+        raise ValueError(error_msg)
+    atoms = atoms.reshape(chunk_frames, atom_count)
+    if not np.array_equal(atoms["species"], np.broadcast_to(atomic_species, (chunk_frames, atom_count))):
+        error_msg = f"The order of the atoms is not constant in {chunk_label}"
+        raise ValueError(error_msg)
+    chunk_arrays["coord"] = atoms["pos"].reshape(chunk_frames, 3 * atom_count)
+    chunk_arrays["force"] = atoms[forces_key].reshape(chunk_frames, 3 * atom_count)
+
+    return chunk_arrays
@@ -108,6 +108,7 @@ def main(
                 labeling_json["systems_auto"][system_auto]["timings_s"] = previous_labeling_json["systems_auto"][system_auto]["timings_s"]
             else:
                 labeling_json["systems_auto"][system_auto]["timings_s"] = [1800, 3600]
+            labeling_json["systems_auto"][system_auto]["candidates_converged_count"] = [0, 0]
             labeling_json["systems_auto"][system_auto]["candidates_skipped_count"] = 0
             labeling_json["systems_auto"][system_auto]["disturbed_candidates_skipped_count"] = 0
             continue
@@ -237,9 +238,11 @@ def main(
             else:
                 timings[step] = default_timing
         del step, default_timing
-        del system_timings_sum, system_candidates_converged_count, system_timings
 
         labeling_json["systems_auto"][system_auto]["timings_s"] = [timings[0], timings[1]]
+        # The timings of the steps without converged candidates are defaults, not measurements
+        labeling_json["systems_auto"][system_auto]["candidates_converged_count"] = [system_candidates_converged_count[0], system_candidates_converged_count[1]]
+        del system_timings_sum, system_candidates_converged_count, system_timings
         labeling_json["systems_auto"][system_auto]["candidates_skipped_count"] = system_candidates_skipped_count
         labeling_json["systems_auto"][system_auto]["disturbed_candidates_skipped_count"] = system_disturbed_candidates_skipped_count
         del timings
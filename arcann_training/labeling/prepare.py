@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/26
+Last modified: 2026/10/18
 """
 
 # Standard library modules
@@ -25,7 +25,7 @@ from arcann_training.common.json import backup_and_overwrite_json_file, get_key_
 from arcann_training.common.list import replace_substring_in_string_list, string_list_to_textfile, textfile_to_string_list
 from arcann_training.common.machine import get_machine_keyword, get_machine_spec_for_step
 from arcann_training.common.slurm import replace_in_slurm_file_general
-from arcann_training.common.xyz import parse_xyz_trajectory_file, write_xyz_frame
+from arcann_training.common.xyz import iter_xyz_frames, write_xyz_frames
 
 
 def main(
@@ -342,17 +342,18 @@ def main(
 
         # Regular
         xyz_file = training_path / f"{padded_curr_iter}-exploration" / system_auto / f"candidates_{padded_curr_iter}_{system_auto}.xyz"
-        num_atoms, atom_symbols, atom_coords, comments, cell_info, pbc_info, properties_info, max_f_std_info = parse_xyz_trajectory_file(xyz_file)
-        del xyz_file
-
-        if atom_coords.shape[0] != candidates_count:
-            arcann_logger.error(f"The number of structures in the xyz does not match the number of candidates.")
-            arcann_logger.error(f"Aborting...")
-            return 1
 
         arcann_logger.info(f"Processing {candidates_count} structures for system: {system_auto}.")
 
-        for labeling_step in range(atom_coords.shape[0]):
+        # Stream the candidates, the labeling XYZ files are written at once after the loop
+        labeling_xyz_paths, labeling_atomic_symbols, labeling_atomic_coordinates, labeling_comments, labeling_lattices = [], [], [], [], []
+        labeling_step = -1
+        for labeling_step, (atom_symbols, atom_coords, comment, lattice, _, _, _) in enumerate(iter_xyz_frames(xyz_file)):
+            if labeling_step >= candidates_count:
+                arcann_logger.error(f"The number of structures in the xyz does not match the number of candidates.")
+                arcann_logger.error(f"Aborting...")
+                return 1
+
             padded_labeling_step = str(labeling_step).zfill(5)
             labeling_step_path = system_path / padded_labeling_step
             labeling_step_path.mkdir(exist_ok=True)
@@ -360,7 +361,7 @@ def main(
             first_job_input_t = deepcopy(system_first_job_input)
             first_job_input_t = replace_substring_in_string_list(first_job_input_t, "_R_PADDEDSTEP_", padded_labeling_step)
             if labeling_program == "cp2k":
-                first_job_input_t = replace_substring_in_string_list(first_job_input_t, "_R_CELL_", " ".join([str(_) for _ in [cell_info[labeling_step][i] for i in [0, 4, 8]]]))
+                first_job_input_t = replace_substring_in_string_list(first_job_input_t, "_R_CELL_", " ".join([str(_) for _ in [lattice[i] for i in [0, 4, 8]]]))
 
             string_list_to_textfile(labeling_step_path / f"1_labeling_{padded_labeling_step}.inp", first_job_input_t)
             del first_job_input_t
@@ -368,7 +369,7 @@ def main(
             if labeling_program == "cp2k":
                 second_job_input_t = deepcopy(system_second_job_input)
                 second_job_input_t = replace_substring_in_string_list(second_job_input_t, "_R_PADDEDSTEP_", padded_labeling_step)
-                second_job_input_t = replace_substring_in_string_list(second_job_input_t, "_R_CELL_", " ".join([str(_) for _ in [cell_info[labeling_step][i] for i in [0, 4, 8]]]))
+                second_job_input_t = replace_substring_in_string_list(second_job_input_t, "_R_CELL_", " ".join([str(_) for _ in [lattice[i] for i in [0, 4, 8]]]))
 
                 string_list_to_textfile(labeling_step_path / f"2_labeling_{padded_labeling_step}.inp", second_job_input_t)
                 del second_job_input_t
@@ -378,10 +379,12 @@ def main(
             job_file_t = replace_substring_in_string_list(job_file_t, f"_R_{labeling_program_up}_JOBNAME_", f"{labeling_program_up}_{system_auto}_{padded_curr_iter}")
             string_list_to_textfile(labeling_step_path / f"job_{labeling_program_up}_label_{padded_labeling_step}_{machine_spec['arch_type']}_{machine}.sh", job_file_t)
             del job_file_t
-            if np.any(cell_info) == None:
-                cell_info = np.array([])
 
-            write_xyz_frame(labeling_step_path / f"labeling_{padded_labeling_step}.xyz", labeling_step, num_atoms, atom_symbols, atom_coords, cell_info, comments)
+            labeling_xyz_paths.append(labeling_step_path / f"labeling_{padded_labeling_step}.xyz")
+            labeling_atomic_symbols.append(atom_symbols)
+            labeling_atomic_coordinates.append(atom_coords)
+            labeling_comments.append(comment)
+            labeling_lattices.append(lattice)
             job_array_params_line = f":{system_auto}:"
             job_array_params_line += f"{padded_labeling_step}:"
             job_array_params_line += f"1_labeling_{padded_labeling_step}:"
@@ -395,34 +398,49 @@ def main(
             job_array_params_file[f"{labeling_program}"].append(job_array_params_line)
             del padded_labeling_step, labeling_step_path
 
-        del labeling_step
-        del num_atoms, atom_symbols, atom_coords, cell_info, comments, pbc_info, properties_info, max_f_std_info
+        if labeling_step + 1 != candidates_count:
+            arcann_logger.error(f"The number of structures in the xyz does not match the number of candidates.")
+            arcann_logger.error(f"Aborting...")
+            return 1
+
+        # One labeling XYZ file per step, written with a single call (the Lattice header is rebuilt from the cell when every frame has one)
+        if labeling_xyz_paths:
+            write_xyz_frames(
+                labeling_xyz_paths,
+                np.arange(len(labeling_xyz_paths)),
+                np.array([atom_symbols.shape[0] for atom_symbols in labeling_atomic_symbols]),
+                np.array(labeling_atomic_symbols),
+                np.array(labeling_atomic_coordinates),
+                np.array(labeling_lattices) if all(labeling_lattices) else np.array([]),
+                labeling_comments,
+            )
+        del labeling_step, xyz_file, labeling_xyz_paths, labeling_atomic_symbols, labeling_atomic_coordinates, labeling_comments, labeling_lattices
 
         # Disturbed
         xyz_file_disturbed = training_path / f"{padded_curr_iter}-exploration" / system_auto / f"candidates_{padded_curr_iter}_{system_auto}_disturbed.xyz"
         if xyz_file_disturbed.is_file():
-            num_atoms, atom_symbols, atom_coords, comments, cell_info, pbc_info, properties_info, max_f_std_info = parse_xyz_trajectory_file(xyz_file)
-            del xyz_file_disturbed
-
-            if atom_coords.shape[0] != candidates_count:
-                arcann_logger.error(f"The number of structures in the xyz does not match the number of candidates.")
-                arcann_logger.error(f"Aborting...")
-                return 1
-
-            for labeling_step_idx, labeling_step in enumerate(range(candidates_count, candidates_count + atom_coords.shape[0])):
+            labeling_xyz_paths, labeling_atomic_symbols, labeling_atomic_coordinates, labeling_comments, labeling_lattices = [], [], [], [], []
+            labeling_step_idx = -1
+            for labeling_step_idx, (atom_symbols, atom_coords, comment, lattice, _, _, _) in enumerate(iter_xyz_frames(xyz_file_disturbed)):
+                if labeling_step_idx >= candidates_count:
+                    arcann_logger.error(f"The number of structures in the xyz does not match the number of candidates.")
+                    arcann_logger.error(f"Aborting...")
+                    return 1
+
+                labeling_step = candidates_count + labeling_step_idx
                 padded_labeling_step = str(labeling_step).zfill(5)
                 labeling_step_path = system_path / padded_labeling_step
                 labeling_step_path.mkdir(exist_ok=True)
 
                 first_job_input_t = deepcopy(system_first_job_input)
                 first_job_input_t = replace_substring_in_string_list(first_job_input_t, "_R_PADDEDSTEP_", padded_labeling_step)
-                first_job_input_t = replace_substring_in_string_list(first_job_input_t, "_R_CELL_", " ".join([str(_) for _ in [cell_info[labeling_step][i] for i in [0, 4, 8]]]))
+                first_job_input_t = replace_substring_in_string_list(first_job_input_t, "_R_CELL_", " ".join([str(_) for _ in [lattice[i] for i in [0, 4, 8]]]))
                 string_list_to_textfile(labeling_step_path / f"1_labeling_{padded_labeling_step}.inp", first_job_input_t)
                 del first_job_input_t
                 if labeling_program == "cp2k":
                     second_job_input_t = deepcopy(system_second_job_input)
                     second_job_input_t = replace_substring_in_string_list(second_job_input_t, "_R_PADDEDSTEP_", padded_labeling_step)
-                    second_job_input_t = replace_substring_in_string_list(second_job_input_t, "_R_CELL_", " ".join([str(_) for _ in [cell_info[labeling_step][i] for i in [0, 4, 8]]]))
+                    second_job_input_t = replace_substring_in_string_list(second_job_input_t, "_R_CELL_", " ".join([str(_) for _ in [lattice[i] for i in [0, 4, 8]]]))
                     string_list_to_textfile(labeling_step_path / f"2_labeling_{padded_labeling_step}.inp", second_job_input_t)
                     del second_job_input_t
 
@@ -432,9 +450,11 @@ def main(
                 string_list_to_textfile(labeling_step_path / f"job_{labeling_program_up}_label_{padded_labeling_step}_{machine_spec['arch_type']}_{machine}.sh", job_file_t)
                 del job_file_t
 
-                if np.any(cell_info) == None:
-                    cell_info = np.array([])
-                write_xyz_frame(labeling_step_path / f"labeling_{padded_labeling_step}.xyz", labeling_step_idx, num_atoms, atom_symbols, atom_coords, cell_info, comments)
+                labeling_xyz_paths.append(labeling_step_path / f"labeling_{padded_labeling_step}.xyz")
+                labeling_atomic_symbols.append(atom_symbols)
+                labeling_atomic_coordinates.append(atom_coords)
+                labeling_comments.append(comment)
+                labeling_lattices.append(lattice)
 
                 job_array_params_line = f":{system_auto}:"
                 job_array_params_line += f"{padded_labeling_step}:"
@@ -448,10 +468,26 @@ def main(
                 job_array_params_line += f"{walltime_approx_s}:"
                 job_array_params_file[f"{labeling_program}"].append(job_array_params_line)
 
-                del padded_labeling_step, labeling_step_path
+                del labeling_step, padded_labeling_step, labeling_step_path
+
+            if labeling_step_idx + 1 != candidates_count:
+                arcann_logger.error(f"The number of structures in the xyz does not match the number of candidates.")
+                arcann_logger.error(f"Aborting...")
+                return 1
 
-            del labeling_step
-            del num_atoms, atom_symbols, atom_coords, cell_info, comments, pbc_info, properties_info, max_f_std_info
+            # One labeling XYZ file per step, written with a single call (the Lattice header is rebuilt from the cell when every frame has one)
+            if labeling_xyz_paths:
+                write_xyz_frames(
+                    labeling_xyz_paths,
+                    np.arange(len(labeling_xyz_paths)),
+                    np.array([atom_symbols.shape[0] for atom_symbols in labeling_atomic_symbols]),
+                    np.array(labeling_atomic_symbols),
+                    np.array(labeling_atomic_coordinates),
+                    np.array(labeling_lattices) if all(labeling_lattices) else np.array([]),
+                    labeling_comments,
+                )
+            del labeling_step_idx, labeling_xyz_paths, labeling_atomic_symbols, labeling_atomic_coordinates, labeling_comments, labeling_lattices
+        del xyz_file_disturbed
 
         # Update labeling JSON
         labeling_json["systems_auto"][system_auto]["walltime_first_job_h"] = system_walltime_first_job_h
@@ -0,0 +1,280 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+Test cases for the amber module.
+
+Classes
+-------
+TestReadNetcdfHeader():
+    Test case for the 'read_netcdf_header' function.
+TestReadAmberNetcdfFrames():
+    Test case for the 'read_amber_netcdf_frames' function.
+TestCheckAmberNetcdfFile():
+    Test case for the 'check_amber_netcdf_file' function.
+TestWriteAmberRestartFile():
+    Test case for the 'write_amber_restart_file' function.
+"""
+
+# Standard library modules
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Optional
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.amber import check_amber_netcdf_file, read_amber_netcdf_frames, read_netcdf_header, write_amber_restart_file
+
+
+def write_amber_netcdf(netcdf_file_path: Path, coordinates: np.ndarray, cell_lengths: Optional[np.ndarray] = None, conventions: str = "AMBER") -> None:
+    """
+    Writes an AMBER NetCDF trajectory (64-bit offset format, as sander does), used to build the test trajectories.
+    """
+
+    def name(value: str) -> bytes:
+        encoded = value.encode()
+        return struct.pack(">I", len(encoded)) + encoded + b"\x00" * (-len(encoded) % 4)
+
+    def char_attribute(attribute_name: str, value: str) -> bytes:
+        encoded = value.encode()
+        return name(attribute_name) + struct.pack(">II", 2, len(encoded)) + encoded + b"\x00" * (-len(encoded) % 4)
+
+    frame_count, atom_count = coordinates.shape[:2]
+    dimensions = [("frame", 0), ("spatial", 3), ("atom", atom_count), ("cell_spatial", 3), ("cell_angular", 3)]
+    # name, dimension ids, nc_type, per record shape
+    variables = [("spatial", [1], 2, (3,)), ("time", [0], 5, ()), ("coordinates", [0, 2, 1], 5, (atom_count, 3))]
+    if cell_lengths is not None:
+        variables += [("cell_lengths", [0, 3], 6, (3,)), ("cell_angles", [0, 4], 6, (3,))]
+    itemsizes = {2: 1, 5: 4, 6: 8}
+    sizes = [int(np.prod(shape)) * itemsizes[nc_type] for _, _, nc_type, shape in variables]
+    sizes = [size + (-size % 4) for size in sizes]
+
+    def header(begins) -> bytes:
+        content = b"CDF\x02" + struct.pack(">I", frame_count)
+        content += struct.pack(">II", 10, len(dimensions)) + b"".join(name(dimension) + struct.pack(">I", length) for dimension, length in dimensions)
+        content += struct.pack(">II", 12, 2) + char_attribute("Conventions", conventions) + char_attribute("ConventionVersion", "1.0")
+        content += struct.pack(">II", 11, len(variables))
+        for (variable_name, dimension_ids, nc_type, _), size, begin in zip(variables, sizes, begins):
+            content += name(variable_name) + struct.pack(">I", len(dimension_ids)) + b"".join(struct.pack(">I", dimension_id) for dimension_id in dimension_ids)
+            content += struct.pack(">II", 0, 0) + struct.pack(">II", nc_type, size) + struct.pack(">Q", begin)
+        return content
+
+    header_size = len(header([0] * len(variables)))
+    begins = [header_size, header_size + sizes[0]]
+    for size in sizes[1:-1]:
+        begins.append(begins[-1] + size)
+
+    with netcdf_file_path.open("wb") as file:
+        file.write(header(begins))
+        file.write(b"xyz\x00")
+        for frame_idx in range(frame_count):
+            file.write(np.array(frame_idx * 0.5, dtype=">f4").tobytes())
+            file.write(np.asarray(coordinates[frame_idx], dtype=">f4").tobytes())
+            if cell_lengths is not None:
+                file.write(np.asarray(cell_lengths[frame_idx], dtype=">f8").tobytes())
+                file.write(np.full(3, 90.0, dtype=">f8").tobytes())
+
+
+class TestReadNetcdfHeader(unittest.TestCase):
+    """
+    Test case for the 'read_netcdf_header' function.
+
+    Methods
+    -------
+    test_read_header():
+        Test that the dimensions, attributes and variables are read.
+    test_invalid_file():
+        Test that a non-NetCDF file raises a ValueError.
+    test_file_not_found():
+        Test that a missing file raises a FileNotFoundError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.netcdf_file = Path(self.temp_dir.name) / "traj.nc"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_read_header(self):
+        """
+        Test that the dimensions, attributes and variables are read.
+        """
+        write_amber_netcdf(self.netcdf_file, np.zeros((4, 5, 3)), np.full((4, 3), 20.0))
+        netcdf_header = read_netcdf_header(self.netcdf_file)
+        self.assertEqual(netcdf_header["version"], 2)
+        self.assertEqual(netcdf_header["record_count"], 4)
+        self.assertEqual(netcdf_header["dimensions"]["atom"], 5)
+        self.assertIsNone(netcdf_header["dimensions"]["frame"])
+        self.assertEqual(netcdf_header["attributes"]["Conventions"], "AMBER")
+        self.assertEqual(netcdf_header["variables"]["coordinates"]["shape"], (5, 3))
+        self.assertTrue(netcdf_header["variables"]["coordinates"]["is_record"])
+        self.assertFalse(netcdf_header["variables"]["spatial"]["is_record"])
+        self.assertEqual(netcdf_header["record_size"], 4 + 60 + 24 + 24)
+
+    def test_invalid_file(self):
+        """
+        Test that a non-NetCDF file raises a ValueError.
+        """
+        self.netcdf_file.write_bytes(b"\x89HDF\r\n\x1a\n" + b"\x00" * 64)
+        with self.assertRaises(ValueError):
+            read_netcdf_header(self.netcdf_file)
+
+    def test_file_not_found(self):
+        """
+        Test that a missing file raises a FileNotFoundError.
+        """
+        with self.assertRaises(FileNotFoundError):
+            read_netcdf_header(self.netcdf_file)
+
+
+class TestReadAmberNetcdfFrames(unittest.TestCase):
+    """
+    Test case for the 'read_amber_netcdf_frames' function.
+
+    Methods
+    -------
+    test_read_selected_frames():
+        Test that the selected frames and cells are read in the requested order.
+    test_read_without_cell():
+        Test that no cell is returned for a trajectory without cell.
+    test_out_of_range():
+        Test that an out of range frame index raises an IndexError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.netcdf_file = Path(self.temp_dir.name) / "traj.nc"
+        self.coordinates = np.arange(4 * 5 * 3, dtype=np.float64).reshape(4, 5, 3) / 4.0
+        self.cell_lengths = np.array([[20.0 + idx, 21.0, 22.0] for idx in range(4)])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_read_selected_frames(self):
+        """
+        Test that the selected frames and cells are read in the requested order.
+        """
+        write_amber_netcdf(self.netcdf_file, self.coordinates, self.cell_lengths)
+        atomic_coordinates, cell_lengths, cell_angles = read_amber_netcdf_frames(self.netcdf_file, [2, 0])
+        np.testing.assert_array_equal(atomic_coordinates, self.coordinates[[2, 0]])
+        np.testing.assert_array_equal(cell_lengths, self.cell_lengths[[2, 0]])
+        np.testing.assert_array_equal(cell_angles, np.full((2, 3), 90.0))
+
+    def test_read_without_cell(self):
+        """
+        Test that no cell is returned for a trajectory without cell.
+        """
+        write_amber_netcdf(self.netcdf_file, self.coordinates)
+        atomic_coordinates, cell_lengths, cell_angles = read_amber_netcdf_frames(self.netcdf_file, [3])
+        np.testing.assert_array_equal(atomic_coordinates, self.coordinates[[3]])
+        self.assertIsNone(cell_lengths)
+        self.assertIsNone(cell_angles)
+
+    def test_out_of_range(self):
+        """
+        Test that an out of range frame index raises an IndexError.
+        """
+        write_amber_netcdf(self.netcdf_file, self.coordinates)
+        with self.assertRaises(IndexError):
+            read_amber_netcdf_frames(self.netcdf_file, [4])
+
+
+class TestCheckAmberNetcdfFile(unittest.TestCase):
+    """
+    Test case for the 'check_amber_netcdf_file' function.
+
+    Methods
+    -------
+    test_valid_file():
+        Test that a complete trajectory is valid and that its frames are counted.
+    test_truncated_file():
+        Test that a trajectory missing part of its last record is invalid.
+    test_not_amber():
+        Test that a NetCDF file without the AMBER conventions is invalid.
+    test_invalid_file():
+        Test that a non-NetCDF file is invalid.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.netcdf_file = Path(self.temp_dir.name) / "traj.nc"
+        self.coordinates = np.zeros((3, 5, 3))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_valid_file(self):
+        """
+        Test that a complete trajectory is valid and that its frames are counted.
+        """
+        write_amber_netcdf(self.netcdf_file, self.coordinates, np.full((3, 3), 20.0))
+        self.assertEqual(check_amber_netcdf_file(self.netcdf_file), (True, 3))
+
+    def test_truncated_file(self):
+        """
+        Test that a trajectory missing part of its last record is invalid.
+        """
+        write_amber_netcdf(self.netcdf_file, self.coordinates, np.full((3, 3), 20.0))
+        self.netcdf_file.write_bytes(self.netcdf_file.read_bytes()[:-30])
+        self.assertEqual(check_amber_netcdf_file(self.netcdf_file), (False, 3))
+
+    def test_not_amber(self):
+        """
+        Test that a NetCDF file without the AMBER conventions is invalid.
+        """
+        write_amber_netcdf(self.netcdf_file, self.coordinates, conventions="CF-1.6")
+        self.assertFalse(check_amber_netcdf_file(self.netcdf_file)[0])
+
+    def test_invalid_file(self):
+        """
+        Test that a non-NetCDF file is invalid.
+        """
+        self.netcdf_file.write_bytes(b"CDF\x01")
+        self.assertEqual(check_amber_netcdf_file(self.netcdf_file), (False, 0))
+
+
+class TestWriteAmberRestartFile(unittest.TestCase):
+    """
+    Test case for the 'write_amber_restart_file' function.
+
+    Methods
+    -------
+    test_write_restart():
+        Test the layout of the restart file (6 coordinates per line, box line).
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.restart_file = Path(self.temp_dir.name) / "start.rst7"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write_restart(self):
+        """
+        Test the layout of the restart file (6 coordinates per line, box line).
+        """
+        coordinates = np.arange(9, dtype=np.float64).reshape(3, 3)
+        write_amber_restart_file(self.restart_file, coordinates, np.array([20.0, 21.0, 22.0]), title="frame 3", time=1.5)
+        lines = self.restart_file.read_text().splitlines()
+        self.assertEqual(lines[0], "frame 3")
+        self.assertEqual(lines[1], "    3  1.5000000e+00")
+        self.assertEqual(lines[2], "".join(f"{value:12.7f}" for value in range(6)))
+        self.assertEqual(lines[3], "".join(f"{value:12.7f}" for value in range(6, 9)))
+        self.assertEqual(lines[4], "  20.0000000  21.0000000  22.0000000  90.0000000  90.0000000  90.0000000")
+        np.testing.assert_array_equal(np.array(" ".join(lines[2:4]).split(), dtype=float).reshape(3, 3), coordinates)
+
+
+if __name__ == "__main__":
+    unittest.main()
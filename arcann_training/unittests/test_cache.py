@@ -0,0 +1,257 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+Test cases for the cache module.
+
+Classes
+-------
+TestGetCachePath():
+    Test case for the 'get_cache_path' and 'get_file_key' functions.
+TestCachedArrays():
+    Test case for the 'load_cached_arrays' and 'store_cached_arrays' functions.
+TestCachedXyzTrajectory():
+    Test case for the cache hits of 'parse_xyz_trajectory_file', 'read_xyz_frames' and 'read_xyz_max_f_std'.
+"""
+
+# Standard library modules
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.cache import get_cache_path, get_file_key, load_cached_arrays, store_cached_arrays
+from arcann_training.common.xyz import parse_xyz_trajectory_file, read_xyz_frames, read_xyz_max_f_std
+from arcann_training.unittests.test_xyz import XYZ_TRAJECTORY
+
+
+class TestGetCachePath(unittest.TestCase):
+    """
+    Test case for the 'get_cache_path' and 'get_file_key' functions.
+
+    Methods
+    -------
+    test_cache_path_in_iteration():
+        Test that the cache folder is in the nearest parent iteration folder.
+    test_cache_path_outside_iteration():
+        Test that there is no cache outside an iteration folder.
+    test_cache_disabled():
+        Test that a zero disk budget disables the cache.
+    test_file_key_changes():
+        Test that the key changes when the file is modified.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.iteration_path = Path(self.temp_dir.name) / "001-exploration"
+        (self.iteration_path / "system" / "00001").mkdir(parents=True)
+        self.data_file = self.iteration_path / "system" / "00001" / "traj.xyz"
+        self.data_file.write_text(XYZ_TRAJECTORY)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_cache_path_in_iteration(self):
+        """
+        Test that the cache folder is in the nearest parent iteration folder.
+        """
+        self.assertEqual(get_cache_path(self.data_file), self.iteration_path.resolve() / ".arcann_cache")
+
+    def test_cache_path_outside_iteration(self):
+        """
+        Test that there is no cache outside an iteration folder.
+        """
+        other_file = Path(self.temp_dir.name) / "traj.xyz"
+        other_file.write_text(XYZ_TRAJECTORY)
+        self.assertIsNone(get_cache_path(other_file))
+
+    def test_cache_disabled(self):
+        """
+        Test that a zero disk budget disables the cache.
+        """
+        self.assertIsNone(get_cache_path(self.data_file, 0))
+
+    def test_file_key_changes(self):
+        """
+        Test that the key changes when the file is modified.
+        """
+        key = get_file_key(self.data_file)
+        self.assertEqual(key, get_file_key(self.data_file))
+        self.data_file.write_text(XYZ_TRAJECTORY.replace("0.125", "0.375"))
+        self.assertNotEqual(key, get_file_key(self.data_file))
+
+
+class TestCachedArrays(unittest.TestCase):
+    """
+    Test case for the 'load_cached_arrays' and 'store_cached_arrays' functions.
+
+    Methods
+    -------
+    test_store_and_load():
+        Test that stored arrays are loaded back memory-mapped and read-only.
+    test_missing_array():
+        Test that None is returned if a requested array is not cached.
+    test_stale_entry():
+        Test that a modified file does not hit the entry of its previous version.
+    test_eviction():
+        Test that the least recently used entries are evicted over the disk budget.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.iteration_path = Path(self.temp_dir.name) / "001-exploration"
+        self.iteration_path.mkdir()
+        self.data_file = self.iteration_path / "data.txt"
+        self.data_file.write_text("0 1 2\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_store_and_load(self):
+        """
+        Test that stored arrays are loaded back memory-mapped and read-only.
+        """
+        store_cached_arrays(self.data_file, {"values": np.arange(3.0)})
+        cached_arrays = load_cached_arrays(self.data_file, ["values"])
+        np.testing.assert_array_equal(cached_arrays["values"], np.arange(3.0))
+        self.assertIsInstance(cached_arrays["values"], np.memmap)
+        self.assertFalse(cached_arrays["values"].flags.writeable)
+
+    def test_missing_array(self):
+        """
+        Test that None is returned if a requested array is not cached.
+        """
+        self.assertIsNone(load_cached_arrays(self.data_file, ["values"]))
+        store_cached_arrays(self.data_file, {"values": np.arange(3.0)})
+        self.assertIsNone(load_cached_arrays(self.data_file, ["values", "others"]))
+
+    def test_stale_entry(self):
+        """
+        Test that a modified file does not hit the entry of its previous version.
+        """
+        store_cached_arrays(self.data_file, {"values": np.arange(3.0)})
+        self.data_file.write_text("0 1 2 3\n")
+        self.assertIsNone(load_cached_arrays(self.data_file, ["values"]))
+
+    def test_eviction(self):
+        """
+        Test that the least recently used entries are evicted over the disk budget.
+        """
+        data_files = []
+        for idx in range(3):
+            data_file = self.iteration_path / f"data_{idx}.txt"
+            data_file.write_text(f"{idx}\n")
+            data_files.append(data_file)
+            # About 1 kB per entry: only two entries fit in the budget
+            store_cached_arrays(data_file, {"values": np.zeros(100)}, 0.002)
+            time.sleep(0.01)
+        self.assertIsNone(load_cached_arrays(data_files[0], ["values"], 0.002))
+        self.assertIsNotNone(load_cached_arrays(data_files[2], ["values"], 0.002))
+
+
+class TestCachedXyzTrajectory(unittest.TestCase):
+    """
+    Test case for the cache hits of 'parse_xyz_trajectory_file', 'read_xyz_frames' and 'read_xyz_max_f_std'.
+
+    Methods
+    -------
+    test_parse_cache_hit():
+        Test that a second parse returns the same values from the cache.
+    test_read_frames_cache_hit():
+        Test that reading frames of a parsed trajectory slices the cached arrays.
+    test_read_frames_merged():
+        Test that the frames read by separate calls are merged in one entry and served without reading the file.
+    test_read_max_f_std_cache_hit():
+        Test that the 'max_f_std' values are cached.
+    test_cache_disabled():
+        Test that nothing is cached with a zero disk budget.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.iteration_path = Path(self.temp_dir.name) / "001-exploration"
+        self.iteration_path.mkdir()
+        self.xyz_file = self.iteration_path / "traj.xyz"
+        self.xyz_file.write_text(XYZ_TRAJECTORY)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_parse_cache_hit(self):
+        """
+        Test that a second parse returns the same values from the cache.
+        """
+        parsed = parse_xyz_trajectory_file(self.xyz_file)
+        self.assertIsNotNone(load_cached_arrays(self.xyz_file, ["atomic_coordinates"]))
+        cached = parse_xyz_trajectory_file(self.xyz_file)
+        self.assertIsInstance(cached[2], np.memmap)
+        for idx in range(3):
+            np.testing.assert_array_equal(parsed[idx], cached[idx])
+        self.assertEqual(parsed[3], cached[3])
+        for lattice, cached_lattice in zip(parsed[4], cached[4]):
+            np.testing.assert_array_equal(lattice, cached_lattice)
+        self.assertEqual(parsed[5:], cached[5:])
+
+    def test_read_frames_cache_hit(self):
+        """
+        Test that reading frames of a parsed trajectory slices the cached arrays.
+        """
+        expected = read_xyz_frames(self.xyz_file, [1, 0])
+        parse_xyz_trajectory_file(self.xyz_file)
+        cached = read_xyz_frames(self.xyz_file, [1, 0])
+        np.testing.assert_array_equal(expected[2], cached[2])
+        self.assertEqual(expected[3], cached[3])
+        self.assertEqual(expected[7], cached[7])
+        with self.assertRaises(IndexError):
+            read_xyz_frames(self.xyz_file, [2])
+
+    def test_read_frames_merged(self):
+        """
+        Test that the frames read by separate calls are merged in one entry and served without reading the file.
+        """
+        expected = read_xyz_frames(self.xyz_file, [1, 0], 0)
+        read_xyz_frames(self.xyz_file, [1])
+        read_xyz_frames(self.xyz_file, [0])
+        with mock.patch("arcann_training.common.xyz.get_xyz_frame_offsets") as mocked_offsets:
+            cached = read_xyz_frames(self.xyz_file, [1, 0, 1])
+            parsed = parse_xyz_trajectory_file(self.xyz_file)
+            mocked_offsets.assert_not_called()
+        np.testing.assert_array_equal(cached[1], expected[1][[0, 1, 0]])
+        np.testing.assert_array_equal(cached[2], expected[2][[0, 1, 0]])
+        self.assertEqual(cached[3], [expected[3][0], expected[3][1], expected[3][0]])
+        np.testing.assert_array_equal(cached[4][0], expected[4][0])
+        self.assertEqual(cached[5:], tuple(info + [info[0]] for info in expected[5:]))
+        np.testing.assert_array_equal(parsed[2], expected[2][::-1])
+
+    def test_read_max_f_std_cache_hit(self):
+        """
+        Test that the 'max_f_std' values are cached.
+        """
+        max_f_std = read_xyz_max_f_std(self.xyz_file)
+        cached_arrays = load_cached_arrays(self.xyz_file, ["max_f_std"])
+        np.testing.assert_array_equal(cached_arrays["max_f_std"], max_f_std)
+        np.testing.assert_array_equal(read_xyz_max_f_std(self.xyz_file), [0.125, 0.250])
+
+    def test_cache_disabled(self):
+        """
+        Test that nothing is cached with a zero disk budget.
+        """
+        parse_xyz_trajectory_file(self.xyz_file, 0)
+        read_xyz_frames(self.xyz_file, [0], 0)
+        read_xyz_max_f_std(self.xyz_file, 0)
+        self.assertFalse((self.iteration_path / ".arcann_cache").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
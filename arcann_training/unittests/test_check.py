@@ -6,230 +6,146 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/18
 
 Test case for the check module.
 
 Classes
 -------
-TestCheckAtomsk():
-    Test case for the 'check_atomsk' function.
-
-TestCheckVMD():
-    Test case for the 'check_vmd' function.
-
 TestValidateStepFolder():
     Test case for the 'validate_step_folder' function.
+
+TestCheckDcdIsValid():
+    Test case for the 'check_dcd_is_valid' function.
+
+TestCheckNcIsValid():
+    Test case for the 'check_nc_is_valid' function.
 """
 
 # Standard library modules
-import logging
 import os
-import shutil
 import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import patch
+
+# Third-party modules
+import numpy as np
 
 # Local imports
 from arcann_training.common.check import (
-    check_atomsk,
-    check_vmd,
+    check_dcd_is_valid,
+    check_nc_is_valid,
     validate_step_folder,
 )
+from arcann_training.unittests.test_amber import write_amber_netcdf
+from arcann_training.unittests.test_dcd import write_dcd
 
 
-class TestCheckAtomsk(unittest.TestCase):
+class TestValidateStepFolder(unittest.TestCase):
     """
-    Test case for the 'check_atomsk' function.
+    Test case for 'validate_step_folder' function.
 
     Methods
     -------
-    test_system_path():
-        Test that 'check_atomsk' finds atomsk in the system path and returns the full path.
-
-    test_atomsk_path():
-        Test that 'check_atomsk' finds atomsk at a specified path and returns the full path.
-
-    test_invalid_path():
-        Test that 'check_atomsk' logs a warning for an invalid path.
-
-    test_invalid_env_var():
-        Test that 'check_atomsk' ignores an invalid ATOMSK_PATH environment variable.
-
-    test_env_var():
-        Test that 'check_atomsk' finds atomsk at an environment variable-specified path and returns the full path.
+    test_validate_step_folder():
+        Test that 'validate_step_folder' returns None when the current directory name matches the expected directory for the step.
+    test_validate_step_folder_raises_error():
+        Test that 'validate_step_folder' raises a ValueError when the current directory name does not contain the step name.
     """
 
     def setUp(self):
-        self.tempdir = tempfile.mkdtemp()
-        vmd_file = Path(self.tempdir) / "atomsk"
-        vmd_file.touch()
-        vmd_file.chmod(0o755)
-        path_separator = ";" if os.name == "nt" else ":"
-        os.environ["PATH"] = f"{self.tempdir}{path_separator}{os.environ['PATH']}"
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.step_name = "step1"
+        self.step_folder = Path(self.temp_dir.name) / self.step_name
+        self.step_folder.mkdir()
 
     def tearDown(self):
-        shutil.rmtree(self.tempdir)
-
-    @patch("shutil.which")
-    def test_system_path(self, mock_which):
-        """
-        Test that 'check_atomsk' finds atomsk in the system path and returns the full path.
-        """
-        mock_which.return_value = "/usr/bin/atomsk"
-        atomsk_bin = check_atomsk()
-        self.assertEqual(atomsk_bin, str(Path("/usr/bin/atomsk").resolve()))
-
-    def test_atomsk_path(self):
-        """
-        Test that 'check_atomsk finds atomsk at a specified path and returns the full path.
-        """
-        atomsk_path = Path(self.tempdir) / "atomsk"
-        atomsk_bin = check_atomsk(str(atomsk_path))
-        self.assertEqual(atomsk_bin, str(atomsk_path.resolve()))
-
-    def test_invalid_path(self):
-        """
-        Test that 'check_atomsk' logs a warning for an invalid path.
-        """
-        invalid_path = "/invalid/path/to/atomsk"
-        with self.assertLogs(level=logging.WARNING):
-            atomsk_bin = check_atomsk(invalid_path)
-            self.assertEqual(atomsk_bin, str(shutil.which("atomsk")))
+        self.temp_dir.cleanup()
 
-    def test_invalid_env_var(self):
+    def test_validate_step_folder(self):
         """
-        Test that 'check_atomsk' ignores an invalid ATOMSK_PATH environment variable.
+        Test that 'validate_step_folder' returns None when the current directory name matches the expected directory for the step.
         """
-        os.environ["ATOMSK_PATH"] = "/invalid/path/to/atomsk"
-        atomsk_bin = check_atomsk()
-        self.assertEqual(atomsk_bin, str(shutil.which("atomsk")))
+        os.chdir(self.step_folder)
+        with self.step_folder:
+            self.assertIsNone(validate_step_folder(self.step_name))
 
-    def test_env_var(self):
+    def test_validate_step_folder_raises_error(self):
         """
-        Test that 'check_atomsk' finds vmd at an environment variable-specified path and returns the full path.
+        Test that 'validate_step_folder' raises a ValueError when the current directory name does not contain the step name.
         """
-        atomsk_path = Path(self.tempdir) / "atomsk"
-        os.environ["ATOMSK_PATH"] = str(atomsk_path)
-        atomsk_bin = check_atomsk()
-        self.assertEqual(atomsk_bin, str(atomsk_path.resolve()))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.chdir(temp_dir)
+            with self.assertRaises(ValueError):
+                validate_step_folder(self.step_name)
 
 
-class TestCheckVMD(unittest.TestCase):
+class TestCheckDcdIsValid(unittest.TestCase):
     """
-    Test case for the 'check_vmd' function.
+    Test case for the 'check_dcd_is_valid' function.
 
     Methods
     -------
-    test_system_path():
-        Test that 'check_vmd' finds vmd in the system path and returns the full path.
-
-    test_vmd_path():
-        Test that 'check_vmd' finds vmd at a specified path and returns the full path.
-
-    test_invalid_path():
-        Test that 'check_vmd' logs a warning for an invalid path.
-
-    test_invalid_env_var():
-        Test that 'check_vmd' ignores an invalid VMD_PATH environment variable.
-
-    test_env_var():
-        Test that 'check_vmd' finds vmd at an environment variable-specified path and returns the full path.
+    test_valid_dcd():
+        Test that a complete DCD file is valid.
+    test_truncated_dcd():
+        Test that a truncated DCD file is invalid.
     """
 
     def setUp(self):
-        self.tempdir = tempfile.mkdtemp()
-        vmd_file = Path(self.tempdir) / "vmd"
-        vmd_file.touch()
-        vmd_file.chmod(0o755)
-        path_separator = ";" if os.name == "nt" else ":"
-        os.environ["PATH"] = f"{self.tempdir}{path_separator}{os.environ['PATH']}"
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dcd_file = Path(self.temp_dir.name) / "traj.dcd"
+        write_dcd(self.dcd_file, np.zeros((2, 3, 3)))
 
     def tearDown(self):
-        shutil.rmtree(self.tempdir)
-
-    @patch("shutil.which")
-    def test_system_path(self, mock_which):
-        """
-        Test that 'check_vmd' finds vmd in the system path and returns the full path.
-        """
-        mock_which.return_value = "/usr/bin/vmd"
-        vmd_bin = check_vmd()
-        self.assertEqual(vmd_bin, str(Path("/usr/bin/vmd").resolve()))
-
-    def test_vmd_path(self):
-        """
-        Test that 'check_vmd' finds vmd at a specified path and returns the full path.
-        """
-        vmd_path = Path(self.tempdir) / "vmd"
-        vmd_bin = check_vmd(str(vmd_path))
-        self.assertEqual(vmd_bin, str(vmd_path.resolve()))
-
-    def test_invalid_path(self):
-        """
-        Test that 'check_vmd' logs a warning for an invalid path.
-        """
-        invalid_path = "/invalid/path/to/vmd"
-        with self.assertLogs(level=logging.WARNING):
-            vmd_bin = check_vmd(invalid_path)
-            self.assertEqual(vmd_bin, str(shutil.which("vmd")))
+        self.temp_dir.cleanup()
 
-    def test_invalid_env_var(self):
+    def test_valid_dcd(self):
         """
-        Test that 'check_vmd' ignores an invalid VMD_PATH environment variable.
+        Test that a complete DCD file is valid.
         """
-        os.environ["VMD_PATH"] = "/invalid/path/to/vmd"
-        vmd_bin = check_vmd()
-        self.assertEqual(vmd_bin, str(shutil.which("vmd")))
+        self.assertTrue(check_dcd_is_valid(self.dcd_file))
 
-    def test_env_var(self):
+    def test_truncated_dcd(self):
         """
-        Test that 'check_vmd' finds vmd at an environment variable-specified path and returns the full path.
+        Test that a truncated DCD file is invalid.
         """
-        vmd_path = Path(self.tempdir) / "vmd"
-        os.environ["VMD_PATH"] = str(vmd_path)
-        vmd_bin = check_vmd()
-        self.assertEqual(vmd_bin, str(vmd_path.resolve()))
+        self.dcd_file.write_bytes(self.dcd_file.read_bytes()[:-1])
+        self.assertFalse(check_dcd_is_valid(self.dcd_file))
 
 
-class TestValidateStepFolder(unittest.TestCase):
+class TestCheckNcIsValid(unittest.TestCase):
     """
-    Test case for 'validate_step_folder' function.
+    Test case for the 'check_nc_is_valid' function.
 
     Methods
     -------
-    test_validate_step_folder():
-        Test that 'validate_step_folder' returns None when the current directory name matches the expected directory for the step.
-    test_validate_step_folder_raises_error():
-        Test that 'validate_step_folder' raises a ValueError when the current directory name does not contain the step name.
+    test_valid_nc():
+        Test that a complete NetCDF trajectory is valid.
+    test_truncated_nc():
+        Test that a truncated NetCDF trajectory is invalid.
     """
 
     def setUp(self):
         self.temp_dir = tempfile.TemporaryDirectory()
-        self.step_name = "step1"
-        self.step_folder = Path(self.temp_dir.name) / self.step_name
-        self.step_folder.mkdir()
+        self.nc_file = Path(self.temp_dir.name) / "traj.nc"
+        write_amber_netcdf(self.nc_file, np.zeros((2, 3, 3)))
 
     def tearDown(self):
         self.temp_dir.cleanup()
 
-    def test_validate_step_folder(self):
+    def test_valid_nc(self):
         """
-        Test that 'validate_step_folder' returns None when the current directory name matches the expected directory for the step.
+        Test that a complete NetCDF trajectory is valid.
         """
-        os.chdir(self.step_folder)
-        with self.step_folder:
-            self.assertIsNone(validate_step_folder(self.step_name))
+        self.assertTrue(check_nc_is_valid(self.nc_file))
 
-    def test_validate_step_folder_raises_error(self):
+    def test_truncated_nc(self):
         """
-        Test that 'validate_step_folder' raises a ValueError when the current directory name does not contain the step name.
+        Test that a truncated NetCDF trajectory is invalid.
         """
-        with tempfile.TemporaryDirectory() as temp_dir:
-            os.chdir(temp_dir)
-            with self.assertRaises(ValueError):
-                validate_step_folder(self.step_name)
+        self.nc_file.write_bytes(self.nc_file.read_bytes()[:-1])
+        self.assertFalse(check_nc_is_valid(self.nc_file))
 
 
 if __name__ == "__main__":
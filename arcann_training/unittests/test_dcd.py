@@ -0,0 +1,295 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+Test cases for the dcd module.
+
+Classes
+-------
+TestReadDcdHeader():
+    Test case for the 'read_dcd_header' function.
+TestReadDcdFrames():
+    Test case for the 'read_dcd_frames' function.
+TestDcdUnitCellToLattice():
+    Test case for the 'dcd_unit_cell_to_lattice' function.
+TestCheckDcdFile():
+    Test case for the 'check_dcd_file' function.
+"""
+
+# Standard library modules
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Optional
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.dcd import check_dcd_file, dcd_unit_cell_to_lattice, read_dcd_frames, read_dcd_header
+
+
+def write_dcd(dcd_file_path: Path, coordinates: np.ndarray, unit_cells: Optional[np.ndarray] = None, byte_order: str = "<") -> None:
+    """
+    Writes a CHARMM-flavoured DCD file (as LAMMPS does), used to build the test trajectories.
+    """
+
+    def record(payload: bytes) -> bytes:
+        return struct.pack(f"{byte_order}i", len(payload)) + payload + struct.pack(f"{byte_order}i", len(payload))
+
+    control = [coordinates.shape[0], 0, 10] + [0] * 6 + [0, 1 if unit_cells is not None else 0] + [0] * 8 + [24]
+    header = b"CORD" + struct.pack(f"{byte_order}9i", *control[:9]) + struct.pack(f"{byte_order}f", 0.5) + struct.pack(f"{byte_order}10i", *control[10:])
+    titles = struct.pack(f"{byte_order}i", 2) + b"Created by test".ljust(80) + b"ArcaNN".ljust(80)
+    with dcd_file_path.open("wb") as file:
+        file.write(record(header))
+        file.write(record(titles))
+        file.write(record(struct.pack(f"{byte_order}i", coordinates.shape[1])))
+        for frame_idx, frame in enumerate(coordinates):
+            if unit_cells is not None:
+                file.write(record(np.asarray(unit_cells[frame_idx], dtype=f"{byte_order}f8").tobytes()))
+            for axis in range(3):
+                file.write(record(np.asarray(frame[:, axis], dtype=f"{byte_order}f4").tobytes()))
+
+
+class TestReadDcdHeader(unittest.TestCase):
+    """
+    Test case for the 'read_dcd_header' function.
+
+    Methods
+    -------
+    test_read_header():
+        Test that the header values are read.
+    test_big_endian():
+        Test that a big-endian file is detected.
+    test_truncated_frame():
+        Test that a truncated trailing frame is not counted.
+    test_invalid_file():
+        Test that a non-DCD file raises a ValueError.
+    test_file_not_found():
+        Test that a missing file raises a FileNotFoundError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dcd_file = Path(self.temp_dir.name) / "traj.dcd"
+        self.coordinates = np.arange(5 * 4 * 3, dtype=np.float64).reshape(5, 4, 3) / 10.0
+        self.unit_cells = np.array([[10.0 + idx, 0.0, 11.0, 0.0, 0.0, 12.0] for idx in range(5)])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_read_header(self):
+        """
+        Test that the header values are read.
+        """
+        write_dcd(self.dcd_file, self.coordinates, self.unit_cells)
+        dcd_header = read_dcd_header(self.dcd_file)
+        self.assertEqual(dcd_header["atom_count"], 4)
+        self.assertEqual(dcd_header["frame_count"], 5)
+        self.assertEqual(dcd_header["header_frame_count"], 5)
+        self.assertEqual(dcd_header["save_frequency"], 10)
+        self.assertAlmostEqual(dcd_header["timestep"], 0.5)
+        self.assertTrue(dcd_header["has_unit_cell"])
+        self.assertFalse(dcd_header["has_4d"])
+        self.assertEqual(dcd_header["titles"], ["Created by test", "ArcaNN"])
+        self.assertEqual(dcd_header["header_size"] + 5 * dcd_header["frame_size"], self.dcd_file.stat().st_size)
+
+    def test_big_endian(self):
+        """
+        Test that a big-endian file is detected.
+        """
+        write_dcd(self.dcd_file, self.coordinates, byte_order=">")
+        dcd_header = read_dcd_header(self.dcd_file)
+        self.assertEqual(dcd_header["byte_order"], ">")
+        self.assertEqual(dcd_header["frame_count"], 5)
+        self.assertFalse(dcd_header["has_unit_cell"])
+
+    def test_truncated_frame(self):
+        """
+        Test that a truncated trailing frame is not counted.
+        """
+        write_dcd(self.dcd_file, self.coordinates, self.unit_cells)
+        self.dcd_file.write_bytes(self.dcd_file.read_bytes()[:-10])
+        self.assertEqual(read_dcd_header(self.dcd_file)["frame_count"], 4)
+
+    def test_invalid_file(self):
+        """
+        Test that a non-DCD file raises a ValueError.
+        """
+        self.dcd_file.write_bytes(b"\x00" * 200)
+        with self.assertRaises(ValueError):
+            read_dcd_header(self.dcd_file)
+
+    def test_file_not_found(self):
+        """
+        Test that a missing file raises a FileNotFoundError.
+        """
+        with self.assertRaises(FileNotFoundError):
+            read_dcd_header(self.dcd_file)
+
+
+class TestReadDcdFrames(unittest.TestCase):
+    """
+    Test case for the 'read_dcd_frames' function.
+
+    Methods
+    -------
+    test_read_selected_frames():
+        Test that the selected frames and unit cells are read in the requested order.
+    test_read_without_unit_cell():
+        Test that no unit cell is returned for a file without unit cell records.
+    test_out_of_range():
+        Test that an out of range frame index raises an IndexError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dcd_file = Path(self.temp_dir.name) / "traj.dcd"
+        self.coordinates = np.arange(5 * 4 * 3, dtype=np.float64).reshape(5, 4, 3) / 4.0
+        self.unit_cells = np.array([[10.0 + idx, 0.0, 11.0, 0.0, 0.0, 12.0] for idx in range(5)])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_read_selected_frames(self):
+        """
+        Test that the selected frames and unit cells are read in the requested order.
+        """
+        write_dcd(self.dcd_file, self.coordinates, self.unit_cells)
+        atomic_coordinates, unit_cells = read_dcd_frames(self.dcd_file, [3, 0])
+        np.testing.assert_array_equal(atomic_coordinates, self.coordinates[[3, 0]])
+        np.testing.assert_array_equal(unit_cells, self.unit_cells[[3, 0]])
+
+    def test_read_without_unit_cell(self):
+        """
+        Test that no unit cell is returned for a file without unit cell records.
+        """
+        write_dcd(self.dcd_file, self.coordinates, byte_order=">")
+        atomic_coordinates, unit_cells = read_dcd_frames(self.dcd_file, [4])
+        np.testing.assert_array_equal(atomic_coordinates, self.coordinates[[4]])
+        self.assertIsNone(unit_cells)
+
+    def test_out_of_range(self):
+        """
+        Test that an out of range frame index raises an IndexError.
+        """
+        write_dcd(self.dcd_file, self.coordinates, self.unit_cells)
+        with self.assertRaises(IndexError):
+            read_dcd_frames(self.dcd_file, [5])
+
+
+class TestDcdUnitCellToLattice(unittest.TestCase):
+    """
+    Test case for the 'dcd_unit_cell_to_lattice' function.
+
+    Methods
+    -------
+    test_orthogonal_cosines():
+        Test an orthogonal cell written with cosines (LAMMPS).
+    test_orthogonal_degrees():
+        Test an orthogonal cell written with angles in degrees (CHARMM/NAMD).
+    test_triclinic():
+        Test that a triclinic cell gives the expected lattice vector lengths and angles.
+    """
+
+    def test_orthogonal_cosines(self):
+        """
+        Test an orthogonal cell written with cosines (LAMMPS).
+        """
+        np.testing.assert_array_equal(dcd_unit_cell_to_lattice(np.array([10.0, 0.0, 11.0, 0.0, 0.0, 12.0])), [10.0, 0.0, 0.0, 0.0, 11.0, 0.0, 0.0, 0.0, 12.0])
+
+    def test_orthogonal_degrees(self):
+        """
+        Test an orthogonal cell written with angles in degrees (CHARMM/NAMD).
+        """
+        lattice = dcd_unit_cell_to_lattice(np.array([[10.0, 90.0, 11.0, 90.0, 90.0, 12.0]]))
+        self.assertEqual(lattice.shape, (1, 9))
+        np.testing.assert_allclose(lattice[0], [10.0, 0.0, 0.0, 0.0, 11.0, 0.0, 0.0, 0.0, 12.0], atol=1e-12)
+
+    def test_triclinic(self):
+        """
+        Test that a triclinic cell gives the expected lattice vector lengths and angles.
+        """
+        lattice = dcd_unit_cell_to_lattice(np.array([10.0, 80.0, 11.0, 70.0, 60.0, 12.0])).reshape(3, 3)
+        np.testing.assert_allclose(np.linalg.norm(lattice, axis=1), [10.0, 11.0, 12.0])
+        np.testing.assert_allclose(np.dot(lattice[1], lattice[2]) / (11.0 * 12.0), np.cos(np.deg2rad(60.0)))
+        np.testing.assert_allclose(np.dot(lattice[0], lattice[2]) / (10.0 * 12.0), np.cos(np.deg2rad(70.0)))
+        np.testing.assert_allclose(np.dot(lattice[0], lattice[1]) / (10.0 * 11.0), np.cos(np.deg2rad(80.0)))
+
+
+class TestCheckDcdFile(unittest.TestCase):
+    """
+    Test case for the 'check_dcd_file' function.
+
+    Methods
+    -------
+    test_valid_file():
+        Test that a complete file is valid and that its frames are counted.
+    test_truncated_frame():
+        Test that a truncated trailing frame makes the file invalid.
+    test_corrupted_record():
+        Test that a corrupted record marker makes the file invalid.
+    test_invalid_header():
+        Test that a file with an invalid header is invalid.
+    test_empty_trajectory():
+        Test that a file without any frame is invalid.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dcd_file = Path(self.temp_dir.name) / "traj.dcd"
+        self.coordinates = np.zeros((3, 4, 3))
+        self.unit_cells = np.tile([10.0, 0.0, 10.0, 0.0, 0.0, 10.0], (3, 1))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_valid_file(self):
+        """
+        Test that a complete file is valid and that its frames are counted.
+        """
+        write_dcd(self.dcd_file, self.coordinates, self.unit_cells)
+        self.assertEqual(check_dcd_file(self.dcd_file), (True, 3))
+
+    def test_truncated_frame(self):
+        """
+        Test that a truncated trailing frame makes the file invalid.
+        """
+        write_dcd(self.dcd_file, self.coordinates, self.unit_cells)
+        self.dcd_file.write_bytes(self.dcd_file.read_bytes()[:-4])
+        self.assertEqual(check_dcd_file(self.dcd_file), (False, 2))
+
+    def test_corrupted_record(self):
+        """
+        Test that a corrupted record marker makes the file invalid.
+        """
+        write_dcd(self.dcd_file, self.coordinates)
+        content = bytearray(self.dcd_file.read_bytes())
+        content[-4:] = struct.pack("<i", 0)
+        self.dcd_file.write_bytes(bytes(content))
+        self.assertEqual(check_dcd_file(self.dcd_file), (False, 3))
+
+    def test_invalid_header(self):
+        """
+        Test that a file with an invalid header is invalid.
+        """
+        self.dcd_file.write_bytes(b"CORD")
+        self.assertEqual(check_dcd_file(self.dcd_file), (False, 0))
+
+    def test_empty_trajectory(self):
+        """
+        Test that a file without any frame is invalid.
+        """
+        write_dcd(self.dcd_file, np.zeros((0, 4, 3)))
+        self.assertEqual(check_dcd_file(self.dcd_file), (False, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
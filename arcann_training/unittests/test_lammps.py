@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2023/09/04
-Last modified: 2024/05/15
+Last modified: 2026/10/18
 
 Test cases for the lammps module.
 
@@ -14,18 +14,63 @@ Classes
 -------
 TestReadLammpsData():
     Test case for the 'read_lammps_data' function.
+TestReadLammpsDataFile():
+    Test case for the sectioned parsing and the per-file memoization of 'read_lammps_data'.
+TestReadLammpsDataAtoms():
+    Test case for the 'read_lammps_data_atoms' function.
+TestReadLammpsDataAtomTypes():
+    Test case for the 'read_lammps_data_atom_types' function.
 """
 
 # Standard library modules
 from contextlib import AbstractContextManager
+from pathlib import Path
 from typing import Any
+from unittest import mock
+import os
+import tempfile
 import unittest
 
 # Third-party modules
 import numpy as np
 
 # Local imports
-from arcann_training.common.lammps import read_lammps_data
+from arcann_training.common import lammps
+from arcann_training.common.lammps import read_lammps_data, read_lammps_data_atoms, read_lammps_data_atom_types
+
+# A data file as written by LAMMPS 'write_data' (title line, blank lines, comments, image flags, extra sections)
+LAMMPS_DATA_FILE = """LAMMPS data file via write_data, version 2 Aug 2023, timestep = 0, units = metal
+
+3 atoms
+2 atom types
+
+0.0 10.0 xlo xhi
+-1.0 11.0 ylo yhi
+0.0 12.0 zlo zhi
+1.0 0.0 0.0 xy xz yz
+
+Masses
+
+1 15.999 # O
+2 1.008 # H
+
+Pair Coeffs # deepmd
+
+1
+2
+
+Atoms # atomic
+
+2 2 4.0 5.0 6.0 0 0 0
+1 1 1.0 2.0 3.0 0 1 0
+3 2 7.0 8.0 9.0 0 0 -1
+
+Velocities
+
+1 0.0 0.0 0.0
+2 0.0 0.0 0.0
+3 0.0 0.0 0.0
+"""
 
 
 class TestReadLammpsData(unittest.TestCase):
@@ -66,6 +111,9 @@ class TestReadLammpsData(unittest.TestCase):
 
     test_no_masses_section():
         Test handling of missing 'Masses' section.
+
+    test_title_line():
+        Test that the title line is not read as a header keyword.
     """
 
     def test_successful_read(self):
@@ -73,6 +121,7 @@ class TestReadLammpsData(unittest.TestCase):
         Test successful reading of LAMMPS data format.
         """
         data = [
+            "LAMMPS data file",
             "3 atoms",
             "3 atom types",
             "0.0 10.0 xlo xhi",
@@ -297,6 +346,177 @@ class TestReadLammpsData(unittest.TestCase):
         with self.assertRaises(ValueError):
             read_lammps_data(data)
 
+    def test_title_line(self):
+        """
+        Test that the title line is not read as a header keyword.
+        """
+        for title in ["water atoms", "solvated atom types", "LAMMPS data file # 64 atoms"]:
+            data = [
+                title,
+                "",
+                "2 atoms",
+                "1 atom types",
+                "0.0 10.0 xlo xhi",
+                "0.0 10.0 ylo yhi",
+                "0.0 10.0 zlo zhi",
+                "Masses",
+                "1 1.008",
+                "Atoms # atomic",
+                "1 1 1.0 2.0 3.0",
+                "2 1 4.0 5.0 6.0",
+            ]
+            num_atoms, num_atom_types, _, _, atoms = read_lammps_data(data)
+            self.assertEqual(num_atoms, 2)
+            self.assertEqual(num_atom_types, 1)
+            np.testing.assert_array_equal(atoms, np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]))
+
+
+
+class TestReadLammpsDataFile(unittest.TestCase):
+    """
+    Test case for the sectioned parsing and the per-file memoization of 'read_lammps_data'.
+
+    Methods
+    -------
+    test_read_write_data_file():
+        Test reading a file with a title line, comments, image flags and extra sections.
+
+    test_memoized_per_file():
+        Test that a file is parsed once, and parsed again when it is modified.
+
+    test_ragged_section():
+        Test handling of atom lines with different numbers of columns.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_file = Path(self.temp_dir.name) / "system.lmp"
+        self.data_file.write_text(LAMMPS_DATA_FILE)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_read_write_data_file(self):
+        """
+        Test reading a file with a title line, comments, image flags and extra sections.
+        """
+        num_atoms, num_atom_types, box_bounds, masses, atoms = read_lammps_data(self.data_file)
+        self.assertEqual((num_atoms, num_atom_types), (3, 2))
+        np.testing.assert_array_equal(box_bounds, np.array([0.0, 10.0, -1.0, 11.0, 0.0, 12.0, 1.0, 0.0, 0.0]))
+        self.assertDictEqual(masses, {1: 15.999, 2: 1.008})
+        np.testing.assert_array_equal(atoms, np.array([[4.0, 5.0, 6.0], [1.0, 2.0, 3.0], [7.0, 8.0, 9.0]]))
+        np.testing.assert_array_equal(read_lammps_data_atom_types(self.data_file), np.array([1, 2, 2]))
+        self.assertEqual(read_lammps_data(LAMMPS_DATA_FILE.splitlines())[1], 2)
+
+    def test_memoized_per_file(self):
+        """
+        Test that a file is parsed once, and parsed again when it is modified.
+        """
+        with mock.patch.object(lammps, "_parse_lammps_data_sections", wraps=lammps._parse_lammps_data_sections) as parse_mock:
+            for _ in range(3):
+                read_lammps_data(self.data_file)
+                read_lammps_data_atoms(self.data_file)
+            self.assertEqual(parse_mock.call_count, 1)
+            self.data_file.write_text(LAMMPS_DATA_FILE.replace("4.0 5.0 6.0", "4.5 5.0 6.0"))
+            os.utime(self.data_file, ns=(0, self.data_file.stat().st_mtime_ns + 1_000_000))
+            self.assertEqual(read_lammps_data(self.data_file)[4][0, 0], 4.5)
+            self.assertEqual(parse_mock.call_count, 2)
+
+    def test_ragged_section(self):
+        """
+        Test handling of atom lines with different numbers of columns.
+        """
+        self.data_file.write_text(LAMMPS_DATA_FILE.replace("3 2 7.0 8.0 9.0 0 0 -1", "3 2 7.0 8.0 9.0"))
+        with self.assertRaises(ValueError):
+            read_lammps_data(self.data_file)
+
+
+class TestReadLammpsDataAtoms(unittest.TestCase):
+    """
+    Test case for the 'read_lammps_data_atoms' function.
+
+    Methods
+    -------
+    test_atomic_style():
+        Test that the types and coordinates are returned in atom ID order.
+
+    test_full_style():
+        Test that the columns of the 'full' atom style are used.
+
+    test_unsupported_style():
+        Test handling of an unsupported atom style.
+    """
+
+    def test_atomic_style(self):
+        """
+        Test that the types and coordinates are returned in atom ID order.
+        """
+        data = ["2 atoms", "Atoms # atomic", "", "2 2 4.0 5.0 6.0", "1 1 1.0 2.0 3.0", "", "Velocities", "", "1 0.0 0.0 0.0"]
+        atom_types, atom_coordinates = read_lammps_data_atoms(data)
+        np.testing.assert_array_equal(atom_types, np.array([1, 2]))
+        np.testing.assert_array_equal(atom_coordinates, np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]))
+
+    def test_full_style(self):
+        """
+        Test that the columns of the 'full' atom style are used.
+        """
+        data = ["2 atoms", "Atoms # full", "", "2 1 3 -0.5 4.0 5.0 6.0", "1 1 2 0.5 1.0 2.0 3.0"]
+        atom_types, atom_coordinates = read_lammps_data_atoms(data)
+        np.testing.assert_array_equal(atom_types, np.array([2, 3]))
+        np.testing.assert_array_equal(atom_coordinates, np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]))
+
+    def test_unsupported_style(self):
+        """
+        Test handling of an unsupported atom style.
+        """
+        with self.assertRaises(ValueError):
+            read_lammps_data_atoms(["1 atoms", "Atoms # sphere", "", "1 1 1.0 1.0 0.0 0.0 0.0"])
+
+
+class TestReadLammpsDataAtomTypes(unittest.TestCase):
+    """
+    Test case for the 'read_lammps_data_atom_types' function.
+
+    Methods
+    -------
+    test_atom_types_sorted_by_id():
+        Test that the atom types are returned in atom ID order.
+
+    test_no_atoms_section():
+        Test handling of missing 'Atoms' section.
+    """
+
+    def test_atom_types_sorted_by_id(self):
+        """
+        Test that the atom types are returned in atom ID order.
+        """
+        data = [
+            "3 atoms",
+            "2 atom types",
+            "Masses",
+            "",
+            "1 15.999",
+            "2 1.008",
+            "",
+            "Atoms # atomic",
+            "",
+            "2 2 4.0 5.0 6.0",
+            "1 1 1.0 2.0 3.0",
+            "3 2 7.0 8.0 9.0",
+            "",
+            "Velocities",
+            "",
+            "1 0.0 0.0 0.0",
+        ]
+        np.testing.assert_array_equal(read_lammps_data_atom_types(data), np.array([1, 2, 2]))
+
+    def test_no_atoms_section(self):
+        """
+        Test handling of missing 'Atoms' section.
+        """
+        with self.assertRaises(ValueError):
+            read_lammps_data_atom_types(["3 atoms", "2 atom types"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,248 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+Test cases for the structure module.
+
+Classes
+-------
+TestGetPropertiesMaps():
+    Test case for the 'get_properties_maps' function.
+TestLammpsDataStructure():
+    Test case for the 'write_lammps_data_files' and 'read_lammps_data_structure' functions.
+TestPdbFile():
+    Test case for the 'write_pdb_file' and 'read_pdb_file' functions.
+TestConvertStructure():
+    Test case for the 'convert_xyz_to_lammps_data' and 'convert_lammps_data_to_xyz' functions.
+"""
+
+# Standard library modules
+import tempfile
+import unittest
+from pathlib import Path
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.lammps import read_lammps_data
+from arcann_training.common.structure import (
+    convert_lammps_data_to_xyz,
+    convert_xyz_to_lammps_data,
+    get_properties_maps,
+    read_lammps_data_structure,
+    read_pdb_file,
+    write_lammps_data_files,
+    write_pdb_file,
+)
+from arcann_training.common.xyz import parse_xyz_trajectory_file
+
+# As in main_json["properties"] after a JSON round trip (str keys)
+PROPERTIES = {"1": {"symbol": "O", "mass": 15.999}, "2": {"symbol": "H", "mass": 1.008}, "3": {"symbol": "Cl", "mass": 35.45}}
+
+
+class TestGetPropertiesMaps(unittest.TestCase):
+    """
+    Test case for the 'get_properties_maps' function.
+
+    Methods
+    -------
+    test_maps():
+        Test the symbol to type, type to symbol and type to mass maps.
+    test_duplicated_symbol():
+        Test that a symbol used by several types raises a ValueError.
+    """
+
+    def test_maps(self):
+        """
+        Test the symbol to type, type to symbol and type to mass maps.
+        """
+        symbol_types, type_symbols, type_masses = get_properties_maps(PROPERTIES)
+        self.assertEqual(symbol_types, {"O": 1, "H": 2, "Cl": 3})
+        self.assertEqual(type_symbols, {1: "O", 2: "H", 3: "Cl"})
+        self.assertEqual(type_masses, {1: 15.999, 2: 1.008, 3: 35.45})
+
+    def test_duplicated_symbol(self):
+        """
+        Test that a symbol used by several types raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            get_properties_maps({1: {"symbol": "H", "mass": 1.008}, 2: {"symbol": "H", "mass": 2.014}})
+
+
+class TestLammpsDataStructure(unittest.TestCase):
+    """
+    Test case for the 'write_lammps_data_files' and 'read_lammps_data_structure' functions.
+
+    Methods
+    -------
+    test_write_and_read():
+        Test that several structures are written (with every type and mass of the properties) and read back.
+    test_triclinic():
+        Test that a triclinic lattice is written with its tilt factors.
+    test_invalid_lattice():
+        Test that a lattice with a not along x raises a ValueError.
+    test_unknown_symbol():
+        Test that a symbol not in the properties raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.atomic_symbols = np.array([["O", "H", "H"], ["H", "O", "H"]])
+        self.atomic_coordinates = np.arange(18, dtype=np.float64).reshape(2, 3, 3) / 3.0
+        self.lattices = np.array([[10.0, 0.0, 0.0, 0.0, 11.0, 0.0, 0.0, 0.0, 12.0], [13.0, 0.0, 0.0, 0.0, 13.0, 0.0, 0.0, 0.0, 13.0]])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write_and_read(self):
+        """
+        Test that several structures are written (with every type and mass of the properties) and read back.
+        """
+        data_file_paths = [self.temp_path / "structure_0.lmp", self.temp_path / "structure_1.lmp"]
+        write_lammps_data_files(data_file_paths, self.atomic_symbols, self.atomic_coordinates, self.lattices, PROPERTIES)
+        for structure_idx, data_file_path in enumerate(data_file_paths):
+            num_atoms, num_atom_types, box, masses, _ = read_lammps_data(data_file_path)
+            self.assertEqual((num_atoms, num_atom_types), (3, 3))
+            self.assertEqual(masses, {1: 15.999, 2: 1.008, 3: 35.45})
+            self.assertIsNone(box[6])
+            atomic_symbols, atomic_coordinates, lattice = read_lammps_data_structure(data_file_path, PROPERTIES)
+            np.testing.assert_array_equal(atomic_symbols, self.atomic_symbols[structure_idx])
+            np.testing.assert_allclose(atomic_coordinates, self.atomic_coordinates[structure_idx], atol=1e-12)
+            np.testing.assert_array_equal(lattice, self.lattices[structure_idx])
+
+    def test_triclinic(self):
+        """
+        Test that a triclinic lattice is written with its tilt factors.
+        """
+        data_file_path = self.temp_path / "structure.lmp"
+        lattice = np.array([[10.0, 0.0, 0.0, 1.0, 11.0, 0.0, 2.0, 3.0, 12.0]])
+        write_lammps_data_files([data_file_path], self.atomic_symbols[:1], self.atomic_coordinates[:1], lattice, PROPERTIES)
+        self.assertIn("xy xz yz", data_file_path.read_text())
+        np.testing.assert_array_equal(read_lammps_data_structure(data_file_path, PROPERTIES)[2], lattice[0])
+
+    def test_invalid_lattice(self):
+        """
+        Test that a lattice with a not along x raises a ValueError.
+        """
+        lattice = np.array([[10.0, 1.0, 0.0, 0.0, 11.0, 0.0, 0.0, 0.0, 12.0]])
+        with self.assertRaises(ValueError):
+            write_lammps_data_files([self.temp_path / "structure.lmp"], self.atomic_symbols[:1], self.atomic_coordinates[:1], lattice, PROPERTIES)
+
+    def test_unknown_symbol(self):
+        """
+        Test that a symbol not in the properties raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            write_lammps_data_files([self.temp_path / "structure.lmp"], np.array([["O", "N", "H"]]), self.atomic_coordinates[:1], self.lattices[:1], PROPERTIES)
+
+
+class TestPdbFile(unittest.TestCase):
+    """
+    Test case for the 'write_pdb_file' and 'read_pdb_file' functions.
+
+    Methods
+    -------
+    test_write_and_read():
+        Test that several structures are written as models and read back with their lattices.
+    test_without_lattice():
+        Test that no lattice is read from a file without CRYST1 record.
+    test_file_not_found():
+        Test that a missing file raises a FileNotFoundError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdb_file = Path(self.temp_dir.name) / "structures.pdb"
+        self.atomic_symbols = np.array([["O", "H", "Cl"], ["O", "H", "Cl"]])
+        self.atomic_coordinates = np.arange(18, dtype=np.float64).reshape(2, 3, 3) / 4.0
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write_and_read(self):
+        """
+        Test that several structures are written as models and read back with their lattices.
+        """
+        lattices = np.array([[10.0, 0.0, 0.0, 0.0, 11.0, 0.0, 0.0, 0.0, 12.0], [10.0, 0.0, 0.0, 2.0, 11.0, 0.0, 0.0, 0.0, 12.0]])
+        write_pdb_file(self.pdb_file, self.atomic_symbols, self.atomic_coordinates, lattices)
+        atomic_symbols, atomic_coordinates, read_lattices = read_pdb_file(self.pdb_file)
+        np.testing.assert_array_equal(atomic_symbols, self.atomic_symbols)
+        np.testing.assert_allclose(atomic_coordinates, self.atomic_coordinates, atol=1e-3)
+        np.testing.assert_allclose(read_lattices, lattices, atol=1e-2)
+
+    def test_without_lattice(self):
+        """
+        Test that no lattice is read from a file without CRYST1 record.
+        """
+        write_pdb_file(self.pdb_file, self.atomic_symbols[:1], self.atomic_coordinates[:1])
+        atomic_symbols, _, lattices = read_pdb_file(self.pdb_file)
+        self.assertEqual(atomic_symbols.shape, (1, 3))
+        self.assertIsNone(lattices)
+
+    def test_file_not_found(self):
+        """
+        Test that a missing file raises a FileNotFoundError.
+        """
+        with self.assertRaises(FileNotFoundError):
+            read_pdb_file(self.pdb_file)
+
+
+class TestConvertStructure(unittest.TestCase):
+    """
+    Test case for the 'convert_xyz_to_lammps_data' and 'convert_lammps_data_to_xyz' functions.
+
+    Methods
+    -------
+    test_round_trip():
+        Test that a LAMMPS data file converted to XYZ and back gives the same structure.
+    test_xyz_without_lattice():
+        Test that an XYZ file without lattice raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """
+        Test that a LAMMPS data file converted to XYZ and back gives the same structure.
+        """
+        data_file_path = self.temp_path / "structure.lmp"
+        data_file_path.write_text(
+            "# generated by VMD\n\n3 atoms\n3 atom types\n\n0.0 10.0 xlo xhi\n0.0 11.0 ylo yhi\n0.0 12.0 zlo zhi\n\n"
+            "Masses\n\n1 15.999 # O\n2 1.008 # H\n3 35.45 # Cl\n\nAtoms # atomic\n\n3 3 7.0 8.0 9.0\n1 1 1.0 2.0 3.0\n2 2 4.0 5.0 6.0\n"
+        )
+        convert_lammps_data_to_xyz(data_file_path, self.temp_path / "structure.xyz", PROPERTIES)
+        _, atomic_symbols, atomic_coordinates, _, lattices, _, _, _ = parse_xyz_trajectory_file(self.temp_path / "structure.xyz")
+        np.testing.assert_array_equal(atomic_symbols[0], ["O", "H", "Cl"])
+        np.testing.assert_array_equal(atomic_coordinates[0], np.arange(1.0, 10.0).reshape(3, 3))
+        np.testing.assert_array_equal(lattices[0], [10.0, 0.0, 0.0, 0.0, 11.0, 0.0, 0.0, 0.0, 12.0])
+
+        convert_xyz_to_lammps_data([self.temp_path / "structure.xyz"], [self.temp_path / "converted.lmp"], PROPERTIES)
+        atomic_symbols, atomic_coordinates, lattice = read_lammps_data_structure(self.temp_path / "converted.lmp", PROPERTIES)
+        np.testing.assert_array_equal(atomic_symbols, ["O", "H", "Cl"])
+        np.testing.assert_allclose(atomic_coordinates, np.arange(1.0, 10.0).reshape(3, 3))
+        np.testing.assert_array_equal(lattice, [10.0, 0.0, 0.0, 0.0, 11.0, 0.0, 0.0, 0.0, 12.0])
+
+    def test_xyz_without_lattice(self):
+        """
+        Test that an XYZ file without lattice raises a ValueError.
+        """
+        (self.temp_path / "structure.xyz").write_text("1\ncomment\nO 0.0 0.0 0.0\n")
+        with self.assertRaises(ValueError):
+            convert_xyz_to_lammps_data([self.temp_path / "structure.xyz"], [self.temp_path / "structure.lmp"], PROPERTIES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/18
 
 Test cases for the (training) utils module.
 
@@ -18,6 +18,44 @@ TestGetLastFrameNumber():
     Test case for the 'get_last_frame_number' function.
 TestUpdateNbStepsFactor():
     Test case for the 'update_system_nb_steps_factor' function.
+TestGetDisturbSeed():
+    Test case for the 'get_disturb_seed' function.
+TestDisturbAtomicCoordinates():
+    Test case for the 'disturb_atomic_coordinates' function.
+TestReadModelDeviation():
+    Test case for the 'read_model_deviation' function.
+TestGetMinimumDeviationIndex():
+    Test case for the 'get_minimum_deviation_index' function.
+TestTailModelDeviation():
+    Test case for the 'tail_model_deviation' function.
+TestUpdateDeviationState():
+    Test case for the 'update_deviation_state' and 'get_deviation_state_stats' functions.
+TestUpdateModelDeviationStateFile():
+    Test case for the 'update_model_deviation_state_file' function.
+TestIndexIntervals():
+    Test case for the 'encode_index_intervals' and 'decode_index_intervals' functions.
+TestQbcStore():
+    Test case for the 'write_qbc_store', 'load_qbc_store', 'get_qbc_stats' and 'get_qbc_indexes' functions.
+TestSweepDeviationThresholds():
+    Test case for the 'sweep_deviation_thresholds' function.
+TestGetSelectedCounts():
+    Test case for the 'get_selected_counts' function.
+TestComputePairDistanceHistograms():
+    Test case for the 'compute_pair_distance_histograms' function.
+TestSelectCandidates():
+    Test case for the 'select_candidates' function and its selectors.
+TestGetAutocorrelationTime():
+    Test case for the 'get_autocorrelation_time' function.
+TestGetCandidateLabelingCosts():
+    Test case for the 'get_candidate_labeling_costs' function.
+TestAllocateCandidateBudget():
+    Test case for the 'allocate_candidate_budget' function.
+TestGetStructureHashes():
+    Test case for the 'get_structure_hashes' function.
+TestNearDuplicates():
+    Test case for the 'compute_structure_descriptors', 'get_nearest_descriptors' and 'get_duplicate_leaders' functions.
+TestUpdateDatasetDedupIndex():
+    Test case for the 'update_dataset_dedup_index' function.
 """
 
 # Standard library modules
@@ -25,18 +63,78 @@ import json
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 # Third-party modules
 import numpy as np
 
 # Local imports
 from arcann_training.exploration.utils import (
+    allocate_candidate_budget,
+    compute_pair_distance_histograms,
+    compute_structure_descriptors,
     create_models_list,
+    decode_index_intervals,
+    disturb_atomic_coordinates,
+    encode_index_intervals,
+    get_deviation_state_stats,
+    get_autocorrelation_time,
+    get_candidate_labeling_costs,
+    get_disturb_seed,
+    get_duplicate_leaders,
     get_last_frame_number,
+    get_minimum_deviation_index,
+    get_nearest_descriptors,
+    get_qbc_indexes,
+    get_qbc_stats,
+    get_selected_counts,
+    get_structure_hashes,
+    load_qbc_store,
+    read_model_deviation,
+    select_candidates,
+    sweep_deviation_thresholds,
+    tail_model_deviation,
+    update_dataset_dedup_index,
+    update_deviation_state,
+    update_model_deviation_state_file,
     update_system_nb_steps_factor,
+    write_qbc_store,
 )
 
 
+def _model_deviation_text(max_devi_f: np.ndarray) -> str:
+    """
+    Returns the text of a model deviation file (header and one row per max_devi_f, every 10 steps).
+    """
+    header = "#       step         max_devi_v         min_devi_v         avg_devi_v         max_devi_f         min_devi_f         avg_devi_f\n"
+    return header + "".join(f"{10 * row:12d}{0.001:19.6e}{0.0001:19.6e}{0.0005:19.6e}{value:19.6e}{0.001:19.6e}{0.005:19.6e}\n" for row, value in enumerate(max_devi_f))
+
+
+def _new_deviation_state(start_row_number: int, disturbed_start: bool) -> dict:
+    """
+    Returns an empty deviation state (sigma_low 0.1, sigma_high 0.3, sigma_high_limit 0.5).
+    """
+    return {
+        "sigma_low": 0.1,
+        "sigma_high": 0.3,
+        "sigma_high_limit": 0.5,
+        "start_row_number": start_row_number,
+        "disturbed_start": disturbed_start,
+        "offset": 0,
+        "row_count": 0,
+        "pending": [],
+        "end_row_number": -1,
+        "count": 0,
+        "mean": 0.0,
+        "m2": 0.0,
+        "histogram": [0] * 1000,
+        "good_count": 0,
+        "rejected_count": 0,
+        "candidates_count": 0,
+        "is_final": False,
+    }
+
+
 class TestCreateModelsList(unittest.TestCase):
     """
     Test case for the 'create_models_list' function.
@@ -125,6 +223,8 @@ class TestGetLastFrameNumber(unittest.TestCase):
     -------
     test_get_last_frame_number():
         Test the 'get_last_frame_number' function with various inputs and validate the output.
+    test_get_last_frame_number_two_columns():
+        Test the 'get_last_frame_number' function with (step, max_devi_f) columns.
     """
 
     def test_get_last_frame_number(self):
@@ -151,6 +251,15 @@ class TestGetLastFrameNumber(unittest.TestCase):
         self.assertEqual(get_last_frame_number(model_deviation, 0.6, True), 4)
         self.assertEqual(get_last_frame_number(model_deviation, 0.7, True), -1)
 
+    def test_get_last_frame_number_two_columns(self):
+        """
+        Test the 'get_last_frame_number' function with (step, max_devi_f) columns.
+        """
+        model_deviation = np.array([[0, 0.1], [10, 0.2], [20, 0.3], [30, 0.4]])
+        self.assertEqual(get_last_frame_number(model_deviation, 0.2, False), 1)
+        self.assertEqual(get_last_frame_number(model_deviation, 0.4, True), 2)
+        self.assertEqual(get_last_frame_number(model_deviation, 0.5, False), -1)
+
 
 class TestUpdateSystemNbStepsFactor(unittest.TestCase):
     """
@@ -189,5 +298,926 @@ class TestUpdateSystemNbStepsFactor(unittest.TestCase):
         self.assertEqual(update_system_nb_steps_factor(prevexploration_json, 0), 100)
 
 
+class TestGetDisturbSeed(unittest.TestCase):
+    """
+    Test case for the 'get_disturb_seed' function.
+
+    Methods
+    -------
+    test_seed_from_input():
+        Test that a non-negative 'disturbed_seed' input is used.
+    test_random_seed():
+        Test that a non-negative seed is drawn with the default input.
+    test_invalid_seed():
+        Test that a seed below -1 raises a ValueError.
+    """
+
+    def test_seed_from_input(self):
+        """
+        Test that a non-negative 'disturbed_seed' input is used.
+        """
+        self.assertEqual(get_disturb_seed(1234), 1234)
+        self.assertEqual(get_disturb_seed(0), 0)
+
+    def test_random_seed(self):
+        """
+        Test that a non-negative seed is drawn with the default input.
+        """
+        disturb_seed = get_disturb_seed(-1)
+        self.assertIsInstance(disturb_seed, int)
+        self.assertGreaterEqual(disturb_seed, 0)
+
+    def test_invalid_seed(self):
+        """
+        Test that a seed below -1 raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            get_disturb_seed(-2)
+
+
+class TestDisturbAtomicCoordinates(unittest.TestCase):
+    """
+    Test case for the 'disturb_atomic_coordinates' function.
+
+    Methods
+    -------
+    test_disturb_all_atoms():
+        Test that every atom is displaced within the amplitude and that the input is not modified.
+    test_disturb_selected_atoms():
+        Test that only the selected atoms are displaced.
+    test_reproducible():
+        Test that the same seed gives the same displacements.
+    test_out_of_range_index():
+        Test that an out of range atom index raises an IndexError.
+    """
+
+    def setUp(self):
+        self.atomic_coordinates = np.zeros((4, 5, 3))
+
+    def test_disturb_all_atoms(self):
+        """
+        Test that every atom is displaced within the amplitude and that the input is not modified.
+        """
+        disturbed_coordinates = disturb_atomic_coordinates(self.atomic_coordinates, 0.5, [], np.random.default_rng(0))
+        self.assertEqual(disturbed_coordinates.shape, (4, 5, 3))
+        self.assertTrue(np.all(disturbed_coordinates != 0.0))
+        self.assertTrue(np.all(np.abs(disturbed_coordinates) <= 0.5))
+        np.testing.assert_array_equal(self.atomic_coordinates, 0.0)
+
+    def test_disturb_selected_atoms(self):
+        """
+        Test that only the selected atoms are displaced.
+        """
+        disturbed_coordinates = disturb_atomic_coordinates(self.atomic_coordinates, 0.5, [3, 1, 3], np.random.default_rng(0))
+        self.assertTrue(np.all(disturbed_coordinates[:, [1, 3]] != 0.0))
+        np.testing.assert_array_equal(disturbed_coordinates[:, [0, 2, 4]], 0.0)
+
+    def test_reproducible(self):
+        """
+        Test that the same seed gives the same displacements.
+        """
+        np.testing.assert_array_equal(
+            disturb_atomic_coordinates(self.atomic_coordinates, 0.5, [], np.random.default_rng([42, 0, 1, 1, 0])),
+            disturb_atomic_coordinates(self.atomic_coordinates, 0.5, [], np.random.default_rng([42, 0, 1, 1, 0])),
+        )
+
+    def test_out_of_range_index(self):
+        """
+        Test that an out of range atom index raises an IndexError.
+        """
+        with self.assertRaises(IndexError):
+            disturb_atomic_coordinates(self.atomic_coordinates, 0.5, [5], np.random.default_rng(0))
+
+
+class TestReadModelDeviation(unittest.TestCase):
+    """
+    Test case for the 'read_model_deviation' function.
+
+    Methods
+    -------
+    test_read_columns():
+        Test that only the step and max_devi_f columns are read, and that the sidecar is written.
+    test_sidecar():
+        Test that an up-to-date sidecar is used and that a modified file is parsed again.
+    test_file_not_found():
+        Test that a missing file raises a FileNotFoundError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model_deviation_file = Path(self.temp_dir.name) / "model_devi_sys_1_001.out"
+        self.sidecar_file = Path(self.temp_dir.name) / "model_devi_sys_1_001.out.npy"
+        self.model_deviation_file.write_text(
+            "#       step         max_devi_v         min_devi_v         avg_devi_v         max_devi_f         min_devi_f         avg_devi_f\n"
+            "           0       1.000000e-03       1.000000e-04       5.000000e-04       1.000000e-02       1.000000e-03       5.000000e-03\n"
+            "          10       2.000000e-03       2.000000e-04       6.000000e-04       2.000000e-02       2.000000e-03       6.000000e-03\n"
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_read_columns(self):
+        """
+        Test that only the step and max_devi_f columns are read, and that the sidecar is written.
+        """
+        model_deviation = read_model_deviation(self.model_deviation_file)
+        np.testing.assert_array_equal(model_deviation, np.array([[0.0, 0.01], [10.0, 0.02]]))
+        self.assertTrue(self.sidecar_file.is_file())
+
+    def test_sidecar(self):
+        """
+        Test that an up-to-date sidecar is used and that a modified file is parsed again.
+        """
+        read_model_deviation(self.model_deviation_file)
+        with mock.patch("numpy.loadtxt") as loadtxt:
+            np.testing.assert_array_equal(read_model_deviation(self.model_deviation_file)[:, 0], [0.0, 10.0])
+            loadtxt.assert_not_called()
+
+        with self.model_deviation_file.open("a") as model_deviation_file:
+            model_deviation_file.write("          20       3.000000e-03       3.000000e-04       7.000000e-04       3.000000e-02       3.000000e-03       7.000000e-03\n")
+        np.testing.assert_array_equal(read_model_deviation(self.model_deviation_file)[:, 1], [0.01, 0.02, 0.03])
+
+    def test_file_not_found(self):
+        """
+        Test that a missing file raises a FileNotFoundError.
+        """
+        with self.assertRaises(FileNotFoundError):
+            read_model_deviation(Path(self.temp_dir.name) / "model_devi_missing.out")
+
+
+class TestGetMinimumDeviationIndex(unittest.TestCase):
+    """
+    Test case for the 'get_minimum_deviation_index' function.
+
+    Methods
+    -------
+    test_against_loop():
+        Test that the result is the one of a loop over the selected steps, on random data.
+    test_ties_and_unsorted_steps():
+        Test that the first selected step wins a tie and that unsorted steps are handled.
+    test_missing_step():
+        Test that a selected step not in the model deviation raises a ValueError.
+    """
+
+    def test_against_loop(self):
+        """
+        Test that the result is the one of a loop over the selected steps, on random data.
+        """
+        rng = np.random.default_rng(0)
+        model_deviation = np.column_stack((np.arange(0, 50000, 10), rng.random(5000)))
+        selected_indexes = rng.choice(model_deviation[:, 0], 300, replace=False).astype(int)
+        min_val, min_index = 1e30, None
+        for selected_idx in selected_indexes:
+            temp_min = model_deviation[:, 1][np.where(model_deviation[:, 0] == selected_idx)]
+            if temp_min < min_val:
+                min_val, min_index = temp_min, selected_idx
+        self.assertEqual(get_minimum_deviation_index(model_deviation, selected_indexes), min_index)
+
+    def test_ties_and_unsorted_steps(self):
+        """
+        Test that the first selected step wins a tie and that unsorted steps are handled.
+        """
+        model_deviation = np.array([[30, 0.2], [0, 0.5], [20, 0.1], [10, 0.1]])
+        self.assertEqual(get_minimum_deviation_index(model_deviation, np.array([0, 20, 10])), 20)
+        self.assertEqual(get_minimum_deviation_index(model_deviation, np.array([10, 20])), 10)
+        self.assertEqual(get_minimum_deviation_index(model_deviation, np.array([30, 0])), 30)
+
+    def test_missing_step(self):
+        """
+        Test that a selected step not in the model deviation raises a ValueError.
+        """
+        model_deviation = np.array([[0, 0.5], [10, 0.1]])
+        with self.assertRaises(ValueError):
+            get_minimum_deviation_index(model_deviation, np.array([0, 5]))
+        with self.assertRaises(ValueError):
+            get_minimum_deviation_index(model_deviation, np.array([20]))
+        with self.assertRaises(ValueError):
+            get_minimum_deviation_index(model_deviation, np.array([]))
+
+
+
+class TestTailModelDeviation(unittest.TestCase):
+    """
+    Test case for the 'tail_model_deviation' function.
+
+    Methods
+    -------
+    test_incomplete_line():
+        Test that a line still being written is left for the next call.
+    test_offset_after_end():
+        Test that an offset after the end of the file raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model_deviation_file = Path(self.temp_dir.name) / "model_devi_sys_1_001.out"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_incomplete_line(self):
+        """
+        Test that a line still being written is left for the next call.
+        """
+        text = _model_deviation_text(np.array([0.01, 0.02, 0.03]))
+        self.model_deviation_file.write_text(text[:-20])
+        model_deviation, offset = tail_model_deviation(self.model_deviation_file, 0)
+        np.testing.assert_array_equal(model_deviation, [[0.0, 0.01], [10.0, 0.02]])
+
+        self.model_deviation_file.write_text(text)
+        model_deviation, offset = tail_model_deviation(self.model_deviation_file, offset)
+        np.testing.assert_array_equal(model_deviation, [[20.0, 0.03]])
+        self.assertEqual(offset, len(text))
+        self.assertEqual(tail_model_deviation(self.model_deviation_file, offset)[0].shape, (0, 2))
+
+    def test_offset_after_end(self):
+        """
+        Test that an offset after the end of the file raises a ValueError.
+        """
+        self.model_deviation_file.write_text(_model_deviation_text(np.array([0.01])))
+        with self.assertRaises(ValueError):
+            tail_model_deviation(self.model_deviation_file, 10000)
+
+
+class TestUpdateDeviationState(unittest.TestCase):
+    """
+    Test case for the 'update_deviation_state' and 'get_deviation_state_stats' functions.
+
+    Methods
+    -------
+    test_same_split_as_deviate():
+        Test that updates by chunks give the counts and stats of the whole trajectory split at the first crossing.
+    test_crossing_during_ignored_rows():
+        Test that a crossing before start_row_number rejects every row and gives no stats.
+    test_pending_row():
+        Test that the last row of a disturbed start is only counted once it is known to be before the crossing.
+    """
+
+    def test_same_split_as_deviate(self):
+        """
+        Test that updates by chunks give the counts and stats of the whole trajectory split at the first crossing.
+        """
+        rng = np.random.default_rng(0)
+        max_devi_f = rng.uniform(0.0, 0.45, 200)
+        max_devi_f[150] = 0.7
+        model_deviation = np.column_stack((np.arange(200) * 10.0, max_devi_f))
+        for disturbed_start in [False, True]:
+            deviation_state = _new_deviation_state(5, disturbed_start)
+            for chunk in np.array_split(model_deviation, [7, 8, 60, 151, 152]):
+                update_deviation_state(deviation_state, chunk)
+            update_deviation_state(deviation_state, np.empty((0, 2)), is_final=True)
+
+            end_row_number = get_last_frame_number(model_deviation, 0.5, disturbed_start)
+            window = max_devi_f[5:end_row_number]
+            self.assertEqual(deviation_state["end_row_number"], end_row_number)
+            self.assertEqual(deviation_state["good_count"], np.count_nonzero(window <= 0.1))
+            self.assertEqual(deviation_state["candidates_count"], np.count_nonzero((window > 0.1) & (window < 0.3)))
+            self.assertEqual(deviation_state["rejected_count"], np.count_nonzero(window >= 0.3) + 200 - end_row_number)
+            mean, median, std = get_deviation_state_stats(deviation_state)
+            self.assertAlmostEqual(mean, np.mean(window), places=12)
+            self.assertAlmostEqual(std, np.std(window), places=12)
+            self.assertLessEqual(abs(median - np.median(window)), 0.5 / 2000 + 1e-12)
+
+    def test_crossing_during_ignored_rows(self):
+        """
+        Test that a crossing before start_row_number rejects every row and gives no stats.
+        """
+        deviation_state = _new_deviation_state(5, False)
+        update_deviation_state(deviation_state, np.column_stack((np.arange(10) * 10.0, [0.2, 0.9] + [0.2] * 8)), is_final=True)
+        self.assertEqual((deviation_state["good_count"], deviation_state["candidates_count"], deviation_state["rejected_count"]), (0, 0, 5))
+        self.assertEqual(get_deviation_state_stats(deviation_state), (999.0, 999.0, 999.0))
+
+    def test_pending_row(self):
+        """
+        Test that the last row of a disturbed start is only counted once it is known to be before the crossing.
+        """
+        deviation_state = _new_deviation_state(0, True)
+        update_deviation_state(deviation_state, np.array([[0.0, 0.2], [10.0, 0.2]]))
+        self.assertEqual((deviation_state["candidates_count"], deviation_state["pending"]), (1, [[10.0, 0.2]]))
+        update_deviation_state(deviation_state, np.array([[20.0, 0.9]]))
+        self.assertEqual((deviation_state["candidates_count"], deviation_state["rejected_count"], deviation_state["pending"]), (1, 2, []))
+
+
+class TestUpdateModelDeviationStateFile(unittest.TestCase):
+    """
+    Test case for the 'update_model_deviation_state_file' function.
+
+    Methods
+    -------
+    test_growing_file():
+        Test the updates of a growing file, and that the final one writes the sidecar of 'read_model_deviation'.
+    test_new_parameters():
+        Test that the state starts over when the deviation parameters change.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.model_deviation_file = Path(self.temp_dir.name) / "model_devi_sys_1_001.out"
+        self.text = _model_deviation_text(np.linspace(0.05, 0.45, 50))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_growing_file(self):
+        """
+        Test the updates of a growing file, and that the final one writes the sidecar of 'read_model_deviation'.
+        """
+        self.model_deviation_file.write_text(self.text[:1000])
+        deviation_state = update_model_deviation_state_file(self.model_deviation_file, 0.1, 0.3, 0.5, 0, False)
+        self.assertEqual(deviation_state["offset"], self.text[:1000].rfind("\n") + 1)
+        self.assertFalse(deviation_state["is_final"])
+
+        self.model_deviation_file.write_text(self.text)
+        deviation_state = update_model_deviation_state_file(self.model_deviation_file, 0.1, 0.3, 0.5, 0, False, is_final=True)
+        self.assertTrue(deviation_state["is_final"])
+        self.assertEqual(deviation_state["row_count"], 50)
+        self.assertEqual(deviation_state["good_count"] + deviation_state["candidates_count"] + deviation_state["rejected_count"], 50)
+        self.assertFalse(self.model_deviation_file.with_name(f"{self.model_deviation_file.name}.rows").exists())
+
+        expected = np.loadtxt(self.text.splitlines(), usecols=(0, 4), ndmin=2)
+        with mock.patch("numpy.loadtxt") as loadtxt:
+            np.testing.assert_array_equal(read_model_deviation(self.model_deviation_file), expected)
+            loadtxt.assert_not_called()
+
+    def test_new_parameters(self):
+        """
+        Test that the state starts over when the deviation parameters change.
+        """
+        self.model_deviation_file.write_text(self.text)
+        update_model_deviation_state_file(self.model_deviation_file, 0.1, 0.3, 0.5, 0, False)
+        deviation_state = update_model_deviation_state_file(self.model_deviation_file, 0.1, 0.2, 0.5, 0, False)
+        self.assertEqual(deviation_state["row_count"], 50)
+        self.assertEqual(deviation_state["sigma_high"], 0.2)
+
+
+
+class TestIndexIntervals(unittest.TestCase):
+    """
+    Test case for the 'encode_index_intervals' and 'decode_index_intervals' functions.
+
+    Methods
+    -------
+    test_runs():
+        Test that runs of consecutive steps are encoded as single intervals and decoded back.
+    test_any_sequence():
+        Test that unsorted, sparse and empty sequences are decoded back exactly.
+    """
+
+    def test_runs(self):
+        """
+        Test that runs of consecutive steps are encoded as single intervals and decoded back.
+        """
+        indexes = np.array([0, 10, 20, 30, 70, 80, 150])
+        intervals = encode_index_intervals(indexes, 10)
+        np.testing.assert_array_equal(intervals, [[0, 30], [70, 80], [150, 150]])
+        np.testing.assert_array_equal(decode_index_intervals(intervals, 10), indexes)
+
+    def test_any_sequence(self):
+        """
+        Test that unsorted, sparse and empty sequences are decoded back exactly.
+        """
+        for indexes in [np.array([50, 10, 20, 5, 6, 7]), np.array([3, 100, 7]), np.array([], dtype=int)]:
+            np.testing.assert_array_equal(decode_index_intervals(encode_index_intervals(indexes, 1), 1), indexes)
+
+
+class TestQbcStore(unittest.TestCase):
+    """
+    Test case for the 'write_qbc_store', 'load_qbc_store', 'get_qbc_stats' and 'get_qbc_indexes' functions.
+
+    Methods
+    -------
+    test_write_and_read():
+        Test that the stats and the index sets of each trajectory are read back.
+    test_unknown_trajectory_and_set():
+        Test that an unknown trajectory raises a KeyError and an unknown index set a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.qbc_store_path = Path(self.temp_dir.name) / "QbC_store.npz"
+        self.trajectories_qbc = {
+            ("sys-1", 1, 1): (
+                {"sigma_low": 0.1, "candidates_count": 3, "minimum_index": 20, "mean_deviation_max_f": 0.123456789},
+                {"good_indexes": [0, 10], "rejected_indexes": [50, 60, 70], "candidate_indexes": [20, 30, 40], "selected_indexes": [20, 40], "discarded_indexes": [30]},
+            ),
+            ("sys-1", 2, 1): (
+                {"sigma_low": 0.1, "candidates_count": 0, "minimum_index": -1},
+                {"good_indexes": [], "rejected_indexes": [], "candidate_indexes": [], "selected_indexes": [], "discarded_indexes": []},
+            ),
+        }
+        write_qbc_store(self.qbc_store_path, self.trajectories_qbc)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write_and_read(self):
+        """
+        Test that the stats and the index sets of each trajectory are read back.
+        """
+        qbc_store = load_qbc_store(self.qbc_store_path)
+        for (system_auto, it_nnp, it_number), (QbC_stats, QbC_indexes) in self.trajectories_qbc.items():
+            self.assertEqual(get_qbc_stats(qbc_store, system_auto, it_nnp, it_number), QbC_stats)
+            for index_set in ["good", "rejected", "candidate", "selected", "discarded"]:
+                self.assertEqual(get_qbc_indexes(qbc_store, system_auto, it_nnp, it_number, index_set).tolist(), QbC_indexes[f"{index_set}_indexes"])
+        self.assertEqual(qbc_store["rejected_intervals"].shape, (1, 2))
+
+    def test_unknown_trajectory_and_set(self):
+        """
+        Test that an unknown trajectory raises a KeyError and an unknown index set a ValueError.
+        """
+        qbc_store = load_qbc_store(self.qbc_store_path)
+        with self.assertRaises(KeyError):
+            get_qbc_stats(qbc_store, "sys-1", 3, 1)
+        with self.assertRaises(ValueError):
+            get_qbc_indexes(qbc_store, "sys-1", 1, 1, "unknown")
+
+
+
+class TestSweepDeviationThresholds(unittest.TestCase):
+    """
+    Test case for the 'sweep_deviation_thresholds' function.
+
+    Methods
+    -------
+    test_same_split_as_deviate():
+        Test the counts of a grid against the split of the whole trajectory at the first crossing of each limit.
+    test_missing_rows():
+        Test that the missing rows of a forced trajectory are rejected.
+    """
+
+    def test_same_split_as_deviate(self):
+        """
+        Test the counts of a grid against the split of the whole trajectory at the first crossing of each limit.
+        """
+        rng = np.random.default_rng(0)
+        max_devi_f = rng.uniform(0.0, 0.6, 300)
+        max_devi_f[[0, 40, 200]] = [1.2, 0.8, 1.1]
+        sigma_low_values, sigma_high_values, sigma_high_limit_values = [0.05, 0.1], [0.3, 0.5], [0.7, 1.0, 2.0]
+        for disturbed_start, is_forced in [(False, False), (True, False), (True, True)]:
+            counts = sweep_deviation_thresholds(max_devi_f, 5, disturbed_start, is_forced, 296, sigma_low_values, sigma_high_values, sigma_high_limit_values)
+            self.assertEqual(counts.shape, (3, 2, 2, 3))
+            for limit_index, sigma_high_limit in enumerate(sigma_high_limit_values):
+                end_row_number = get_last_frame_number(np.column_stack((np.arange(300), max_devi_f)), sigma_high_limit, disturbed_start) - int(is_forced)
+                if end_row_number < 0:
+                    window, rejected_after_count = max_devi_f[5:], 0
+                elif end_row_number <= 5:
+                    window, rejected_after_count = max_devi_f[:0], 295
+                else:
+                    window, rejected_after_count = max_devi_f[5:end_row_number], 300 - end_row_number
+                for low_index, sigma_low in enumerate(sigma_low_values):
+                    for high_index, sigma_high in enumerate(sigma_high_values):
+                        expected = [np.count_nonzero(window <= sigma_low), np.count_nonzero((window > sigma_low) & (window < sigma_high)), np.count_nonzero(window >= sigma_high) + rejected_after_count]
+                        expected[2] = expected[2] + max(296 - sum(expected), 0)
+                        np.testing.assert_array_equal(counts[limit_index, low_index, high_index], expected)
+
+    def test_missing_rows(self):
+        """
+        Test that the missing rows of a forced trajectory are rejected.
+        """
+        counts = sweep_deviation_thresholds(np.array([0.05, 0.2, 0.6]), 0, False, True, 10, [0.1], [0.5], [1.0])
+        np.testing.assert_array_equal(counts[0, 0, 0], [1, 1, 8])
+
+
+class TestGetSelectedCounts(unittest.TestCase):
+    """
+    Test case for the 'get_selected_counts' function.
+
+    Methods
+    -------
+    test_under_budget():
+        Test that every candidate is selected when the system has at most max_candidates of them.
+    test_over_budget():
+        Test that each trajectory gets its share of max_candidates (rounded up), for each column of a grid.
+    """
+
+    def test_under_budget(self):
+        """
+        Test that every candidate is selected when the system has at most max_candidates of them.
+        """
+        np.testing.assert_array_equal(get_selected_counts(np.array([3, 0, 7]), 10), [3, 0, 7])
+
+    def test_over_budget(self):
+        """
+        Test that each trajectory gets its share of max_candidates (rounded up), for each column of a grid.
+        """
+        candidates_counts = np.array([[30, 2], [10, 0], [0, 1]])
+        np.testing.assert_array_equal(get_selected_counts(candidates_counts, 10), [[8, 2], [3, 0], [0, 1]])
+
+
+class TestComputePairDistanceHistograms(unittest.TestCase):
+    """
+    Test case for the 'compute_pair_distance_histograms' function.
+
+    Methods
+    -------
+    test_permutation_invariance():
+        Test that the order of the atoms does not change the descriptors.
+    test_periodic_images():
+        Test that translating atoms by cell vectors does not change the descriptors.
+    test_distances():
+        Test the descriptors of a dimer, and the shape for several frames.
+    """
+
+    def test_permutation_invariance(self):
+        """
+        Test that the order of the atoms does not change the descriptors.
+        """
+        rng = np.random.default_rng(0)
+        atomic_coordinates = rng.uniform(0.0, 10.0, (3, 20, 3))
+        descriptors = compute_pair_distance_histograms(atomic_coordinates, [10.0, 10.0, 10.0])
+        permuted_descriptors = compute_pair_distance_histograms(atomic_coordinates[:, rng.permutation(20)], [10.0, 10.0, 10.0])
+        np.testing.assert_allclose(descriptors, permuted_descriptors)
+
+    def test_periodic_images(self):
+        """
+        Test that translating atoms by cell vectors does not change the descriptors.
+        """
+        rng = np.random.default_rng(1)
+        atomic_coordinates = rng.uniform(0.0, 8.0, (2, 15, 3))
+        cell_lengths = np.array([[8.0, 9.0, 10.0], [8.0, 9.0, 10.0]])
+        shifted_coordinates = atomic_coordinates + rng.integers(-2, 3, (2, 15, 3)) * cell_lengths[:, np.newaxis, :]
+        np.testing.assert_allclose(compute_pair_distance_histograms(atomic_coordinates, cell_lengths), compute_pair_distance_histograms(shifted_coordinates, cell_lengths))
+
+    def test_distances(self):
+        """
+        Test the descriptors of a dimer, and the shape for several frames.
+        """
+        # 1 A apart through the boundary of a 10 A cell (cutoff 5 A, 10 bins of 0.5 A)
+        descriptors = compute_pair_distance_histograms(np.array([[[0.5, 0.0, 0.0], [9.5, 0.0, 0.0]]]), [10.0, 10.0, 10.0], bin_count=10)
+        np.testing.assert_allclose(descriptors[0], [0.0, 0.0] + [1.0] * 8)
+        descriptors = compute_pair_distance_histograms(np.zeros((7, 4, 3)) + np.arange(4)[np.newaxis, :, np.newaxis], bin_count=16)
+        self.assertEqual(descriptors.shape, (7, 16))
+        with self.assertRaises(ValueError):
+            compute_pair_distance_histograms(np.zeros((2, 1, 3)))
+
+
+class TestSelectCandidates(unittest.TestCase):
+    """
+    Test case for the 'select_candidates' function and its selectors.
+
+    Methods
+    -------
+    test_linspace():
+        Test the linspace selector (evenly spaced, first and last kept).
+    test_farthest_point():
+        Test that the farthest point selector picks one candidate per cluster, without duplicates.
+    test_under_budget():
+        Test that every candidate is kept when there are at most max_candidates_local of them.
+    test_decorrelated():
+        Test the decorrelated selector against the greedy loop, and its thinning to max_candidates_local.
+    test_unknown_selector():
+        Test that an unknown selector or missing descriptors raise a ValueError.
+    """
+
+    def test_linspace(self):
+        """
+        Test the linspace selector (evenly spaced, first and last kept).
+        """
+        candidate_indexes = np.arange(0, 1000, 10)
+        selected_indexes = select_candidates(candidate_indexes, 7)
+        np.testing.assert_array_equal(selected_indexes, candidate_indexes[np.round(np.linspace(0, 99, 7)).astype(int)])
+        self.assertEqual(selected_indexes[0], 0)
+        self.assertEqual(selected_indexes[-1], 990)
+
+    def test_farthest_point(self):
+        """
+        Test that the farthest point selector picks one candidate per cluster, without duplicates.
+        """
+        # Three clusters of identical descriptors: 0-4, 5-14 and 15-19
+        descriptors = np.repeat(np.array([[0.0, 0.0], [5.0, 0.0], [0.0, 5.0]]), [5, 10, 5], axis=0)
+        candidate_indexes = np.arange(20) * 10
+        selected_indexes = select_candidates(candidate_indexes, 3, "farthest_point", descriptors=descriptors)
+        np.testing.assert_array_equal(np.unique(np.searchsorted([0, 50, 150], selected_indexes, side="right")), [1, 2, 3])
+        selected_indexes = select_candidates(candidate_indexes, 6, "farthest_point", descriptors=descriptors)
+        self.assertEqual(len(np.unique(selected_indexes)), 6)
+        self.assertTrue(np.all(np.diff(selected_indexes) > 0))
+
+    def test_under_budget(self):
+        """
+        Test that every candidate is kept when there are at most max_candidates_local of them.
+        """
+        candidate_indexes = np.array([3, 8, 11])
+        np.testing.assert_array_equal(select_candidates(candidate_indexes, 3), candidate_indexes)
+        np.testing.assert_array_equal(select_candidates(candidate_indexes, 5, "farthest_point"), candidate_indexes)
+
+    def test_decorrelated(self):
+        """
+        Test the decorrelated selector against the greedy loop, and its thinning to max_candidates_local.
+        """
+        rng = np.random.default_rng(2)
+        for minimum_gap in [1, 10, 35, 1000, 100000]:
+            candidate_indexes = np.sort(rng.choice(20000, 700, replace=False)) * 10
+            expected = [candidate_indexes[0]]
+            for candidate_index in candidate_indexes[1:]:
+                if candidate_index - expected[-1] >= minimum_gap:
+                    expected.append(candidate_index)
+            np.testing.assert_array_equal(select_candidates(candidate_indexes, 10000, "decorrelated", minimum_gap=minimum_gap), expected)
+        selected_indexes = select_candidates(candidate_indexes, 5, "decorrelated", minimum_gap=1000)
+        self.assertEqual(len(selected_indexes), 5)
+        self.assertTrue(np.all(np.diff(selected_indexes) >= 1000))
+        self.assertEqual(len(select_candidates(np.array([], dtype=int), 5, "decorrelated", minimum_gap=10)), 0)
+
+    def test_unknown_selector(self):
+        """
+        Test that an unknown selector or missing descriptors raise a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            select_candidates(np.arange(10), 2, "random")
+        with self.assertRaises(ValueError):
+            select_candidates(np.arange(10), 2, "farthest_point", descriptors=np.zeros((9, 4)))
+        with self.assertRaises(ValueError):
+            select_candidates(np.arange(10), 2, "farthest_point")
+
+
+class TestGetAutocorrelationTime(unittest.TestCase):
+    """
+    Test case for the 'get_autocorrelation_time' function.
+
+    Methods
+    -------
+    test_uncorrelated():
+        Test that white noise, constant and too short series give about 1.
+    test_ar1():
+        Test an AR(1) series against its exact integrated autocorrelation time.
+    """
+
+    def test_uncorrelated(self):
+        """
+        Test that white noise, constant and too short series give about 1.
+        """
+        self.assertLess(get_autocorrelation_time(np.random.default_rng(3).normal(size=20000)), 1.2)
+        self.assertEqual(get_autocorrelation_time(np.full(50, 0.3)), 1.0)
+        self.assertEqual(get_autocorrelation_time(np.array([0.3])), 1.0)
+
+    def test_ar1(self):
+        """
+        Test an AR(1) series against its exact integrated autocorrelation time, (1 + phi) / (1 - phi).
+        """
+        rng = np.random.default_rng(4)
+        phi = 0.9
+        noise = rng.normal(size=200000)
+        values = np.empty_like(noise)
+        values[0] = noise[0]
+        for it_value in range(1, noise.shape[0]):
+            values[it_value] = phi * values[it_value - 1] + noise[it_value]
+        self.assertAlmostEqual(get_autocorrelation_time(values), (1 + phi) / (1 - phi), delta=0.15 * (1 + phi) / (1 - phi))
+
+
+class TestGetCandidateLabelingCosts(unittest.TestCase):
+    """
+    Test case for the 'get_candidate_labeling_costs' function.
+
+    Methods
+    -------
+    test_costs():
+        Test the core-hours per candidate, with disturbed candidates and a system without timings.
+    test_placeholder_timings():
+        Test that the placeholder timings (no candidates, all skipped, no converged step) are not used.
+    test_no_timings():
+        Test that None is returned without any timings.
+    """
+
+    def test_costs(self):
+        """
+        Test the core-hours per candidate, with disturbed candidates and a system without timings.
+        """
+        labeling_json = {
+            "systems_auto": {
+                "gas": {"timings_s": [600.0, 1200.0], "nb_nodes": 1, "nb_mpi_per_node": 32, "nb_threads_per_mpi": 1, "candidates_count": 10, "disturbed_candidates_count": 0},
+                "solvated": {"timings_s": [1800.0, 5400.0], "nb_nodes": 2, "nb_mpi_per_node": 64, "nb_threads_per_mpi": 2, "candidates_count": 10, "disturbed_candidates_count": 10},
+            }
+        }
+        candidate_costs = get_candidate_labeling_costs(labeling_json, ["gas", "solvated", "new"])
+        np.testing.assert_allclose(candidate_costs[:2], [0.5 * 32, 2.0 * 256 * 2])
+        self.assertTrue(np.isnan(candidate_costs[2]))
+
+    def test_placeholder_timings(self):
+        """
+        Test that the placeholder timings (no candidates, all skipped, no converged step) are not used.
+        """
+        system_json = {"nb_nodes": 1, "nb_mpi_per_node": 36, "nb_threads_per_mpi": 1}
+        labeling_json = {
+            "systems_auto": {
+                "empty": {**system_json, "timings_s": [1800, 3600], "candidates_converged_count": [0, 0], "candidates_count": 0, "disturbed_candidates_count": 0},
+                "skipped": {**system_json, "timings_s": [900.0, 3600.0], "candidates_count": 5, "disturbed_candidates_count": 0, "candidates_skipped_count": 5},
+                "failed": {**system_json, "timings_s": [900.0, 3600.0], "candidates_converged_count": [0, 0], "candidates_count": 5, "disturbed_candidates_count": 0},
+                "orca": {**system_json, "timings_s": [360.0, 3600.0], "candidates_converged_count": [5, 0], "candidates_count": 5, "disturbed_candidates_count": 0},
+            }
+        }
+        candidate_costs = get_candidate_labeling_costs(labeling_json, ["empty", "skipped", "failed", "orca"])
+        self.assertTrue(np.all(np.isnan(candidate_costs[:3])))
+        np.testing.assert_allclose(candidate_costs[3], 0.1 * 36)
+        self.assertIsNone(get_candidate_labeling_costs(labeling_json, ["empty", "skipped", "failed"]))
+
+    def test_no_timings(self):
+        """
+        Test that None is returned without any timings.
+        """
+        self.assertIsNone(get_candidate_labeling_costs({}, ["gas"]))
+
+
+class TestAllocateCandidateBudget(unittest.TestCase):
+    """
+    Test case for the 'allocate_candidate_budget' function.
+
+    Methods
+    -------
+    test_within_budget():
+        Test that the caps are kept when they fit in the budget.
+    test_over_budget():
+        Test that the allocation fits the budget, spends it, and still gives candidates to an expensive system.
+    test_invalid_costs():
+        Test that non positive costs raise a ValueError.
+    """
+
+    def test_within_budget(self):
+        """
+        Test that the caps are kept when they fit in the budget.
+        """
+        np.testing.assert_array_equal(allocate_candidate_budget([1.0, 20.0], [100, 100], 5000.0), [100, 100])
+
+    def test_over_budget(self):
+        """
+        Test that the allocation fits the budget, spends it, and still gives candidates to an expensive system.
+        """
+        candidate_costs = np.array([1.0, 20.0, 3.0])
+        candidate_caps = np.array([300, 100, 0])
+        for budget in [10.0, 250.0, 777.0, 2000.0]:
+            candidate_counts = allocate_candidate_budget(candidate_costs, candidate_caps, budget)
+            self.assertLessEqual(np.sum(candidate_costs * candidate_counts), budget)
+            self.assertTrue(np.all((candidate_counts >= 0) & (candidate_counts <= candidate_caps)))
+            # Nothing else fits
+            self.assertTrue(np.all((candidate_counts == candidate_caps) | (candidate_costs > budget - np.sum(candidate_costs * candidate_counts))))
+        self.assertGreater(allocate_candidate_budget(candidate_costs, candidate_caps, 777.0)[1], 0)
+        # Equal costs: the same number of candidates, within the caps
+        np.testing.assert_array_equal(allocate_candidate_budget([1.0, 1.0, 1.0], [10, 50, 50], 60.0), [10, 25, 25])
+
+    def test_invalid_costs(self):
+        """
+        Test that non positive costs raise a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            allocate_candidate_budget([1.0, 0.0], [10, 10], 5.0)
+
+
+class TestGetStructureHashes(unittest.TestCase):
+    """
+    Test case for the 'get_structure_hashes' function.
+
+    Methods
+    -------
+    test_invariances():
+        Test that the hash does not depend on the order of the atoms of a species nor on the periodic images.
+    test_different_structures():
+        Test that different structures, or the same positions with different types, give different hashes.
+    """
+
+    def setUp(self):
+        self.atom_types = np.array([0, 1, 1, 0])
+        self.cell_lengths = np.array([10.0, 11.0, 12.0])
+        self.atomic_coordinates = np.array([[[1.0, 2.0, 3.0], [4.5, 5.5, 6.5], [7.25, 8.25, 9.25], [2.0, 3.0, 4.0]]])
+
+    def test_invariances(self):
+        """
+        Test that the hash does not depend on the order of the atoms of a species nor on the periodic images.
+        """
+        reference_hash = get_structure_hashes(self.atom_types, self.atomic_coordinates, self.cell_lengths)[0]
+        permuted_coordinates = self.atomic_coordinates[:, [3, 2, 1, 0]]
+        shifted_coordinates = self.atomic_coordinates + np.array([[[10.0, 0.0, 0.0], [0.0, -11.0, 0.0], [0.0, 0.0, 24.0], [-10.0, 11.0, 12.0]]])
+        hashes = get_structure_hashes(self.atom_types, np.concatenate((permuted_coordinates, shifted_coordinates)), self.cell_lengths)
+        self.assertEqual(hashes.shape, (2,))
+        self.assertTrue(np.all(hashes == reference_hash))
+
+    def test_different_structures(self):
+        """
+        Test that different structures, or the same positions with different types, give different hashes.
+        """
+        moved_coordinates = self.atomic_coordinates.copy()
+        moved_coordinates[0, 0, 0] += 0.5
+        reference_hash = get_structure_hashes(self.atom_types, self.atomic_coordinates, self.cell_lengths)[0]
+        self.assertNotEqual(get_structure_hashes(self.atom_types, moved_coordinates, self.cell_lengths)[0], reference_hash)
+        self.assertNotEqual(get_structure_hashes(np.array([1, 0, 1, 0]), self.atomic_coordinates, self.cell_lengths)[0], reference_hash)
+        self.assertNotEqual(get_structure_hashes(self.atom_types, self.atomic_coordinates)[0], reference_hash)
+
+
+class TestNearDuplicates(unittest.TestCase):
+    """
+    Test case for the 'compute_structure_descriptors', 'get_nearest_descriptors' and 'get_duplicate_leaders' functions.
+
+    Methods
+    -------
+    test_descriptors():
+        Test the shape of the descriptors and their invariance to the order of the atoms.
+    test_nearest_descriptors():
+        Test the nearest reference of each frame, and the case without reference.
+    test_duplicate_leaders():
+        Test that the duplicates point to the first kept frame within the tolerance.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.atom_types = np.array([0] * 24 + [1] * 40)
+        self.cell_lengths = np.array([10.0, 10.0, 10.0])
+        base_coordinates = rng.uniform(0.0, 10.0, size=(1, 64, 3))
+        # Two frames near the first one, and a different one
+        self.atomic_coordinates = np.concatenate(
+            (
+                base_coordinates,
+                base_coordinates + rng.normal(scale=0.001, size=(1, 64, 3)),
+                rng.uniform(0.0, 10.0, size=(1, 64, 3)),
+                base_coordinates + rng.normal(scale=0.001, size=(1, 64, 3)),
+            )
+        )
+
+    def test_descriptors(self):
+        """
+        Test the shape of the descriptors and their invariance to the order of the atoms.
+        """
+        descriptors = compute_structure_descriptors(self.atom_types, self.atomic_coordinates, self.cell_lengths, bin_count=32)
+        self.assertEqual(descriptors.shape, (4, 3 * 32))
+        self.assertEqual(descriptors.dtype, np.float32)
+        permuted_descriptors = compute_structure_descriptors(self.atom_types, self.atomic_coordinates[:, np.concatenate((np.arange(24)[::-1], 24 + np.arange(40)[::-1]))], self.cell_lengths, bin_count=32)
+        np.testing.assert_allclose(permuted_descriptors, descriptors, atol=1e-6)
+        # A species with a single atom has no histogram of its own
+        self.assertEqual(compute_structure_descriptors(np.array([0] + [1] * 63), self.atomic_coordinates, self.cell_lengths, bin_count=32).shape, (4, 2 * 32))
+
+    def test_nearest_descriptors(self):
+        """
+        Test the nearest reference of each frame, and the case without reference.
+        """
+        descriptors = compute_structure_descriptors(self.atom_types, self.atomic_coordinates, self.cell_lengths)
+        nearest_indexes, nearest_distances = get_nearest_descriptors(descriptors[1:], descriptors[:1])
+        np.testing.assert_array_equal(nearest_indexes, [0, 0, 0])
+        self.assertTrue(np.all(nearest_distances[[0, 2]] < 0.02))
+        self.assertGreater(nearest_distances[1], 0.02)
+        nearest_indexes, nearest_distances = get_nearest_descriptors(descriptors, descriptors[:0])
+        np.testing.assert_array_equal(nearest_indexes, [-1, -1, -1, -1])
+        self.assertTrue(np.all(np.isinf(nearest_distances)))
+
+    def test_duplicate_leaders(self):
+        """
+        Test that the duplicates point to the first kept frame within the tolerance.
+        """
+        descriptors = compute_structure_descriptors(self.atom_types, self.atomic_coordinates, self.cell_lengths)
+        np.testing.assert_array_equal(get_duplicate_leaders(descriptors, 0.02), [0, 0, 2, 0])
+        np.testing.assert_array_equal(get_duplicate_leaders(descriptors, 0.0), [0, 1, 2, 3])
+        # A chain of frames: each one is near the previous one but the third is far from the first (kept)
+        chain_descriptors = np.array([[0.0], [0.015], [0.03]], dtype=np.float32)
+        np.testing.assert_array_equal(get_duplicate_leaders(chain_descriptors, 0.02), [0, 0, 2])
+
+
+class TestUpdateDatasetDedupIndex(unittest.TestCase):
+    """
+    Test case for the 'update_dataset_dedup_index' function.
+
+    Methods
+    -------
+    test_index():
+        Test the entries of the datasets, their reuse when unchanged and the removal of the deleted datasets.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_path = Path(self.temp_dir.name) / "data"
+        self.index_path = Path(self.temp_dir.name) / "control" / "dedup_index"
+        rng = np.random.default_rng(6)
+        for dataset_name, nb_frames in [("init_a", 3), ("extra_b", 2)]:
+            (self.data_path / dataset_name / "set.000").mkdir(parents=True)
+            (self.data_path / dataset_name / "type.raw").write_text("0\n1\n1\n")
+            np.save(self.data_path / dataset_name / "set.000" / "coord.npy", rng.uniform(0.0, 6.0, size=(nb_frames, 9)))
+            np.save(self.data_path / dataset_name / "set.000" / "box.npy", np.tile(np.diag([6.0, 6.0, 6.0]).ravel(), (nb_frames, 1)))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_index(self):
+        """
+        Test the entries of the datasets, their reuse when unchanged and the removal of the deleted datasets.
+        """
+        dataset_index = update_dataset_dedup_index(self.index_path, self.data_path, bin_count=16)
+        self.assertEqual(sorted(dataset_index), ["extra_b", "init_a"])
+        np.testing.assert_array_equal(dataset_index["init_a"]["types"], [0, 1, 1])
+        self.assertEqual(dataset_index["init_a"]["hashes"].shape, (3,))
+        self.assertEqual(dataset_index["extra_b"]["descriptors"].shape, (2, 2 * 16))
+        self.assertTrue((self.index_path / "init_a.npz").is_file())
+
+        # Unchanged: the entries are read from the index, not computed again
+        with mock.patch("arcann_training.exploration.utils.compute_structure_descriptors") as mocked_descriptors:
+            reused_index = update_dataset_dedup_index(self.index_path, self.data_path, bin_count=16)
+            mocked_descriptors.assert_not_called()
+        np.testing.assert_array_equal(reused_index["init_a"]["hashes"], dataset_index["init_a"]["hashes"])
+        np.testing.assert_allclose(reused_index["extra_b"]["descriptors"], dataset_index["extra_b"]["descriptors"])
+
+        # Other parameters: computed again
+        self.assertEqual(update_dataset_dedup_index(self.index_path, self.data_path, bin_count=8)["init_a"]["descriptors"].shape, (3, 2 * 8))
+
+        # Deleted dataset: its entry is removed
+        for file_path in sorted((self.data_path / "extra_b").rglob("*"), reverse=True):
+            file_path.rmdir() if file_path.is_dir() else file_path.unlink()
+        (self.data_path / "extra_b").rmdir()
+        self.assertEqual(list(update_dataset_dedup_index(self.index_path, self.data_path, bin_count=8)), ["init_a"])
+        self.assertFalse((self.index_path / "extra_b.npz").exists())
+
+
 if __name__ == "__main__":
     unittest.main()
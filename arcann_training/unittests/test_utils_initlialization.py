@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/18
 
 This module contains unit tests for the 'utils' module in the 'initialization' package.
 
@@ -16,6 +16,8 @@ TestGenerateMainJson
     Test suite for the 'generate_main_json' function.
 TestCheckPropertiesFile
     Test suite for the 'check_properties_file' function.
+TestImportExtendedXyzDataset
+    Test suite for the 'import_extended_xyz_dataset' function.
 """
 
 # Standard library modules
@@ -23,8 +25,11 @@ import tempfile
 import unittest
 from pathlib import Path
 
+# Third-party modules
+import numpy as np
+
 # Local imports
-from arcann_training.initialization.utils import generate_main_json, check_properties_file
+from arcann_training.initialization.utils import generate_main_json, check_properties_file, import_extended_xyz_dataset
 
 
 class TestGenerateMainJson(unittest.TestCase):
@@ -252,5 +257,102 @@ He four.002
             check_properties_file(temp_file)
 
 
+class TestImportExtendedXyzDataset(unittest.TestCase):
+    """
+    Test suite for the 'import_extended_xyz_dataset' function.
+
+    Methods
+    -------
+    test_import_with_virial():
+        Tests that every set array and the type.raw are written, across several chunks.
+    test_import_with_stress():
+        Tests that a Voigt stress is converted to a virial.
+    test_changing_atom_order():
+        Tests that a change in the order of the atoms raises a ValueError and leaves no dataset.
+    test_unknown_species():
+        Tests that a species not in the properties raises a ValueError.
+    test_existing_dataset():
+        Tests that an existing dataset raises a FileExistsError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.xyz_file = self.temp_path / "reference.xyz"
+        self.dataset_path = self.temp_path / "data" / "init_reference"
+        (self.temp_path / "data").mkdir()
+        self.properties = {"1": {"symbol": "O", "mass": 15.999}, "2": {"symbol": "H", "mass": 1.008}}
+        self.positions = np.arange(5 * 3 * 3, dtype=np.float64).reshape(5, 3, 3) / 10.0
+        self.forces = -self.positions
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_xyz(self, comment_keys, species=("O", "H", "H")):
+        frames = []
+        for frame_idx in range(self.positions.shape[0]):
+            frame = f'3\nLattice="10.0 0.0 0.0 0.0 10.0 0.0 0.0 0.0 {10.0 + frame_idx}" Properties=species:S:1:pos:R:3:forces:R:3 energy={-frame_idx - 0.5} {comment_keys} pbc="T T T"\n'
+            for symbol, position, force in zip(species, self.positions[frame_idx], self.forces[frame_idx]):
+                frame += f"{symbol} {' '.join(str(_) for _ in position)} {' '.join(str(_) for _ in force)}\n"
+            frames.append(frame)
+        self.xyz_file.write_text("".join(frames))
+
+    def test_import_with_virial(self):
+        """
+        Tests that every set array and the type.raw are written, across several chunks.
+        """
+        self.write_xyz('virial="1.0 0.0 0.0 0.0 2.0 0.0 0.0 0.0 3.0"')
+        # A tiny budget: one frame per chunk
+        self.assertEqual(import_extended_xyz_dataset(self.xyz_file, self.dataset_path, self.properties, memory_budget_mb=1e-6), 5)
+        self.assertEqual((self.dataset_path / "type.raw").read_text().split(), ["0", "1", "1"])
+        set_path = self.dataset_path / "set.000"
+        np.testing.assert_array_equal(np.load(set_path / "coord.npy"), self.positions.reshape(5, 9))
+        np.testing.assert_array_equal(np.load(set_path / "force.npy"), self.forces.reshape(5, 9))
+        np.testing.assert_array_equal(np.load(set_path / "energy.npy"), -np.arange(5) - 0.5)
+        np.testing.assert_array_equal(np.load(set_path / "box.npy")[:, 8], 10.0 + np.arange(5))
+        np.testing.assert_array_equal(np.load(set_path / "virial.npy"), np.tile([1.0, 0.0, 0.0, 0.0, 2.0, 0.0, 0.0, 0.0, 3.0], (5, 1)))
+        self.assertEqual([_.name for _ in (self.temp_path / "data").iterdir()], ["init_reference"])
+
+    def test_import_with_stress(self):
+        """
+        Tests that a Voigt stress is converted to a virial.
+        """
+        self.write_xyz('stress="1.0 2.0 3.0 0.0 0.0 0.5"')
+        import_extended_xyz_dataset(self.xyz_file, self.dataset_path, self.properties)
+        virial = np.load(self.dataset_path / "set.000" / "virial.npy")
+        volumes = 100.0 * (10.0 + np.arange(5))
+        np.testing.assert_allclose(virial[:, [0, 1, 4, 8]], -np.outer(volumes, [1.0, 0.5, 2.0, 3.0]))
+
+    def test_changing_atom_order(self):
+        """
+        Tests that a change in the order of the atoms raises a ValueError and leaves no dataset.
+        """
+        self.write_xyz("")
+        # Swap the O and the first H of the last frame
+        lines = self.xyz_file.read_text().splitlines()
+        lines[-3], lines[-2] = lines[-2], lines[-3]
+        self.xyz_file.write_text("\n".join(lines) + "\n")
+        with self.assertRaises(ValueError):
+            import_extended_xyz_dataset(self.xyz_file, self.dataset_path, self.properties, memory_budget_mb=1e-6)
+        self.assertEqual(list((self.temp_path / "data").iterdir()), [])
+
+    def test_unknown_species(self):
+        """
+        Tests that a species not in the properties raises a ValueError.
+        """
+        self.write_xyz("", species=("N", "H", "H"))
+        with self.assertRaises(ValueError):
+            import_extended_xyz_dataset(self.xyz_file, self.dataset_path, self.properties)
+
+    def test_existing_dataset(self):
+        """
+        Tests that an existing dataset raises a FileExistsError.
+        """
+        self.write_xyz("")
+        self.dataset_path.mkdir()
+        with self.assertRaises(FileExistsError):
+            import_extended_xyz_dataset(self.xyz_file, self.dataset_path, self.properties)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -6,16 +6,26 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/18
 
 Test cases for the xyz module.
 
-Classes:
---------
+Classes
+-------
+TestIterXyzFrames():
+    Test case for the 'iter_xyz_frames' function.
+TestParseXyzTrajectoryFile():
+    Test case for the 'parse_xyz_trajectory_file' function.
+TestReadXyzFrames():
+    Test case for the 'get_xyz_frame_offsets' and 'read_xyz_frames' functions.
+TestWriteXyzFrames():
+    Test case for the 'write_xyz_frame' and 'write_xyz_frames' functions.
+TestReadXyzMaxFStd():
+    Test case for the 'read_xyz_max_f_std' function.
+TestParseExtendedXyz():
+    Test case for the 'parse_extended_xyz_info' and 'parse_extended_xyz_properties' functions.
 """
 
-# TODO : Add test cases for the xyz module
-
 # Standard library modules
 import unittest
 import tempfile
@@ -24,6 +34,365 @@ from pathlib import Path
 # Third-party modules
 import numpy as np
 
+# Local imports
+from arcann_training.common.xyz import get_xyz_frame_offsets, iter_xyz_frames, parse_extended_xyz_info, parse_extended_xyz_properties, parse_xyz_trajectory_file, read_xyz_frames, read_xyz_max_f_std, write_xyz_frame, write_xyz_frames
+
+
+XYZ_TRAJECTORY = """3
+Lattice="10.0 0.0 0.0 0.0 10.0 0.0 0.0 0.0 10.0" Properties=species:S:1:pos:R:3 pbc="T T T" max_f_std=0.125
+O 0.000000 0.000000 0.000000
+H 0.757000 0.586000 0.000000
+H -0.757000 0.586000 0.000000
+3
+Lattice="11.0 0.0 0.0 0.0 11.0 0.0 0.0 0.0 11.0" Properties=species:S:1:pos:R:3 pbc="T T T" max_f_std=0.250
+O 0.100000 0.000000 0.000000
+H 0.857000 0.586000 0.000000
+H -0.657000 0.586000 0.000000
+"""
+
+
+class TestIterXyzFrames(unittest.TestCase):
+    """
+    Test case for the 'iter_xyz_frames' function.
+
+    Methods
+    -------
+    test_iter_frames():
+        Test that each frame is yielded with its symbols, coordinates and parsed header.
+    test_file_not_found():
+        Test that a missing file raises a FileNotFoundError when calling the function.
+    test_non_constant_atom_count():
+        Test that a change in the number of atoms raises a ValueError.
+    test_invalid_atom_count():
+        Test that a non-integer atom count raises a TypeError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.xyz_file = Path(self.temp_dir.name) / "traj.xyz"
+        self.xyz_file.write_text(XYZ_TRAJECTORY)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_iter_frames(self):
+        """
+        Test that each frame is yielded with its symbols, coordinates and parsed header.
+        """
+        frames = list(iter_xyz_frames(self.xyz_file))
+        self.assertEqual(len(frames), 2)
+        symbols, coordinates, comment, lattice, properties, pbc, max_f_std = frames[1]
+        np.testing.assert_array_equal(symbols, np.array(["O", "H", "H"]))
+        np.testing.assert_array_almost_equal(coordinates[0], [0.1, 0.0, 0.0])
+        self.assertTrue(comment.startswith('Lattice="11.0'))
+        self.assertEqual(lattice[0], 11.0)
+        self.assertTrue(properties)
+        self.assertEqual(pbc, [True, True, True])
+        self.assertEqual(max_f_std, 0.25)
+
+    def test_file_not_found(self):
+        """
+        Test that a missing file raises a FileNotFoundError when calling the function.
+        """
+        with self.assertRaises(FileNotFoundError):
+            iter_xyz_frames(Path(self.temp_dir.name) / "missing.xyz")
+
+    def test_non_constant_atom_count(self):
+        """
+        Test that a change in the number of atoms raises a ValueError.
+        """
+        self.xyz_file.write_text(XYZ_TRAJECTORY + "1\n\nO 0.0 0.0 0.0\n")
+        with self.assertRaises(ValueError):
+            list(iter_xyz_frames(self.xyz_file))
+
+    def test_invalid_atom_count(self):
+        """
+        Test that a non-integer atom count raises a TypeError.
+        """
+        self.xyz_file.write_text("three\n\nO 0.0 0.0 0.0\n")
+        with self.assertRaises(TypeError):
+            list(iter_xyz_frames(self.xyz_file))
+
+
+class TestParseXyzTrajectoryFile(unittest.TestCase):
+    """
+    Test case for the 'parse_xyz_trajectory_file' function.
+
+    Methods
+    -------
+    test_parse_trajectory():
+        Test that the stacked arrays and lists match the content of the file.
+    test_vectorized_matches_frame_by_frame():
+        Test that the vectorized parser gives the same result as the frame by frame parser.
+    test_invalid_atom_line():
+        Test that an atom line with the wrong number of columns raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.xyz_file = Path(self.temp_dir.name) / "traj.xyz"
+        self.xyz_file.write_text(XYZ_TRAJECTORY)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_parse_trajectory(self):
+        """
+        Test that the stacked arrays and lists match the content of the file.
+        """
+        atom_counts, atomic_symbols, atomic_coordinates, comments, lattice_info, pbc_info, properties_info, max_f_std_info = parse_xyz_trajectory_file(self.xyz_file)
+        np.testing.assert_array_equal(atom_counts, np.array([3, 3]))
+        self.assertEqual(atomic_symbols.shape, (2, 3))
+        self.assertEqual(atomic_coordinates.shape, (2, 3, 3))
+        self.assertEqual(len(comments), 2)
+        np.testing.assert_array_equal(lattice_info[0], np.array([10.0, 0.0, 0.0, 0.0, 10.0, 0.0, 0.0, 0.0, 10.0]))
+        self.assertEqual(pbc_info, [[True, True, True], [True, True, True]])
+        self.assertEqual(properties_info, [True, True])
+        self.assertEqual(max_f_std_info, [0.125, 0.25])
+
+    def test_vectorized_matches_frame_by_frame(self):
+        """
+        Test that the vectorized parser gives the same result as the frame by frame parser.
+        """
+        self.xyz_file.write_text(XYZ_TRAJECTORY + "3\nno extended header\nO 1.0 2.0 3.0\nH 4.0 5.0 6.0\nH 7.0 8.0 9.0\n")
+        frames = list(iter_xyz_frames(self.xyz_file))
+        atom_counts, atomic_symbols, atomic_coordinates, comments, lattice_info, pbc_info, properties_info, max_f_std_info = parse_xyz_trajectory_file(self.xyz_file)
+        np.testing.assert_array_equal(atom_counts, np.array([3, 3, 3]))
+        np.testing.assert_array_equal(atomic_symbols, np.array([frame[0] for frame in frames]))
+        np.testing.assert_array_equal(atomic_coordinates, np.array([frame[1] for frame in frames]))
+        self.assertEqual(comments, [frame[2] for frame in frames])
+        self.assertIsNone(lattice_info[2])
+        np.testing.assert_array_equal(lattice_info[1], np.array(frames[1][3]))
+        self.assertEqual(pbc_info, [[True, True, True], [True, True, True], None])
+        self.assertEqual(properties_info, [True, True, None])
+        self.assertEqual(max_f_std_info, [0.125, 0.25, None])
+
+    def test_invalid_atom_line(self):
+        """
+        Test that an atom line with the wrong number of columns raises a ValueError.
+        """
+        self.xyz_file.write_text("2\n\nO 0.0 0.0 0.0\nH 0.0 0.0 0.0 1.0\n")
+        with self.assertRaises(ValueError):
+            parse_xyz_trajectory_file(self.xyz_file)
+
+
+class TestReadXyzFrames(unittest.TestCase):
+    """
+    Test case for the 'get_xyz_frame_offsets' and 'read_xyz_frames' functions.
+
+    Methods
+    -------
+    test_offsets_and_sidecar():
+        Test that the offsets point to the frames and are persisted in the sidecar.
+    test_sidecar_invalidated():
+        Test that the sidecar is rebuilt when the trajectory changes.
+    test_read_selected_frames():
+        Test that only the requested frames are returned, in the requested order.
+    test_out_of_range():
+        Test that an out of range frame index raises an IndexError.
+    test_truncated_frame():
+        Test that a truncated last frame raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.xyz_file = Path(self.temp_dir.name) / "traj.xyz"
+        self.xyz_file.write_text(XYZ_TRAJECTORY)
+        self.index_file = Path(self.temp_dir.name) / "traj.xyz.xyzidx"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_offsets_and_sidecar(self):
+        """
+        Test that the offsets point to the frames and are persisted in the sidecar.
+        """
+        offsets = get_xyz_frame_offsets(self.xyz_file)
+        content = self.xyz_file.read_bytes()
+        np.testing.assert_array_equal(offsets, np.array([0, content.index(b"3\nLattice=\"11.0")]))
+        self.assertTrue(self.index_file.is_file())
+        np.testing.assert_array_equal(np.load(self.index_file)[2:], offsets)
+
+    def test_sidecar_invalidated(self):
+        """
+        Test that the sidecar is rebuilt when the trajectory changes.
+        """
+        get_xyz_frame_offsets(self.xyz_file)
+        self.xyz_file.write_text(XYZ_TRAJECTORY + XYZ_TRAJECTORY)
+        self.assertEqual(get_xyz_frame_offsets(self.xyz_file).shape[0], 4)
+
+    def test_read_selected_frames(self):
+        """
+        Test that only the requested frames are returned, in the requested order.
+        """
+        atom_counts, atomic_symbols, atomic_coordinates, comments, lattice_info, pbc_info, properties_info, max_f_std_info = read_xyz_frames(self.xyz_file, [1, 0])
+        np.testing.assert_array_equal(atom_counts, np.array([3, 3]))
+        self.assertEqual(atomic_coordinates.shape, (2, 3, 3))
+        np.testing.assert_array_almost_equal(atomic_coordinates[0, 0], [0.1, 0.0, 0.0])
+        self.assertEqual(lattice_info[0][0], 11.0)
+        self.assertEqual(max_f_std_info, [0.25, 0.125])
+
+    def test_out_of_range(self):
+        """
+        Test that an out of range frame index raises an IndexError.
+        """
+        with self.assertRaises(IndexError):
+            read_xyz_frames(self.xyz_file, [2])
+
+    def test_truncated_frame(self):
+        """
+        Test that a truncated last frame raises a ValueError.
+        """
+        self.xyz_file.write_text(XYZ_TRAJECTORY + "3\n\nO 0.0 0.0 0.0\n")
+        with self.assertRaises(ValueError):
+            get_xyz_frame_offsets(self.xyz_file)
+
+
+class TestWriteXyzFrames(unittest.TestCase):
+    """
+    Test case for the 'write_xyz_frame' and 'write_xyz_frames' functions.
+
+    Methods
+    -------
+    test_write_frame():
+        Test the content written for a single frame with a lattice.
+    test_write_frames_one_file():
+        Test that all the frames are written in order in a single file.
+    test_write_frames_many_files():
+        Test that each frame is written in its own file, with the original comment when there is no lattice.
+    test_invalid_arguments():
+        Test the errors raised for an out of range index and a mismatched number of paths.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.atom_counts = np.array([2, 2])
+        self.atomic_symbols = np.array([["O", "H"], ["C", "H"]])
+        self.atomic_coordinates = np.array([[[0.0, 0.0, 0.0], [1.0, 0.5, -0.25]], [[1.0, 1.0, 1.0], [2.0, 2.0, 2.0]]])
+        self.cell_info = np.array([[10.0, 0.0, 0.0, 0.0, 10.0, 0.0, 0.0, 0.0, 10.0]] * 2)
+        self.comments = ["first", "second"]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write_frame(self):
+        """
+        Test the content written for a single frame with a lattice.
+        """
+        xyz_file = Path(self.temp_dir.name) / "frame.xyz"
+        write_xyz_frame(xyz_file, 0, self.atom_counts, self.atomic_symbols, self.atomic_coordinates, self.cell_info, self.comments)
+        expected = '2\nLattice="10.0 0.0 0.0 0.0 10.0 0.0 0.0 0.0 10.0" Properties=species:S:1:pos:R:3\nO 0.000000 0.000000 0.000000\nH 1.000000 0.500000 -0.250000\n'
+        self.assertEqual(xyz_file.read_text(), expected)
+
+    def test_write_frames_one_file(self):
+        """
+        Test that all the frames are written in order in a single file.
+        """
+        xyz_file = Path(self.temp_dir.name) / "frames.xyz"
+        write_xyz_frames(xyz_file, [1, 0], self.atom_counts, self.atomic_symbols, self.atomic_coordinates, self.cell_info, self.comments)
+        atom_counts, atomic_symbols, atomic_coordinates, _, _, _, _, _ = parse_xyz_trajectory_file(xyz_file)
+        np.testing.assert_array_equal(atomic_symbols, self.atomic_symbols[[1, 0]])
+        np.testing.assert_array_equal(atomic_coordinates, self.atomic_coordinates[[1, 0]])
+
+    def test_write_frames_many_files(self):
+        """
+        Test that each frame is written in its own file, with the original comment when there is no lattice.
+        """
+        xyz_files = [Path(self.temp_dir.name) / f"frame_{idx}.xyz" for idx in range(2)]
+        write_xyz_frames(xyz_files, [0, 1], self.atom_counts, self.atomic_symbols, self.atomic_coordinates, np.array([]), self.comments)
+        self.assertEqual(xyz_files[1].read_text().splitlines()[:3], ["2", "second", "C 1.000000 1.000000 1.000000"])
+
+    def test_invalid_arguments(self):
+        """
+        Test the errors raised for an out of range index and a mismatched number of paths.
+        """
+        with self.assertRaises(IndexError):
+            write_xyz_frames(Path(self.temp_dir.name) / "frames.xyz", [2], self.atom_counts, self.atomic_symbols, self.atomic_coordinates, self.cell_info, self.comments)
+        with self.assertRaises(ValueError):
+            write_xyz_frames([Path(self.temp_dir.name) / "frame.xyz"], [0, 1], self.atom_counts, self.atomic_symbols, self.atomic_coordinates, self.cell_info, self.comments)
+
+
+class TestReadXyzMaxFStd(unittest.TestCase):
+    """
+    Test case for the 'read_xyz_max_f_std' function.
+
+    Methods
+    -------
+    test_scan_and_index():
+        Test the deviation values read with and without the frame index sidecar.
+    test_missing_value():
+        Test that a frame without 'max_f_std' gives NaN.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.xyz_file = Path(self.temp_dir.name) / "traj.xyz"
+        self.xyz_file.write_text(XYZ_TRAJECTORY)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_scan_and_index(self):
+        """
+        Test the deviation values read with and without the frame index sidecar.
+        """
+        max_f_std = read_xyz_max_f_std(self.xyz_file)
+        self.assertEqual(max_f_std.dtype, np.float64)
+        np.testing.assert_array_equal(max_f_std, np.array([0.125, 0.25]))
+        self.assertTrue((Path(self.temp_dir.name) / "traj.xyz.xyzidx").is_file())
+        np.testing.assert_array_equal(read_xyz_max_f_std(self.xyz_file), max_f_std)
+
+    def test_missing_value(self):
+        """
+        Test that a frame without 'max_f_std' gives NaN.
+        """
+        self.xyz_file.write_text(XYZ_TRAJECTORY + "3\n\nO 0.0 0.0 0.0\nH 0.0 0.0 0.0\nH 0.0 0.0 0.0\n")
+        max_f_std = read_xyz_max_f_std(self.xyz_file)
+        self.assertEqual(max_f_std.shape, (3,))
+        self.assertTrue(np.isnan(max_f_std[2]))
+
+
+class TestParseExtendedXyz(unittest.TestCase):
+    """
+    Test case for the 'parse_extended_xyz_info' and 'parse_extended_xyz_properties' functions.
+
+    Methods
+    -------
+    test_parse_info():
+        Test that quoted, braced and bare values are parsed.
+    test_parse_properties():
+        Test the columns of a properties specification.
+    test_invalid_properties():
+        Test that an invalid properties specification raises a ValueError.
+    """
+
+    def test_parse_info(self):
+        """
+        Test that quoted, braced and bare values are parsed.
+        """
+        info = parse_extended_xyz_info('Lattice="10.0 0.0 0.0 0.0 10.0 0.0 0.0 0.0 10.0" Properties=species:S:1:pos:R:3 energy=-12.5 stress={1 2 3 4 5 6} name=\'a b\'')
+        self.assertEqual(info["Lattice"], "10.0 0.0 0.0 0.0 10.0 0.0 0.0 0.0 10.0")
+        self.assertEqual(info["Properties"], "species:S:1:pos:R:3")
+        self.assertEqual(info["energy"], "-12.5")
+        self.assertEqual(info["stress"], "1 2 3 4 5 6")
+        self.assertEqual(info["name"], "a b")
+
+    def test_parse_properties(self):
+        """
+        Test the columns of a properties specification.
+        """
+        columns = parse_extended_xyz_properties("species:S:1:pos:R:3:forces:R:3:Z:I:1")
+        self.assertEqual(columns, [("species", "S", 1, 0), ("pos", "R", 3, 1), ("forces", "R", 3, 4), ("Z", "I", 1, 7)])
+
+    def test_invalid_properties(self):
+        """
+        Test that an invalid properties specification raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            parse_extended_xyz_properties("species:S:1:pos:R")
+        with self.assertRaises(ValueError):
+            parse_extended_xyz_properties("species:S:1:pos:X:3")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -11,7 +11,7 @@ setup(
     packages=find_packages(),
     package_data={
         "arcann_training.assets": ["*.json"],
-        "arcann_training.assets.others": ["*.in", "*.tcl"],
+        "arcann_training.assets.others": ["*.in"],
     },
     classifiers=[
         "Development Status :: 4 - Beta",
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+Benchmark of the search of the starting point of the next exploration (selected frame with the lowest max_devi_f):
+'get_minimum_deviation_index' (searchsorted then argmin) against the previous loop over the selected steps.
+
+Usage: python tools/benchmark_minimum_deviation.py [--frames 1000000] [--selected 1000]
+"""
+
+# Standard library modules
+import argparse
+import time
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.exploration.utils import get_minimum_deviation_index
+
+
+def minimum_index_loop(model_deviation: np.ndarray, selected_indexes: np.ndarray) -> int:
+    min_val = 1e30
+    for selected_idx in selected_indexes:
+        temp_min = model_deviation[:, 1][np.where(model_deviation[:, 0] == selected_idx)]
+        if temp_min < min_val:
+            min_val = temp_min
+            min_index = selected_idx
+    return int(min_index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the minimum deviation search")
+    parser.add_argument("--frames", type=int, default=1000000, help="number of frames of the trajectory")
+    parser.add_argument("--selected", type=int, default=1000, help="number of selected frames")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    model_deviation = np.column_stack((np.arange(args.frames) * 10.0, rng.random(args.frames)))
+    selected_indexes = np.sort(rng.choice(model_deviation[:, 0], args.selected, replace=False)).astype(int)
+    print(f"Trajectory: {args.frames} frames, {args.selected} selected")
+
+    start = time.perf_counter()
+    min_index_loop = minimum_index_loop(model_deviation, selected_indexes)
+    time_loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    min_index_vectorized = get_minimum_deviation_index(model_deviation, selected_indexes)
+    time_vectorized = time.perf_counter() - start
+
+    assert min_index_loop == min_index_vectorized
+    print(f"Loop:       {time_loop * 1000:.1f} ms")
+    print(f"Vectorized: {time_vectorized * 1000:.1f} ms")
+    print(f"Speedup:    {time_loop / time_vectorized:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/18
+Last modified: 2026/10/18
+
+Benchmark of the XYZ trajectory parsers: the vectorized (constant atom count) parser used by
+'parse_xyz_trajectory_file' against the frame by frame parser ('iter_xyz_frames').
+
+Usage: python tools/benchmark_xyz_parsing.py [--frames 100000] [--atoms 10]
+"""
+
+# Standard library modules
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.xyz import iter_xyz_frames, parse_xyz_trajectory_file
+
+
+def write_trajectory(trajectory_file_path: Path, nb_frames: int, nb_atoms: int) -> None:
+    rng = np.random.default_rng(0)
+    symbols = np.array(["O", "H", "H"] * (nb_atoms // 3 + 1))[:nb_atoms]
+    with trajectory_file_path.open("w") as file:
+        for frame_idx in range(nb_frames):
+            coordinates = rng.random((nb_atoms, 3)) * 10.0
+            file.write(f"{nb_atoms}\n")
+            file.write(f'Lattice="10.0 0.0 0.0 0.0 10.0 0.0 0.0 0.0 10.0" Properties=species:S:1:pos:R:3 pbc="T T T" max_f_std={rng.random():.6f}\n')
+            file.write("\n".join(f"{symbol} {x:.6f} {y:.6f} {z:.6f}" for symbol, (x, y, z) in zip(symbols, coordinates)))
+            file.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the XYZ trajectory parsers")
+    parser.add_argument("--frames", type=int, default=100000, help="number of frames")
+    parser.add_argument("--atoms", type=int, default=10, help="number of atoms per frame")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        trajectory_file_path = Path(temp_dir) / "benchmark.xyz"
+        write_trajectory(trajectory_file_path, args.frames, args.atoms)
+        print(f"File: {args.frames} frames x {args.atoms} atoms ({trajectory_file_path.stat().st_size / 1024**2:.1f} MiB)")
+
+        start = time.perf_counter()
+        frame_by_frame = [frame for frame in iter_xyz_frames(trajectory_file_path)]
+        coordinates_reference = np.array([frame[1] for frame in frame_by_frame])
+        time_frame_by_frame = time.perf_counter() - start
+        del frame_by_frame
+
+        start = time.perf_counter()
+        _, _, coordinates, _, _, _, _, _ = parse_xyz_trajectory_file(trajectory_file_path)
+        time_vectorized = time.perf_counter() - start
+
+        np.testing.assert_array_equal(coordinates, coordinates_reference)
+        print(f"Frame by frame parser: {time_frame_by_frame:.2f} s")
+        print(f"Vectorized parser:     {time_vectorized:.2f} s")
+        print(f"Speedup:               {time_frame_by_frame / time_vectorized:.1f}x")
+
+
+if __name__ == "__main__":
+    main()